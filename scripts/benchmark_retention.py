@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Lock-hold benchmark: single-transaction prune vs batched retention.
+
+Seeds a database with old strategy decisions, then prunes it while a writer
+thread keeps inserting decisions the way the trading loop does (one short
+transaction every few milliseconds). For each pruner it reports how long the
+writer was blocked (p50/p99/max per write) and the longest transaction the
+pruner held.
+
+Usage:
+    python scripts/benchmark_retention.py --rows 500000 --batch-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sqlalchemy import delete  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from trading_bot.db.maintenance import prune_old_events  # noqa: E402
+from trading_bot.db.models import StrategyDecisionEvent  # noqa: E402
+from trading_bot.db.repository import SqliteRepository  # noqa: E402
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+INSERT = (
+    "INSERT INTO strategy_decisions (ts, symbol, mode, signal, confidence, votes_json, "
+    "weights_json, explanations_json) VALUES (?, ?, 'ensemble', ?, 0.5, '{}', '{}', '{}')"
+)
+
+
+def seed(path: Path, rows: int) -> SqliteRepository:
+    repo = SqliteRepository(db_path=path)
+    repo.init_db()
+    start = datetime(2024, 1, 1)
+    con = sqlite3.connect(path)
+    con.executemany(
+        INSERT,
+        ((str(start + timedelta(seconds=i)), f"S{i % 100:03d}", i % 2) for i in range(rows)),
+    )
+    con.commit()
+    con.close()
+    return repo
+
+
+def legacy_prune(session: Session, cutoff: datetime) -> dict:
+    """What prune_old_events used to do: one unbounded DELETE, one commit."""
+    t0 = time.perf_counter()
+    session.execute(delete(StrategyDecisionEvent).where(StrategyDecisionEvent.ts < cutoff))
+    session.commit()
+    return {"max_txn_ms": (time.perf_counter() - t0) * 1000.0}
+
+
+def writer(path: Path, stop: threading.Event, latencies: list[float]) -> None:
+    con = sqlite3.connect(path, timeout=60)
+    ts = str(NOW.replace(tzinfo=None))
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        con.execute(INSERT, (ts, "LIVE", 1))
+        con.commit()
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        time.sleep(0.005)
+    con.close()
+
+
+def run(name: str, path: Path, rows: int, batch_size: int) -> None:
+    repo = seed(path, rows)
+    latencies: list[float] = []
+    stop = threading.Event()
+    thread = threading.Thread(target=writer, args=(path, stop, latencies), daemon=True)
+    thread.start()
+    time.sleep(0.2)  # writer warm-up
+
+    t0 = time.perf_counter()
+    with Session(repo._engine()) as session:
+        if name == "single":
+            stats = legacy_prune(session, (NOW - timedelta(days=7)).replace(tzinfo=None))
+        else:
+            stats = prune_old_events(session, batch_size=batch_size, hourly_rollup=False, now=NOW)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    thread.join()
+
+    lat = sorted(latencies)
+    pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]  # noqa: E731
+    print(
+        f"  {name:8s} prune {elapsed:7.2f}s  longest txn {stats['max_txn_ms']:9.1f} ms  "
+        f"writes {len(lat):6d}  p50 {pct(0.5):7.2f} ms  p99 {pct(0.99):8.2f} ms  "
+        f"max {lat[-1]:9.1f} ms"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--batch-size", type=int, default=5_000)
+    args = ap.parse_args()
+
+    print(f"{args.rows} old strategy decisions, batch size {args.batch_size}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("single", "batched"):
+            run(name, Path(tmp) / f"{name}.sqlite", args.rows, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: direct SqliteRepository vs BatchedSqliteRepository.
+
+Simulates paper-engine steps that each log one order, one fill and one
+strategy decision per symbol plus a portfolio snapshot. Reports events/sec
+and time per step for both repositories.
+
+Usage:
+    python scripts/benchmark_write_behind.py --steps 50 --symbols 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from trading_bot.core.models import Fill, Order, Portfolio, Position  # noqa: E402
+from trading_bot.db.repository import SqliteRepository  # noqa: E402
+from trading_bot.db.write_behind import BatchedSqliteRepository  # noqa: E402
+from trading_bot.strategy.base import StrategyDecision  # noqa: E402
+
+
+def log_step(repo, step: int, symbols: list[str]) -> int:
+    ts = datetime(2024, 1, 2) + timedelta(minutes=step)
+    prices = {}
+    for k, sym in enumerate(symbols):
+        oid = f"{step}-{sym}"
+        px = 100.0 + k + step * 0.01
+        prices[sym] = px
+        repo.log_order_filled(Order(id=oid, ts=ts, symbol=sym, side="BUY", qty=10))
+        repo.log_fill(Fill(order_id=oid, ts=ts, symbol=sym, side="BUY", qty=10, price=px))
+        repo.log_strategy_decision(
+            ts=ts,
+            symbol=sym,
+            mode="ensemble",
+            decision=StrategyDecision(
+                signal=1,
+                confidence=0.6,
+                votes={"rsi": 1, "macd": 0, "atr": 1},
+                weights={"rsi": 0.4, "macd": 0.3, "atr": 0.3},
+                explanations={"rsi": {"rsi": 28.1}},
+            ),
+        )
+    portfolio = Portfolio(
+        cash=100_000.0,
+        positions={s: Position(symbol=s, qty=10, avg_price=prices[s]) for s in symbols},
+    )
+    repo.log_snapshot(ts=ts, portfolio=portfolio, prices=prices)
+    return 3 * len(symbols) + 1 + len(symbols)
+
+
+def run(repo, steps: int, symbols: list[str]) -> tuple[float, int]:
+    repo.init_db()
+    rows = 0
+    start = time.perf_counter()
+    for step in range(steps):
+        rows += log_step(repo, step, symbols)
+        if isinstance(repo, BatchedSqliteRepository):
+            repo.flush()  # what PaperEngine.step does
+    elapsed = time.perf_counter() - start
+    if isinstance(repo, BatchedSqliteRepository):
+        repo.close()
+    return elapsed, rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--steps", type=int, default=20)
+    ap.add_argument("--symbols", type=int, default=50)
+    args = ap.parse_args()
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, cls in (("direct", SqliteRepository), ("batched", BatchedSqliteRepository)):
+            repo = cls(db_path=Path(tmp) / f"{name}.sqlite")
+            results[name] = run(repo, args.steps, symbols)
+
+    print(f"{args.steps} steps x {args.symbols} symbols")
+    for name, (elapsed, rows) in results.items():
+        print(
+            f"  {name:8s} {rows:8d} rows  {elapsed:8.3f}s  "
+            f"{rows / elapsed:10.0f} rows/s  {1000 * elapsed / args.steps:8.2f} ms/step"
+        )
+    print(f"  speedup  {results['direct'][0] / results['batched'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ import json
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 import sqlite3
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, as_completed
@@ -29,6 +29,9 @@ import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from trading_bot.core.shared_panel import SharedOHLCVPanel  # noqa: E402
+
+
 class Strategy:
     """Base strategy class"""
     
@@ -196,8 +199,21 @@ def backtest_strategy(strategy: Strategy, df: pd.DataFrame, start_cash: float =
     }
 
 
-def run_generation(generation: int, symbols: List[str], all_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+def backtest_panel_symbol(strategy: Strategy, panel: SharedOHLCVPanel, symbol: str) -> Dict[str, Any]:
+    """Worker entry point: backtest one symbol read from the shared panel"""
+    df = panel.frame(symbol).rename_axis('Date').reset_index()
+    return backtest_strategy(strategy, df)
+
+
+def run_generation(
+    generation: int,
+    symbols: List[str],
+    all_data: Union[Dict[str, pd.DataFrame], SharedOHLCVPanel],
+) -> Dict[str, Any]:
     """Run one generation of strategy testing in parallel"""
+    if not isinstance(all_data, SharedOHLCVPanel):
+        with SharedOHLCVPanel.publish(all_data) as panel:
+            return run_generation(generation, symbols, panel)
     
     print(f"\n{'='*80}")
     print(f"GENERATION {generation} - TESTING STRATEGIES IN PARALLEL")
@@ -216,7 +232,7 @@ def run_generation(generation: int, symbols: List[str], all_data: Dict[str, pd.D
     
     results = []
     
-    # Run backtests in parallel
+    # Run backtests in parallel; workers attach to the shared panel by name
     with ProcessPoolExecutor(max_workers=4) as executor:
         futures = {}
         
@@ -224,8 +240,7 @@ def run_generation(generation: int, symbols: List[str], all_data: Dict[str, pd.D
             # Test on multiple symbols
             for symbol in symbols[:20]:  # Test on first 20 symbols for speed
                 if symbol in all_data:
-                    df = all_data[symbol]
-                    future = executor.submit(backtest_strategy, strategy, df)
+                    future = executor.submit(backtest_panel_symbol, strategy, all_data, symbol)
                     futures[future] = (strategy.name, symbol)
         
         # Collect results
@@ -315,14 +330,16 @@ def main():
     # Run multiple generations with learning
     evolution_results = []
     
-    for generation in range(1, 4):  # 3 generations
-        gen_result = run_generation(generation, list(all_data.keys()), all_data)
-        evolution_results.append(gen_result)
-        
-        # Brief pause between generations
-        if generation < 3:
-            print(f"\n  Waiting before next generation...")
-            time.sleep(2)
+    # Publish the bars once; every generation's workers share the same block
+    with SharedOHLCVPanel.publish(all_data) as panel:
+        for generation in range(1, 4):  # 3 generations
+            gen_result = run_generation(generation, list(panel.symbols), panel)
+            evolution_results.append(gen_result)
+            
+            # Brief pause between generations
+            if generation < 3:
+                print(f"\n  Waiting before next generation...")
+                time.sleep(2)
     
     # Save evolution results
     conn = sqlite3.connect('data/real_market_data.db')
@@ -1,11 +1,35 @@
+"""DuckDB analytics store, synced incrementally from the SQLite event store.
+
+`build_analytics_db` used to read every row of the event tables into pandas
+and ``create or replace`` each table, so refresh time and peak memory grew
+with history. It now appends only the rows added since the last sync:
+
+- ``sync_state`` keeps a high-water mark per table. Tables with an integer
+  ``id`` use ``id > mark``. ``orders`` (string ids) uses ``ts >= mark`` and
+  skips ids it already holds, so rows sharing the mark's timestamp are not
+  lost or duplicated.
+- Rows are copied by DuckDB's SQLite scanner (``ATTACH ... (TYPE sqlite)``).
+  When the extension cannot be loaded (no network to install it), the same
+  queries run through ``sqlite3`` in chunks of ``CHUNK_ROWS`` rows.
+- Aggregates are maintained from the new rows only. ``daily_equity`` rebuilds
+  the days they touch. ``symbol_flows`` and ``strategy_flows`` add the new
+  fills' totals in place. The ``symbol_pnl`` and ``strategy_attribution``
+  views read from those.
+- `performance_summary` computes return and max drawdown in SQL.
+
+Pass ``full=True`` (``paper analytics build --full``) to drop everything and
+resync from scratch.
+"""
+
 from __future__ import annotations
 
+import sqlite3
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Optional
 
 import pandas as pd
-from sqlalchemy import create_engine
 
 
 @dataclass(frozen=True)
@@ -18,6 +42,101 @@ class PerformanceSummary:
     max_drawdown: float
 
 
+# table -> high-water column ("id": integer primary key, "ts": timestamp + id dedupe)
+SYNC_TABLES = {
+    "orders": "ts",
+    "fills": "id",
+    "portfolio_snapshots": "id",
+    "position_snapshots": "id",
+}
+CHUNK_ROWS = 50_000  # rows per batch on the sqlite3 fallback path
+
+# Order tags look like "signal_long:<mode>" for strategy entries and exits and
+# "<reason>[:detail]" for risk exits ("stop_loss", "partial_tp:2.0%", ...)
+_STRATEGY_OF_NOTE = """
+    case
+        when note like 'signal\\_%:%' escape '\\' then split_part(note, ':', 2)
+        when note = '' then 'untagged'
+        else split_part(note, ':', 1)
+    end
+"""
+
+_FLOW_COLUMNS = """
+    sum(case when side = 'BUY' then qty else 0 end) as bought,
+    sum(case when side = 'SELL' then qty else 0 end) as sold,
+    sum(case when side = 'BUY' then qty * price else 0 end) as buy_notional,
+    sum(case when side = 'SELL' then qty * price else 0 end) as sell_notional,
+    sum(fee) as fees,
+    count(*) as n_fills
+"""
+
+_SCHEMA = [
+    """
+    create table if not exists sync_state (
+        table_name varchar primary key,
+        high_water_id bigint,
+        high_water_ts timestamp,
+        synced_at timestamp
+    )
+    """,
+    """
+    create table if not exists daily_equity (
+        day date primary key,
+        open_equity double,
+        high_equity double,
+        low_equity double,
+        close_equity double,
+        close_cash double,
+        snapshots bigint
+    )
+    """,
+    """
+    create table if not exists symbol_flows (
+        symbol varchar primary key,
+        bought bigint, sold bigint,
+        buy_notional double, sell_notional double,
+        fees double, n_fills bigint
+    )
+    """,
+    """
+    create table if not exists strategy_flows (
+        strategy varchar primary key,
+        bought bigint, sold bigint,
+        buy_notional double, sell_notional double,
+        fees double, n_fills bigint
+    )
+    """,
+]
+
+# Views over the synced tables (created once the source tables exist)
+_VIEWS = [
+    # Cash-flow P&L per symbol, with the open quantity marked at its last price
+    """
+    create or replace view symbol_pnl as
+    with marks as (
+        select symbol, arg_max(last_price, ts) as last_price
+        from position_snapshots group by symbol
+    )
+    select
+        f.symbol, f.bought, f.sold, f.bought - f.sold as open_qty,
+        f.buy_notional, f.sell_notional, f.fees, f.n_fills,
+        coalesce(m.last_price, 0.0) as last_price,
+        f.sell_notional - f.buy_notional - f.fees
+            + (f.bought - f.sold) * coalesce(m.last_price, 0.0) as total_pnl
+    from symbol_flows f left join marks m using (symbol)
+    """,
+    # Cash flows by the tag of the order that produced them: entries and exits
+    # are attributed to the strategy (or risk rule) that placed them
+    """
+    create or replace view strategy_attribution as
+    select
+        strategy, n_fills, bought, sold, buy_notional, sell_notional, fees,
+        sell_notional - buy_notional - fees as net_cash_flow
+    from strategy_flows
+    """,
+]
+
+
 def _require_duckdb():
     try:
         import duckdb  # type: ignore
@@ -31,59 +150,237 @@ def _require_duckdb():
         ) from e
 
 
-def build_analytics_db(*, sqlite_db: Path, duckdb_db: Path) -> None:
-    """Rebuild analytics DuckDB from the SQLite event store."""
+def _attach_sqlite(con, sqlite_db: Path) -> bool:
+    """Attach the event store as ``src`` through the SQLite scanner, if available."""
+    try:
+        con.execute("load sqlite")
+    except Exception:
+        try:
+            con.execute("install sqlite")
+            con.execute("load sqlite")
+        except Exception:
+            return False
+    con.execute(f"attach '{sqlite_db}' as src (type sqlite, read_only)")
+    return True
+
+
+def _stored_mark(con, table: str, column: str) -> Optional[object]:
+    row = con.execute(
+        f"select high_water_{column} from sync_state where table_name = ?", [table]
+    ).fetchone()
+    return None if row is None else row[0]
+
+
+def _table_max(con, table: str, column: str) -> Optional[object]:
+    """Highest ``column`` already copied (stores built before sync_state have no mark)."""
+    exists = con.execute(
+        "select count(*) from information_schema.tables"
+        " where table_name = ? and table_schema = 'main'",
+        [table],
+    ).fetchone()[0]
+    if not exists:
+        return None
+    return con.execute(f"select max({column}) from main.{table}").fetchone()[0]
 
-    duckdb = _require_duckdb()
 
-    engine = create_engine(f"sqlite:///{sqlite_db}")
+def _new_rows_filter(table: str, column: str, mark) -> tuple[str, list]:
+    if mark is None:
+        return "", []
+    if column == "id":
+        return "where id > ?", [mark]
+    return f"where ts >= ? and id not in (select id from main.{table} where ts >= ?)", [mark, mark]
 
-    tables = {
-        "orders": pd.read_sql_query("select * from orders", engine),
-        "fills": pd.read_sql_query("select * from fills", engine),
-        "portfolio_snapshots": pd.read_sql_query("select * from portfolio_snapshots", engine),
-        "position_snapshots": pd.read_sql_query("select * from position_snapshots", engine),
-    }
+
+def _copy_native(con, table: str, column: str, mark) -> None:
+    con.execute(f"create table if not exists main.{table} as select * from src.{table} limit 0")
+    where, params = _new_rows_filter(table, column, mark)
+    con.execute(f"insert into main.{table} by name select * from src.{table} {where}", params)
+
+
+def _copy_chunked(con, sqlite_db: Path, table: str, column: str, mark) -> None:
+    src = sqlite3.connect(f"file:{sqlite_db}?mode=ro", uri=True)
+    try:
+        if column == "id" or mark is None:
+            where, params = ("", []) if mark is None else ("where id > ?", [mark])
+            sql = f"select * from {table} {where} order by {column}"
+        else:
+            # The id dedupe runs in DuckDB; SQLite only narrows by timestamp
+            where, params = "where ts >= ?", [pd.Timestamp(mark).strftime("%Y-%m-%d %H:%M:%S.%f")]
+            sql = f"select * from {table} {where} order by ts"
+        chunks = pd.read_sql_query(
+            sql, src, params=params, chunksize=CHUNK_ROWS, parse_dates=["ts"]
+        )
+        for chunk in chunks:
+            con.register("chunk", chunk)
+            try:
+                con.execute(
+                    f"create table if not exists main.{table} as select * from chunk limit 0"
+                )
+                if column == "ts" and mark is not None:
+                    con.execute(
+                        f"insert into main.{table} by name select * from chunk "
+                        f"where id not in (select id from main.{table} where ts >= ?)",
+                        [mark],
+                    )
+                else:
+                    con.execute(f"insert into main.{table} by name select * from chunk")
+            finally:
+                con.unregister("chunk")
+    finally:
+        src.close()
+
+
+def _refresh_aggregates(con, *, fills_after: Optional[int], snapshots_after: Optional[int]) -> None:
+    """Fold rows with ``id`` above the previous marks into the aggregate tables."""
+    fills_where = "" if fills_after is None else f"where id > {int(fills_after)}"
+    for target, key in (("symbol_flows", "symbol"), ("strategy_flows", _STRATEGY_OF_NOTE)):
+        name = "symbol" if target == "symbol_flows" else "strategy"
+        con.execute(
+            f"""
+            insert into {target}
+            select {key} as {name}, {_FLOW_COLUMNS}
+            from fills {fills_where} group by 1
+            on conflict ({name}) do update set
+                bought = {target}.bought + excluded.bought,
+                sold = {target}.sold + excluded.sold,
+                buy_notional = {target}.buy_notional + excluded.buy_notional,
+                sell_notional = {target}.sell_notional + excluded.sell_notional,
+                fees = {target}.fees + excluded.fees,
+                n_fills = {target}.n_fills + excluded.n_fills
+            """
+        )
+
+    snap_where = "" if snapshots_after is None else f"where id > {int(snapshots_after)}"
+    first_day = con.execute(
+        f"select min(cast(ts as date)) from portfolio_snapshots {snap_where}"
+    ).fetchone()[0]
+    if first_day is None:
+        return
+    con.execute("delete from daily_equity where day >= ?", [first_day])
+    con.execute(
+        """
+        insert into daily_equity
+        select
+            cast(ts as date) as day,
+            arg_min(equity, ts), max(equity), min(equity), arg_max(equity, ts),
+            arg_max(cash, ts), count(*)
+        from portfolio_snapshots
+        where ts >= ?
+        group by 1
+        """,
+        [first_day],
+    )
+
+
+def build_analytics_db(*, sqlite_db: Path, duckdb_db: Path, full: bool = False) -> Dict[str, int]:
+    """Append new SQLite events to the analytics DuckDB; returns rows added per table."""
+
+    duckdb = _require_duckdb()
+
+    with sqlite3.connect(f"file:{sqlite_db}?mode=ro", uri=True) as src:
+        rows = src.execute("select name from sqlite_master where type = 'table'")
+        available = {r[0] for r in rows}
 
     con = duckdb.connect(str(duckdb_db))
     try:
-        for name, df in tables.items():
-            con.register("df", df)
-            con.execute(f"create or replace table {name} as select * from df")
-            con.unregister("df")
+        if full:
+            for name in ("symbol_pnl", "strategy_attribution"):
+                con.execute(f"drop view if exists {name}")
+            derived = ["sync_state", "daily_equity", "symbol_flows", "strategy_flows"]
+            for name in [*SYNC_TABLES, *derived]:
+                con.execute(f"drop table if exists {name}")
+        for ddl in _SCHEMA:
+            con.execute(ddl)
+        native = _attach_sqlite(con, sqlite_db)
+
+        added: Dict[str, int] = {}
+        previous: Dict[str, Optional[object]] = {}
+        con.execute("begin transaction")
+        for table, column in SYNC_TABLES.items():
+            if table not in available:
+                continue
+            # Aggregates fold in rows past the stored mark (all rows on a first sync)
+            previous[table] = _stored_mark(con, table, column)
+            mark = previous[table]
+            if mark is None:
+                mark = _table_max(con, table, column)
+            before = _row_count(con, table)
+            if native:
+                _copy_native(con, table, column, mark)
+            else:
+                _copy_chunked(con, sqlite_db, table, column, mark)
+            added[table] = _row_count(con, table) - before
+            new_mark = _table_max(con, table, column)
+            con.execute(
+                f"""
+                insert into sync_state (table_name, high_water_{column}, synced_at)
+                values (?, ?, now())
+                on conflict (table_name) do update set
+                    high_water_{column} = excluded.high_water_{column},
+                    synced_at = excluded.synced_at
+                """,
+                [table, new_mark],
+            )
+
+        if {"fills", "portfolio_snapshots", "position_snapshots"} <= available:
+            _refresh_aggregates(
+                con,
+                fills_after=previous.get("fills"),
+                snapshots_after=previous.get("portfolio_snapshots"),
+            )
+            for ddl in _VIEWS:
+                con.execute(ddl)
+        con.execute("commit")
+        return added
     finally:
         con.close()
 
 
+def _row_count(con, table: str) -> int:
+    try:
+        return int(con.execute(f"select count(*) from main.{table}").fetchone()[0])
+    except Exception:
+        return 0
+
+
 def performance_summary(*, duckdb_db: Path) -> PerformanceSummary:
     duckdb = _require_duckdb()
 
     con = duckdb.connect(str(duckdb_db), read_only=True)
     try:
-        df = con.execute(
-            "select ts, equity from portfolio_snapshots order by ts asc"
-        ).fetchdf()  # type: ignore[attr-defined]
+        row = con.execute(
+            """
+            with curve as (
+                select
+                    ts, equity,
+                    max(equity) over (
+                        order by ts rows between unbounded preceding and current row
+                    ) as peak
+                from portfolio_snapshots
+            )
+            select
+                min(ts), max(ts),
+                arg_min(equity, ts), arg_max(equity, ts),
+                min(case when peak > 0 then equity / peak - 1.0 end),
+                count(*)
+            from curve
+            """
+        ).fetchone()
     finally:
         con.close()
 
-    if df is None or df.empty:
+    if row is None or not row[5]:
         raise ValueError("No portfolio snapshots found")
 
-    equity = df["equity"].astype(float)
-    running_max = equity.cummax()
-    drawdown = equity / running_max - 1.0
-
-    start_eq = float(equity.iloc[0])
-    end_eq = float(equity.iloc[-1])
-
+    start_ts, end_ts, start_eq, end_eq, max_dd, _ = row
+    start_eq, end_eq = float(start_eq), float(end_eq)
     total_ret = 0.0 if start_eq == 0 else (end_eq / start_eq - 1.0)
-    max_dd = float(drawdown.min())
 
     return PerformanceSummary(
-        start_ts=pd.to_datetime(df["ts"].iloc[0]).to_pydatetime(),
-        end_ts=pd.to_datetime(df["ts"].iloc[-1]).to_pydatetime(),
+        start_ts=pd.to_datetime(start_ts).to_pydatetime(),
+        end_ts=pd.to_datetime(end_ts).to_pydatetime(),
         start_equity=start_eq,
         end_equity=end_eq,
         total_return=float(total_ret),
-        max_drawdown=max_dd,
+        max_drawdown=float(max_dd or 0.0),
     )
@@ -9,11 +9,13 @@ Provides API-friendly snapshots for dashboard integration.
 from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import pandas as pd
 from collections import deque
 
+if TYPE_CHECKING:
+    from trading_bot.engine.online_metrics import OnlineMetrics
+
 
 @dataclass
 class ExecutionMetrics:
@@ -163,8 +165,7 @@ class MetricsCollector:
         iteration: int,
         portfolio,
         prices: Dict[str, float],
-        equity_history: List[float],
-        trade_history: List[dict],
+        metrics: "OnlineMetrics",
         fills: List,
         rejections: List,
     ) -> PerformanceSnapshot:
@@ -176,8 +177,8 @@ class MetricsCollector:
             iteration: Current iteration number
             portfolio: Broker portfolio object
             prices: Current prices by symbol
-            equity_history: Historical equity values
-            trade_history: Historical trades
+            metrics: The engine's OnlineMetrics; Sharpe, drawdown, win rate
+                and streaks are read from it instead of recomputed
             fills: Orders filled this iteration
             rejections: Orders rejected this iteration
             
@@ -235,6 +236,7 @@ class MetricsCollector:
         weekly_return_pct = 0.0
         monthly_return_pct = 0.0
         
+        equity_history = metrics.equity  # bounded ring, newest last
         if len(equity_history) > 1:
             current_equity = equity_history[-1]
             
@@ -250,45 +252,9 @@ class MetricsCollector:
             if len(equity_history) >= 5040:
                 monthly_return_pct = (current_equity - equity_history[-5040]) / equity_history[-5040]
         
-        # Calculate drawdown and Sharpe
-        max_drawdown_pct = 0.0
-        sharpe_ratio = 0.0
-        volatility = 0.0
-        
-        if len(equity_history) > 1:
-            eq_array = np.array(equity_history)
-            cummax = np.maximum.accumulate(eq_array)
-            drawdown = (eq_array - cummax) / cummax
-            max_drawdown_pct = float(np.min(drawdown)) if len(drawdown) > 0 else 0.0
-            
-            # Sharpe ratio (assuming 252 trading days, 0% risk-free rate)
-            returns = np.diff(eq_array) / eq_array[:-1] if len(eq_array) > 1 else np.array([])
-            if len(returns) > 1:
-                volatility = float(np.std(returns))
-                sharpe_ratio = float(np.sqrt(252) * np.mean(returns) / (volatility + 1e-8)) if volatility > 0 else 0.0
-        
-        # Calculate win rate and trade metrics
-        win_rate = 0.0
-        num_trades = len(trade_history)
-        consecutive_wins = 0
-        consecutive_losses = 0
-        
-        if num_trades > 0:
-            winning = len([t for t in trade_history if t.get("pnl", 0) > 0])
-            win_rate = winning / num_trades
-            
-            # Consecutive win/loss streak
-            for t in reversed(trade_history):
-                if t.get("pnl", 0) > 0:
-                    consecutive_wins += 1
-                else:
-                    break
-            
-            for t in reversed(trade_history):
-                if t.get("pnl", 0) <= 0:
-                    consecutive_losses += 1
-                else:
-                    break
+        # Drawdown, Sharpe, win rate and streaks are kept incrementally by the
+        # engine over the whole session
+        start_equity = metrics.start_equity or equity
         
         # Build snapshot
         snapshot = PerformanceSnapshot(
@@ -298,18 +264,18 @@ class MetricsCollector:
             cash=cash,
             gross_exposure=gross_exposure,
             net_exposure=gross_exposure,  # Simplified, assume net = gross for longs
-            current_pnl=equity - (equity_history[0] if equity_history else equity),
-            current_pnl_pct=(equity - (equity_history[0] if equity_history else equity)) / (equity_history[0] if equity_history else equity),
+            current_pnl=equity - start_equity,
+            current_pnl_pct=(equity - start_equity) / start_equity,
             daily_return_pct=daily_return_pct,
             weekly_return_pct=weekly_return_pct,
             monthly_return_pct=monthly_return_pct,
-            sharpe_ratio=sharpe_ratio,
-            max_drawdown_pct=max_drawdown_pct,
-            volatility_pct=volatility,
-            win_rate=win_rate,
-            num_trades=num_trades,
-            consecutive_wins=consecutive_wins,
-            consecutive_losses=consecutive_losses,
+            sharpe_ratio=metrics.sharpe,
+            max_drawdown_pct=metrics.max_drawdown,
+            volatility_pct=metrics.volatility,
+            win_rate=metrics.win_rate,
+            num_trades=metrics.num_trades,
+            consecutive_wins=metrics.consecutive_wins,
+            consecutive_losses=metrics.consecutive_losses,
             num_open_positions=len(positions_list),
             avg_position_size=gross_exposure / len(positions_list) if positions_list else 0.0,
             largest_position=largest_position_sym,
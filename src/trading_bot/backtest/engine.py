@@ -4,7 +4,7 @@ import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Sequence
 
 import numpy as np
 import pandas as pd
@@ -13,15 +13,17 @@ from trading_bot.broker.base import Broker, OrderRejection
 from trading_bot.broker.paper import PaperBroker, PaperBrokerConfig
 from trading_bot.configs import load_config, AppConfig, RiskConfig, PortfolioConfig, StrategyConfig
 from trading_bot.core.models import Fill, Order
-from trading_bot.data.providers import MarketDataProvider, AlpacaProvider, MockDataProvider, YFinanceProvider
 from trading_bot.db.repository import SqliteRepository
 from trading_bot.indicators import add_indicators
 from trading_bot.learn.ensemble import ExponentialWeightsEnsemble
 from trading_bot.strategy.atr_breakout import AtrBreakoutStrategy
-from trading_bot.strategy.base import StrategyDecision
+from trading_bot.strategy.base import CausalOutputs, StrategyDecision, StrategyOutput
 from trading_bot.strategy.macd_volume_momentum import MacdVolumeMomentumStrategy
 from trading_bot.strategy.rsi_mean_reversion import RsiMeanReversionStrategy
 
+if TYPE_CHECKING:
+    from trading_bot.data.providers import MarketDataProvider
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +57,8 @@ class BacktestConfig:
     min_fee: float = 0.0
     strategy_mode: str = "ensemble"  # ensemble|mean_reversion_rsi|momentum_macd_volume|breakout_atr
     data_source: str = "auto"  # auto|alpaca|yahoo
+    # indexed: precompute once, walk row offsets | slice: re-slice per date
+    engine_mode: str = "indexed"
 
 
 def _calculate_returns(equity_series: list[float]) -> np.ndarray:
@@ -119,6 +123,8 @@ class BacktestEngine:
         else:
             # Always use Yahoo Finance for now - it's the most reliable
             # Alpaca data provider has API limits and authentication issues
+            from trading_bot.data.providers import YFinanceProvider
+
             self.data = YFinanceProvider()
         
         self.broker = broker or PaperBroker(
@@ -242,6 +248,21 @@ class BacktestEngine:
         all_dates = sorted(list(all_dates))
         logger.info(f"Backtesting {len(all_dates)} bars across {len(ohlcv_by_symbol)} symbols")
 
+        if self.cfg.engine_mode == "indexed":
+            self._run_indexed(ohlcv_by_symbol, all_dates)
+        elif self.cfg.engine_mode == "slice":
+            self._run_sliced(ohlcv_by_symbol, all_dates)
+        else:
+            raise ValueError(f"Unknown engine_mode: {self.cfg.engine_mode}")
+
+        # Calculate metrics
+        return self._calculate_metrics()
+
+    def _run_sliced(self, ohlcv_by_symbol: Dict[str, pd.DataFrame], all_dates: list) -> None:
+        """Reference path: slice each symbol's history up to every date and re-evaluate.
+
+        O(dates x history) per symbol; kept for parity checks against `_run_indexed`.
+        """
         for date_idx, current_date in enumerate(all_dates):
             self.iteration += 1
 
@@ -269,15 +290,12 @@ class BacktestEngine:
 
             # Evaluate strategies for each symbol
             for sym in ohlcv_subset.keys():
-                if sym not in ohlcv_subset:
-                    continue
-
                 df = ohlcv_subset[sym]
                 if len(df) < 50:  # Need minimum data
                     continue
 
                 # Add indicators
-                df_with_indicators = add_indicators(df)
+                df_with_indicators = add_indicators(df, symbol=sym, interval=self.cfg.interval)
 
                 # Evaluate all strategies
                 outputs = {
@@ -285,139 +303,211 @@ class BacktestEngine:
                     for name, strat in self.strategies.items()
                 }
 
-                # Get ensemble decision
-                if self.cfg.strategy_mode == "ensemble":
-                    dec = self.ensemble.decide(outputs)
-                else:
-                    if self.cfg.strategy_mode not in outputs:
-                        continue
-                    out = outputs[self.cfg.strategy_mode]
-                    dec = StrategyDecision(
-                        signal=int(out.signal),
-                        confidence=float(out.confidence),
-                        votes={self.cfg.strategy_mode: int(out.signal)},
-                        weights={self.cfg.strategy_mode: 1.0},
-                        explanations={self.cfg.strategy_mode: dict(out.explanation)},
-                    )
+                dec = self._decide(outputs)
+                if dec is None:
+                    continue
+                self._execute(sym, dec, prices[sym], current_date)
+
+            self._record_equity(prices, len(all_dates))
+
+    def _run_indexed(self, ohlcv_by_symbol: Dict[str, pd.DataFrame], all_dates: list) -> None:
+        """Bar-indexed path: evaluate each symbol's full history once, then walk dates.
+
+        Indicators and signals are causal, so the outputs at row ``i`` of the full
+        history equal what `_run_sliced` computes on the slice ending at ``i``. Each
+        date maps to a row offset per symbol via ``searchsorted``; no frame is
+        copied or re-evaluated inside the loop.
+        """
+        dates = np.asarray(all_dates)
+        offsets: Dict[str, np.ndarray] = {}
+        closes: Dict[str, np.ndarray] = {}
+        outputs_by_symbol: Dict[str, Dict[str, Sequence[StrategyOutput]]] = {}
+
+        for sym, df in ohlcv_by_symbol.items():
+            offsets[sym] = np.searchsorted(df["Date"].to_numpy(), dates, side="right") - 1
+            closes[sym] = df["Close"].to_numpy(dtype=float)
+            outputs_by_symbol[sym] = self._causal_outputs(sym, df)
+
+        for date_idx, current_date in enumerate(all_dates):
+            self.iteration += 1
+
+            # Row offset of the latest bar at or before this date, per symbol
+            rows: Dict[str, int] = {}
+            prices: Dict[str, float] = {}
+            for sym in ohlcv_by_symbol:
+                pos = int(offsets[sym][date_idx])
+                if pos < 0:
+                    continue
+                rows[sym] = pos
+                prices[sym] = float(closes[sym][pos])
 
-                # Execute orders based on signal
-                current_portfolio = self.broker.portfolio()
-                pos = current_portfolio.get_position(sym)
-                px = prices[sym]
-
-                # Risk exits
-                if pos.qty > 0:
-                    if pos.stop_loss and px <= float(pos.stop_loss):
-                        # Sell on stop loss
-                        order = Order(
-                            id=f"bt_{self.iteration}_{sym}_sl",
-                            ts=current_date,
-                            symbol=sym,
-                            side="SELL",
-                            qty=int(pos.qty),
-                            type="MARKET",
-                            tag="stop_loss",
-                        )
-                        fill = self.broker.submit_order(order)
-                        if isinstance(fill, Fill):
-                            self.trades.append({
-                                "symbol": sym,
-                                "entry_price": pos.avg_price,
-                                "exit_price": fill.price,
-                                "qty": fill.qty,
-                                "pnl": (fill.price - pos.avg_price) * fill.qty - fill.fee,
-                                "entry_date": None,
-                                "exit_date": current_date,
-                                "tag": "stop_loss",
-                            })
-                        continue
-
-                    if pos.take_profit and px >= float(pos.take_profit):
-                        # Sell on take profit
-                        order = Order(
-                            id=f"bt_{self.iteration}_{sym}_tp",
-                            ts=current_date,
-                            symbol=sym,
-                            side="SELL",
-                            qty=int(pos.qty),
-                            type="MARKET",
-                            tag="take_profit",
-                        )
-                        fill = self.broker.submit_order(order)
-                        if isinstance(fill, Fill):
-                            self.trades.append({
-                                "symbol": sym,
-                                "entry_price": pos.avg_price,
-                                "exit_price": fill.price,
-                                "qty": fill.qty,
-                                "pnl": (fill.price - pos.avg_price) * fill.qty - fill.fee,
-                                "entry_date": None,
-                                "exit_date": current_date,
-                                "tag": "take_profit",
-                            })
-                        continue
-
-                # Signal-based trades
-                if dec.signal == 1 and pos.qty == 0:
-                    # Buy
-                    available_cash = float(current_portfolio.cash)
-                    max_risk = float(self.app_cfg.risk.max_risk_per_trade)
-                    risk_amt = available_cash * max_risk
-
-                    if risk_amt > 0:
-                        sl = px * (1.0 - float(self.app_cfg.risk.stop_loss_pct) / 100.0)
-                        tp = px * (1.0 + float(self.app_cfg.risk.take_profit_pct) / 100.0)
-                        shares = int(risk_amt / (px - sl))
-
-                        if shares > 0:
-                            order = Order(
-                                id=f"bt_{self.iteration}_{sym}_buy",
-                                ts=current_date,
-                                symbol=sym,
-                                side="BUY",
-                                qty=shares,
-                                type="MARKET",
-                                tag=f"signal_long:{self.cfg.strategy_mode}",
-                            )
-                            fill = self.broker.submit_order(order)
-                            if isinstance(fill, Fill):
-                                pos = current_portfolio.get_position(sym)
-                                pos.stop_loss = sl
-                                pos.take_profit = tp
-
-                elif dec.signal == 0 and pos.qty > 0:
-                    # Sell (flatten position)
+            if not prices:
+                continue
+
+            for sym, px in prices.items():
+                self.broker.set_price(sym, px)
+
+            for sym, pos in rows.items():
+                if pos + 1 < 50:  # Need minimum data
+                    continue
+
+                outputs = {name: outs[pos] for name, outs in outputs_by_symbol[sym].items()}
+
+                dec = self._decide(outputs)
+                if dec is None:
+                    continue
+                self._execute(sym, dec, prices[sym], current_date)
+
+            self._record_equity(prices, len(all_dates))
+
+    def _causal_outputs(self, sym: str, df: pd.DataFrame) -> Dict[str, Sequence[StrategyOutput]]:
+        """Per-row outputs of every strategy over one symbol's full history."""
+        out: Dict[str, Sequence[StrategyOutput]] = {}
+        df_with_indicators: pd.DataFrame | None = None
+        for name, strat in self.strategies.items():
+            if hasattr(strat, "evaluate_all"):
+                out[name] = strat.evaluate_all(df)
+                continue
+
+            # Strategies without a causal path get prefix views of one indicator frame.
+            if df_with_indicators is None:
+                df_with_indicators = add_indicators(df, symbol=sym, interval=self.cfg.interval)
+            frame = df_with_indicators
+            out[name] = CausalOutputs(
+                len(frame), lambda i, strat=strat, frame=frame: strat.evaluate(frame.iloc[: i + 1])
+            )
+        return out
+
+    def _decide(self, outputs: Dict[str, StrategyOutput]) -> StrategyDecision | None:
+        """Combine strategy outputs into a decision (None if the mode has no output)."""
+        if self.cfg.strategy_mode == "ensemble":
+            return self.ensemble.decide(outputs)
+        if self.cfg.strategy_mode not in outputs:
+            return None
+        out = outputs[self.cfg.strategy_mode]
+        return StrategyDecision(
+            signal=int(out.signal),
+            confidence=float(out.confidence),
+            votes={self.cfg.strategy_mode: int(out.signal)},
+            weights={self.cfg.strategy_mode: 1.0},
+            explanations={self.cfg.strategy_mode: dict(out.explanation)},
+        )
+
+    def _record_equity(self, prices: Dict[str, float], total_bars: int) -> None:
+        eq = self.broker.portfolio().equity(prices)
+        self.equity_history.append(float(eq))
+
+        if self.iteration % 50 == 0:
+            logger.info(f"Bar {self.iteration}/{total_bars}: Equity=${eq:,.2f}")
+
+    def _execute(self, sym: str, dec: StrategyDecision, px: float, current_date: Any) -> None:
+        """Apply risk exits, then trade toward the decision's target position."""
+        current_portfolio = self.broker.portfolio()
+        pos = current_portfolio.get_position(sym)
+
+        # Risk exits
+        if pos.qty > 0:
+            if pos.stop_loss and px <= float(pos.stop_loss):
+                # Sell on stop loss
+                order = Order(
+                    id=f"bt_{self.iteration}_{sym}_sl",
+                    ts=current_date,
+                    symbol=sym,
+                    side="SELL",
+                    qty=int(pos.qty),
+                    type="MARKET",
+                    tag="stop_loss",
+                )
+                fill = self.broker.submit_order(order)
+                if isinstance(fill, Fill):
+                    self.trades.append({
+                        "symbol": sym,
+                        "entry_price": pos.avg_price,
+                        "exit_price": fill.price,
+                        "qty": fill.qty,
+                        "pnl": (fill.price - pos.avg_price) * fill.qty - fill.fee,
+                        "entry_date": None,
+                        "exit_date": current_date,
+                        "tag": "stop_loss",
+                    })
+                return
+
+            if pos.take_profit and px >= float(pos.take_profit):
+                # Sell on take profit
+                order = Order(
+                    id=f"bt_{self.iteration}_{sym}_tp",
+                    ts=current_date,
+                    symbol=sym,
+                    side="SELL",
+                    qty=int(pos.qty),
+                    type="MARKET",
+                    tag="take_profit",
+                )
+                fill = self.broker.submit_order(order)
+                if isinstance(fill, Fill):
+                    self.trades.append({
+                        "symbol": sym,
+                        "entry_price": pos.avg_price,
+                        "exit_price": fill.price,
+                        "qty": fill.qty,
+                        "pnl": (fill.price - pos.avg_price) * fill.qty - fill.fee,
+                        "entry_date": None,
+                        "exit_date": current_date,
+                        "tag": "take_profit",
+                    })
+                return
+
+        # Signal-based trades
+        if dec.signal == 1 and pos.qty == 0:
+            # Buy
+            available_cash = float(current_portfolio.cash)
+            max_risk = float(self.app_cfg.risk.max_risk_per_trade)
+            risk_amt = available_cash * max_risk
+
+            if risk_amt > 0:
+                sl = px * (1.0 - float(self.app_cfg.risk.stop_loss_pct) / 100.0)
+                tp = px * (1.0 + float(self.app_cfg.risk.take_profit_pct) / 100.0)
+                shares = int(risk_amt / (px - sl))
+
+                if shares > 0:
                     order = Order(
-                        id=f"bt_{self.iteration}_{sym}_sell",
+                        id=f"bt_{self.iteration}_{sym}_buy",
                         ts=current_date,
                         symbol=sym,
-                        side="SELL",
-                        qty=int(pos.qty),
+                        side="BUY",
+                        qty=shares,
                         type="MARKET",
-                        tag=f"signal_flat:{self.cfg.strategy_mode}",
+                        tag=f"signal_long:{self.cfg.strategy_mode}",
                     )
                     fill = self.broker.submit_order(order)
                     if isinstance(fill, Fill):
-                        self.trades.append({
-                            "symbol": sym,
-                            "entry_price": pos.avg_price,
-                            "exit_price": fill.price,
-                            "qty": fill.qty,
-                            "pnl": (fill.price - pos.avg_price) * fill.qty - fill.fee,
-                            "entry_date": None,
-                            "exit_date": current_date,
-                            "tag": "signal",
-                        })
-
-            # Record equity
-            eq = self.broker.portfolio().equity(prices)
-            self.equity_history.append(float(eq))
-
-            if self.iteration % 50 == 0:
-                logger.info(f"Bar {self.iteration}/{len(all_dates)}: Equity=${eq:,.2f}")
-
-        # Calculate metrics
-        return self._calculate_metrics()
+                        pos = current_portfolio.get_position(sym)
+                        pos.stop_loss = sl
+                        pos.take_profit = tp
+
+        elif dec.signal == 0 and pos.qty > 0:
+            # Sell (flatten position)
+            order = Order(
+                id=f"bt_{self.iteration}_{sym}_sell",
+                ts=current_date,
+                symbol=sym,
+                side="SELL",
+                qty=int(pos.qty),
+                type="MARKET",
+                tag=f"signal_flat:{self.cfg.strategy_mode}",
+            )
+            fill = self.broker.submit_order(order)
+            if isinstance(fill, Fill):
+                self.trades.append({
+                    "symbol": sym,
+                    "entry_price": pos.avg_price,
+                    "exit_price": fill.price,
+                    "qty": fill.qty,
+                    "pnl": (fill.price - pos.avg_price) * fill.qty - fill.fee,
+                    "entry_date": None,
+                    "exit_date": current_date,
+                    "tag": "signal",
+                })
 
     def _calculate_metrics(self) -> BacktestResult:
         """Calculate performance metrics."""
@@ -476,6 +566,7 @@ def run_backtest(
     min_fee: float = 0.0,
     strategy_mode: str = "ensemble",
     data_source: str = "auto",
+    engine_mode: str = "indexed",
 ) -> BacktestResult:
     """Run backtest with given parameters.
 
@@ -490,6 +581,7 @@ def run_backtest(
         min_fee: Minimum fee per trade
         strategy_mode: Trading mode (ensemble, mean_reversion_rsi, etc.)
         data_source: Data source to use (auto|alpaca|yahoo)
+        engine_mode: Backtest core (indexed|slice); both produce the same result
 
     Returns:
         BacktestResult with performance metrics
@@ -505,6 +597,7 @@ def run_backtest(
         min_fee=min_fee,
         strategy_mode=strategy_mode,
         data_source=data_source,
+        engine_mode=engine_mode,
     )
 
     engine = BacktestEngine(cfg)
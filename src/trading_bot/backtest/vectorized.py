@@ -0,0 +1,227 @@
+"""Vectorized portfolio simulator for parameter sweeps.
+
+`simulate_signal_grid` scores many parameter sets at once. It takes a close
+matrix of shape ``(bars, symbols)`` and a 0/1 signal tensor of shape
+``(params, bars, symbols)`` and returns equity curves and summary metrics for
+every parameter set in a single NumPy pass. There is no per-bar Python loop.
+
+Portfolio model
+---------------
+Starting cash is split equally into one sleeve per symbol. A sleeve is fully
+invested while its signal is 1 and in cash while it is 0. A signal seen on bar
+``t`` is filled at bar ``t``'s close, so the position earns bar ``t + 1``'s
+return onwards. Sleeves are never rebalanced against each other.
+
+Fills use `PaperBroker`'s market-order arithmetic with fractional shares and
+no minimum fee:
+
+* buy: fill at ``close * (1 + slippage)``, pay ``commission`` on the notional
+* sell: fill at ``close * (1 - slippage)``, pay ``commission`` on the notional
+
+A sleeve therefore shrinks by ``1 / ((1 + s) * (1 + c))`` when it enters and by
+``(1 - s) * (1 - c)`` when it exits. Open positions are marked to market at the
+last bar and are not liquidated.
+
+NaN closes mark bars where a symbol is not trading (not listed yet, delisted,
+or a gap). On those bars the signal is treated as 0 when flat, the position is
+held when long, and the price is carried forward.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class VectorSimConfig:
+    start_cash: float = 100_000.0
+    commission_bps: float = 0.0  # bps of notional, as PaperBrokerConfig
+    slippage_bps: float = 0.0  # bps of mark, as PaperBrokerConfig
+    risk_free_rate: float = 0.02
+    periods_per_year: int = 252
+    chunk_size: int = 64  # parameter sets simulated per block (bounds memory)
+
+
+@dataclass(frozen=True)
+class VectorSimResult:
+    """Per-parameter-set results. Arrays are indexed by parameter set first."""
+
+    equity: np.ndarray  # (params, bars) portfolio equity after each bar
+    total_return: np.ndarray  # (params,)
+    sharpe: np.ndarray  # (params,) annualized, same formula as BacktestEngine
+    max_drawdown: np.ndarray  # (params,) most negative peak-to-trough fraction
+    num_trades: np.ndarray  # (params,) completed round trips (exits)
+    num_entries: np.ndarray  # (params,) positions opened
+
+    def best(self, metric: str = "sharpe") -> int:
+        """Index of the parameter set with the highest ``metric``."""
+        values = np.asarray(getattr(self, metric), dtype=float)
+        return int(np.nanargmax(values))
+
+
+def _forward_fill(closes: np.ndarray) -> np.ndarray:
+    """Carry the last valid close forward along the bar axis."""
+    n = closes.shape[0]
+    valid = ~np.isnan(closes)
+    idx = np.where(valid, np.arange(n)[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(closes, idx, axis=0)
+
+
+def simulate_signal_grid(
+    closes,
+    signals,
+    config: VectorSimConfig | None = None,
+) -> VectorSimResult:
+    """Simulate every parameter set in ``signals`` against ``closes``.
+
+    ``closes`` is ``(bars, symbols)``. ``signals`` is ``(params, bars, symbols)``
+    or ``(bars, symbols)`` for a single parameter set. Any non-zero signal counts
+    as long.
+    """
+    cfg = config or VectorSimConfig()
+    px = np.asarray(closes, dtype=np.float64)
+    sig = np.asarray(signals)
+    if sig.ndim == 2:
+        sig = sig[None, :, :]
+    if px.ndim != 2 or sig.ndim != 3 or sig.shape[1:] != px.shape:
+        raise ValueError(
+            f"expected closes (bars, symbols) and signals (params, bars, symbols); "
+            f"got {px.shape} and {sig.shape}"
+        )
+    if cfg.chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    n_params, n_bars, n_syms = sig.shape
+    if n_bars == 0 or n_syms == 0:
+        raise ValueError("closes must have at least one bar and one symbol")
+
+    tradable = ~np.isnan(px)
+    filled = _forward_fill(px)
+    prev = np.vstack([filled[:1], filled[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gross = np.where(np.isnan(prev) | np.isnan(filled), 1.0, filled / prev)
+
+    slip = float(cfg.slippage_bps) / 10_000.0
+    comm = float(cfg.commission_bps) / 10_000.0
+    entry_factor = 1.0 / ((1.0 + slip) * (1.0 + comm))
+    exit_factor = (1.0 - slip) * (1.0 - comm)
+    sleeve_cash = float(cfg.start_cash) / n_syms
+
+    equity = np.empty((n_params, n_bars), dtype=np.float64)
+    num_trades = np.zeros(n_params, dtype=np.int64)
+    num_entries = np.zeros(n_params, dtype=np.int64)
+
+    for lo in range(0, n_params, int(cfg.chunk_size)):
+        hi = min(lo + int(cfg.chunk_size), n_params)
+        want = sig[lo:hi] != 0
+
+        # Orders can only fill on bars with a real price; otherwise keep the
+        # previous position (flat before the first tradable bar).
+        pos = _hold_through_gaps(want, tradable)
+
+        before = np.zeros_like(pos)
+        before[:, 1:] = pos[:, :-1]
+        entries = pos & ~before
+        exits = before & ~pos
+
+        growth = np.where(before, gross[None, :, :], 1.0)
+        growth = growth * np.where(entries, entry_factor, 1.0) * np.where(exits, exit_factor, 1.0)
+        sleeves = sleeve_cash * np.cumprod(growth, axis=1)
+
+        equity[lo:hi] = sleeves.sum(axis=2)
+        num_entries[lo:hi] = entries.sum(axis=(1, 2))
+        num_trades[lo:hi] = exits.sum(axis=(1, 2))
+
+    total_return = equity[:, -1] / float(cfg.start_cash) - 1.0
+    return VectorSimResult(
+        equity=equity,
+        total_return=total_return,
+        sharpe=_sharpe(equity, cfg),
+        max_drawdown=_max_drawdown(equity),
+        num_trades=num_trades,
+        num_entries=num_entries,
+    )
+
+
+def _hold_through_gaps(want: np.ndarray, tradable: np.ndarray) -> np.ndarray:
+    """Position per bar when orders can only fill on tradable bars."""
+    n_bars = want.shape[1]
+    idx = np.where(tradable[None, :, :], np.arange(n_bars)[None, :, None], -1)
+    last = np.maximum.accumulate(idx, axis=1)
+    has_last = last >= 0
+    held = np.take_along_axis(want, np.where(has_last, last, 0), axis=1)
+    return held & has_last
+
+
+def _sharpe(equity: np.ndarray, cfg: VectorSimConfig) -> np.ndarray:
+    if equity.shape[1] < 2:
+        return np.zeros(equity.shape[0])
+    rets = np.diff(equity, axis=1) / equity[:, :-1]
+    excess = rets - cfg.risk_free_rate / cfg.periods_per_year
+    return np.sqrt(cfg.periods_per_year) * excess.mean(axis=1) / (excess.std(axis=1) + 1e-8)
+
+
+def _max_drawdown(equity: np.ndarray) -> np.ndarray:
+    if equity.shape[1] < 2:
+        return np.zeros(equity.shape[0])
+    peak = np.maximum.accumulate(equity, axis=1)
+    return ((equity - peak) / peak).min(axis=1)
+
+
+def build_signal_tensor(
+    ohlcv_by_symbol: Mapping[str, pd.DataFrame],
+    strategies: Sequence,
+) -> Tuple[np.ndarray, np.ndarray, pd.DatetimeIndex, list[str]]:
+    """Align per-symbol frames and stack each strategy's ``signals(df)``.
+
+    Every strategy must expose ``signals(df)`` returning a 0/1 Series (the
+    built-in RSI, MACD and ATR strategies do). Frames are outer-joined on
+    their index; missing bars become NaN closes.
+
+    Returns ``(closes, signals, index, symbols)`` ready for
+    `simulate_signal_grid`.
+    """
+    symbols = [s for s, df in ohlcv_by_symbol.items() if not df.empty and "Close" in df.columns]
+    if not symbols:
+        raise ValueError("no symbol has Close data")
+
+    index = ohlcv_by_symbol[symbols[0]].index
+    for sym in symbols[1:]:
+        index = index.union(ohlcv_by_symbol[sym].index)
+
+    closes = np.full((len(index), len(symbols)), np.nan)
+    sig = np.zeros((len(strategies), len(index), len(symbols)), dtype=np.int8)
+    for j, sym in enumerate(symbols):
+        df = ohlcv_by_symbol[sym]
+        rows = index.get_indexer(df.index)
+        closes[rows, j] = df["Close"].astype(float).to_numpy()
+        for k, strat in enumerate(strategies):
+            sig[k, rows, j] = np.asarray(strat.signals(df), dtype=np.int8)
+    return closes, sig, index, symbols
+
+
+def sweep(
+    ohlcv_by_symbol: Mapping[str, pd.DataFrame],
+    strategies: Sequence,
+    config: VectorSimConfig | None = None,
+) -> VectorSimResult:
+    """Shorthand for `build_signal_tensor` followed by `simulate_signal_grid`."""
+    closes, sig, _, _ = build_signal_tensor(ohlcv_by_symbol, strategies)
+    return simulate_signal_grid(closes, sig, config)
+
+
+def results_frame(result: VectorSimResult, params: Sequence[Dict]) -> pd.DataFrame:
+    """Tabulate a result next to the parameter dicts that produced it."""
+    if len(params) != len(result.total_return):
+        raise ValueError("params must have one entry per simulated parameter set")
+    out = pd.DataFrame(list(params))
+    out["total_return"] = result.total_return
+    out["sharpe"] = result.sharpe
+    out["max_drawdown"] = result.max_drawdown
+    out["num_trades"] = result.num_trades
+    return out
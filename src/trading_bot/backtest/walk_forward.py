@@ -9,14 +9,36 @@ Walk-forward analysis:
 3. Move forward and repeat
 
 This prevents overfitting and provides realistic performance metrics.
+
+`WalkForwardExecutor` runs the windows x parameter-grid search in parallel:
+
+- Parameter sets are split across ``max_workers`` single-process pools. Each
+  pool receives the data once and evaluates every window for its share of the
+  grid, so all cores stay busy from the first window on.
+- Each worker caches the signals it computes. With ``causal_signals=True`` a
+  strategy runs once per parameter set over the whole data span, and each
+  window slices that result. This suits strategies whose signal at bar t only
+  depends on bars up to t. The alternative gives slightly different values at
+  the start of a window, because indicators are no longer cold-started there.
+  Without it, signals are cached per ``(params, span)``, which still saves the
+  re-evaluation of the winning parameters.
+- `WalkForwardExecutor.iter_results` yields each window's result as soon as
+  every worker has reported that window, in window order.
+
+With ``max_workers=1``, or a strategy function that cannot be pickled, the
+same code runs in-process.
 """
 
 from __future__ import annotations
 
 import logging
+import os
+import pickle
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Callable
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Callable
 
 import numpy as np
 import pandas as pd
@@ -64,6 +86,15 @@ class WalkForwardAnalysis:
     recommendation: str = "NEUTRAL"  # BUY, HOLD, SELL
 
 
+_EMPTY_METRICS = {
+    "total_return": 0.0,
+    "sharpe_ratio": 0.0,
+    "max_drawdown": 0.0,
+    "win_rate": 0.0,
+    "num_trades": 0,
+}
+
+
 class WalkForwardOptimizer:
     """Implements walk-forward analysis for strategy optimization."""
     
@@ -178,7 +209,10 @@ class WalkForwardBacktester:
         data: pd.DataFrame,
         strategy_func: Callable,
         param_ranges: Dict[str, Tuple[float, float]],
-        optimization_metric: str = "sharpe_ratio"
+        optimization_metric: str = "sharpe_ratio",
+        *,
+        max_workers: Optional[int] = 1,
+        causal_signals: bool = False,
     ) -> WalkForwardAnalysis:
         """Run complete walk-forward analysis.
         
@@ -187,6 +221,9 @@ class WalkForwardBacktester:
             strategy_func: Function(data, params) -> signals
             param_ranges: Dict of parameter ranges for optimization
             optimization_metric: Metric to optimize ("sharpe_ratio", "returns", "win_rate")
+            max_workers: Worker processes (None = all cores, 1 = in-process)
+            causal_signals: Compute signals once over the full span and slice
+                them per window (see `WalkForwardExecutor`)
         
         Returns:
             WalkForwardAnalysis with complete results
@@ -197,92 +234,26 @@ class WalkForwardBacktester:
             logger.error("No valid windows created")
             return WalkForwardAnalysis()
         
-        results = []
-        all_test_metrics = []
-        all_parameters = []
-        
-        for window in windows:
-            logger.info(f"Processing window {window.window_num + 1}/{len(windows)}")
-            
-            # Split data
-            train_data, test_data = self.optimizer.split_data_by_window(data, window)
-            
-            if len(train_data) < 20 or len(test_data) < 10:
-                logger.warning(f"Insufficient data for window {window.window_num}")
-                continue
-            
-            # Optimize on training data
-            best_params = self._optimize_parameters(
-                train_data,
-                strategy_func,
-                param_ranges,
-                optimization_metric
-            )
-            all_parameters.append(best_params)
-            
-            # Evaluate on test data (out-of-sample)
-            train_metrics = self._evaluate_strategy(
-                train_data,
-                strategy_func,
-                best_params
-            )
-            
-            test_metrics = self._evaluate_strategy(
-                test_data,
+        executor = WalkForwardExecutor(
+            max_workers=max_workers,
+            causal_signals=causal_signals,
+        )
+        results = list(
+            executor.iter_results(
+                data,
+                windows,
                 strategy_func,
-                best_params
+                self._generate_param_grid(param_ranges, samples=10),
+                optimization_metric,
             )
-            all_test_metrics.append(test_metrics)
-            
-            # Create result
-            result = WalkForwardResult(
-                window_num=window.window_num,
-                train_period=(window.train_start, window.train_end),
-                test_period=(window.test_start, window.test_end),
-                train_metrics=train_metrics,
-                test_metrics=test_metrics,
-                parameter_set=best_params,
-                out_of_sample_sharpe=test_metrics.get("sharpe_ratio", 0.0),
-                out_of_sample_returns=test_metrics.get("total_return", 0.0),
-                out_of_sample_max_dd=test_metrics.get("max_drawdown", 0.0),
-                out_of_sample_win_rate=test_metrics.get("win_rate", 0.0),
-                parameter_stability=self._calculate_parameter_stability(
-                    best_params,
-                    all_parameters[:-1] if len(all_parameters) > 1 else []
-                )
-            )
-            
-            results.append(result)
+        )
         
         # Calculate overall metrics
-        analysis = self._create_analysis_summary(results, all_test_metrics)
+        analysis = self._create_analysis_summary(results, [r.test_metrics for r in results])
         analysis.windows = results
         
         return analysis
     
-    def _optimize_parameters(
-        self,
-        data: pd.DataFrame,
-        strategy_func: Callable,
-        param_ranges: Dict[str, Tuple[float, float]],
-        metric: str
-    ) -> Dict:
-        """Optimize parameters on training data."""
-        # Simple grid search (in production, use Bayesian optimization)
-        best_params = None
-        best_score = -np.inf
-        
-        # Generate parameter combinations
-        for params in self._generate_param_grid(param_ranges, samples=10):
-            metrics = self._evaluate_strategy(data, strategy_func, params)
-            score = metrics.get(metric, 0.0)
-            
-            if score > best_score:
-                best_score = score
-                best_params = params
-        
-        return best_params or list(param_ranges.keys())[0]
-    
     def _evaluate_strategy(
         self,
         data: pd.DataFrame,
@@ -293,49 +264,48 @@ class WalkForwardBacktester:
         try:
             signals = strategy_func(data, params)
             
-            # Calculate returns
             if 'Close' in data.columns:
                 close = data['Close']
             else:
                 close = data['close']
             
-            returns = close.pct_change()
-            strategy_returns = returns * signals.shift(1).fillna(0)
-            
-            # Calculate metrics
-            cumulative_returns = (1 + strategy_returns).cumprod() - 1
-            total_return = float(cumulative_returns.iloc[-1])
-            
-            # Sharpe ratio
-            excess_returns = strategy_returns - 0.0001 / 252  # Risk-free rate
-            sharpe = excess_returns.mean() / excess_returns.std() * np.sqrt(252)
-            
-            # Max drawdown
-            running_max = cumulative_returns.cummax()
-            drawdown = (cumulative_returns - running_max) / (1 + running_max)
-            max_dd = drawdown.min()
-            
-            # Win rate
-            wins = (strategy_returns > 0).sum()
-            trades = (strategy_returns != 0).sum()
-            win_rate = wins / trades if trades > 0 else 0.0
-            
-            return {
-                "total_return": total_return,
-                "sharpe_ratio": float(sharpe) if not np.isnan(sharpe) else 0.0,
-                "max_drawdown": float(max_dd),
-                "win_rate": float(win_rate),
-                "num_trades": int(trades)
-            }
+            return self._metrics_from_signals(close, signals)
         except Exception as e:
             logger.error(f"Evaluation error: {e}")
-            return {
-                "total_return": 0.0,
-                "sharpe_ratio": 0.0,
-                "max_drawdown": 0.0,
-                "win_rate": 0.0,
-                "num_trades": 0
-            }
+            return dict(_EMPTY_METRICS)
+    
+    @staticmethod
+    def _metrics_from_signals(close: pd.Series, signals: pd.Series) -> Dict:
+        """Metrics of holding ``signals`` (acted on the next bar) over ``close``."""
+        # Calculate returns
+        returns = close.pct_change()
+        strategy_returns = returns * signals.shift(1).fillna(0)
+        
+        # Calculate metrics
+        cumulative_returns = (1 + strategy_returns).cumprod() - 1
+        total_return = float(cumulative_returns.iloc[-1])
+        
+        # Sharpe ratio
+        excess_returns = strategy_returns - 0.0001 / 252  # Risk-free rate
+        sharpe = excess_returns.mean() / excess_returns.std() * np.sqrt(252)
+        
+        # Max drawdown
+        running_max = cumulative_returns.cummax()
+        drawdown = (cumulative_returns - running_max) / (1 + running_max)
+        max_dd = drawdown.min()
+        
+        # Win rate
+        wins = (strategy_returns > 0).sum()
+        trades = (strategy_returns != 0).sum()
+        win_rate = wins / trades if trades > 0 else 0.0
+        
+        return {
+            "total_return": total_return,
+            "sharpe_ratio": float(sharpe) if not np.isnan(sharpe) else 0.0,
+            "max_drawdown": float(max_dd),
+            "win_rate": float(win_rate),
+            "num_trades": int(trades)
+        }
     
     @staticmethod
     def _generate_param_grid(ranges: Dict, samples: int = 5) -> List[Dict]:
@@ -426,3 +396,229 @@ class WalkForwardBacktester:
         )
         
         return analysis
+
+
+# (start, stop) row offsets into the data, stop exclusive
+Span = Tuple[int, int]
+
+_FAILED = object()  # cached marker for a strategy call that raised
+
+
+@dataclass(frozen=True)
+class WindowBest:
+    """Best parameter set for one window within one worker's share of the grid."""
+    param_index: int
+    score: float
+    train_metrics: Dict
+    test_metrics: Dict
+
+
+class WindowEvaluator:
+    """Scores a share of the parameter grid on window spans, caching signals."""
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        strategy_func: Callable,
+        param_sets: Sequence[Dict],
+        indices: Sequence[int],
+        causal_signals: bool = True,
+        max_cached: int = 256,
+    ):
+        self.data = data
+        self.close = data["Close"] if "Close" in data.columns else data["close"]
+        self.strategy_func = strategy_func
+        self.param_sets = list(param_sets)
+        self.indices = list(indices)
+        self.causal_signals = causal_signals
+        self.max_cached = max_cached
+        self._signals: OrderedDict = OrderedDict()
+
+    def _signals_for(self, k: int, span: Span):
+        key = k if self.causal_signals else (k, span)
+        signals = self._signals.get(key)
+        if signals is None:
+            try:
+                if self.causal_signals:
+                    signals = self.strategy_func(self.data, self.param_sets[k])
+                else:
+                    window = self.data.iloc[span[0]:span[1]]
+                    signals = self.strategy_func(window, self.param_sets[k])
+            except Exception as e:
+                logger.error(f"Evaluation error: {e}")
+                signals = _FAILED
+            self._signals[key] = signals
+            if len(self._signals) > self.max_cached:
+                self._signals.popitem(last=False)
+        else:
+            self._signals.move_to_end(key)
+        if signals is _FAILED:
+            return None
+        return signals.iloc[span[0]:span[1]] if self.causal_signals else signals
+
+    def metrics(self, k: int, span: Span) -> Dict:
+        try:
+            signals = self._signals_for(k, span)
+            if signals is None:
+                return dict(_EMPTY_METRICS)
+            close = self.close.iloc[span[0]:span[1]]
+            return WalkForwardBacktester._metrics_from_signals(close, signals)
+        except Exception as e:
+            logger.error(f"Evaluation error: {e}")
+            return dict(_EMPTY_METRICS)
+
+    def best_for_window(self, train: Span, test: Span, metric: str) -> WindowBest:
+        """First parameter set (in grid order) with the highest training score."""
+        best_k, best_score = None, -np.inf
+        for k in self.indices:
+            score = self.metrics(k, train).get(metric, 0.0)
+            if score > best_score:
+                best_k, best_score = k, score
+        if best_k is None:
+            best_k = self.indices[0]
+        return WindowBest(
+            best_k, float(best_score), self.metrics(best_k, train), self.metrics(best_k, test)
+        )
+
+
+# Per-process evaluator for pool workers, built once by the initializer
+_WORKER_EVALUATOR: Optional[WindowEvaluator] = None
+
+
+def _init_window_worker(*args) -> None:
+    global _WORKER_EVALUATOR
+    _WORKER_EVALUATOR = WindowEvaluator(*args)
+
+
+def _best_in_worker(train: Span, test: Span, metric: str) -> WindowBest:
+    return _WORKER_EVALUATOR.best_for_window(train, test, metric)
+
+
+def _picklable(obj) -> bool:
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
+class WalkForwardExecutor:
+    """Parallel windows x parameter-grid search with streamed per-window results."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        *,
+        causal_signals: bool = True,
+        max_cached_signals: int = 256,
+        min_train_bars: int = 20,
+        min_test_bars: int = 10,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.causal_signals = causal_signals
+        self.max_cached_signals = max_cached_signals
+        self.min_train_bars = min_train_bars
+        self.min_test_bars = min_test_bars
+
+    def _spans(
+        self, data: pd.DataFrame, windows: Sequence[WalkForwardWindow]
+    ) -> List[Tuple[WalkForwardWindow, Span, Span]]:
+        index = data.index
+
+        def span(start, end) -> Span:
+            return int(index.searchsorted(start, "left")), int(index.searchsorted(end, "right"))
+
+        out = []
+        for window in windows:
+            train = span(window.train_start, window.train_end)
+            test = span(window.test_start, window.test_end)
+            if train[1] - train[0] < self.min_train_bars or test[1] - test[0] < self.min_test_bars:
+                logger.warning(f"Insufficient data for window {window.window_num}")
+                continue
+            out.append((window, train, test))
+        return out
+
+    def iter_results(
+        self,
+        data: pd.DataFrame,
+        windows: Sequence[WalkForwardWindow],
+        strategy_func: Callable,
+        param_sets: Sequence[Dict],
+        metric: str = "sharpe_ratio",
+    ) -> Iterator[WalkForwardResult]:
+        """Yield each window's result, in window order, as soon as it is known."""
+        spans = self._spans(data, windows)
+        param_sets = list(param_sets)
+        if not spans or not param_sets:
+            return
+        n = min(self.max_workers, len(param_sets))
+        if n > 1 and not _picklable(strategy_func):
+            logger.warning(
+                "strategy_func cannot be pickled; evaluating walk-forward windows in-process"
+            )
+            n = 1
+
+        chosen: List[Dict] = []
+        if n == 1:
+            evaluator = WindowEvaluator(
+                data, strategy_func, param_sets, range(len(param_sets)),
+                self.causal_signals, self.max_cached_signals,
+            )
+            for window, train, test in spans:
+                logger.info(f"Processing window {window.window_num + 1}/{len(windows)}")
+                best = evaluator.best_for_window(train, test, metric)
+                yield self._result(window, [best], param_sets, chosen)
+            return
+
+        # One single-process pool per share of the grid: a worker sees the same
+        # parameter sets in every window, so its signal cache keeps paying off
+        pools = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_window_worker,
+                initargs=(
+                    data, strategy_func, param_sets, list(range(i, len(param_sets), n)),
+                    self.causal_signals, self.max_cached_signals,
+                ),
+            )
+            for i in range(n)
+        ]
+        try:
+            futures: List[List[Future]] = [
+                [pool.submit(_best_in_worker, train, test, metric) for pool in pools]
+                for _, train, test in spans
+            ]
+            for (window, _, _), window_futures in zip(spans, futures):
+                bests = [f.result() for f in window_futures]
+                logger.info(f"Finished window {window.window_num + 1}/{len(windows)}")
+                yield self._result(window, bests, param_sets, chosen)
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _result(
+        window: WalkForwardWindow,
+        bests: List[WindowBest],
+        param_sets: List[Dict],
+        chosen: List[Dict],
+    ) -> WalkForwardResult:
+        # Highest score wins; ties go to the earlier grid point, as in a serial scan
+        best = min(bests, key=lambda b: (-b.score, b.param_index))
+        params = param_sets[best.param_index]
+        stability = WalkForwardBacktester._calculate_parameter_stability(params, list(chosen))
+        chosen.append(params)
+        test_metrics = best.test_metrics
+        return WalkForwardResult(
+            window_num=window.window_num,
+            train_period=(window.train_start, window.train_end),
+            test_period=(window.test_start, window.test_end),
+            train_metrics=best.train_metrics,
+            test_metrics=test_metrics,
+            parameter_set=params,
+            out_of_sample_sharpe=test_metrics.get("sharpe_ratio", 0.0),
+            out_of_sample_returns=test_metrics.get("total_return", 0.0),
+            out_of_sample_max_dd=test_metrics.get("max_drawdown", 0.0),
+            out_of_sample_win_rate=test_metrics.get("win_rate", 0.0),
+            parameter_stability=stability,
+        )
@@ -9,28 +9,40 @@ This module provides:
 
 from __future__ import annotations
 
-import ast
-import gc
 import logging
 import os
 import time
-import hashlib
-import json
 import traceback
 from pathlib import Path
 from dataclasses import dataclass
 import concurrent.futures
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
 
 from trading_bot.core.models import Fill, Order, OrderType, Portfolio, Side, Position
+from trading_bot.broker.bar_store import BAR_COLUMNS, BarStore
 from trading_bot.broker.base import Broker, OrderRejection
 
 logger = logging.getLogger(__name__)
 
 
+def _same_bar(bars: pd.DataFrame, ref: pd.DataFrame) -> bool:
+    """Whether ``bars`` holds the single bar in ``ref`` with the same values."""
+    hit = bars[pd.to_datetime(bars.index, utc=True) == ref.index[0]]
+    if hit.empty:
+        return False
+    return bool(np.allclose(
+        hit.iloc[-1][list(BAR_COLUMNS)].to_numpy(dtype=float),
+        ref.iloc[0][list(BAR_COLUMNS)].to_numpy(dtype=float),
+        rtol=1e-9,
+        atol=0.0,
+        equal_nan=True,
+    ))
+
+
 @dataclass(frozen=True)
 class AlpacaConfig:
     """Alpaca broker configuration.
@@ -86,9 +98,18 @@ class AlpacaProvider:
     - Intraday bars (1m, 5m, 15m, 1h, 4h, 1d)
     - Historical data retrieval
     - Real-time updates (via websocket - optional)
+
+    Downloaded bars are kept in a per-symbol `BarStore` under ``cache_dir``;
+    later calls only fetch the bars each symbol is missing. Each tail fetch
+    overlaps the stored series by one completed bar; if the provider returns
+    it with different values, the symbol's series is refetched and replaced
+    rather than appended to. ``client`` can be any object with
+    ``get_stock_bars(request)`` (tests pass a local fake).
     """
     
     config: AlpacaConfig
+    client: Optional[Any] = None
+    cache_dir: str = ".cache"
     
     def __post_init__(self) -> None:
         """Initialize Alpaca REST client."""
@@ -103,14 +124,32 @@ class AlpacaProvider:
                 "alpaca-py not installed. Install with: pip install alpaca-py"
             )
         
-        object.__setattr__(self, "_client", StockHistoricalDataClient(
-            self.config.api_key,
-            self.config.api_secret
-        ))
+        client = self.client
+        if client is None:
+            client = StockHistoricalDataClient(self.config.api_key, self.config.api_secret)
+        object.__setattr__(self, "_client", client)
+        object.__setattr__(self, "_store", BarStore(Path(self.cache_dir) / "bars"))
         object.__setattr__(self, "_StockBarsRequest", StockBarsRequest)
         object.__setattr__(self, "_TimeFrame", TimeFrame)
         object.__setattr__(self, "_TimeFrameUnit", TimeFrameUnit)
         object.__setattr__(self, "_DataFeed", DataFeed)
+
+    @property
+    def bar_store(self) -> BarStore:
+        return self._store
+
+    def _timeframe(self, interval: str):
+        TimeFrame = self._TimeFrame
+        TimeFrameUnit = self._TimeFrameUnit
+        if interval == "1m":
+            return TimeFrame.Minute
+        if interval == "5m":
+            return TimeFrame(5, TimeFrameUnit.Minute)
+        if interval == "15m":
+            return TimeFrame(15, TimeFrameUnit.Minute)
+        if interval == "1h":
+            return TimeFrame.Hour
+        return TimeFrame.Day
     
     def download_bars(
         self,
@@ -128,85 +167,12 @@ class AlpacaProvider:
             period: Time period (e.g., "5d", "7d", "1d") - shorter = faster
             interval: Bar interval (e.g., "1m", "15m", "1h", "1d")
             use_cache: Whether to use cached data (default True)
-            cache_ttl_minutes: Cache time-to-live in minutes (default 60 for stable historical data)
+            cache_ttl_minutes: Symbols fetched more recently than this are not refetched
             
         Returns:
             DataFrame with tuple columns (Price, Symbol)
         """
-        TimeFrame = self._TimeFrame
-        TimeFrameUnit = self._TimeFrameUnit
-        DataFeed = self._DataFeed
-        
-        # 1. Check Cache (JSON)
-        cache_dir = Path(".cache")
-        cache_dir.mkdir(exist_ok=True)
-        
-        # Create unique cache key based on request parameters
-        sym_key = ",".join(sorted(symbols))
-        req_hash = hashlib.md5(f"{sym_key}_{period}_{interval}".encode()).hexdigest()
-        cache_file = cache_dir / f"alpaca_bars_{req_hash}.json"
-        
-        if use_cache and cache_file.exists():
-            mtime = datetime.fromtimestamp(cache_file.stat().st_mtime, tz=timezone.utc)
-            # Cache valid for specified TTL
-            if (datetime.now(timezone.utc) - mtime) < timedelta(minutes=cache_ttl_minutes):
-                print(f"[CACHE] Using cached data from {cache_file}")
-                logger.info(f"Loading cached data from {cache_file}")
-                try:
-                    df = pd.read_json(cache_file, orient="split")
-                    df.index = pd.to_datetime(df.index)
-                    
-                    # Handle MultiIndex columns restoration
-                    # Columns might be stored as string representations like "('Open', 'AAPL')"
-                    if not df.empty and isinstance(df.columns, pd.Index):
-                        # Try to convert string representations back to tuples
-                        new_cols = []
-                        is_multiindex = False
-                        for col in df.columns:
-                            if isinstance(col, str) and col.startswith("('") and col.endswith("')"):
-                                # Parse string representation of tuple
-                                try:
-                                    # Extract the tuple content
-                                    import ast
-                                    parsed = ast.literal_eval(col)
-                                    if isinstance(parsed, tuple):
-                                        new_cols.append(parsed)
-                                        is_multiindex = True
-                                    else:
-                                        new_cols.append(col)
-                                except:
-                                    new_cols.append(col)
-                            elif isinstance(col, list):
-                                new_cols.append(tuple(col))
-                                is_multiindex = True
-                            else:
-                                new_cols.append(col)
-                        
-                        if is_multiindex:
-                            df.columns = pd.MultiIndex.from_tuples(new_cols)
-                        else:
-                            df.columns = new_cols
-                    
-                    return df
-                except Exception as e:
-                    logger.warning(f"Failed to load cache: {e}")
-            else:
-                print(f"[CACHE] Cache expired, re-downloading data")
-
-        print(f"[CACHE] No valid cache, downloading data from Alpaca")
-        # Map interval to TimeFrame
-        if interval == "1m":
-            tf = TimeFrame.Minute
-        elif interval == "5m":
-            tf = TimeFrame(5, TimeFrameUnit.Minute)
-        elif interval == "15m":
-            tf = TimeFrame(15, TimeFrameUnit.Minute)
-        elif interval == "1h":
-            tf = TimeFrame.Hour
-        elif interval == "1d":
-            tf = TimeFrame.Day
-        else:
-            tf = TimeFrame.Day
+        tf = self._timeframe(interval)
             
         # Map period to start date
         now = datetime.now(timezone.utc)
@@ -215,142 +181,192 @@ class AlpacaProvider:
             start = now - timedelta(days=int(period[:-1]))
         elif period.endswith("y"):
             start = now - timedelta(days=int(period[:-1]) * 365)
+
+        # 1. Decide what each symbol is missing. Symbols already complete from
+        # `start` only need bars after their last stored one; those are grouped
+        # by that timestamp so requests still batch.
+        store = self._store
+        ttl = timedelta(minutes=cache_ttl_minutes)
+        tail_groups: dict[datetime, list[str]] = {}
+        full: list[str] = []
+        check: dict[str, pd.DataFrame] = {}
+        for sym in symbols:
+            info = store.fetch_info(sym, interval) if use_cache else None
+            stored = store.tail(sym, interval, 2) if info else None
+            if info is None or info["covered_from"] > start:
+                full.append(sym)
+            elif now - info["fetched_at"] < ttl:
+                continue
+            elif stored is None or stored.empty:
+                tail_groups.setdefault(start, []).append(sym)
+            else:
+                # Refetch the last two stored bars. The last one may still have
+                # been forming; the one before it was complete, so it must come
+                # back unchanged unless the history was revised (e.g. a split
+                # or dividend re-adjusted it).
+                if len(stored) > 1:
+                    check[sym] = stored.iloc[[0]]
+                tail_groups.setdefault(stored.index[0].to_pydatetime(), []).append(sym)
+
+        n_fetch = len(full) + sum(len(v) for v in tail_groups.values())
+        if n_fetch:
+            print(
+                f"[CACHE] {len(symbols) - n_fetch} symbol(s) fresh, "
+                f"{sum(len(v) for v in tail_groups.values())} tail update(s), "
+                f"{len(full)} full download(s)"
+            )
+            fetched = self._fetch_bars(
+                [(start, full, True)] + [(t, syms, False) for t, syms in tail_groups.items()],
+                tf=tf,
+                end=now,
+            )
+            # An empty tail (e.g. outside market hours) means nothing new: the
+            # symbol is up to date and only gets marked fetched below.
+            stale = [
+                sym for sym, ref in check.items()
+                if sym in fetched
+                and not fetched[sym][0].empty
+                and not _same_bar(fetched[sym][0], ref)
+            ]
+            if stale:
+                logger.info(
+                    f"Stored history changed for {len(stale)} symbol(s); refetching in full"
+                )
+                for sym in stale:
+                    del fetched[sym]
+                fetched.update(self._fetch_bars([(start, stale, True)], tf=tf, end=now))
+            for sym, (bars, replace) in fetched.items():
+                if replace:
+                    store.replace(sym, interval, bars)
+                else:
+                    store.append(sym, interval, bars)
+                covered = start if replace else store.fetch_info(sym, interval)["covered_from"]
+                store.mark_fetched(sym, interval, covered_from=covered, when=now)
+        else:
+            print(f"[CACHE] Using stored bars for {len(symbols)} symbol(s)")
+
+        # 2. Serve the requested window from the store.
+        frames = {}
+        for sym in sorted(set(symbols)):
+            bars = store.read(sym, interval, start=start, end=now)
+            if not bars.empty:
+                frames[sym] = bars
+        if not frames:
+            return pd.DataFrame()
+
+        wide = pd.concat(frames, axis=1, names=["symbol", None]).swaplevel(0, 1, axis=1)
+        wide = wide.reindex(
+            columns=pd.MultiIndex.from_product([list(BAR_COLUMNS), list(frames)], names=[None, "symbol"])
+        )
+        wide.index.name = "timestamp"
+
+        # Flatten if single symbol to match yfinance behavior
+        if len(symbols) == 1:
+            wide.columns = wide.columns.droplevel(1)
+        return wide
+
+    def _fetch_bars(
+        self,
+        jobs: list[tuple[datetime, list[str], bool]],
+        *,
+        tf,
+        end: datetime,
+    ) -> dict[str, tuple[pd.DataFrame, bool]]:
+        """Fetch ``(start, symbols, replace)`` jobs; return per-symbol bars.
+
+        Symbols whose request failed are left out of the result so they are
+        retried next time. Symbols that succeeded with no new bars map to an
+        empty frame.
+        """
+        DataFeed = self._DataFeed
         # Chunk symbols to avoid URI Too Long errors - use larger chunks for better performance
         chunk_size = 100  # Increased from 50 - Alpaca can handle it
-        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
-        print(f"[DOWNLOAD] Fetching {len(symbols)} symbols in {len(chunks)} chunk(s) (timeout: 10s per chunk)")
-        all_dfs = []
-        
-        def fetch_chunk(chunk_syms):
+        chunks = [
+            (start, syms[i:i + chunk_size], replace)
+            for start, syms, replace in jobs
+            for i in range(0, len(syms), chunk_size)
+        ]
+        if not chunks:
+            return {}
+        print(f"[DOWNLOAD] Fetching {sum(len(c[1]) for c in chunks)} symbols in {len(chunks)} chunk(s) (timeout: 10s per chunk)")
+
+        def normalize(df: pd.DataFrame, chunk_syms: list[str]) -> pd.DataFrame:
+            df = df.reset_index()
+            # Check for various timestamp column names
+            if "timestamp" not in df.columns and "index" in df.columns:
+                df = df.rename(columns={"index": "timestamp"})
+            if "symbol" not in df.columns and len(chunk_syms) == 1:
+                df["symbol"] = chunk_syms[0]
+            return df
+
+        def request(chunk_syms: list[str], start: datetime) -> pd.DataFrame:
+            req = self._StockBarsRequest(
+                symbol_or_symbols=chunk_syms,
+                timeframe=tf,
+                start=start,
+                end=end,
+                adjustment="all",
+                feed=DataFeed.IEX,
+            )
+            return normalize(self._client.get_stock_bars(req).df, chunk_syms)
+
+        def fetch_chunk(start: datetime, chunk_syms: list[str]) -> tuple[list[str], pd.DataFrame | None]:
             try:
-                req = self._StockBarsRequest(
-                    symbol_or_symbols=chunk_syms,
-                    timeframe=tf,
-                    start=start,
-                    end=now,
-                    adjustment="all",
-                    feed=DataFeed.IEX,
-                )
-                df = self._client.get_stock_bars(req).df
-                df = df.reset_index()
-                # Normalize columns
-                # Check for various timestamp column names
-                if "timestamp" in df.columns:
-                    pass
-                elif "index" in df.columns:
-                    df = df.rename(columns={"index": "timestamp"})
-                if "symbol" not in df.columns and len(chunk_syms) == 1:
-                    df["symbol"] = chunk_syms[0]
-                return df
+                return list(chunk_syms), request(chunk_syms, start)
             except Exception as e:
                 logger.warning(f"Batch download failed (first: {chunk_syms[0]}): {e}. Retrying individually...")
                 # Fallback: Try individually to salvage valid symbols
+                ok: list[str] = []
                 dfs = []
                 for sym in chunk_syms:
                     try:
                         logger.info(f"Retrying fetch for {sym}...")
-                        req_single = self._StockBarsRequest(
-                            symbol_or_symbols=[sym],
-                            timeframe=tf,
-                            start=start,
-                            end=now,
-                            adjustment="all",
-                            feed=DataFeed.IEX,
-                        )
-                        res = self._client.get_stock_bars(req_single).df
+                        res = request([sym], start)
+                        # Force symbol to be correct for individual requests
+                        res["symbol"] = sym
+                        ok.append(sym)
                         if not res.empty:
-                            res = res.reset_index()
-                            if "timestamp" in res.columns:
-                                pass
-                            elif "index" in res.columns:
-                                res = res.rename(columns={"index": "timestamp"})
-                            # Force symbol to be correct for individual requests
-                            res["symbol"] = sym
                             dfs.append(res)
                         time.sleep(0.01)  # Minimal pause - Alpaca rate limits are generous
                     except Exception as inner_e:
                         logger.error(f"Failed to download {sym}: {inner_e}")
                         logger.error(traceback.format_exc())
-                
-                if dfs:
-                    try:
-                        return pd.concat(dfs)
-                    except Exception as e:
-                        logger.error(f"Failed to concat retried chunk: {e}")
-                        return None
-                return None
+                return ok, (pd.concat(dfs) if dfs else None)
 
+        out: dict[str, tuple[pd.DataFrame, bool]] = {}
         # Use threads to fetch chunks in parallel - increased workers for faster downloads
         max_workers = min(100, len(chunks) * 5)  # Aggressive parallelization
-        print(f"[DOWNLOAD] Using {max_workers} parallel workers")
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(fetch_chunk, chunk): chunk for chunk in chunks}
-            completed = 0
+            futures = {
+                executor.submit(fetch_chunk, start, syms): (syms, replace)
+                for start, syms, replace in chunks
+            }
             for future in concurrent.futures.as_completed(futures, timeout=15):
-                chunk_start = futures[future][0]
-                completed += 1
+                syms, replace = futures[future]
                 try:
-                    res = future.result(timeout=10)
-                    if res is not None and not res.empty:
-                        all_dfs.append(res)
+                    ok, res = future.result(timeout=10)
                 except concurrent.futures.TimeoutError:
-                    logger.error(f"Timeout downloading chunk starting with {chunk_start}")
+                    logger.error(f"Timeout downloading chunk starting with {syms[0]}")
+                    continue
                 except Exception as e:
-                    logger.error(f"Unexpected error in download thread for chunk {chunk_start}: {e}")
-                finally:
-                    # Clean up future to free memory immediately
-                    del futures[future]
-                # Show progress every 10 chunks
-                if completed % 10 == 0:
-                    print(f"[DOWNLOAD] Progress: {completed}/{len(chunks)} chunks completed")
-        
-        if not all_dfs:
-            return pd.DataFrame()
-            
-        try:
-            df = pd.concat(all_dfs)
-            logger.info(f"After concat: df shape {df.shape}, columns: {list(df.columns)}, sample data:\n{df.head()}")
-            
-            # Rename columns to match yfinance (Capitalized)
-            df = df.rename(columns={
-                "open": "Open",
-                "high": "High",
-                "low": "Low",
-                "close": "Close",
-                "volume": "Volume"
-            })
-            logger.info(f"After rename: columns {list(df.columns)}")
-            
-            # Pivot table to get MultiIndex columns
-            pivot_df = df.pivot(
-                index="timestamp", 
-                columns="symbol", 
-                values=["Open", "High", "Low", "Close", "Volume"]
-            )
-            logger.info(f"After pivot: shape {pivot_df.shape}, columns: {pivot_df.columns.tolist()}")
-            
-            # Flatten if single symbol to match yfinance behavior
-            if len(symbols) == 1 and not pivot_df.empty:
-                pivot_df.columns = pivot_df.columns.droplevel(1)
-                logger.info(f"After flatten: columns {list(pivot_df.columns)}")
-            
-            # Save to cache
-            if not pivot_df.empty:
-                try:
-                    pivot_df.to_json(cache_file, orient="split", date_format="iso")
-                    logger.info(f"Saved data to cache: {cache_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to save cache: {e}")
+                    logger.error(f"Unexpected error in download thread for chunk {syms[0]}: {e}")
+                    continue
 
-            # Clean up temporary dataframes after download completes
-            del all_dfs, df, chunks, futures
-            gc.collect()  # Force garbage collection after large data processing
-            
-            return pivot_df
-            
-        except Exception as e:
-            logger.error(f"Failed to process/merge data: {e}")
-            return pd.DataFrame()
+                by_symbol = {}
+                if res is not None and not res.empty:
+                    # Rename columns to match yfinance (Capitalized)
+                    res = res.rename(columns={
+                        "open": "Open",
+                        "high": "High",
+                        "low": "Low",
+                        "close": "Close",
+                        "volume": "Volume"
+                    })
+                    for sym, g in res.groupby("symbol"):
+                        by_symbol[sym] = g.set_index("timestamp")[list(BAR_COLUMNS)]
+                for sym in ok:
+                    out[sym] = (by_symbol.get(sym, pd.DataFrame(columns=list(BAR_COLUMNS))), replace)
+        return out
     
     def history(
         self,
@@ -0,0 +1,214 @@
+"""Append-only columnar bar store.
+
+Bars are stored per symbol and interval, one flat binary file per column::
+
+    <root>/<interval>/<SYMBOL>/ts.i64      UTC epoch nanoseconds, ascending
+                               open.f64 ... volume.f64
+                               meta.json   {"fetched_at": ..., "covered_from": ...}
+
+Files are read through `np.memmap`, so a range query binary-searches the
+timestamp column and copies only the requested rows. Appending writes only
+the new rows. Rows at or after the first incoming timestamp are dropped first
+(a "tail upsert"), so a still-forming last bar is simply replaced on the next
+fetch.
+
+Writes append the value columns before the timestamp column and truncate in
+the reverse order. A reader uses the shortest column length, so an interrupted
+write never shows a row with missing values.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+_TS_FILE = "ts.i64"
+_META_FILE = "meta.json"
+_SAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _col_file(col: str) -> str:
+    return f"{col.lower()}.f64"
+
+
+def _to_utc_ns(index) -> np.ndarray:
+    ts = pd.DatetimeIndex(pd.to_datetime(index, utc=True)).tz_convert(None)
+    # Normalize the unit: newer pandas may hold microseconds.
+    return ts.values.astype("datetime64[ns]").view(np.int64)
+
+
+class BarStore:
+    """Per-symbol, per-interval OHLCV store with timestamp range reads."""
+
+    def __init__(self, root: str | Path = ".cache/bars") -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / _SAFE.sub("_", interval) / _SAFE.sub("_", symbol.upper())
+
+    def _length(self, d: Path) -> int:
+        files = [_TS_FILE] + [_col_file(c) for c in BAR_COLUMNS]
+        sizes = []
+        for name in files:
+            p = d / name
+            sizes.append(p.stat().st_size // 8 if p.exists() else 0)
+        return min(sizes)
+
+    def _timestamps(self, d: Path, n: int) -> np.ndarray:
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.memmap(d / _TS_FILE, dtype=np.int64, mode="r", shape=(n,))
+
+    def symbols(self, interval: str) -> List[str]:
+        base = self.root / _SAFE.sub("_", interval)
+        if not base.exists():
+            return []
+        return sorted(p.name for p in base.iterdir() if p.is_dir())
+
+    def row_count(self, symbol: str, interval: str) -> int:
+        d = self._dir(symbol, interval)
+        return self._length(d) if d.exists() else 0
+
+    def bounds(self, symbol: str, interval: str) -> Optional[tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last stored timestamp, or None if nothing is stored."""
+        d = self._dir(symbol, interval)
+        if not d.exists():
+            return None
+        n = self._length(d)
+        if n == 0:
+            return None
+        ts = self._timestamps(d, n)
+        return pd.Timestamp(int(ts[0]), tz="UTC"), pd.Timestamp(int(ts[n - 1]), tz="UTC")
+
+    def fetch_info(self, symbol: str, interval: str) -> Optional[Dict[str, datetime]]:
+        """When the symbol was last fetched and from which start it is complete."""
+        p = self._dir(symbol, interval) / _META_FILE
+        if not p.exists():
+            return None
+        try:
+            meta = json.loads(p.read_text())
+            return {
+                "fetched_at": datetime.fromisoformat(meta["fetched_at"]),
+                "covered_from": datetime.fromisoformat(meta["covered_from"]),
+            }
+        except (ValueError, KeyError, OSError):
+            return None
+
+    def mark_fetched(
+        self,
+        symbol: str,
+        interval: str,
+        *,
+        covered_from: datetime,
+        when: Optional[datetime] = None,
+    ) -> None:
+        """Record a successful fetch; the store is complete from ``covered_from`` on."""
+        d = self._dir(symbol, interval)
+        d.mkdir(parents=True, exist_ok=True)
+        when = when or datetime.now(timezone.utc)
+        meta = {"fetched_at": when.isoformat(), "covered_from": covered_from.isoformat()}
+        tmp = d / f"{_META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, d / _META_FILE)
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        *,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Bars with ``start <= ts <= end`` (either bound optional), UTC index."""
+        d = self._dir(symbol, interval)
+        n = self._length(d) if d.exists() else 0
+        if n == 0:
+            return pd.DataFrame(columns=list(BAR_COLUMNS), index=pd.DatetimeIndex([], tz="UTC"))
+
+        ts = self._timestamps(d, n)
+        lo = 0 if start is None else int(np.searchsorted(ts, _to_utc_ns([start])[0], "left"))
+        hi = n if end is None else int(np.searchsorted(ts, _to_utc_ns([end])[0], "right"))
+        hi = max(hi, lo)
+
+        data: Dict[str, np.ndarray] = {}
+        for col in BAR_COLUMNS:
+            mm = np.memmap(d / _col_file(col), dtype=np.float64, mode="r", shape=(n,))
+            data[col] = np.array(mm[lo:hi])
+        index = pd.DatetimeIndex(np.array(ts[lo:hi]).view("datetime64[ns]")).tz_localize("UTC")
+        return pd.DataFrame(data, index=index)
+
+    def tail(self, symbol: str, interval: str, rows: int = 1) -> pd.DataFrame:
+        """The last ``rows`` stored bars (fewer if fewer are stored)."""
+        d = self._dir(symbol, interval)
+        n = self._length(d) if d.exists() else 0
+        if n == 0:
+            return self.read(symbol, interval)
+        first = int(self._timestamps(d, n)[max(0, n - rows)])
+        return self.read(symbol, interval, start=pd.Timestamp(first, tz="UTC"))
+
+    def append(self, symbol: str, interval: str, bars: pd.DataFrame) -> int:
+        """Upsert ``bars`` at the tail and return the number of rows written.
+
+        ``bars`` needs a timestamp index and the `BAR_COLUMNS`. Stored rows at
+        or after the earliest incoming timestamp are replaced.
+        """
+        if bars is None or bars.empty:
+            return 0
+        missing = [c for c in BAR_COLUMNS if c not in bars.columns]
+        if missing:
+            raise ValueError(f"bars missing columns: {missing}")
+
+        ts = _to_utc_ns(bars.index)
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        # Keep the last occurrence of a duplicated timestamp.
+        keep = np.append(ts[1:] != ts[:-1], True)
+        ts = ts[keep]
+        cols = {c: bars[c].to_numpy(dtype=np.float64)[order][keep] for c in BAR_COLUMNS}
+
+        d = self._dir(symbol, interval)
+        with self._lock:
+            d.mkdir(parents=True, exist_ok=True)
+            n = self._length(d)
+            cut = n
+            if n:
+                stored = self._timestamps(d, n)
+                cut = int(np.searchsorted(stored, ts[0], "left"))
+                del stored
+            # Also trims columns left longer than ts.i64 by an interrupted write.
+            self._truncate(d, cut)
+            for c in BAR_COLUMNS:
+                with open(d / _col_file(c), "ab") as fh:
+                    fh.write(cols[c].tobytes())
+            with open(d / _TS_FILE, "ab") as fh:
+                fh.write(ts.tobytes())
+        return int(ts.shape[0])
+
+    def replace(self, symbol: str, interval: str, bars: pd.DataFrame) -> int:
+        """Drop everything stored for the symbol/interval and write ``bars``."""
+        d = self._dir(symbol, interval)
+        with self._lock:
+            if d.exists():
+                self._truncate(d, 0)
+        return self.append(symbol, interval, bars)
+
+    @staticmethod
+    def _truncate(d: Path, rows: int) -> None:
+        size = rows * 8
+        for name in [_TS_FILE] + [_col_file(c) for c in BAR_COLUMNS]:
+            p = d / name
+            if p.exists() and p.stat().st_size > size:
+                os.truncate(p, size)
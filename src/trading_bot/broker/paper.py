@@ -3,6 +3,7 @@ from __future__ import annotations
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Mapping
 
 from trading_bot.broker.base import OrderRejection
 from trading_bot.core.models import Fill, Order, Portfolio
@@ -34,15 +35,20 @@ class PaperBroker:
     ) -> None:
         self._cfg = config or PaperBrokerConfig()
         self._portfolio = Portfolio(cash=float(start_cash))
-        self._prices: dict[str, float] = {}
+        # Mark prices live in the portfolio so its ledger stays marked to market
+        self._prices = self._portfolio.marks
 
     def set_price(self, symbol: str, price: float) -> None:
         if price <= 0:
             raise ValueError("price must be positive")
-        self._prices[symbol] = float(price)
+        self._portfolio.set_mark(symbol, float(price))
 
-    def prices(self) -> dict[str, float]:
-        return dict(self._prices)
+    def prices(self) -> Mapping[str, float]:
+        """Read-only live view of the mark prices (not a copy).
+
+        Passing it to ``portfolio().equity`` reads the ledger totals in O(1).
+        """
+        return self._portfolio.marks_view
 
     def portfolio(self) -> Portfolio:
         return self._portfolio
@@ -105,6 +105,15 @@ def _save_keys_to_env(key: str, secret: str) -> None:
         print(f"[WARN] Failed to save keys to .env: {e}")
 
 
+def _latency_snapshot(value: str | None) -> str | None:
+    """--latency-snapshot: None -> the shared default path, '' -> disabled."""
+    if value is None:
+        from trading_bot.performance.stage_timer import snapshot_path
+
+        return snapshot_path()
+    return value or None
+
+
 def _add_paper_run_args(p: argparse.ArgumentParser) -> None:
     p.add_argument("--config", default="configs/default.yaml")
     p.add_argument(
@@ -140,6 +149,32 @@ def _add_paper_run_args(p: argparse.ArgumentParser) -> None:
     p.add_argument("--ignore-market-hours", action="store_true", help="Trade outside market hours (for testing)")
     p.add_argument("--max-symbols", type=int, default=None, help="Limit number of symbols to trade (memory optimization)")
     p.add_argument("--memory-mode", action="store_true", help="Enable aggressive memory optimizations (smaller batches, fewer indicators)")
+    p.add_argument("--streaming-indicators", action="store_true", help="Evaluate strategies incrementally on new bars only (O(1) per bar)")
+    p.add_argument("--incremental-bars", action="store_true", help="After warm-up, download only bars newer than each symbol's rolling window")
+    p.add_argument("--window-bars", type=int, default=0, help="Rolling window size per symbol with --incremental-bars (0 = warm-up length)")
+    p.add_argument("--batched-writes", action="store_true", help="Write trade/decision logs on a background thread, one transaction per step")
+    p.add_argument("--compute-workers", type=int, default=1, help="Workers for per-symbol strategy/ML evaluation (1 = sequential)")
+    p.add_argument("--compute-executor", choices=["thread", "process"], default="thread", help="Pool type for --compute-workers")
+    p.add_argument("--ml-pooled-model", action="store_true", help="Train one ML model across all symbols and score them in a single batch")
+    p.add_argument("--ml-background-training", action="store_true", help="Train ML models in worker processes and load saved models on restart")
+    p.add_argument("--ml-training-workers", type=int, default=1, help="Worker processes for --ml-background-training")
+    p.add_argument("--ml-registry-dir", default=".cache/models", help="Directory of versioned ML models for --ml-background-training")
+    p.add_argument("--decision-log", choices=["full", "compact"], default="full", help="compact: weights once per step, encoded explanations, unchanged decisions collapsed")
+    p.add_argument(
+        "--decision-sample-every",
+        type=int,
+        default=10,
+        help="With --decision-log compact, store changed explanation values at most every N bars "
+        "per symbol (1 = every change)",
+    )
+    p.add_argument("--event-loop", action="store_true", help="Headless: wake at bar boundaries and flush/notify in the background (asyncio)")
+    p.add_argument("--bar-deadline", type=float, default=None, help="Seconds after a bar boundary before its work counts as a miss (default: one interval)")
+    p.add_argument(
+        "--latency-snapshot",
+        default=None,
+        help="File the engine publishes stage latency to after each step, for the health API's "
+        "/latency (default: $LATENCY_SNAPSHOT_PATH or logs/latency.json; '' disables)",
+    )
     p.add_argument("--launch-monitor", action="store_true", help="Launch log viewer (default is disabled for faster startup)")
 
 
@@ -212,6 +247,7 @@ def build_parser() -> argparse.ArgumentParser:
     analytics_build = analytics_sub.add_parser("build", help="Build DuckDB from SQLite event store")
     analytics_build.add_argument("--db", default="data/trades.sqlite")
     analytics_build.add_argument("--duckdb", default="analytics.duckdb")
+    analytics_build.add_argument("--full", action="store_true", help="Drop and resync everything")
 
     analytics_report = analytics_sub.add_parser("report", help="Report performance from DuckDB")
     analytics_report.add_argument("--duckdb", default="analytics.duckdb")
@@ -309,6 +345,12 @@ def build_parser() -> argparse.ArgumentParser:
     maintenance_cleanup.add_argument("--db", default="data/trades.sqlite")
     maintenance_cleanup.add_argument("--days-keep", type=int, default=7, help="Keep events for N days")
     maintenance_cleanup.add_argument("--dry-run", action="store_true", help="Show what would be deleted")
+    maintenance_cleanup.add_argument(
+        "--archive-dir",
+        default=None,
+        help="Archive pruned events as Parquet here before deleting them (needs pyarrow)",
+    )
+    maintenance_cleanup.add_argument("--batch-size", type=int, default=5000, help="Rows deleted per transaction")
 
     maintenance_summary = maintenance_sub.add_parser("summary", help="Show database summary stats")
     maintenance_summary.add_argument("--db", default="data/trades.sqlite")
@@ -387,6 +429,21 @@ def _run_paper(args: argparse.Namespace) -> int:
         min_fee=float(args.min_fee),
         ignore_market_hours=bool(args.ignore_market_hours),
         memory_mode=bool(args.memory_mode),
+        streaming_indicators=bool(getattr(args, "streaming_indicators", False)),
+        incremental_bars=bool(getattr(args, "incremental_bars", False)),
+        window_bars=int(getattr(args, "window_bars", 0) or 0),
+        batched_writes=bool(getattr(args, "batched_writes", False)),
+        compute_workers=int(getattr(args, "compute_workers", 1) or 1),
+        compute_executor=str(getattr(args, "compute_executor", "thread")),
+        ml_pooled_model=bool(getattr(args, "ml_pooled_model", False)),
+        ml_background_training=bool(getattr(args, "ml_background_training", False)),
+        ml_training_workers=int(getattr(args, "ml_training_workers", 1) or 1),
+        ml_registry_dir=str(getattr(args, "ml_registry_dir", ".cache/models")),
+        event_loop=bool(getattr(args, "event_loop", False)),
+        bar_deadline=getattr(args, "bar_deadline", None),
+        decision_log=str(getattr(args, "decision_log", "full")),
+        decision_sample_every=int(getattr(args, "decision_sample_every", 10) or 10),
+        latency_snapshot=_latency_snapshot(getattr(args, "latency_snapshot", None)),
     )
     return 0
 
@@ -616,6 +673,8 @@ def _run_maintenance(args: argparse.Namespace) -> int:
                 session,
                 days_to_keep=args.days_keep,
                 dry_run=args.dry_run,
+                archive_dir=args.archive_dir,
+                batch_size=args.batch_size,
             )
             
             if args.dry_run:
@@ -824,7 +883,7 @@ def main(argv: list[str] | None = None) -> int:
             if args.analytics_cmd == "build":
                 from trading_bot.paper.analytics import paper_analytics_build
 
-                return int(paper_analytics_build(db_path=args.db, duckdb_path=args.duckdb))
+                return int(paper_analytics_build(db_path=args.db, duckdb_path=args.duckdb, full=args.full))
 
             if args.analytics_cmd == "report":
                 from trading_bot.paper.analytics import paper_analytics_report
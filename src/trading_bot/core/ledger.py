@@ -0,0 +1,173 @@
+"""Array-backed position ledger.
+
+`PositionLedger` stores one slot per symbol in parallel NumPy arrays (qty,
+avg_price, realized_pnl, stop_loss, take_profit, mark), with a dict from symbol
+to slot. NaN means "not set" for stops, targets and marks.
+
+It keeps running totals of market value (``qty * mark``), marked cost basis
+(``qty * avg_price``) and realized P&L. Every write goes through `set` or
+`set_marks`, which subtract the slot's old contribution and add the new one,
+so equity is O(1) to read after a fill or a price update. The totals are
+recomputed exactly from the arrays every ``RESYNC_EVERY`` writes to stop
+floating-point drift.
+
+`Portfolio` and `Position` in `trading_bot.core.models` are thin views over a
+ledger.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+
+LEDGER_FIELDS = ("qty", "avg_price", "realized_pnl", "stop_loss", "take_profit", "mark")
+RESYNC_EVERY = 4096
+
+
+class PositionLedger:
+    """Per-symbol position state in parallel arrays with O(1) totals."""
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self._cap = 0
+        self.qty = np.zeros(0, dtype=np.int64)
+        for name in LEDGER_FIELDS[1:]:
+            setattr(self, name, np.zeros(0))
+        self._grow(max(1, int(capacity)))
+        self._market_value = 0.0
+        self._marked_cost = 0.0
+        self._realized = 0.0
+        self._writes = 0
+
+    def _grow(self, cap: int) -> None:
+        n = self._cap
+        for name in LEDGER_FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            if name in ("stop_loss", "take_profit", "mark"):
+                new[:] = np.nan
+            new[:n] = old[:n]
+            setattr(self, name, new)
+        self._cap = cap
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def add(self, symbol: str, **values: float) -> int:
+        """Slot for ``symbol``, created (with ``values``) if new."""
+        slot = self.index.get(symbol)
+        if slot is None:
+            slot = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if slot >= self._cap:
+                self._grow(self._cap * 2)
+            if values:
+                self.set(slot, **values)
+        return slot
+
+    # -- writes -------------------------------------------------------------
+
+    def _contribution(self, slot: int) -> Tuple[float, float]:
+        mark = self.mark[slot]
+        if mark != mark:  # NaN: unmarked positions count for nothing
+            return 0.0, 0.0
+        qty = float(self.qty[slot])
+        return qty * float(mark), qty * float(self.avg_price[slot])
+
+    def set(self, slot: int, **values: float) -> None:
+        """Write fields of one slot; ``None`` clears a stop, target or mark."""
+        mv, cost = self._contribution(slot)
+        realized = float(self.realized_pnl[slot])
+        for name, value in values.items():
+            getattr(self, name)[slot] = np.nan if value is None else value
+        new_mv, new_cost = self._contribution(slot)
+        self._market_value += new_mv - mv
+        self._marked_cost += new_cost - cost
+        self._realized += float(self.realized_pnl[slot]) - realized
+        self._wrote(1)
+
+    def set_marks(self, prices: Mapping[str, float]) -> None:
+        """Mark every ledger symbol found in ``prices`` in one vectorized update."""
+        pairs = [(self.index[s], float(p)) for s, p in prices.items() if s in self.index]
+        if not pairs:
+            return
+        slots = np.fromiter((s for s, _ in pairs), dtype=np.int64, count=len(pairs))
+        new = np.fromiter((p for _, p in pairs), dtype=np.float64, count=len(pairs))
+        qty = self.qty[slots].astype(np.float64)
+        old = self.mark[slots]
+        was, now = ~np.isnan(old), ~np.isnan(new)
+        self._market_value += float(
+            np.sum(qty * np.where(now, new, 0.0)) - np.sum(qty * np.where(was, old, 0.0))
+        )
+        cost = qty * self.avg_price[slots]
+        self._marked_cost += float(np.sum(cost[now & ~was]) - np.sum(cost[was & ~now]))
+        self.mark[slots] = new
+        self._wrote(len(pairs))
+
+    def _wrote(self, count: int) -> None:
+        self._writes += count
+        if self._writes >= RESYNC_EVERY:
+            self.resync()
+
+    def resync(self) -> None:
+        """Recompute the running totals exactly from the arrays."""
+        n = len(self.symbols)
+        qty = self.qty[:n].astype(np.float64)
+        marked = ~np.isnan(self.mark[:n])
+        self._market_value = float(np.sum(qty[marked] * self.mark[:n][marked]))
+        self._marked_cost = float(np.sum(qty[marked] * self.avg_price[:n][marked]))
+        self._realized = float(np.sum(self.realized_pnl[:n]))
+        self._writes = 0
+
+    # -- reads --------------------------------------------------------------
+
+    @property
+    def market_value(self) -> float:
+        """Sum of ``qty * mark`` over marked positions."""
+        return self._market_value
+
+    @property
+    def unrealized_pnl(self) -> float:
+        """Sum of ``(mark - avg_price) * qty`` over marked positions."""
+        return self._market_value - self._marked_cost
+
+    @property
+    def realized_total(self) -> float:
+        """Sum of ``realized_pnl`` over every slot."""
+        return self._realized
+
+    def held(self) -> np.ndarray:
+        """Slots with a non-zero quantity."""
+        return np.flatnonzero(self.qty[: len(self.symbols)] != 0)
+
+    def valued_at(self, prices: Mapping[str, float]) -> Tuple[float, float]:
+        """(market value, unrealized P&L) of held positions at ``prices``.
+
+        Symbols missing from ``prices`` are ignored.
+        """
+        held = self.held()
+        if len(held) == 0:
+            return 0.0, 0.0
+        px = np.fromiter(
+            (float(prices.get(self.symbols[i], np.nan)) for i in held),
+            dtype=np.float64,
+            count=len(held),
+        )
+        found = ~np.isnan(px)
+        qty = self.qty[held][found].astype(np.float64)
+        px = px[found]
+        return float(np.sum(qty * px)), float(np.sum((px - self.avg_price[held][found]) * qty))
+
+    def triggered(self) -> List[Tuple[str, str]]:
+        """``(symbol, "stop_loss" | "take_profit")`` for long positions whose mark
+        has crossed a level, in slot order. A stop wins if both are crossed."""
+        n = len(self.symbols)
+        mark = self.mark[:n]
+        held = self.qty[:n] > 0
+        with np.errstate(invalid="ignore"):
+            stop = held & (mark <= self.stop_loss[:n])
+            take = held & ~stop & (mark >= self.take_profit[:n])
+        hits = np.flatnonzero(stop | take)
+        return [(self.symbols[i], "stop_loss" if stop[i] else "take_profit") for i in hits]
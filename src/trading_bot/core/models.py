@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from types import MappingProxyType
 from typing import Literal, Mapping
 
+from trading_bot.core.ledger import LEDGER_FIELDS, PositionLedger
+
 Side = Literal["BUY", "SELL"]
 OrderType = Literal["MARKET", "LIMIT"]
 
@@ -33,14 +36,126 @@ class Fill:
     note: str = ""
 
 
-@dataclass
 class Position:
-    symbol: str
-    qty: int = 0
-    avg_price: float = 0.0
-    realized_pnl: float = 0.0
-    stop_loss: float | None = None
-    take_profit: float | None = None
+    """One symbol's position: a view onto a slot of a `PositionLedger`.
+
+    A position created on its own gets a private one-slot ledger; adding it to
+    a `Portfolio` moves its values into the portfolio's ledger and rebinds it,
+    so the caller's object stays live.
+    """
+
+    __slots__ = ("symbol", "_ledger", "_slot")
+
+    def __init__(
+        self,
+        symbol: str,
+        qty: int = 0,
+        avg_price: float = 0.0,
+        realized_pnl: float = 0.0,
+        stop_loss: float | None = None,
+        take_profit: float | None = None,
+    ) -> None:
+        self.symbol = symbol
+        self._ledger = PositionLedger(capacity=1)
+        self._slot = self._ledger.add(
+            symbol,
+            qty=qty,
+            avg_price=avg_price,
+            realized_pnl=realized_pnl,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
+
+    @classmethod
+    def _view(cls, ledger: PositionLedger, slot: int) -> Position:
+        pos = cls.__new__(cls)
+        pos.symbol = ledger.symbols[slot]
+        pos._ledger = ledger
+        pos._slot = slot
+        return pos
+
+    def _bind(self, ledger: PositionLedger, mark: float | None) -> None:
+        """Move this position's values into ``ledger`` and view them there."""
+        slot = ledger.add(self.symbol)
+        ledger.set(
+            slot,
+            qty=self.qty,
+            avg_price=self.avg_price,
+            realized_pnl=self.realized_pnl,
+            stop_loss=self.stop_loss,
+            take_profit=self.take_profit,
+            mark=mark,
+        )
+        self._ledger = ledger
+        self._slot = slot
+
+    def _get(self, name: str) -> float | None:
+        value = float(getattr(self._ledger, name)[self._slot])
+        return None if value != value else value
+
+    @property
+    def qty(self) -> int:
+        return int(self._ledger.qty[self._slot])
+
+    @qty.setter
+    def qty(self, value: int) -> None:
+        self._ledger.set(self._slot, qty=int(value))
+
+    @property
+    def avg_price(self) -> float:
+        return float(self._ledger.avg_price[self._slot])
+
+    @avg_price.setter
+    def avg_price(self, value: float) -> None:
+        self._ledger.set(self._slot, avg_price=float(value))
+
+    @property
+    def realized_pnl(self) -> float:
+        return float(self._ledger.realized_pnl[self._slot])
+
+    @realized_pnl.setter
+    def realized_pnl(self, value: float) -> None:
+        self._ledger.set(self._slot, realized_pnl=float(value))
+
+    @property
+    def stop_loss(self) -> float | None:
+        return self._get("stop_loss")
+
+    @stop_loss.setter
+    def stop_loss(self, value: float | None) -> None:
+        self._ledger.set(self._slot, stop_loss=None if value is None else float(value))
+
+    @property
+    def take_profit(self) -> float | None:
+        return self._get("take_profit")
+
+    @take_profit.setter
+    def take_profit(self, value: float | None) -> None:
+        self._ledger.set(self._slot, take_profit=None if value is None else float(value))
+
+    def _fields(self) -> tuple:
+        return (
+            self.symbol,
+            self.qty,
+            self.avg_price,
+            self.realized_pnl,
+            self.stop_loss,
+            self.take_profit,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (
+            f"Position(symbol={self.symbol!r}, qty={self.qty!r}, avg_price={self.avg_price!r}, "
+            f"realized_pnl={self.realized_pnl!r}, stop_loss={self.stop_loss!r}, "
+            f"take_profit={self.take_profit!r})"
+        )
 
     def market_value(self, price: float) -> float:
         return float(self.qty) * float(price)
@@ -49,37 +164,99 @@ class Position:
         return (float(price) - float(self.avg_price)) * float(self.qty)
 
 
+class PositionMap(dict):
+    """``symbol -> Position`` dict that binds inserted positions to the portfolio's ledger."""
+
+    def __init__(self, portfolio: Portfolio) -> None:
+        super().__init__()
+        self._portfolio = portfolio
+
+    def __setitem__(self, symbol: str, pos: Position) -> None:
+        pos._bind(self._portfolio.ledger, self._portfolio.marks.get(symbol))
+        super().__setitem__(symbol, pos)
+
+    def _unbind(self, pos: Position) -> None:
+        # The object keeps its values in a private ledger; the slot is zeroed
+        # so the portfolio totals drop it
+        ledger, slot = pos._ledger, pos._slot
+        pos.__init__(pos.symbol, **dict(zip(LEDGER_FIELDS[:5], pos._fields()[1:])))
+        ledger.set(slot, qty=0, avg_price=0.0, realized_pnl=0.0, stop_loss=None, take_profit=None)
+
+    def __delitem__(self, symbol: str) -> None:
+        pos = self[symbol]
+        super().__delitem__(symbol)
+        self._unbind(pos)
+
+    def pop(self, symbol: str, *default):
+        if symbol not in self:
+            return super().pop(symbol, *default)
+        pos = super().pop(symbol)
+        self._unbind(pos)
+        return pos
+
+
 @dataclass
 class Portfolio:
+    """Cash plus positions, backed by a `PositionLedger`.
+
+    `marks` holds the latest mark price per symbol (set by the broker through
+    `set_mark`/`set_marks`). Equity and P&L read from the ledger's running
+    totals in O(1) when called without prices or with `marks_view`; other
+    price mappings are valued over held positions only.
+    """
+
     cash: float
     positions: dict[str, Position] = field(default_factory=dict)
     fees_paid: float = 0.0
+    ledger: PositionLedger = field(
+        default_factory=PositionLedger, init=False, repr=False, compare=False
+    )
+    marks: dict[str, float] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.marks_view: Mapping[str, float] = MappingProxyType(self.marks)
+        given, self.positions = self.positions, PositionMap(self)
+        for sym, pos in given.items():
+            self.positions[sym] = pos
+
+    def __reduce__(self):
+        state = (self.cash, dict(self.positions), self.fees_paid, dict(self.marks))
+        return _restore_portfolio, state
 
     def get_position(self, symbol: str) -> Position:
         pos = self.positions.get(symbol)
         if pos is None:
-            pos = Position(symbol=symbol)
-            self.positions[symbol] = pos
+            slot = self.ledger.add(symbol, mark=self.marks.get(symbol))
+            pos = Position._view(self.ledger, slot)
+            dict.__setitem__(self.positions, symbol, pos)
         return pos
 
-    def market_value(self, prices: Mapping[str, float]) -> float:
-        mv = 0.0
-        for sym, pos in self.positions.items():
-            if pos.qty == 0:
-                continue
-            px = prices.get(sym)
-            if px is None:
-                continue
-            mv += pos.market_value(float(px))
-        return float(mv)
-
-    def equity(self, prices: Mapping[str, float]) -> float:
+    def set_mark(self, symbol: str, price: float) -> None:
+        self.marks[symbol] = float(price)
+        slot = self.ledger.index.get(symbol)
+        if slot is not None:
+            self.ledger.set(slot, mark=float(price))
+
+    def set_marks(self, prices: Mapping[str, float]) -> None:
+        self.marks.update(prices)
+        self.ledger.set_marks(prices)
+
+    def _is_marked(self, prices: Mapping[str, float] | None) -> bool:
+        return prices is None or prices is self.marks_view or prices is self.marks
+
+    def market_value(self, prices: Mapping[str, float] | None = None) -> float:
+        if self._is_marked(prices):
+            return float(self.ledger.market_value)
+        return self.ledger.valued_at(prices)[0]
+
+    def equity(self, prices: Mapping[str, float] | None = None) -> float:
         """
         Calculate total portfolio equity (cash + market value of all positions).
         
         Args:
-            prices: Mapping of symbol to current price. Required to calculate position market values.
-                    Missing symbols are ignored.
+            prices: Mapping of symbol to current price, used for position market
+                    values. Missing symbols are ignored. Omit it (or pass `marks_view`, which
+                    `PaperBroker.prices()` returns) to value at the marks in O(1).
         
         Returns:
             Total equity (float): cash + sum of (position_qty * current_price) for all positions.
@@ -91,16 +268,27 @@ class Portfolio:
         """
         return float(self.cash) + self.market_value(prices)
 
-    def unrealized_pnl(self, prices: Mapping[str, float]) -> float:
-        out = 0.0
-        for sym, pos in self.positions.items():
-            if pos.qty == 0:
-                continue
-            px = prices.get(sym)
-            if px is None:
-                continue
-            out += pos.unrealized_pnl(float(px))
-        return float(out)
+    def unrealized_pnl(self, prices: Mapping[str, float] | None = None) -> float:
+        if self._is_marked(prices):
+            return float(self.ledger.unrealized_pnl)
+        return self.ledger.valued_at(prices)[1]
 
     def realized_pnl(self) -> float:
-        return float(sum(p.realized_pnl for p in self.positions.values()))
+        return float(self.ledger.realized_total)
+
+    def triggered_exits(self) -> list[tuple[str, str]]:
+        """Long positions whose mark crossed their stop-loss or take-profit."""
+        return self.ledger.triggered()
+
+
+def _restore_portfolio(
+    cash: float,
+    positions: dict[str, Position],
+    fees_paid: float,
+    marks: dict[str, float],
+) -> Portfolio:
+    portfolio = Portfolio(cash=cash, fees_paid=fees_paid)
+    portfolio.marks.update(marks)
+    for sym, pos in positions.items():
+        portfolio.positions[sym] = pos
+    return portfolio
@@ -0,0 +1,227 @@
+"""Read-only OHLCV panel published once in shared memory.
+
+Process pools used to receive pickled DataFrames with every task. With a few
+hundred symbols and years of bars, serialization dominated and each worker
+held its own copy. `SharedOHLCVPanel.publish` instead copies the bars once
+into a `multiprocessing.shared_memory` block laid out as::
+
+    ts      int64[n_bars]                       UTC epoch nanoseconds, ascending
+    values  float32[n_fields, n_symbols, n_bars] NaN where a symbol has no bar
+
+Each (field, symbol) series is contiguous. A panel pickles as its `PanelSpec`,
+i.e. the block name plus the symbol/field index, so passing one to
+``executor.submit`` sends a few hundred bytes. The worker attaches to the same
+block by name without copying. Attachments are cached per process, so a worker
+maps a block only once however many tasks it runs.
+
+The creating process owns the block: it must keep the panel alive while
+workers use it and call `unlink` (or leave the ``with`` block) when done.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+# Panels attached in this process, by block name.
+_ATTACHED: Dict[str, "SharedOHLCVPanel"] = {}
+
+
+@dataclass(frozen=True)
+class PanelSpec:
+    """Everything a worker needs to attach to a published panel."""
+
+    name: str
+    symbols: Tuple[str, ...]
+    fields: Tuple[str, ...]
+    n_bars: int
+
+    @property
+    def nbytes(self) -> int:
+        return 8 * self.n_bars + 4 * len(self.fields) * len(self.symbols) * self.n_bars
+
+
+def _to_utc_ns(index) -> np.ndarray:
+    ts = pd.DatetimeIndex(pd.to_datetime(index, utc=True)).tz_convert(None)
+    return ts.values.astype("datetime64[ns]").view(np.int64)
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    # POSIX workers share the parent's resource tracker, so a tracked attach is
+    # harmless there; 3.13+ can skip tracking outright.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedOHLCVPanel:
+    """Zero-copy (fields x symbols x bars) float32 view over a shared block."""
+
+    def __init__(self, spec: PanelSpec, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.spec = spec
+        self._shm = shm
+        self.owner = owner
+        self.index: Dict[str, int] = {s: i for i, s in enumerate(spec.symbols)}
+        self._field_index: Dict[str, int] = {f: i for i, f in enumerate(spec.fields)}
+        n = spec.n_bars
+        self._ts = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self.values = np.ndarray(
+            (len(spec.fields), len(spec.symbols), n),
+            dtype=np.float32,
+            buffer=shm.buf,
+            offset=8 * n,
+        )
+        if not owner:
+            self._ts.flags.writeable = False
+            self.values.flags.writeable = False
+
+    # -- publishing / attaching --------------------------------------------
+
+    @classmethod
+    def publish(
+        cls,
+        frames: Mapping[str, pd.DataFrame],
+        fields: Sequence[str] = PANEL_FIELDS,
+    ) -> "SharedOHLCVPanel":
+        """Copy per-symbol OHLCV frames into a new shared block.
+
+        Frames are aligned on the union of their timestamps (the index, or a
+        ``Date`` column when the index is a plain range). Fields a frame lacks
+        stay NaN.
+        """
+        fields = tuple(fields)
+        stamps = {}
+        for sym, df in frames.items():
+            if "Date" in df.columns and not isinstance(df.index, pd.DatetimeIndex):
+                stamps[sym] = _to_utc_ns(df["Date"])
+            else:
+                stamps[sym] = _to_utc_ns(df.index)
+        if stamps:
+            ts = np.unique(np.concatenate(list(stamps.values())))
+        else:
+            ts = np.empty(0, dtype=np.int64)
+
+        spec_symbols = tuple(frames)
+        size = max(1, 8 * len(ts) + 4 * len(fields) * len(spec_symbols) * len(ts))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        spec = PanelSpec(shm.name, spec_symbols, fields, len(ts))
+        panel = cls(spec, shm, owner=True)
+        panel._ts[:] = ts
+        panel.values[:] = np.nan
+        for s, (sym, df) in enumerate(frames.items()):
+            rows = np.searchsorted(ts, stamps[sym])
+            for f, field in enumerate(fields):
+                if field in df.columns:
+                    panel.values[f, s, rows] = df[field].to_numpy(dtype=np.float32)
+        panel._ts.flags.writeable = False
+        panel.values.flags.writeable = False
+        return panel
+
+    @classmethod
+    def from_wide(
+        cls, wide: pd.DataFrame, fields: Sequence[str] = PANEL_FIELDS
+    ) -> "SharedOHLCVPanel":
+        """Publish a ``download_bars``-style frame.
+
+        Accepts (field, symbol) column tuples, or plain symbol columns holding
+        closes.
+        """
+        if isinstance(wide.columns, pd.MultiIndex):
+            present = [f for f in fields if f in wide.columns.get_level_values(0)]
+            symbols = list(dict.fromkeys(wide.columns.get_level_values(1)))
+            frames = {
+                sym: pd.DataFrame({f: wide[(f, sym)] for f in present if (f, sym) in wide.columns})
+                for sym in symbols
+            }
+            return cls.publish(frames, fields=present)
+        frames = {sym: pd.DataFrame({"Close": wide[sym]}) for sym in wide.columns}
+        return cls.publish(frames, fields=("Close",))
+
+    @classmethod
+    def attach(cls, spec: PanelSpec) -> "SharedOHLCVPanel":
+        """Map a published panel read-only; cached per process."""
+        panel = _ATTACHED.get(spec.name)
+        if panel is None:
+            panel = _ATTACHED[spec.name] = cls(spec, _open_block(spec.name), owner=False)
+        return panel
+
+    def __reduce__(self):
+        return (SharedOHLCVPanel.attach, (self.spec,))
+
+    def close(self) -> None:
+        """Drop this process's mapping (views into it become invalid)."""
+        if _ATTACHED.get(self.spec.name) is self:
+            del _ATTACHED[self.spec.name]
+        self._ts = self.values = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Close and free the block; only the publishing process should call this."""
+        self.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedOHLCVPanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+    # -- views --------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return self.spec.symbols
+
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._ts.view("datetime64[ns]"), tz="UTC")
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.index
+
+    def __len__(self) -> int:
+        return len(self.spec.symbols)
+
+    def column(self, field: str, symbol: str) -> np.ndarray:
+        """One field of one symbol over all bars (a view; NaN where missing)."""
+        return self.values[self._field_index[field], self.index[symbol]]
+
+    def frame(self, symbol: str, fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """``symbol``'s bars as a DataFrame, trimmed to the bars it has."""
+        fields = tuple(fields or self.spec.fields)
+        close_field = "Close" if "Close" in self._field_index else fields[0]
+        has = ~np.isnan(self.column(close_field, symbol))
+        data = {f: self.column(f, symbol)[has] for f in fields}
+        return pd.DataFrame(data, index=self.timestamps[has])
+
+    def wide(self, field: str = "Close") -> pd.DataFrame:
+        """One field for every symbol (bars x symbols), sharing the block's memory."""
+        block = self.values[self._field_index[field]]
+        return pd.DataFrame(
+            block.T, index=self.timestamps, columns=list(self.spec.symbols), copy=False
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """All fields with (field, symbol) column tuples, as ``download_bars`` returns."""
+        f, s, n = self.values.shape
+        columns = pd.MultiIndex.from_product(
+            [self.spec.fields, self.spec.symbols], names=[None, "symbol"]
+        )
+        return pd.DataFrame(
+            self.values.reshape(f * s, n).T, index=self.timestamps, columns=columns, copy=False
+        )
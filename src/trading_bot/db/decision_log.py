@@ -0,0 +1,262 @@
+"""Compact, deduplicated strategy-decision log.
+
+`SqliteRepository.log_strategy_decision` writes a full row per symbol per
+bar, with the votes, weights and explanations as JSON text. The same keys
+and weights repeat in every row, and a decision that did not change is
+written again. `DecisionLog` records the same information with far fewer
+bytes:
+
+- Weights are written once per step (`DecisionStep`). A decision stores its
+  own weights only when they differ from its step's.
+- Votes and explanations are encoded by `PayloadCodec`. The nested dicts are
+  flattened into typed fields: the field paths and types form a schema,
+  registered once in `DecisionSchema` under a hash of its layout, and the
+  values are packed with `struct`. Numbers take 8 bytes each, with no key
+  names.
+- A symbol's decision extends its open `DecisionRun` while its mode, signal
+  and votes are unchanged. A change of any of them closes the run and opens a
+  new one. Each run is written when it opens and again when it closes, keyed
+  by ``(symbol, first_ts)``.
+- Indicator values in the explanations (and the confidence and weights) move
+  on almost every bar, so they are stored only on sampled bars: once a run is
+  ``sample_every`` bars old (per symbol via ``sampling``, default
+  `DEFAULT_SAMPLE_EVERY`), a decision whose stored values changed opens a new
+  run carrying them. ``sample_every=1`` stores every change.
+
+`SqliteRepository.decision_history` rebuilds the per-bar view (one
+decision per symbol per logged step) from steps and runs. Between samples
+it returns the values stored at the run's first bar.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from numbers import Integral, Real
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from trading_bot.strategy.base import StrategyDecision
+
+DEFAULT_SAMPLE_EVERY = 10  # bars between stored explanation values per symbol
+
+# field type code -> struct format of its fixed part ("" = no fixed bytes)
+_FIXED = {"d": "d", "q": "q", "?": "?", "n": "", "s": "I", "j": "I"}
+
+Field = Tuple[Tuple[str, ...], str]  # (path, type code)
+
+
+def _type_code(value: Any) -> str:
+    if value is None:
+        return "n"
+    if isinstance(value, bool):
+        return "?"
+    if isinstance(value, Integral) and -(2**63) <= int(value) < 2**63:
+        return "q"
+    if isinstance(value, Real):
+        return "d"
+    if isinstance(value, str):
+        return "s"
+    return "j"
+
+
+def _flatten(
+    obj: Mapping[str, Any], prefix: Tuple[str, ...], out: List[Tuple[Tuple[str, ...], Any]]
+) -> None:
+    for key in sorted(obj, key=str):
+        value = obj[key]
+        path = prefix + (str(key),)
+        if isinstance(value, Mapping) and value:
+            _flatten(value, path, out)
+        else:
+            out.append((path, value))
+
+
+def schema_id(fields: Tuple[Field, ...]) -> int:
+    """Stable 56-bit id of a schema, so every process assigns the same one."""
+    digest = hashlib.sha1(fields_json(fields).encode()).digest()
+    return int.from_bytes(digest[:7], "big")
+
+
+def fields_json(fields: Tuple[Field, ...]) -> str:
+    return json.dumps([[list(path), code] for path, code in fields], separators=(",", ":"))
+
+
+def parse_fields(text: str) -> Tuple[Field, ...]:
+    return tuple((tuple(path), code) for path, code in json.loads(text))
+
+
+class PayloadCodec:
+    """Encodes nested decision dicts against a registry of schemas."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[Tuple[Field, ...], int] = {}
+        self._fields: Dict[int, Tuple[Field, ...]] = {}
+        self._structs: Dict[int, struct.Struct] = {}
+
+    def register(self, sid: int, fields: Tuple[Field, ...]) -> None:
+        self._ids[fields] = sid
+        self._fields[sid] = fields
+        self._structs[sid] = struct.Struct("<" + "".join(_FIXED[code] for _, code in fields))
+
+    def fields(self, sid: int) -> Tuple[Field, ...]:
+        return self._fields[sid]
+
+    def encode(self, payload: Mapping[str, Any]) -> Tuple[int, bytes, bool]:
+        """``(schema id, packed bytes, schema is new to this codec)``."""
+        flat: List[Tuple[Tuple[str, ...], Any]] = []
+        _flatten(payload, (), flat)
+        fields = tuple((path, _type_code(value)) for path, value in flat)
+        sid = self._ids.get(fields)
+        new = sid is None
+        if new:
+            sid = schema_id(fields)
+            self.register(sid, fields)
+
+        fixed: List[Any] = []
+        tail: List[bytes] = []
+        for (_, code), (_, value) in zip(fields, flat):
+            if code in ("s", "j"):
+                if code == "j":
+                    value = json.dumps(value, sort_keys=True, default=str)
+                raw = value.encode()
+                fixed.append(len(raw))
+                tail.append(raw)
+            elif code != "n":
+                fixed.append(value)
+        return sid, self._structs[sid].pack(*fixed) + b"".join(tail), new
+
+    def decode(self, sid: int, data: bytes) -> Dict[str, Any]:
+        fields = self._fields[sid]
+        st = self._structs[sid]
+        fixed = iter(st.unpack_from(data))
+        offset = st.size
+        out: Dict[str, Any] = {}
+        for path, code in fields:
+            if code == "n":
+                value = None
+            elif code in ("s", "j"):
+                n = next(fixed)
+                raw = data[offset : offset + n].decode()
+                offset += n
+                value = raw if code == "s" else json.loads(raw)
+            else:
+                value = next(fixed)
+            node = out
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = value
+        return out
+
+
+@dataclass
+class _Run:
+    first_ts: datetime
+    last_ts: datetime
+    sampled_bar: int  # the symbol's bar count when its values were last compared
+    exact: tuple  # everything stored for the run
+    coarse: tuple  # what every bar of the run has to match
+    values: Dict[str, Any]  # DecisionRun column values
+
+
+class DecisionLog:
+    """Per-step decision recorder writing `DecisionStep`/`DecisionRun` rows through ``repo``.
+
+    Call `begin_step` once per engine step, `record` once per symbol decided
+    on, then `end_step`.
+    """
+
+    def __init__(
+        self,
+        repo,
+        *,
+        sample_every: int = DEFAULT_SAMPLE_EVERY,
+        sampling: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.repo = repo
+        self.sample_every = max(1, int(sample_every))
+        self.sampling = {sym: max(1, int(k)) for sym, k in (sampling or {}).items()}
+        self.codec = PayloadCodec()
+        self._runs: Dict[str, _Run] = {}
+        self._bars: Dict[str, int] = {}
+        self._seen: Set[str] = set()
+        self._ts: Optional[datetime] = None
+        self._weights: Optional[Dict[str, float]] = None
+        # Runs a previous process left open end at its last logged step
+        repo.close_open_decision_runs()
+
+    def begin_step(self, ts: datetime) -> None:
+        self._ts = ts
+        self._weights = None
+        self._seen.clear()
+
+    def record(self, symbol: str, mode: str, decision: StrategyDecision) -> None:
+        ts = self._ts
+        if ts is None:
+            raise RuntimeError("DecisionLog.record called outside begin_step/end_step")
+        weights = {k: float(v) for k, v in decision.weights.items()}
+        if self._weights is None:
+            self._weights = weights
+        override = None if weights == self._weights else json.dumps(weights, sort_keys=True)
+
+        bar = self._bars.get(symbol, 0)
+        self._bars[symbol] = bar + 1
+        self._seen.add(symbol)
+        signal = int(decision.signal)
+        coarse = (mode, signal, json.dumps(decision.votes, sort_keys=True))
+
+        run = self._runs.get(symbol)
+        if (
+            run is not None
+            and run.coarse == coarse
+            and bar - run.sampled_bar < self.sampling.get(symbol, self.sample_every)
+        ):
+            run.last_ts = ts
+            return
+
+        payload_dict = {"votes": decision.votes, "explanations": decision.explanations}
+        sid, payload, new = self.codec.encode(payload_dict)
+        if new:
+            fields = fields_json(self.codec.fields(sid))
+            self.repo.log_decision_schema(schema_id=sid, fields_json=fields)
+        confidence = float(decision.confidence)
+        exact = (mode, signal, confidence, override, sid, payload)
+        if run is not None and run.exact == exact:
+            run.last_ts = ts
+            run.sampled_bar = bar
+            return
+        if run is not None:
+            self._close(symbol, run)
+        values = dict(
+            symbol=symbol,
+            first_ts=ts,
+            last_ts=None,
+            mode=str(mode),
+            signal=signal,
+            confidence=confidence,
+            schema_id=sid,
+            payload=payload,
+            weights_json=override,
+        )
+        self._runs[symbol] = _Run(ts, ts, bar, exact, coarse, values)
+        self.repo.log_decision_run(**values)
+
+    def end_step(self) -> None:
+        if self._ts is None:
+            return
+        if self._seen:
+            self.repo.log_decision_step(ts=self._ts, weights=self._weights or {})
+        # A symbol not decided on this step (e.g. it exited) ends its run
+        for symbol in [s for s in self._runs if s not in self._seen]:
+            self._close(symbol, self._runs.pop(symbol))
+        self._ts = None
+
+    def close(self) -> None:
+        """Close every open run at its last step (engine shutdown)."""
+        for symbol in list(self._runs):
+            self._close(symbol, self._runs.pop(symbol))
+
+    def _close(self, symbol: str, run: _Run) -> None:
+        self.repo.log_decision_run(**{**run.values, "last_ts": run.last_ts})
@@ -2,18 +2,51 @@
 
 Prunes old events and keeps rolling summaries to prevent database bloat
 while preserving learning state.
+
+Retention (`prune_old_events`) used to run one unbounded ``DELETE`` per
+table in a single transaction. On a large database that held SQLite's writer
+lock long enough to stall the trading loop. It now works in batches:
+
+- Each table is walked in primary-key (insertion) order, ``batch_size`` rows
+  at a time. A batch is read without taking the write lock, then rolled up
+  and deleted in one short transaction. The job sleeps ``pause`` seconds
+  between batches so the trading loop's writes get the lock.
+- With ``archive_dir`` set (opt-in; it needs pyarrow), the batch is first
+  written to zstd-compressed Parquet, partitioned by table and event date
+  (``<archive_dir>/<table>/date=YYYY-MM-DD/<first_id>-<last_id>.parquet``).
+  Nothing is deleted unless the archive was written, so asking for an
+  archive without pyarrow installed fails before anything is pruned. File names are derived
+  from the ids, so a retried batch overwrites its file rather than
+  duplicating it.
+- With ``hourly_rollup``, strategy decisions and portfolio snapshots are
+  folded into `DecisionRollup` and `EquityRollup` before deletion. Batches
+  of the same hour are merged additively.
+- The compact decision log has no ``id`` column, so its tables are walked
+  in timestamp order and deleted by primary key. A run is pruned once it
+  ended (``last_ts``) before the cutoff; open runs are kept. A schema is
+  pruned once no run references it.
 """
 
 from __future__ import annotations
 
 import gc
+import importlib.util
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import and_, delete, func, inspect, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from trading_bot.db.models import (
+    DecisionRollup,
+    DecisionRun,
+    DecisionSchema,
+    DecisionStep,
+    EquityRollup,
     LearningStateEvent,
     OrderEvent,
     PortfolioSnapshot,
@@ -22,11 +55,262 @@ from trading_bot.db.models import (
     StrategyDecisionEvent,
 )
 
+DEFAULT_BATCH_SIZE = 5_000
+DEFAULT_PAUSE = 0.05  # seconds between batches
+
+
+def _require_parquet() -> None:
+    if importlib.util.find_spec("pyarrow") is None:
+        raise RuntimeError(
+            "Archiving old events needs pyarrow. "
+            "Install with: python -m pip install -e '.[analytics]'"
+        )
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    """Event timestamps are stored as naive UTC."""
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _archive(
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Any],
+    archive_dir: Path,
+    *,
+    ts_column: str = "ts",
+) -> int:
+    """Write one batch as Parquet, one file per event date; returns the file count."""
+    import pandas as pd
+
+    df = pd.DataFrame.from_records([tuple(r) for r in rows], columns=list(columns))
+    files = 0
+    for day, part in df.groupby(df[ts_column].map(lambda ts: ts.date().isoformat()), sort=True):
+        out = archive_dir / table / f"date={day}"
+        out.mkdir(parents=True, exist_ok=True)
+        if "id" in part:
+            name = f"{int(part['id'].iloc[0]):012d}-{int(part['id'].iloc[-1]):012d}.parquet"
+        else:  # keyed tables: a retried batch selects the same rows, so the same name
+            first, last = part[ts_column].iloc[0], part[ts_column].iloc[-1]
+            name = f"{first:%H%M%S%f}-{last:%H%M%S%f}-{len(part)}.parquet"
+        tmp = out / f".{name}.tmp"
+        part.to_parquet(tmp, compression="zstd", index=False)
+        tmp.replace(out / name)
+        files += 1
+    return files
+
+
+def _rollup_decisions(session: Session, rows: Sequence[Any]) -> int:
+    acc: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0, 0, 0.0])
+    for r in rows:
+        a = acc[(_hour(r.ts), r.symbol, r.mode)]
+        a[0] += 1
+        a[1] += r.signal > 0
+        a[2] += r.signal < 0
+        a[3] += float(r.confidence)
+    if not acc:
+        return 0
+    stmt = sqlite_insert(DecisionRollup)
+    ex = stmt.excluded
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["hour", "symbol", "mode"],
+            set_={
+                "decisions": DecisionRollup.decisions + ex.decisions,
+                "long_signals": DecisionRollup.long_signals + ex.long_signals,
+                "short_signals": DecisionRollup.short_signals + ex.short_signals,
+                "confidence_sum": DecisionRollup.confidence_sum + ex.confidence_sum,
+            },
+        ),
+        [
+            {
+                "hour": hour,
+                "symbol": symbol,
+                "mode": mode,
+                "decisions": n,
+                "long_signals": longs,
+                "short_signals": shorts,
+                "confidence_sum": conf,
+            }
+            for (hour, symbol, mode), (n, longs, shorts, conf) in acc.items()
+        ],
+    )
+    return len(acc)
+
+
+def _rollup_equity(session: Session, rows: Sequence[Any]) -> int:
+    acc: Dict[datetime, dict] = {}
+    for r in rows:  # id order: the first row of an hour opens it, the last closes it
+        eq = float(r.equity)
+        a = acc.get(_hour(r.ts))
+        if a is None:
+            acc[_hour(r.ts)] = {
+                "hour": _hour(r.ts),
+                "snapshots": 1,
+                "open_equity": eq,
+                "high_equity": eq,
+                "low_equity": eq,
+                "close_equity": eq,
+                "close_cash": float(r.cash),
+            }
+            continue
+        a["snapshots"] += 1
+        a["high_equity"] = max(a["high_equity"], eq)
+        a["low_equity"] = min(a["low_equity"], eq)
+        a["close_equity"] = eq
+        a["close_cash"] = float(r.cash)
+    if not acc:
+        return 0
+    stmt = sqlite_insert(EquityRollup)
+    ex = stmt.excluded
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["hour"],
+            set_={
+                "snapshots": EquityRollup.snapshots + ex.snapshots,
+                "high_equity": func.max(EquityRollup.high_equity, ex.high_equity),
+                "low_equity": func.min(EquityRollup.low_equity, ex.low_equity),
+                "close_equity": ex.close_equity,
+                "close_cash": ex.close_cash,
+            },
+        ),
+        list(acc.values()),
+    )
+    return len(acc)
+
+
+def _prune_table(
+    session: Session,
+    model,
+    cutoff: datetime,
+    stats: dict,
+    *,
+    rollup: Optional[Callable[[Session, Sequence[Any]], int]],
+    archive_dir: Optional[Path],
+    batch_size: int,
+    pause: float,
+) -> int:
+    """Archive, roll up and delete ``model`` rows older than ``cutoff``, batch by batch."""
+    table = model.__table__
+    columns = [c.name for c in table.columns]
+    deleted = 0
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(*table.columns)
+            .where(and_(table.c.id > last_id, table.c.ts < cutoff))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        session.commit()  # end the read transaction before the (slow) archive write
+        if not rows:
+            return deleted
+        first_id, last_id = rows[0].id, rows[-1].id
+
+        if archive_dir is not None:
+            stats["archived_files"] += _archive(table.name, columns, rows, archive_dir)
+
+        t0 = time.perf_counter()
+        if rollup is not None:
+            stats["rollup_rows"] += rollup(session, rows)
+        result = session.execute(
+            delete(model).where(and_(model.id >= first_id, model.id <= last_id, model.ts < cutoff))
+        )
+        session.commit()
+        txn_ms = (time.perf_counter() - t0) * 1000.0
+
+        deleted += result.rowcount or 0
+        stats["batches"] += 1
+        stats["max_txn_ms"] = max(stats["max_txn_ms"], txn_ms)
+        if len(rows) < batch_size:
+            return deleted
+        if pause > 0:
+            time.sleep(pause)
+
+
+def _prune_keyed(
+    session: Session,
+    model,
+    ts_column: str,
+    cutoff: datetime,
+    stats: dict,
+    *,
+    archive_dir: Optional[Path],
+    batch_size: int,
+    pause: float,
+) -> int:
+    """Archive and delete ``model`` rows with ``ts_column`` before ``cutoff``, by primary key."""
+    table = model.__table__
+    columns = [c.name for c in table.columns]
+    key = list(table.primary_key.columns)
+    ts = table.c[ts_column]
+    deleted = 0
+    while True:
+        # Deleted rows are gone, so every batch starts from the oldest remaining row
+        rows = session.execute(
+            select(*table.columns).where(ts < cutoff).order_by(ts, *key).limit(batch_size)
+        ).all()
+        session.commit()
+        if not rows:
+            return deleted
+
+        if archive_dir is not None:
+            stats["archived_files"] += _archive(
+                table.name, columns, rows, archive_dir, ts_column=ts_column
+            )
+
+        t0 = time.perf_counter()
+        keys = [tuple(getattr(r, c.name) for c in key) for r in rows]
+        result = session.execute(delete(table).where(tuple_(*key).in_(keys)))
+        session.commit()
+        txn_ms = (time.perf_counter() - t0) * 1000.0
+
+        deleted += result.rowcount or 0
+        stats["batches"] += 1
+        stats["max_txn_ms"] = max(stats["max_txn_ms"], txn_ms)
+        if len(rows) < batch_size:
+            return deleted
+        if pause > 0:
+            time.sleep(pause)
+
+
+def _prune_schemas(session: Session, archive_dir: Optional[Path]) -> int:
+    """Delete decision schemas no run references (archived with the runs that used them)."""
+    unused = DecisionSchema.id.not_in(select(DecisionRun.schema_id).distinct())
+    stmt = select(DecisionSchema.id, DecisionSchema.fields_json).where(unused)
+    rows = session.execute(stmt.order_by(DecisionSchema.id)).all()
+    if not rows:
+        return 0
+    if archive_dir is not None:
+        import pandas as pd
+
+        out = archive_dir / DecisionSchema.__tablename__
+        out.mkdir(parents=True, exist_ok=True)
+        name = f"{rows[0].id}-{rows[-1].id}-{len(rows)}.parquet"
+        tmp = out / f".{name}.tmp"
+        df = pd.DataFrame.from_records([tuple(r) for r in rows], columns=["id", "fields_json"])
+        df.to_parquet(tmp, compression="zstd", index=False)
+        tmp.replace(out / name)
+    result = session.execute(
+        delete(DecisionSchema).where(DecisionSchema.id.in_([r.id for r in rows]))
+    )
+    session.commit()
+    return result.rowcount or 0
+
 
 def prune_old_events(
     session: Session,
     days_to_keep: int = 7,
     hourly_rollup: bool = True,
+    *,
+    archive_dir: str | Path | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = DEFAULT_PAUSE,
+    now: Optional[datetime] = None,
 ) -> dict:
     """Prune events older than days_to_keep, optionally keeping hourly summaries.
     
@@ -34,47 +318,77 @@ def prune_old_events(
         session: SQLAlchemy session
         days_to_keep: Keep detailed events for this many days, older = deleted
         hourly_rollup: If True, keep rolling hourly stats before deletion
+        archive_dir: Write pruned rows to Parquet under this directory first
+        batch_size: Rows deleted per transaction
+        pause: Seconds to sleep between batches (lets other writers in)
+        now: Reference time for the cutoffs (default: current UTC time)
         
     Returns:
         Summary of what was deleted
     """
-    now = datetime.now(tz=timezone.utc)
+    now = now or datetime.now(tz=timezone.utc)
     cutoff = now - timedelta(days=days_to_keep)
-    
+    # Keep regime history longer (it's sparse and valuable for learning)
+    regime_cutoff = now - timedelta(days=max(30, days_to_keep * 2))
+
+    archive = Path(archive_dir) if archive_dir is not None else None
+    if archive is not None:
+        _require_parquet()
+    if hourly_rollup:
+        bind = session.get_bind()
+        DecisionRollup.__table__.create(bind, checkfirst=True)
+        EquityRollup.__table__.create(bind, checkfirst=True)
+
     stats = {
         "strategy_decisions_deleted": 0,
         "portfolio_snapshots_deleted": 0,
         "position_snapshots_deleted": 0,
         "regime_history_deleted": 0,
+        "decision_runs_deleted": 0,
+        "decision_steps_deleted": 0,
+        "decision_schemas_deleted": 0,
+        "archived_files": 0,
+        "rollup_rows": 0,
+        "batches": 0,
+        "max_txn_ms": 0.0,
         "cutoff_time": cutoff.isoformat(),
     }
-    
-    # Delete old strategy decision events (very granular, can be pruned aggressively)
-    result = session.execute(
-        delete(StrategyDecisionEvent).where(StrategyDecisionEvent.ts < cutoff)
-    )
-    stats["strategy_decisions_deleted"] = result.rowcount or 0
-    
-    # Delete old portfolio snapshots (keep for 7 days by default)
-    result = session.execute(
-        delete(PortfolioSnapshot).where(PortfolioSnapshot.ts < cutoff)
-    )
-    stats["portfolio_snapshots_deleted"] = result.rowcount or 0
-    
-    # Delete old position snapshots
-    result = session.execute(
-        delete(PositionSnapshot).where(PositionSnapshot.ts < cutoff)
+    plan = (
+        ("strategy_decisions_deleted", StrategyDecisionEvent, cutoff, _rollup_decisions),
+        ("portfolio_snapshots_deleted", PortfolioSnapshot, cutoff, _rollup_equity),
+        ("position_snapshots_deleted", PositionSnapshot, cutoff, None),
+        ("regime_history_deleted", RegimeHistoryEvent, regime_cutoff, None),
     )
-    stats["position_snapshots_deleted"] = result.rowcount or 0
-    
-    # Keep regime history longer (it's sparse and valuable for learning)
-    regime_cutoff = now - timedelta(days=max(30, days_to_keep * 2))
-    result = session.execute(
-        delete(RegimeHistoryEvent).where(RegimeHistoryEvent.ts < regime_cutoff)
-    )
-    stats["regime_history_deleted"] = result.rowcount or 0
-    
-    session.commit()
+    for key, model, table_cutoff, rollup in plan:
+        stats[key] = _prune_table(
+            session,
+            model,
+            _naive_utc(table_cutoff),
+            stats,
+            rollup=rollup if hourly_rollup else None,
+            archive_dir=archive,
+            batch_size=max(1, int(batch_size)),
+            pause=float(pause),
+        )
+
+    # Compact decision log (skipped on databases created before it existed)
+    if inspect(session.get_bind()).has_table(DecisionRun.__tablename__):
+        keyed_plan = (
+            ("decision_runs_deleted", DecisionRun, "last_ts"),
+            ("decision_steps_deleted", DecisionStep, "ts"),
+        )
+        for key, model, ts_column in keyed_plan:
+            stats[key] = _prune_keyed(
+                session,
+                model,
+                ts_column,
+                _naive_utc(cutoff),
+                stats,
+                archive_dir=archive,
+                batch_size=max(1, int(batch_size)),
+                pause=float(pause),
+            )
+        stats["decision_schemas_deleted"] = _prune_schemas(session, archive)
     
     # Force garbage collection after database cleanup to reclaim memory
     gc.collect()
@@ -129,6 +443,10 @@ def cleanup_database(
     session: Session,
     days_to_keep: int = 7,
     dry_run: bool = False,
+    *,
+    archive_dir: str | Path | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = DEFAULT_PAUSE,
 ) -> dict:
     """Clean up database and return stats.
     
@@ -136,6 +454,9 @@ def cleanup_database(
         session: SQLAlchemy session
         days_to_keep: Delete events older than this
         dry_run: If True, just report what would be deleted
+        archive_dir: Archive pruned rows as Parquet here before deleting
+        batch_size: Rows deleted per transaction
+        pause: Seconds between batches
         
     Returns:
         Statistics about what was deleted
@@ -164,4 +485,10 @@ def cleanup_database(
             "cutoff_time": cutoff.isoformat(),
         }
     
-    return prune_old_events(session, days_to_keep=days_to_keep)
+    return prune_old_events(
+        session,
+        days_to_keep=days_to_keep,
+        archive_dir=archive_dir,
+        batch_size=batch_size,
+        pause=pause,
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -127,3 +127,112 @@ class PerformanceMetricsEvent(Base):
     trade_count: Mapped[int] = mapped_column(Integer, nullable=False)
     winning_trades: Mapped[int] = mapped_column(Integer, nullable=False)
     losing_trades: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+# --- Read model -----------------------------------------------------------
+# Maintained by the repository on every snapshot so readers (the dashboard)
+# never scan the event tables. Rows are overwritten in place, so both tables
+# stay the same size however old the database is.
+
+
+class HoldingState(Base):
+    """Latest position per symbol, rewritten with each portfolio snapshot."""
+
+    __tablename__ = "holdings_latest"
+
+    symbol: Mapped[str] = mapped_column(String(32), primary_key=True)
+    ts: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    qty: Mapped[int] = mapped_column(Integer, nullable=False)
+    avg_price: Mapped[float] = mapped_column(Float, nullable=False)
+    last_price: Mapped[float] = mapped_column(Float, nullable=False)
+    unrealized_pnl: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class EquityPoint(Base):
+    """One slot of the equity-history ring (``slot = seq % EQUITY_RING_SIZE``)."""
+
+    __tablename__ = "equity_ring"
+
+    slot: Mapped[int] = mapped_column(Integer, primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
+    ts: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    cash: Mapped[float] = mapped_column(Float, nullable=False)
+    equity: Mapped[float] = mapped_column(Float, nullable=False)
+    unrealized_pnl: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+# --- Hourly rollups -------------------------------------------------------
+# Written by the retention job (db/maintenance.py) from the raw events it
+# prunes, so hourly history outlives the detail rows.
+
+
+class DecisionRollup(Base):
+    """Strategy decisions per hour, symbol and mode."""
+
+    __tablename__ = "strategy_decisions_hourly"
+
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    symbol: Mapped[str] = mapped_column(String(32), primary_key=True)
+    mode: Mapped[str] = mapped_column(String(32), primary_key=True)
+    decisions: Mapped[int] = mapped_column(Integer, nullable=False)
+    long_signals: Mapped[int] = mapped_column(Integer, nullable=False)
+    short_signals: Mapped[int] = mapped_column(Integer, nullable=False)
+    confidence_sum: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class EquityRollup(Base):
+    """Portfolio equity per hour (open/high/low/close of the snapshots)."""
+
+    __tablename__ = "equity_hourly"
+
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    snapshots: Mapped[int] = mapped_column(Integer, nullable=False)
+    open_equity: Mapped[float] = mapped_column(Float, nullable=False)
+    high_equity: Mapped[float] = mapped_column(Float, nullable=False)
+    low_equity: Mapped[float] = mapped_column(Float, nullable=False)
+    close_equity: Mapped[float] = mapped_column(Float, nullable=False)
+    close_cash: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+# --- Compact decision log -------------------------------------------------
+# Alternative to one StrategyDecisionEvent per symbol per bar (see
+# db/decision_log.py). Runs of unchanged decisions are one row; weights are
+# stored once per step.
+
+
+class DecisionSchema(Base):
+    """Field layout of encoded decision payloads; ``id`` is a hash of ``fields_json``."""
+
+    __tablename__ = "decision_schemas"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    fields_json: Mapped[str] = mapped_column(String(16384), nullable=False)
+
+
+class DecisionStep(Base):
+    """One engine step that logged decisions, with the ensemble weights it used."""
+
+    __tablename__ = "decision_steps"
+
+    ts: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    weights_json: Mapped[str] = mapped_column(String(4096), nullable=False, default="{}")
+
+
+class DecisionRun(Base):
+    """A symbol's decision, unchanged from step ``first_ts`` to ``last_ts``.
+
+    ``last_ts`` is NULL while the run is still open. ``weights_json`` is set
+    only when the decision's weights differ from its step's.
+    """
+
+    __tablename__ = "decision_runs"
+
+    symbol: Mapped[str] = mapped_column(String(32), primary_key=True)
+    first_ts: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    last_ts: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+    mode: Mapped[str] = mapped_column(String(32), nullable=False)
+    signal: Mapped[int] = mapped_column(Integer, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    schema_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    weights_json: Mapped[Optional[str]] = mapped_column(String(4096), nullable=True)
@@ -2,20 +2,28 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
+from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from sqlalchemy import create_engine, select, text
+from sqlalchemy import Engine, Insert, and_, create_engine, func, literal, select, text, update
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from trading_bot.core.models import Fill, Order, Portfolio
+from trading_bot.db.decision_log import PayloadCodec, parse_fields
 from trading_bot.db.models import (
     Base,
     AdaptiveDecisionEvent,
+    DecisionRun,
+    DecisionSchema,
+    DecisionStep,
+    EquityPoint,
     FillEvent,
+    HoldingState,
     LearningStateEvent,
     OrderEvent,
     PortfolioSnapshot,
@@ -41,8 +49,41 @@ RECOMMENDED_INDEXES = [
 
 # BUG FIX #3: Global singleton engine to prevent SQLite deadlock (database locked 10-30s pauses)
 # Each call to create_engine() creates a new connection pool, causing contention and timeouts.
-# Singleton pattern with one persistent connection resolves this.
-_ENGINE_SINGLETON = None
+# One persistent engine per database file resolves this.
+_ENGINES: Dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+# (mapped class, column values) for one row to insert
+Row = Tuple[type, Dict[str, Any]]
+
+# Read-model tables (see db/models.py): rows are keyed, so writes replace them
+READ_MODELS = (HoldingState, EquityPoint)
+# Compact decision-log rows are keyed too: a run is rewritten when it closes
+KEYED_MODELS = READ_MODELS + (DecisionSchema, DecisionStep, DecisionRun)
+EQUITY_RING_SIZE = 1_000  # equity points kept for the dashboard
+
+# Next equity-ring sequence number per database file, seeded from the table
+_EQUITY_SEQ: Dict[str, int] = {}
+_EQUITY_SEQ_LOCK = threading.Lock()
+
+
+def insert_statement(model: type) -> Insert:
+    """INSERT for ``model``.
+
+    Keyed rows (read model, decision log) overwrite the row they replace.
+    """
+    stmt = model.__table__.insert()
+    if model in KEYED_MODELS:
+        stmt = stmt.prefix_with("OR REPLACE")
+    return stmt
+
+
+def group_rows(rows: list[Row]) -> Dict[type, list[Dict[str, Any]]]:
+    """Column values per table, in first-seen table order (one executemany each)."""
+    by_table: Dict[type, list[Dict[str, Any]]] = defaultdict(list)
+    for model, values in rows:
+        by_table[model].append(values)
+    return by_table
 
 
 @dataclass(frozen=True)
@@ -57,17 +98,22 @@ class SqliteRepository:
         - 10-30 second pauses on database writes
         - "database is locked" errors
         
-        Fix: Create engine once, reuse across all repository operations.
+        Fix: Create engine once per database file, reuse across all repository operations.
         """
-        global _ENGINE_SINGLETON
-        if _ENGINE_SINGLETON is None:
-            _ENGINE_SINGLETON = create_engine(
-                f"sqlite:///{self.db_path}",
-                poolclass=StaticPool,  # BUG FIX #3: StaticPool ensures single connection per thread
-                connect_args={"timeout": 30.0, "check_same_thread": False},  # BUG FIX #3: Extended timeout
-                echo=False,
-            )
-        return _ENGINE_SINGLETON
+        key = str(Path(self.db_path).resolve())
+        with _ENGINES_LOCK:
+            engine = _ENGINES.get(key)
+            if engine is None:
+                engine = create_engine(
+                    f"sqlite:///{self.db_path}",
+                    # BUG FIX #3: StaticPool ensures single connection per thread
+                    poolclass=StaticPool,
+                    # BUG FIX #3: Extended timeout
+                    connect_args={"timeout": 30.0, "check_same_thread": False},
+                    echo=False,
+                )
+                _ENGINES[key] = engine
+        return engine
 
     def init_db(self) -> None:
         engine = self._engine()
@@ -83,95 +129,210 @@ class SqliteRepository:
                     logger.debug(f"Index already exists: {e}")
             session.commit()
 
-    def log_order_filled(self, order: Order) -> None:
+        self.rebuild_read_model()
+
+    def _write(self, rows: list[Row]) -> None:
+        """Insert ``rows`` in one transaction and commit."""
         engine = self._engine()
         Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            session.add(
-                OrderEvent(
-                    id=order.id,
-                    ts=order.ts,
-                    symbol=order.symbol,
-                    side=order.side,
-                    qty=order.qty,
-                    type=order.type,
-                    limit_price=order.limit_price,
-                    tag=order.tag,
-                    status="FILLED",
-                    reject_reason="",
+        with engine.begin() as conn:
+            for model, values in group_rows(rows).items():
+                conn.execute(insert_statement(model), values)
+
+    # --- read model ---------------------------------------------------------
+
+    def _seed_equity_seq(self) -> str:
+        """Load this file's equity-ring counter from the table once; returns its key."""
+        key = str(Path(self.db_path).resolve())
+        with _EQUITY_SEQ_LOCK:
+            if key not in _EQUITY_SEQ:
+                engine = self._engine()
+                Base.metadata.create_all(engine)
+                with Session(engine) as session:
+                    last = session.scalar(select(func.max(EquityPoint.seq)))
+                _EQUITY_SEQ[key] = 0 if last is None else int(last) + 1
+        return key
+
+    def _next_equity_seq(self) -> int:
+        key = self._seed_equity_seq()
+        with _EQUITY_SEQ_LOCK:
+            seq = _EQUITY_SEQ[key]
+            _EQUITY_SEQ[key] = seq + 1
+        return seq
+
+    @staticmethod
+    def _equity_row(
+        seq: int, *, ts: datetime, cash: float, equity: float, unrealized_pnl: float
+    ) -> Row:
+        return (
+            EquityPoint,
+            dict(
+                slot=seq % EQUITY_RING_SIZE,
+                seq=seq,
+                ts=ts,
+                cash=float(cash),
+                equity=float(equity),
+                unrealized_pnl=float(unrealized_pnl),
+            ),
+        )
+
+    def rebuild_read_model(self) -> None:
+        """Fill an empty read model from the newest snapshots (one-off, on upgrade)."""
+        with Session(self._engine()) as session:
+            if session.scalar(select(EquityPoint.slot).limit(1)) is not None:
+                return
+            stmt = (
+                select(PortfolioSnapshot)
+                .order_by(PortfolioSnapshot.ts.desc())
+                .limit(EQUITY_RING_SIZE)
+            )
+            snapshots = list(session.scalars(stmt).all())[::-1]
+            if not snapshots:
+                return
+            latest_ts = snapshots[-1].ts
+            positions = session.scalars(
+                select(PositionSnapshot).where(PositionSnapshot.ts == latest_ts)
+            ).all()
+            rows: list[Row] = [
+                self._equity_row(
+                    self._next_equity_seq(),
+                    ts=s.ts,
+                    cash=s.cash,
+                    equity=s.equity,
+                    unrealized_pnl=s.unrealized_pnl,
+                )
+                for s in snapshots
+            ]
+            rows.extend(
+                (
+                    HoldingState,
+                    dict(
+                        symbol=p.symbol,
+                        ts=p.ts,
+                        qty=p.qty,
+                        avg_price=p.avg_price,
+                        last_price=p.last_price,
+                        unrealized_pnl=p.unrealized_pnl,
+                    ),
                 )
+                for p in positions
             )
-            session.commit()
+        self._write(rows)
+        logger.info("Rebuilt dashboard read model from %d snapshots", len(snapshots))
 
-    def log_order_rejected(self, order: Order, *, reason: str) -> None:
-        engine = self._engine()
-        Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            session.add(
-                OrderEvent(
-                    id=order.id,
-                    ts=order.ts,
-                    symbol=order.symbol,
-                    side=order.side,
-                    qty=order.qty,
-                    type=order.type,
-                    limit_price=order.limit_price,
-                    tag=order.tag,
-                    status="REJECTED",
-                    reject_reason=reason,
-                )
+    def read_model_version(self) -> int:
+        """Sequence number of the newest equity point (-1 when empty); changes on every snapshot."""
+        with Session(self._engine()) as session:
+            last = session.scalar(select(func.max(EquityPoint.seq)))
+        return -1 if last is None else int(last)
+
+    def equity_history(
+        self, *, limit: int = 100, before: Optional[int] = None
+    ) -> list[EquityPoint]:
+        """Up to ``limit`` newest equity points with ``seq < before``, oldest first."""
+        stmt = select(EquityPoint).order_by(EquityPoint.seq.desc()).limit(max(0, int(limit)))
+        if before is not None:
+            stmt = stmt.where(EquityPoint.seq < int(before))
+        with Session(self._engine()) as session:
+            return list(session.scalars(stmt).all())[::-1]
+
+    def latest_holdings(self) -> list[HoldingState]:
+        """Open positions as of the latest snapshot."""
+        with Session(self._engine()) as session:
+            latest = session.scalar(
+                select(EquityPoint.ts).order_by(EquityPoint.seq.desc()).limit(1)
             )
-            session.commit()
+            if latest is None:
+                return []
+            stmt = (
+                select(HoldingState)
+                .where(HoldingState.ts == latest, HoldingState.qty != 0)
+                .order_by(HoldingState.symbol)
+            )
+            return list(session.scalars(stmt).all())
+
+    @staticmethod
+    def _order_row(order: Order, *, status: str, reason: str = "") -> Row:
+        return (
+            OrderEvent,
+            dict(
+                id=order.id,
+                ts=order.ts,
+                symbol=order.symbol,
+                side=order.side,
+                qty=order.qty,
+                type=order.type,
+                limit_price=order.limit_price,
+                tag=order.tag,
+                status=status,
+                reject_reason=reason,
+            ),
+        )
+
+    def log_order_filled(self, order: Order) -> None:
+        self._write([self._order_row(order, status="FILLED")])
+
+    def log_order_rejected(self, order: Order, *, reason: str) -> None:
+        self._write([self._order_row(order, status="REJECTED", reason=reason)])
 
     def log_fill(self, fill: Fill) -> None:
-        engine = self._engine()
-        Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            session.add(
-                FillEvent(
-                    order_id=str(fill.order_id),
-                    ts=fill.ts,
-                    symbol=fill.symbol,
-                    side=fill.side,
-                    qty=fill.qty,
-                    price=fill.price,
-                    fee=fill.fee,
-                    slippage=fill.slippage,
-                    note=fill.note,
+        self._write(
+            [
+                (
+                    FillEvent,
+                    dict(
+                        order_id=str(fill.order_id),
+                        ts=fill.ts,
+                        symbol=fill.symbol,
+                        side=fill.side,
+                        qty=fill.qty,
+                        price=fill.price,
+                        fee=fill.fee,
+                        slippage=fill.slippage,
+                        note=fill.note,
+                    ),
                 )
-            )
-            session.commit()
+            ]
+        )
 
     def log_snapshot(self, *, ts: datetime, portfolio: Portfolio, prices: dict[str, float]) -> None:
-        engine = self._engine()
-        Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            equity = portfolio.equity(prices)
-            unrl = portfolio.unrealized_pnl(prices)
-            session.add(
-                PortfolioSnapshot(
+        equity = portfolio.equity(prices)
+        unrl = portfolio.unrealized_pnl(prices)
+        rows: list[Row] = [
+            (
+                PortfolioSnapshot,
+                dict(
                     ts=ts,
                     cash=float(portfolio.cash),
                     equity=float(equity),
                     unrealized_pnl=float(unrl),
                     fees_paid=float(portfolio.fees_paid),
-                )
+                ),
+            ),
+            self._equity_row(
+                self._next_equity_seq(),
+                ts=ts,
+                cash=portfolio.cash,
+                equity=equity,
+                unrealized_pnl=unrl,
+            ),
+        ]
+        for sym, pos in portfolio.positions.items():
+            if pos.qty == 0:
+                continue
+            last = float(prices.get(sym, 0.0))
+            values = dict(
+                ts=ts,
+                symbol=sym,
+                qty=int(pos.qty),
+                avg_price=float(pos.avg_price),
+                last_price=last,
+                unrealized_pnl=float(pos.unrealized_pnl(last)),
             )
-            for sym, pos in portfolio.positions.items():
-                if pos.qty == 0:
-                    continue
-                last = float(prices.get(sym, 0.0))
-                session.add(
-                    PositionSnapshot(
-                        ts=ts,
-                        symbol=sym,
-                        qty=int(pos.qty),
-                        avg_price=float(pos.avg_price),
-                        last_price=last,
-                        unrealized_pnl=float(pos.unrealized_pnl(last)),
-                    )
-                )
-            session.commit()
+            rows.append((PositionSnapshot, values))
+            # Closed positions keep an older ts and drop out of latest_holdings
+            rows.append((HoldingState, values))
+        self._write(rows)
 
     def recent_fills(self, *, limit: int = 10) -> list[FillEvent]:
         engine = self._engine()
@@ -203,22 +364,136 @@ class SqliteRepository:
         mode: str,
         decision: StrategyDecision,
     ) -> None:
-        engine = self._engine()
-        Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            session.add(
-                StrategyDecisionEvent(
-                    ts=ts,
-                    symbol=symbol,
-                    mode=str(mode),
-                    signal=int(decision.signal),
-                    confidence=float(decision.confidence),
-                    votes_json=json.dumps(decision.votes, sort_keys=True),
-                    weights_json=json.dumps(decision.weights, sort_keys=True),
-                    explanations_json=json.dumps(decision.explanations, sort_keys=True),
+        self._write(
+            [
+                (
+                    StrategyDecisionEvent,
+                    dict(
+                        ts=ts,
+                        symbol=symbol,
+                        mode=str(mode),
+                        signal=int(decision.signal),
+                        confidence=float(decision.confidence),
+                        votes_json=json.dumps(decision.votes, sort_keys=True),
+                        weights_json=json.dumps(decision.weights, sort_keys=True),
+                        explanations_json=json.dumps(decision.explanations, sort_keys=True),
+                    ),
                 )
+            ]
+        )
+
+    def log_decision_schema(self, *, schema_id: int, fields_json: str) -> None:
+        self._write([(DecisionSchema, dict(id=int(schema_id), fields_json=fields_json))])
+
+    def log_decision_step(self, *, ts: datetime, weights: Dict[str, float]) -> None:
+        self._write([(DecisionStep, dict(ts=ts, weights_json=json.dumps(weights, sort_keys=True)))])
+
+    def log_decision_run(
+        self,
+        *,
+        symbol: str,
+        first_ts: datetime,
+        last_ts: Optional[datetime],
+        mode: str,
+        signal: int,
+        confidence: float,
+        schema_id: int,
+        payload: bytes,
+        weights_json: Optional[str] = None,
+    ) -> None:
+        self._write(
+            [
+                (
+                    DecisionRun,
+                    dict(
+                        symbol=symbol,
+                        first_ts=first_ts,
+                        last_ts=last_ts,
+                        mode=mode,
+                        signal=int(signal),
+                        confidence=float(confidence),
+                        schema_id=int(schema_id),
+                        payload=bytes(payload),
+                        weights_json=weights_json,
+                    ),
+                )
+            ]
+        )
+
+    def close_open_decision_runs(self) -> int:
+        """End runs a previous process left open at the last step it logged."""
+        with self._engine().begin() as conn:
+            latest = conn.execute(select(func.max(DecisionStep.ts))).scalar()
+            if latest is None:
+                return 0
+            result = conn.execute(
+                update(DecisionRun).where(DecisionRun.last_ts.is_(None)).values(last_ts=latest)
             )
-            session.commit()
+            return result.rowcount or 0
+
+    def decision_history(
+        self,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        symbol: Optional[str] = None,
+    ) -> list[Dict[str, Any]]:
+        """Per-bar decisions from the compact log, shaped like `StrategyDecisionEvent` rows.
+
+        One dict per (logged step, symbol) with ``ts``, ``symbol``, ``mode``,
+        ``signal``, ``confidence`` and decoded ``votes``, ``weights`` and
+        ``explanations``, ordered by ``ts`` then ``symbol``.
+        """
+        with Session(self._engine()) as session:
+            codec = PayloadCodec()
+            schemas = session.execute(select(DecisionSchema.id, DecisionSchema.fields_json))
+            for sid, text_ in schemas:
+                codec.register(sid, parse_fields(text_))
+            latest = session.scalar(select(func.max(DecisionStep.ts)))
+            if latest is None:
+                return []
+            stmt = (
+                select(DecisionStep.ts, DecisionStep.weights_json, DecisionRun)
+                .join(
+                    DecisionRun,
+                    and_(
+                        DecisionRun.first_ts <= DecisionStep.ts,
+                        # open runs reach the newest step; typed so it binds as a stored DateTime
+                        func.coalesce(
+                            DecisionRun.last_ts, literal(latest, DecisionStep.ts.type)
+                        )
+                        >= DecisionStep.ts,
+                    ),
+                )
+                .order_by(DecisionStep.ts, DecisionRun.symbol)
+            )
+            if start is not None:
+                stmt = stmt.where(DecisionStep.ts >= start)
+            if end is not None:
+                stmt = stmt.where(DecisionStep.ts <= end)
+            if symbol is not None:
+                stmt = stmt.where(DecisionRun.symbol == symbol)
+
+            decoded: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+            out: list[Dict[str, Any]] = []
+            for ts, step_weights, run in session.execute(stmt):
+                key = (run.symbol, run.first_ts)
+                payload = decoded.get(key)
+                if payload is None:
+                    payload = decoded[key] = codec.decode(run.schema_id, run.payload)
+                out.append(
+                    {
+                        "ts": ts,
+                        "symbol": run.symbol,
+                        "mode": run.mode,
+                        "signal": run.signal,
+                        "confidence": run.confidence,
+                        "votes": payload.get("votes", {}),
+                        "weights": json.loads(run.weights_json or step_weights),
+                        "explanations": payload.get("explanations", {}),
+                    }
+                )
+            return out
 
     def log_learning_state(
         self,
@@ -228,24 +503,26 @@ class SqliteRepository:
         params: Dict[str, Dict[str, Any]],
         note: str = "",
     ) -> None:
-        engine = self._engine()
-        Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            session.add(
-                LearningStateEvent(
-                    ts=ts,
-                    weights_json=json.dumps(weights, sort_keys=True),
-                    params_json=json.dumps(params, sort_keys=True),
-                    note=str(note),
+        self._write(
+            [
+                (
+                    LearningStateEvent,
+                    dict(
+                        ts=ts,
+                        weights_json=json.dumps(weights, sort_keys=True),
+                        params_json=json.dumps(params, sort_keys=True),
+                        note=str(note),
+                    ),
                 )
-            )
-            session.commit()
+            ]
+        )
 
     def latest_learning_state(self) -> Optional[LearningStateEvent]:
         engine = self._engine()
         with Session(engine) as session:
             stmt = select(LearningStateEvent).order_by(LearningStateEvent.ts.desc()).limit(1)
             return session.scalars(stmt).first()
+
     def log_adaptive_decision(
         self,
         *,
@@ -258,18 +535,21 @@ class SqliteRepository:
         explanation: Dict[str, Any],
     ) -> None:
         """Log adaptive learning decision for audit trail."""
-        engine = self._engine()
-        Base.metadata.create_all(engine)
-        with Session(engine) as session:
-            session.add(
-                AdaptiveDecisionEvent(
-                    ts=ts,
-                    regime=str(regime),
-                    regime_confidence=float(regime_confidence),
-                    adjusted_weights_json=json.dumps(adjusted_weights, sort_keys=True),
-                    param_recommendations_json=json.dumps(param_recommendations, sort_keys=True),
-                    anomalies_json=json.dumps(anomalies),
-                    explanation_json=json.dumps(explanation, sort_keys=True, default=str),
+        self._write(
+            [
+                (
+                    AdaptiveDecisionEvent,
+                    dict(
+                        ts=ts,
+                        regime=str(regime),
+                        regime_confidence=float(regime_confidence),
+                        adjusted_weights_json=json.dumps(adjusted_weights, sort_keys=True),
+                        param_recommendations_json=json.dumps(
+                            param_recommendations, sort_keys=True
+                        ),
+                        anomalies_json=json.dumps(anomalies),
+                        explanation_json=json.dumps(explanation, sort_keys=True, default=str),
+                    ),
                 )
-            )
-            session.commit()
\ No newline at end of file
+            ]
+        )
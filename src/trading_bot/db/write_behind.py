@@ -0,0 +1,229 @@
+"""Write-behind SQLite repository.
+
+`BatchedSqliteRepository` has the same logging API as `SqliteRepository`, but
+``log_*`` calls only queue their rows. A background writer thread drains the
+queue and writes everything it finds in one transaction, with one
+``executemany`` insert per table. The engine calls `flush()` at the end of each
+step, so one paper step costs one commit rather than one per event.
+
+- The database runs in WAL mode with ``synchronous=NORMAL``. A committed batch
+  survives an application crash, and an interrupted batch rolls back whole.
+- The queue is bounded. When the writer falls behind, ``log_*`` blocks
+  instead of letting memory grow.
+- `close()` (also registered with ``atexit``) drains the queue before the
+  writer stops. After close, writes go straight to the database.
+- Reads flush first, so they see every event logged before them.
+- Read-model rows (latest holdings, equity ring) travel in the same batch as
+  the snapshot that produced them, so the dashboard never sees one without
+  the other.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from trading_bot.db.models import Base
+from trading_bot.db.repository import Row, SqliteRepository, group_rows, insert_statement
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class BatchedSqliteRepository(SqliteRepository):
+    max_queue: int = 10_000      # queued log calls before writers block
+    max_batch_rows: int = 50_000  # rows per transaction
+    flush_timeout: float = 30.0   # seconds a flush waits when not given one
+
+    def __post_init__(self) -> None:
+        if self.max_queue < 1 or self.max_batch_rows < 1:
+            raise ValueError("max_queue and max_batch_rows must be >= 1")
+        # Frozen dataclass: runtime state is set with object.__setattr__.
+        object.__setattr__(self, "_queue", queue.Queue(maxsize=self.max_queue))
+        object.__setattr__(self, "_db_lock", threading.RLock())
+        object.__setattr__(self, "_closed", False)
+        object.__setattr__(self, "_error", None)
+        object.__setattr__(
+            self, "_stats", {"rows": 0, "batches": 0, "max_depth": 0, "write_seconds": 0.0}
+        )
+        self._prepare()
+        thread = threading.Thread(target=self._run, name="sqlite-write-behind", daemon=True)
+        object.__setattr__(self, "_thread", thread)
+        thread.start()
+        atexit.register(self.close)
+
+    def _prepare(self) -> None:
+        # The engine keeps one connection (StaticPool), so setting the pragmas once
+        # covers every later write.
+        engine = self._engine()
+        with self._db_lock:
+            with engine.connect() as conn:
+                _set_pragmas(conn.connection.dbapi_connection)
+            Base.metadata.create_all(engine)
+            # Seed the equity-ring counter before the writer shares the connection
+            self._seed_equity_seq()
+
+    # --- queue side -------------------------------------------------------
+
+    def _write(self, rows: List[Row]) -> None:
+        if self._closed:
+            with self._db_lock:
+                super()._write(rows)
+            return
+        self._queue.put(rows)  # blocks while the queue is full
+        depth = self._queue.qsize()
+        if depth > self._stats["max_depth"]:
+            self._stats["max_depth"] = depth
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every event queued so far has been committed.
+
+        Raises ``RuntimeError`` if a batch failed since the last flush, or
+        ``TimeoutError`` if the writer did not catch up within ``timeout``
+        (``flush_timeout`` when not given).
+        """
+        if not self._closed:
+            done = threading.Event()
+            self._queue.put(done)
+            if not done.wait(self.flush_timeout if timeout is None else timeout):
+                raise TimeoutError("write-behind flush timed out")
+        self._raise_pending_error()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Drain the queue, stop the writer and switch to direct writes."""
+        if self._closed:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        object.__setattr__(self, "_closed", True)
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        out = dict(self._stats)
+        out["queued"] = self._queue.qsize()
+        return out
+
+    def _raise_pending_error(self) -> None:
+        err = self._error
+        if err is not None:
+            object.__setattr__(self, "_error", None)
+            raise RuntimeError("write-behind batch failed") from err
+
+    # --- writer thread ----------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Row] = []
+            barriers: List[threading.Event] = []
+            stop = False
+            taken = 1
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    barriers.append(item)
+                else:
+                    batch.extend(item)
+                if stop or len(batch) >= self.max_batch_rows:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+
+            # A bad batch is logged and dropped by _commit; whatever happens,
+            # waiting flushes are released and the writer keeps running.
+            try:
+                if batch:
+                    self._commit(batch)
+            finally:
+                for done in barriers:
+                    done.set()
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _commit(self, rows: List[Row]) -> None:
+        start = time.perf_counter()
+        try:
+            by_table = group_rows(rows)
+            with self._db_lock, self._engine().begin() as conn:
+                for model, values in by_table.items():
+                    conn.execute(insert_statement(model), values)
+        except Exception as e:
+            logger.exception("write-behind batch of %d rows failed", len(rows))
+            object.__setattr__(self, "_error", e)
+            return
+        self._stats["rows"] += len(rows)
+        self._stats["batches"] += 1
+        self._stats["write_seconds"] += time.perf_counter() - start
+
+    # --- reads see everything logged before them --------------------------
+
+    def init_db(self) -> None:
+        with self._db_lock:
+            super().init_db()
+
+    def recent_fills(self, *, limit: int = 10):
+        self.flush()
+        with self._db_lock:
+            return super().recent_fills(limit=limit)
+
+    def latest_portfolio_snapshot(self):
+        self.flush()
+        with self._db_lock:
+            return super().latest_portfolio_snapshot()
+
+    def latest_position_snapshots(self):
+        self.flush()
+        with self._db_lock:
+            return super().latest_position_snapshots()
+
+    def latest_learning_state(self):
+        self.flush()
+        with self._db_lock:
+            return super().latest_learning_state()
+
+    def read_model_version(self) -> int:
+        self.flush()
+        with self._db_lock:
+            return super().read_model_version()
+
+    def equity_history(self, *, limit: int = 100, before: Optional[int] = None):
+        self.flush()
+        with self._db_lock:
+            return super().equity_history(limit=limit, before=before)
+
+    def latest_holdings(self):
+        self.flush()
+        with self._db_lock:
+            return super().latest_holdings()
+
+    def close_open_decision_runs(self) -> int:
+        self.flush()
+        with self._db_lock:
+            return super().close_open_decision_runs()
+
+    def decision_history(self, **kwargs):
+        self.flush()
+        with self._db_lock:
+            return super().decision_history(**kwargs)
+
+
+def _set_pragmas(dbapi_conn) -> None:
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+    finally:
+        cur.close()
@@ -0,0 +1,232 @@
+"""Event-driven runner that drives `PaperEngine` at bar boundaries.
+
+The polling loops slept a fixed ``sleep_seconds`` between checks, so a bar
+was picked up anywhere up to one sleep after it closed. Each step also ran
+its DB flush and the caller's notifications before the loop could sleep
+again. `BarRunner` runs the engine on an asyncio loop instead:
+
+- It sleeps until `MarketSchedule.next_run_utc` and wakes at the bar
+  boundary itself. ``settle`` adds an optional delay for providers that
+  publish a bar a moment after it closes.
+- The critical path is fetch, then `PaperEngine.step`, with orders submitted
+  inside the step. Both run on worker threads so the loop stays responsive.
+- The step does not flush. The write-behind flush and every notifier run as
+  background tasks, and the loop goes straight back to waiting. The next
+  bar's fetch never waits for the previous bar's flush or notifications.
+- Every bar has a deadline, ``deadline`` seconds after its boundary (one
+  interval by default). Post-bar tasks still running then are cut off:
+  notifiers are cancelled, and the flush stops waiting. The writer thread
+  keeps the rows and commits them with the next flush.
+- Each bar produces a `BarReport`. The report is a miss if the update was
+  not ready by the deadline or any post-bar task was cut off. Misses are
+  logged. Boundary-to-ready time is recorded as the ``bar_ready`` stage of
+  the engine's `StageTimer`.
+
+A flush that fails (rather than times out) stops the runner with the error,
+as it would have stopped the synchronous loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Notifier = Callable[[Any], Optional[Awaitable[None]]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+@dataclass(frozen=True)
+class BarReport:
+    iteration: int
+    bar_ts: datetime  # scheduled bar boundary (UTC)
+    wake_lag_ms: float  # boundary -> runner awake
+    ready_ms: float  # boundary -> orders submitted, update ready
+    deadline_ms: float
+    cancelled: Tuple[str, ...] = ()  # post-bar tasks cut off at the deadline
+
+    @property
+    def missed(self) -> bool:
+        return self.ready_ms > self.deadline_ms or bool(self.cancelled)
+
+
+class BarRunner:
+    """Runs one engine step per bar boundary of ``schedule``."""
+
+    def __init__(
+        self,
+        engine,
+        schedule,
+        *,
+        notify: Sequence[Notifier] = (),
+        deadline: Optional[float] = None,
+        settle: float = 0.0,
+        run_immediately: bool = True,
+        clock: Callable[[], datetime] = _utcnow,
+        max_reports: int = 1_000,
+    ) -> None:
+        self.engine = engine
+        self.schedule = schedule
+        self.notify = list(notify)
+        if deadline is None:
+            deadline = schedule.interval.total_seconds()
+        self.deadline = float(deadline)
+        self.settle = float(settle)
+        self.run_immediately = bool(run_immediately)
+        self._clock = clock
+        self.reports: Deque[BarReport] = deque(maxlen=max_reports)
+        self.bars = 0
+        self.misses = 0
+        self._settling: List[asyncio.Task] = []
+        self._error: Optional[BaseException] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stop(self) -> None:
+        """Stop after the current bar; safe to call from any thread."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def run(self, iterations: int = 0) -> int:
+        """Run until ``iterations`` engine steps (0 = until `stop`); returns the count."""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        first = self.run_immediately
+        try:
+            while not self._stop.is_set():
+                if iterations > 0 and self.engine.iteration >= iterations:
+                    break
+                self._raise_pending_error()
+                if first:
+                    first = False
+                    bar_ts = self._clock()
+                else:
+                    bar_ts = await self._wait_for_bar()
+                    if bar_ts is None:
+                        break
+                await self.run_bar(bar_ts)
+            await asyncio.gather(*self._settling)
+            self._raise_pending_error()
+        finally:
+            for task in self._settling:
+                task.cancel()
+            self._settling.clear()
+        return self.engine.iteration
+
+    async def run_bar(self, bar_ts: datetime):
+        """Fetch and step for the bar closing at ``bar_ts``, then start its post-bar tasks."""
+        woke = self._clock()
+        if self.settle > 0:
+            await asyncio.sleep(self.settle)
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline - (woke - bar_ts).total_seconds()
+
+        fetched = await asyncio.to_thread(self.engine.prefetch)
+        update = await asyncio.to_thread(self.engine.step, now=bar_ts, fetched=fetched, flush=False)
+        self.schedule.mark_ran(bar_ts)
+        ready = self._clock()
+
+        tasks: Dict[str, asyncio.Task] = {}
+        repo = getattr(self.engine, "repo", None)
+        if hasattr(repo, "flush"):
+            timeout = max(0.0, deadline_at - loop.time())
+            tasks["flush"] = asyncio.create_task(asyncio.to_thread(repo.flush, timeout))
+        for fn in self.notify:
+            tasks[getattr(fn, "__name__", repr(fn))] = asyncio.create_task(self._call(fn, update))
+
+        report = BarReport(
+            iteration=update.iteration,
+            bar_ts=bar_ts,
+            wake_lag_ms=max(0.0, (woke - bar_ts).total_seconds() * 1000.0),
+            ready_ms=max(0.0, (ready - bar_ts).total_seconds() * 1000.0),
+            deadline_ms=self.deadline * 1000.0,
+        )
+        self._settling = [t for t in self._settling if not t.done()]
+        self._settling.append(asyncio.create_task(self._settle(report, tasks, deadline_at)))
+        return update
+
+    async def _wait_for_bar(self) -> Optional[datetime]:
+        while True:
+            now = self._clock()
+            if self.schedule.due(now):
+                return self.schedule.next_run_utc
+            try:
+                timeout = self.schedule.seconds_until_next(now)
+                await asyncio.wait_for(self._stop.wait(), timeout=timeout)
+                return None
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    async def _call(fn: Notifier, update) -> None:
+        if inspect.iscoroutinefunction(fn):
+            await fn(update)
+        else:
+            await asyncio.to_thread(fn, update)
+
+    async def _settle(
+        self, report: BarReport, tasks: Dict[str, asyncio.Task], deadline_at: float
+    ) -> None:
+        cut: List[str] = []
+        if tasks:
+            timeout = max(0.0, deadline_at - asyncio.get_running_loop().time())
+            _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for name, task in tasks.items():
+                if task in pending:
+                    cut.append(name)
+                    continue
+                exc = task.exception()
+                if exc is None:
+                    continue
+                if name == "flush":
+                    if isinstance(exc, TimeoutError):
+                        cut.append(name)
+                    elif self._error is None:
+                        self._error = exc
+                else:
+                    logger.error("Notifier %s failed for bar %s: %s", name, report.bar_ts, exc)
+
+        if cut:
+            report = replace(report, cancelled=tuple(cut))
+        self.reports.append(report)
+        self.bars += 1
+        timer = getattr(self.engine, "timer", None)
+        if timer is not None and timer.enabled:
+            timer.record_ns("bar_ready", int(report.ready_ms * 1_000_000))
+        if report.missed:
+            self.misses += 1
+            logger.warning(
+                "Bar %s (iteration %d) missed its %.0f ms deadline: "
+                "ready after %.0f ms, cut off %s",
+                report.bar_ts.isoformat(),
+                report.iteration,
+                report.deadline_ms,
+                report.ready_ms,
+                ", ".join(report.cancelled) or "nothing",
+            )
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            exc, self._error = self._error, None
+            raise exc
+
+    def stats(self) -> Dict[str, Any]:
+        ready = sorted(r.ready_ms for r in self.reports)
+        return {
+            "bars": self.bars,
+            "deadline_misses": self.misses,
+            "ready_ms_p50": ready[len(ready) // 2] if ready else 0.0,
+            "ready_ms_max": ready[-1] if ready else 0.0,
+        }
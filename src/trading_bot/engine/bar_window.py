@@ -0,0 +1,117 @@
+"""Rolling in-memory OHLCV window for one symbol.
+
+`BarWindow` holds at most ``capacity`` bars in preallocated NumPy columns,
+using the engine's dtypes (float32 prices, uint32 volume). New bars are written
+in place. The columns are twice the capacity, so the live window is always one
+contiguous slice. When the write position reaches the end, the last
+``capacity`` rows are moved back to the front. That move happens at most once
+per ``capacity`` appends, so appending costs O(1) amortized.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+_DTYPES: Dict[str, np.dtype] = {
+    "Open": np.dtype(np.float32),
+    "High": np.dtype(np.float32),
+    "Low": np.dtype(np.float32),
+    "Close": np.dtype(np.float32),
+    "Volume": np.dtype(np.uint32),
+}
+
+
+class BarWindow:
+    """Fixed-capacity, append-only OHLCV window with a timestamp index."""
+
+    def __init__(self, capacity: int, columns=None) -> None:
+        if int(capacity) < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self.columns = [c for c in (columns or _DTYPES) if c in _DTYPES]
+        if "Close" not in self.columns:
+            raise ValueError("BarWindow needs a Close column")
+        size = 2 * self.capacity
+        self._cols = {c: np.zeros(size, dtype=_DTYPES[c]) for c in self.columns}
+        self._ts = np.zeros(size, dtype="datetime64[ns]")
+        self._tz = None
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if self._end == self._start:
+            return None
+        ts = pd.Timestamp(self._ts[self._end - 1])
+        return ts.tz_localize("UTC").tz_convert(self._tz) if self._tz is not None else ts
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: Optional[int] = None) -> "BarWindow":
+        """Seed a window from a normalized OHLCV frame (capacity defaults to its length)."""
+        win = cls(capacity or max(len(df), 1), columns=[c for c in _DTYPES if c in df.columns])
+        win.update(df)
+        return win
+
+    def _index_values(self, index: pd.Index) -> np.ndarray:
+        idx = pd.DatetimeIndex(index)
+        if idx.tz is not None:
+            if self._tz is None:
+                self._tz = idx.tz
+            idx = idx.tz_convert("UTC").tz_localize(None)
+        return idx.values.astype("datetime64[ns]")
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Append bars newer than the last one held and return how many were added.
+
+        A bar with the same timestamp as the last one held replaces it, so a
+        still-forming bar is kept current. Older bars are ignored.
+        """
+        if df is None or df.empty:
+            return 0
+        ts = self._index_values(df.index)
+        mask = np.ones(len(ts), dtype=bool)
+        if len(self):
+            last = self._ts[self._end - 1]
+            mask = ts >= last
+            if mask.any() and ts[mask][0] == last:
+                self._end -= 1  # overwrite the last bar
+        if not mask.any():
+            return 0
+
+        ts = ts[mask]
+        values = {c: df[c].to_numpy()[mask] for c in self.columns if c in df.columns}
+        n = len(ts)
+        if n > self.capacity:
+            ts = ts[-self.capacity:]
+            values = {c: v[-self.capacity:] for c, v in values.items()}
+            n = self.capacity
+
+        if self._end + n > len(self._ts):
+            keep = min(len(self), self.capacity - n)
+            lo = self._end - keep
+            self._ts[:keep] = self._ts[lo:self._end]
+            for col in self._cols.values():
+                col[:keep] = col[lo:self._end]
+            self._start, self._end = 0, keep
+
+        sl = slice(self._end, self._end + n)
+        self._ts[sl] = ts
+        for c, col in self._cols.items():
+            col[sl] = values[c].astype(col.dtype, copy=False) if c in values else 0
+        self._end += n
+        self._start = max(self._start, self._end - self.capacity)
+        return n
+
+    def frame(self) -> pd.DataFrame:
+        """The live window as a DataFrame (columns are copied)."""
+        sl = slice(self._start, self._end)
+        index = pd.DatetimeIndex(self._ts[sl].copy())
+        if self._tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._tz)
+        return pd.DataFrame({c: col[sl].copy() for c, col in self._cols.items()}, index=index)
@@ -0,0 +1,103 @@
+"""Vectorized exit scan over all open positions.
+
+`PaperEngine.step` used to check exits inside its per-symbol strategy loop, so
+a stop was only acted on after that symbol's strategies had run. `scan_exits`
+evaluates every position at once from parallel arrays (quantity, price,
+stop/target levels, entry price and bars held). It returns the exit orders in
+symbol order, before any signal is computed:
+
+- partial take-profit: the first level in `PARTIAL_TAKE_PROFITS` whose profit
+  threshold is met sells that fraction of the position (at least one share);
+- time exit: a position held more than `TIME_EXIT_BARS` bars with less than
+  `TIME_EXIT_MIN_PROFIT` profit is closed;
+- stop-loss / take-profit: the remaining position is closed when the price
+  crosses its level (the stop wins if both are crossed).
+
+Partial take-profits and time exits need an entry price; positions without
+one only get the stop/target check. Time, stop and target exits close the
+whole position, and the engine skips strategy evaluation for those symbols.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# (fraction of position, profit threshold), checked in order
+PARTIAL_TAKE_PROFITS = ((0.50, 0.015), (0.25, 0.030), (0.25, 0.050))
+TIME_EXIT_BARS = 20
+TIME_EXIT_MIN_PROFIT = 0.01
+
+FULL_EXITS = ("time_exit", "stop_loss", "take_profit")
+
+
+@dataclass(frozen=True)
+class ExitOrder:
+    """One exit to submit; ``qty`` is 0 for "the whole remaining position"."""
+
+    symbol: str
+    reason: str  # "partial_tp", "time_exit", "stop_loss" or "take_profit"
+    qty: int
+    profit_pct: float
+    level: Optional[float] = None  # stop or target price for risk exits
+
+    @property
+    def closes_position(self) -> bool:
+        return self.reason in FULL_EXITS
+
+
+def scan_exits(
+    symbols: Sequence[str],
+    qty: np.ndarray,
+    price: np.ndarray,
+    stop_loss: np.ndarray,
+    take_profit: np.ndarray,
+    entry_price: np.ndarray,
+    bars_held: np.ndarray,
+) -> List[ExitOrder]:
+    """Exit orders for every long position, in ``symbols`` order.
+
+    NaN in ``stop_loss``/``take_profit`` means no level and NaN in
+    ``entry_price`` means the entry is not tracked.
+    """
+    qty = np.asarray(qty, dtype=np.int64)
+    price = np.asarray(price, dtype=np.float64)
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    held = qty > 0
+    tracked = held & ~np.isnan(entry_price)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        profit = np.where(tracked & (entry_price > 0), (price - entry_price) / entry_price, 0.0)
+
+        # First level (in list order) whose threshold is met
+        fraction = np.zeros(len(qty))
+        for frac, threshold in reversed(PARTIAL_TAKE_PROFITS):
+            fraction = np.where(profit >= threshold, frac, fraction)
+        partial = tracked & (fraction > 0)
+        partial_qty = np.where(partial, np.maximum(1, (qty * fraction).astype(np.int64)), 0)
+        remaining = qty - partial_qty
+
+        timed = (
+            tracked
+            & (remaining > 0)
+            & (np.asarray(bars_held) > TIME_EXIT_BARS)
+            & (profit < TIME_EXIT_MIN_PROFIT)
+        )
+        risk = held & ~timed & (remaining > 0)
+        stop = risk & (price <= stop_loss)
+        take = risk & ~stop & (price >= take_profit)
+
+    exits: List[ExitOrder] = []
+    for i in np.flatnonzero(partial | timed | stop | take):
+        sym, pct = symbols[i], float(profit[i])
+        if partial[i]:
+            exits.append(ExitOrder(sym, "partial_tp", int(partial_qty[i]), pct))
+        if timed[i]:
+            exits.append(ExitOrder(sym, "time_exit", 0, pct))
+        elif stop[i]:
+            exits.append(ExitOrder(sym, "stop_loss", 0, pct, float(stop_loss[i])))
+        elif take[i]:
+            exits.append(ExitOrder(sym, "take_profit", 0, pct, float(take_profit[i])))
+    return exits
@@ -0,0 +1,135 @@
+"""Streaming performance metrics for the paper/live engine.
+
+`PaperEngine._calculate_metrics` rebuilt the Sharpe ratio, max drawdown and
+win rate from the full equity and trade histories on every step, and again
+for every sized entry. The streak counts were recomputed by walking the
+trades backwards. `OnlineMetrics` keeps the same numbers up to date in O(1)
+per event:
+
+- Sharpe: Welford running mean and population variance of per-step excess
+  returns, over the whole session, as ``np.mean``/``np.std`` over the full
+  history would give.
+- Drawdown: running peak and the lowest drawdown seen against it.
+- Win rate: win counts over the trades still in the ring. A trade evicted
+  from the ring is subtracted again, so the window matches the old
+  ``deque(maxlen=...)`` history.
+- Streaks: consecutive wins (``pnl > 0``) and losses (``pnl <= 0``).
+
+The raw equity and trade histories are bounded ring buffers (`deque`). The
+engine still exposes them as ``equity_history``/``trade_history`` for the
+learning consumers. `MetricsCollector.collect_metrics` takes the
+`OnlineMetrics` itself, so it neither rescans the rings nor mistakes the
+oldest point left in a wrapped ring for the starting equity.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+EQUITY_HISTORY_LEN = 10_080  # one week of 1-minute bars, around the clock
+TRADE_HISTORY_LEN = 10_000
+PERIODS_PER_YEAR = 252
+RISK_FREE_RATE = 0.02  # annual
+
+
+class OnlineMetrics:
+    """Session performance metrics updated per equity point and per trade."""
+
+    def __init__(
+        self,
+        start_equity: float,
+        *,
+        equity_len: int = EQUITY_HISTORY_LEN,
+        trade_len: int = TRADE_HISTORY_LEN,
+    ) -> None:
+        self.start_equity = float(start_equity)
+        self.equity: Deque[float] = deque([self.start_equity], maxlen=equity_len)
+        self.trades: Deque[dict] = deque(maxlen=trade_len)
+
+        # Welford state over per-step excess returns
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._last = self.start_equity
+
+        self.peak = self.start_equity
+        self.max_drawdown = 0.0
+
+        self.wins = 0  # trades in the ring with pnl > 0
+        self.consecutive_wins = 0
+        self.consecutive_losses = 0
+
+    # -- updates ------------------------------------------------------------
+
+    def record_equity(self, equity: float) -> None:
+        equity = float(equity)
+        if self._last != 0.0:
+            excess = (equity - self._last) / self._last - RISK_FREE_RATE / PERIODS_PER_YEAR
+            self._n += 1
+            delta = excess - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (excess - self._mean)
+        self._last = equity
+        self.equity.append(equity)
+
+        if equity > self.peak:
+            self.peak = equity
+        elif self.peak > 0:
+            self.max_drawdown = min(self.max_drawdown, (equity - self.peak) / self.peak)
+
+    def record_trade(self, trade: dict) -> None:
+        if len(self.trades) == self.trades.maxlen and self.trades[0].get("pnl", 0) > 0:
+            self.wins -= 1  # about to be evicted
+        self.trades.append(trade)
+        if trade.get("pnl", 0) > 0:
+            self.wins += 1
+            self.consecutive_wins += 1
+            self.consecutive_losses = 0
+        else:
+            self.consecutive_losses += 1
+            self.consecutive_wins = 0
+        # Streaks never reach further back than the ring, as before
+        self.consecutive_wins = min(self.consecutive_wins, len(self.trades))
+        self.consecutive_losses = min(self.consecutive_losses, len(self.trades))
+
+    # -- reads --------------------------------------------------------------
+
+    @property
+    def sharpe(self) -> float:
+        if self._n == 0:
+            return 0.0
+        return float(math.sqrt(PERIODS_PER_YEAR) * self._mean / (self.volatility + 1e-8))
+
+    @property
+    def volatility(self) -> float:
+        """Population standard deviation of per-step returns."""
+        return math.sqrt(self._m2 / self._n) if self._n else 0.0
+
+    @property
+    def num_trades(self) -> int:
+        return len(self.trades)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / len(self.trades) if self.trades else 0.0
+
+    @property
+    def current_pnl(self) -> float:
+        return self._last - self.start_equity
+
+    def snapshot(self) -> Tuple[float, float, float, int, float]:
+        """(sharpe_ratio, max_drawdown_pct, win_rate, num_trades, current_pnl)"""
+        return self.sharpe, self.max_drawdown, self.win_rate, self.num_trades, self.current_pnl
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "sharpe_ratio": self.sharpe,
+            "max_drawdown_pct": self.max_drawdown,
+            "win_rate": self.win_rate,
+            "num_trades": self.num_trades,
+            "current_pnl": self.current_pnl,
+            "consecutive_wins": self.consecutive_wins,
+            "consecutive_losses": self.consecutive_losses,
+        }
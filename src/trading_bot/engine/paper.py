@@ -4,7 +4,7 @@ import json
 import time
 import uuid
 from collections.abc import Iterator
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -18,11 +18,19 @@ from trading_bot.broker.alpaca import AlpacaBroker, AlpacaConfig
 from trading_bot.configs import load_config
 from trading_bot.core.models import Fill, Order, Portfolio
 from trading_bot.data.providers import MarketDataProvider, AlpacaProvider, MockDataProvider
+from trading_bot.db.decision_log import DEFAULT_SAMPLE_EVERY, DecisionLog
 from trading_bot.db.repository import SqliteRepository
+from trading_bot.db.write_behind import BatchedSqliteRepository
+from trading_bot.engine.bar_window import BarWindow
+from trading_bot.engine.exit_scan import TIME_EXIT_BARS, scan_exits
+from trading_bot.engine.online_metrics import OnlineMetrics
+from trading_bot.engine.signal_compute import SignalComputePool, SymbolSignals
 from trading_bot.learn.adaptive_controller import AdaptiveLearningController
 from trading_bot.learn.ensemble import ExponentialWeightsEnsemble, reward_to_unit_interval
 from trading_bot.learn.tuner import default_params, maybe_tune_weekly
 from trading_bot.learn.momentum_scaling import MomentumScaler
+from trading_bot.performance.latency_optimizer import LatencyOptimizer
+from trading_bot.performance.stage_timer import StageTimer, TimedCalls, default_timer
 from trading_bot.analytics.realtime_metrics import MetricsCollector
 from trading_bot.analytics.position_monitor import PositionMonitor, AlertType
 from trading_bot.risk import position_size_shares, stop_loss_price, take_profit_price
@@ -64,6 +72,22 @@ class PaperEngineConfig:
     learning_eta: float = 0.3
     ignore_market_hours: bool = False  # For testing outside market hours
     memory_mode: bool = False  # Aggressive memory optimizations (smaller batches, fewer indicators)
+    streaming_indicators: bool = False  # Feed only new bars through strategies' O(1) update() path
+    incremental_bars: bool = False  # After warm-up, fetch only bars newer than the held window
+    window_bars: int = 0  # Rolling window cap per symbol with incremental_bars (0 = warm-up length)
+    batched_writes: bool = False  # Queue DB events and commit them once per step on a writer thread
+    compute_workers: int = 1  # Workers for the per-symbol strategy/ML phase (1 = sequential)
+    compute_executor: str = "thread"  # thread|process (process: stateless strategy evaluation only)
+    latency_tracking: bool = True  # Per-stage latency histograms (False = no-op spans)
+    latency_snapshot_path: Optional[str] = None  # Publish stage latency here each step (/latency)
+    ml_pooled_model: bool = False  # One ML model for all symbols, scored in one predict_proba call
+    ml_background_training: bool = False  # Fit ML models on a process pool, serving the old one
+    ml_training_workers: int = 1  # Worker processes for ml_background_training
+    ml_registry_dir: str = ".cache/models"  # Versioned model store for warm restarts
+    decision_log: str = "full"  # full|compact (run-length decision log, see db/decision_log.py)
+    decision_sample_every: int = DEFAULT_SAMPLE_EVERY  # compact: bars between stored explanations
+    # compact: per-symbol decision_sample_every
+    decision_sampling: dict[str, int] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -85,6 +109,10 @@ class PaperEngineUpdate:
     num_trades: int = 0
     current_pnl: float = 0.0
 
+    # Stage latency: totals for this step, and p50/p99 etc. across steps (milliseconds)
+    stage_latency_ms: dict[str, float] = field(default_factory=dict)
+    latency_ms: dict[str, dict[str, float]] = field(default_factory=dict)
+
 
 
 
@@ -116,6 +144,15 @@ def _normalize_ohlcv(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
     return out
 
 
+def _delta_period(last_ts: Any) -> str:
+    """Smallest ``"<n>d"`` period reaching back to ``last_ts`` (inclusive)."""
+    last = pd.Timestamp(last_ts)
+    if last.tzinfo is None:
+        last = last.tz_localize("UTC")
+    days = (pd.Timestamp.now(tz="UTC") - last) / pd.Timedelta(days=1)
+    return f"{max(int(days) + 1, 1)}d"
+
+
 class PaperEngine:
     def __init__(
         self,
@@ -127,8 +164,27 @@ class PaperEngine:
 
         self.app_cfg = load_config(cfg.config_path)
 
-        self.repo = SqliteRepository(db_path=Path(cfg.db_path))
-        self.repo.init_db()
+        # Stage latency spans; the shared default_timer is what the health API reports.
+        self.timer = default_timer if cfg.latency_tracking else StageTimer(enabled=False)
+        self.latency_optimizer = LatencyOptimizer()
+
+        if cfg.batched_writes:
+            repo = BatchedSqliteRepository(db_path=Path(cfg.db_path))
+        else:
+            repo = SqliteRepository(db_path=Path(cfg.db_path))
+        repo.init_db()
+        self.repo = TimedCalls(repo, self.timer, "db_log", prefix=("log_", "flush"))
+        if cfg.decision_log not in ("full", "compact"):
+            raise ValueError(f"decision_log must be 'full' or 'compact', got {cfg.decision_log!r}")
+        self.decision_log = (
+            DecisionLog(
+                self.repo,
+                sample_every=cfg.decision_sample_every,
+                sampling=cfg.decision_sampling,
+            )
+            if cfg.decision_log == "compact"
+            else None
+        )
 
         # Initialize broker: live Alpaca or paper broker
         if cfg.live_trading:
@@ -207,10 +263,20 @@ class PaperEngine:
             ensemble=self.ensemble,
             min_trades_for_analysis=5,
         )
-        # BUG FIX #4: Unbounded memory - use deque with maxlen instead of unbounded list
-        from collections import deque
-        self.trade_history: deque = deque(maxlen=10000)  # Keep only last 10k trades
-        self.equity_history: list[float] = [float(cfg.start_cash)]
+        # Streaming Sharpe/drawdown/win-rate; the histories are its bounded rings
+        self.online_metrics = OnlineMetrics(start_equity=float(cfg.start_cash))
+        self.trade_history = self.online_metrics.trades
+        self.equity_history = self.online_metrics.equity
+
+        # Streaming strategy evaluation: last bar fed per symbol and its outputs
+        self._stream_last_ts: Dict[str, Any] = {}
+        self._stream_outputs: Dict[str, Dict[str, StrategyOutput]] = {}
+
+        # Incremental bar fetching: rolling OHLCV window per symbol
+        self._bar_windows: Dict[str, BarWindow] = {}
+
+        # Compute phase (strategy evaluation + ML prediction) over symbol shards
+        self._compute_pool = SignalComputePool(cfg.compute_workers, cfg.compute_executor)
 
         # For learning updates
         self._prev_prices: Optional[Dict[str, float]] = None
@@ -233,11 +299,14 @@ class PaperEngine:
         self._ml_trained_symbols: set[str] = set()
         self._ml_training_attempts: Dict[str, int] = {}  # Track retry count per symbol
         self._ohlcv_cache: Dict[str, pd.DataFrame] = {}  # Cache OHLCV for ML training
+        self._ml_training = None  # ModelTrainingService with ml_background_training
         try:
             from trading_bot.learn.ml_signals import MLSignalManager
-            self.ml_manager = MLSignalManager()
+            self.ml_manager = MLSignalManager(pooled=cfg.ml_pooled_model)
             self.ml_enabled = True
             logger.info("[ML] MLSignalManager initialized successfully")
+            if cfg.ml_background_training:
+                self._start_ml_training_service()
         except ImportError as e:
             logger.warning(f"[ML] MLSignalManager not available (ImportError): {e}")
         except Exception as e:
@@ -347,42 +416,220 @@ class PaperEngine:
 
         return strategies
 
-    def _calculate_metrics(self) -> tuple[float, float, float, int, float]:
-        """Calculate real-time performance metrics.
-        
-        Returns: (sharpe_ratio, max_drawdown_pct, win_rate, num_trades, current_pnl)
+    def _evaluate_strategies(self, sym: str, ohlcv: pd.DataFrame) -> Dict[str, StrategyOutput]:
+        """Run every strategy on one symbol's history.
+
+        With ``streaming_indicators`` enabled only bars newer than the last one
+        fed are pushed through each strategy's ``update`` path, so the cost per
+        step no longer grows with the history. The first call for a symbol (or
+        a history that no longer lines up with what was fed) replays the frame
+        once. Bars are assumed closed: a revised last bar is not re-fed.
         """
-        # Calculate Sharpe ratio
-        if len(self.equity_history) < 2:
-            sharpe = 0.0
+        if not self.cfg.streaming_indicators:
+            result: Dict[str, StrategyOutput] = {}
+            for name, strat in self.strategies.items():
+                with self.timer.span(f"evaluate.{name}"):
+                    result[name] = strat.evaluate(ohlcv)
+            return result
+
+        last_ts = self._stream_last_ts.get(sym)
+        if last_ts is not None and ohlcv.index[-1] == last_ts and sym in self._stream_outputs:
+            return self._stream_outputs[sym]
+
+        if last_ts is None or last_ts not in ohlcv.index:
+            for strat in self.strategies.values():
+                strat.reset(sym)
+            new_rows = ohlcv
         else:
-            returns = np.diff(self.equity_history) / np.array(self.equity_history[:-1])
-            excess_returns = returns - (0.02 / 252)  # Daily risk-free rate
-            sharpe = float(np.sqrt(252) * np.mean(excess_returns) / (np.std(excess_returns) + 1e-8))
-        
-        # Calculate max drawdown
-        if len(self.equity_history) < 2:
-            max_dd = 0.0
+            new_rows = ohlcv.loc[ohlcv.index > last_ts]
+
+        outputs: Dict[str, StrategyOutput] = {}
+        with self.timer.span("evaluate.streaming"):
+            for _, bar in new_rows.iterrows():
+                outputs = {
+                    name: strat.update(bar, key=sym) for name, strat in self.strategies.items()
+                }
+
+        self._stream_last_ts[sym] = ohlcv.index[-1]
+        self._stream_outputs[sym] = outputs
+        return outputs
+
+    def _start_ml_training_service(self) -> None:
+        """Open the model registry, restore saved models and start the training pool."""
+        from trading_bot.learn.model_registry import ModelRegistry
+        from trading_bot.learn.training_service import ModelTrainingService
+
+        registry = ModelRegistry(self.cfg.ml_registry_dir)
+        self._ml_training = ModelTrainingService(registry, self.cfg.ml_training_workers)
+        loaded = self.ml_manager.load_registry(registry, list(self.cfg.symbols))
+        self._ml_trained_symbols.update(loaded)
+        if loaded:
+            print(f"[ML] Restored {len(loaded)} saved model(s) from {registry.root}")
+
+    def _schedule_ml_training(self, ohlcv_by_symbol: Dict[str, pd.DataFrame]) -> None:
+        """Install finished background fits and submit the models that are due.
+
+        Symbols count as ML-enabled from their first submission, so they are
+        scored by the heuristic fallback (or the previous version) meanwhile.
+        """
+        service = self._ml_training
+        mgr = self.ml_manager
+        for result in service.poll():
+            if result.ok:
+                mgr.install(result.key, result.trainer, result.record.version, result.symbols)
+                print(f"[ML] Installed {result.key} model v{result.record.version}")
+            else:
+                mgr.mark_trained(result.symbols)
+                print(f"[ML] Background training skipped for {result.key}: {result.error}")
+
+        frames = {s: df for s, df in ohlcv_by_symbol.items() if len(df) >= 50}
+        for key, group in mgr.due_for_training(frames).items():
+            if not service.in_flight(key) and service.submit(key, mgr.training_frames(group)):
+                self._ml_trained_symbols.update(group)
+
+    def _compute_signals(
+        self,
+        ohlcv_by_symbol: Dict[str, pd.DataFrame],
+        skip: frozenset[str] = frozenset(),
+    ) -> Dict[str, SymbolSignals]:
+        """Strategy outputs and ML predictions for every symbol not in ``skip``.
+
+        Reads only each symbol's bars, so it runs on `SignalComputePool`
+        across ``compute_workers``. Results are keyed by symbol and do not
+        depend on the worker count. With the process executor only stateless
+        strategy evaluation leaves the process; streaming state and ML models
+        stay on threads. First-time ML training runs sequentially beforehand
+        (or on the background training service), and ML predictions for all
+        symbols are scored in one batch afterwards.
+        """
+        symbols = [s for s in self.cfg.symbols if s not in skip]
+        pool = self._compute_pool
+
+        if self.ml_enabled and self._ml_training is not None:
+            with self.timer.span("ml_schedule"):
+                self._schedule_ml_training({s: ohlcv_by_symbol[s] for s in symbols})
+        elif self.ml_enabled and self.cfg.ml_pooled_model:
+            frames = {s: ohlcv_by_symbol[s] for s in symbols if len(ohlcv_by_symbol[s]) >= 50}
+            ready = [s for s in frames if s not in self._ml_trained_symbols]
+            if ready:
+                with self.timer.span("ml_train"):
+                    trained = self.ml_manager.train_universe(frames)
+                if trained:
+                    self._ml_trained_symbols.update(ready)
+                    print(f"[ML] Pooled model trained on {len(frames)} symbols")
+        elif self.ml_enabled:
+            for sym in symbols:
+                if sym not in self._ml_trained_symbols and len(ohlcv_by_symbol[sym]) >= 50:
+                    try:
+                        with self.timer.span("ml_train"):
+                            self.ml_manager.train_symbol(sym, ohlcv_by_symbol[sym])
+                        self._ml_trained_symbols.add(sym)
+                        print(f"[ML] Model trained for {sym}")
+                    except Exception as e:
+                        print(f"[ML] Training failed for {sym}: {e}")
+
+        if pool.executor == "process" and not self.cfg.streaming_indicators:
+            with self.timer.span("evaluate"):
+                outputs = pool.evaluate(self.strategies, ohlcv_by_symbol, symbols)
         else:
-            cummax = np.maximum.accumulate(self.equity_history)
-            drawdown = (np.array(self.equity_history) - cummax) / cummax
-            max_dd = float(np.min(drawdown))
+            outputs = pool.map_symbols(
+                lambda sym: self._evaluate_strategies(sym, ohlcv_by_symbol[sym]), symbols
+            )
+
+        eligible = [
+            s for s in symbols
+            if self.ml_enabled and s in self._ml_trained_symbols and len(ohlcv_by_symbol[s]) >= 20
+        ]
+        ml_signals: Dict[str, Any] = {}
+        ml_error = ""
+        if eligible:
+            try:
+                with self.timer.span("ml_predict"):
+                    ml_signals = self.ml_manager.predict_signals(
+                        {s: ohlcv_by_symbol[s] for s in eligible}
+                    )
+            except Exception as e:
+                ml_error = str(e)
+
+        return {
+            sym: SymbolSignals(
+                outputs[sym],
+                ml_signal=ml_signals.get(sym),
+                ml_error=ml_error if sym in eligible else "",
+            )
+            for sym in symbols
+        }
+
+    def _submit_order(self, order: Order) -> Fill | OrderRejection:
+        with self.timer.span("order_submit"):
+            return self.broker.submit_order(order)
+
+    def _fetch_ohlcv(self) -> Dict[str, pd.DataFrame]:
+        """Return the normalized OHLCV history for every configured symbol.
+
+        By default the full ``period`` is downloaded and normalized each step.
+        With ``incremental_bars`` that only happens once per symbol (warm-up).
+        Later steps download just the days since the oldest last-held bar and
+        append the new rows to each symbol's `BarWindow`. A symbol missing
+        from a delta response simply had no new bar.
+        """
+        symbols = self.cfg.symbols
+        if not self.cfg.incremental_bars:
+            with self.timer.span("fetch"):
+                bars = self.data.download_bars(
+                    symbols=symbols,
+                    period=self.cfg.period,
+                    interval=self.cfg.interval,
+                )
+            with self.timer.span("normalize"):
+                return {sym: _normalize_ohlcv(bars, sym) for sym in symbols}
+
+        cold = [sym for sym in symbols if sym not in self._bar_windows]
+        warm = [sym for sym in symbols if sym in self._bar_windows]
+
+        if cold:
+            with self.timer.span("fetch"):
+                bars = self.data.download_bars(
+                    symbols=cold, period=self.cfg.period, interval=self.cfg.interval
+                )
+            with self.timer.span("normalize"):
+                for sym in cold:
+                    ohlcv = _normalize_ohlcv(bars, sym)
+                    capacity = int(self.cfg.window_bars) or len(ohlcv)
+                    self._bar_windows[sym] = BarWindow.from_frame(ohlcv, capacity=capacity)
+
+        if warm:
+            oldest = min(self._bar_windows[sym].last_timestamp for sym in warm)
+            with self.timer.span("fetch"):
+                bars = self.data.download_bars(
+                    symbols=warm,
+                    period=_delta_period(oldest),
+                    interval=self.cfg.interval,
+                )
+            if bars is not None and not bars.empty:
+                with self.timer.span("normalize"):
+                    for sym in warm:
+                        try:
+                            delta = _normalize_ohlcv(bars, sym)
+                        except ValueError:
+                            continue
+                        self._bar_windows[sym].update(delta)
+
+        with self.timer.span("normalize"):
+            return {sym: self._bar_windows[sym].frame() for sym in symbols}
+
+    def _calculate_metrics(self) -> tuple[float, float, float, int, float]:
+        """Calculate real-time performance metrics (O(1), see `OnlineMetrics`).
         
-        # Calculate win rate
-        if len(self.trade_history) == 0:
-            win_rate = 0.0
-            num_trades = 0
+        Returns: (sharpe_ratio, max_drawdown_pct, win_rate, num_trades, current_pnl)
+        """
+        return self.online_metrics.snapshot()
+
+    def _log_decision(self, ts: datetime, sym: str, mode: str, dec: StrategyDecision) -> None:
+        if self.decision_log is not None:
+            self.decision_log.record(sym, mode, dec)
         else:
-            winning = len([t for t in self.trade_history if t.get("pnl", 0) > 0])
-            num_trades = len(self.trade_history)
-            win_rate = winning / num_trades if num_trades > 0 else 0.0
-        
-        # Current P&L
-        start_cash = float(self.cfg.start_cash)
-        current_equity = self.equity_history[-1] if self.equity_history else start_cash
-        current_pnl = current_equity - start_cash
-        
-        return sharpe, max_dd, win_rate, num_trades, current_pnl
+            self.repo.log_strategy_decision(ts=ts, symbol=sym, mode=mode, decision=dec)
 
     def _record_position_entry(self, sym: str, px: float, iteration: int) -> None:
         """BUG FIX #6: Atomically record position entry in both tracking dicts."""
@@ -401,13 +648,120 @@ class PaperEngine:
         logger.warning(f"[TRACK] Position {sym} missing from entry bar tracking dict")
         return self.iteration  # Safe fallback: assume just entered
 
-    def step(self, *, now: datetime | None = None) -> PaperEngineUpdate:
+    def _run_exits(
+        self,
+        ts: datetime,
+        prices: Dict[str, float],
+        decisions: Dict[str, StrategyDecision],
+        signals: Dict[str, int],
+        fills: list[Fill],
+        rejections: list[OrderRejection],
+    ) -> frozenset[str]:
+        """Scan all open positions for exits and submit them as one batch.
+
+        Reads quantities and stop/target levels straight from the portfolio
+        ledger and entry prices/bars from the tracking dicts, then lets
+        `scan_exits` decide with array comparisons. Returns the symbols whose
+        whole position is being closed; the step skips their strategies.
+        """
+        syms = list(self.cfg.symbols)
+        portfolio = self.broker.portfolio()
+        ledger = portfolio.ledger
+        n = len(syms)
+        slots = np.fromiter((ledger.index.get(s, -1) for s in syms), dtype=np.int64, count=n)
+        known = slots >= 0
+        entry_prices = self._position_entry_prices
+        entry_bars = self._position_entry_bars
+        exits = scan_exits(
+            syms,
+            qty=np.where(known, ledger.qty[slots], 0),
+            price=np.fromiter((prices[s] for s in syms), dtype=np.float64, count=n),
+            stop_loss=np.where(known, ledger.stop_loss[slots], np.nan),
+            take_profit=np.where(known, ledger.take_profit[slots], np.nan),
+            entry_price=np.fromiter(
+                (entry_prices.get(s, np.nan) for s in syms), dtype=np.float64, count=n
+            ),
+            bars_held=self.iteration - np.fromiter(
+                (entry_bars.get(s, self.iteration) for s in syms), dtype=np.int64, count=n
+            ),
+        )
+
+        exiting = set()
+        for ex in exits:
+            sym, px = ex.symbol, float(prices[ex.symbol])
+            qty = ex.qty or int(portfolio.get_position(sym).qty)
+            if qty <= 0:
+                continue
+            tag = {
+                "partial_tp": f"partial_tp:{ex.profit_pct:.1%}",
+                "time_exit": f"time_exit:{TIME_EXIT_BARS}bars",
+            }.get(ex.reason, ex.reason)
+            order = Order(
+                id=uuid.uuid4().hex,
+                ts=ts,
+                symbol=sym,
+                side="SELL",
+                qty=qty,
+                type="MARKET",
+                tag=tag,
+            )
+            res = self._submit_order(order)
+            if isinstance(res, OrderRejection):
+                rejections.append(res)
+                self.repo.log_order_rejected(order, reason=res.reason)
+            else:
+                fills.append(res)
+                self.repo.log_order_filled(order)
+                self.repo.log_fill(res)
+                if ex.closes_position:
+                    # BUG FIX #6: Use atomic clear method
+                    self._clear_position_entry(sym)
+                    if self.position_monitoring_enabled and sym in self.position_monitor.positions:
+                        self.position_monitor.remove_position(sym)
+            if not ex.closes_position:
+                continue
+
+            # BUG FIX #5: Mark as exited this iteration
+            self._exited_this_iteration.add(sym)
+            exiting.add(sym)
+            explanation: Dict[str, Any] = {"reason": ex.reason, "price": px}
+            if ex.level is not None:
+                explanation[ex.reason] = ex.level
+            else:
+                explanation["profit_pct"] = ex.profit_pct
+            dec = StrategyDecision(
+                signal=0,
+                confidence=1.0,
+                votes={"risk_exit": 0},
+                weights=self.ensemble.normalized(),
+                explanations={"risk_exit": explanation},
+            )
+            decisions[sym] = dec
+            signals[sym] = 0
+            self._log_decision(ts, sym, "risk_exit", dec)
+        return frozenset(exiting)
+
+    def prefetch(self) -> Dict[str, pd.DataFrame]:
+        """Fetch the next step's bars ahead of `step` (pass them as ``fetched``).
+
+        Starts the step's latency totals, so the fetch counts towards it.
+        """
+        self.timer.start_step()
+        return self._fetch_ohlcv()
+
+    def step(
+        self,
+        *,
+        now: datetime | None = None,
+        fetched: Dict[str, pd.DataFrame] | None = None,
+        flush: bool = True,
+    ) -> PaperEngineUpdate:
         """Execute one trading iteration (one bar per symbol).
         
         This method processes one bar for each configured symbol and:
         1. Fetches latest OHLCV data
-        2. Evaluates all trading strategies
-        3. Checks stop-loss, take-profit, and time-based exits
+        2. Scans all open positions for stop-loss, take-profit and time-based exits
+        3. Evaluates trading strategies for symbols that are not exiting
         4. Records all state to database
         
         BUG FIX #10: Iteration Concept Documentation
@@ -419,6 +773,9 @@ class PaperEngine:
         
         Args:
             now: Override timestamp for this bar (useful for testing)
+            fetched: Bars from `prefetch`; fetched here when omitted
+            flush: Flush batched DB writes before returning. A caller that
+                passes False (see `BarRunner`) flushes the repository itself.
             
         Returns:
             PaperEngineUpdate with orders, fills, portfolio snapshot, and metrics
@@ -428,23 +785,30 @@ class PaperEngine:
         
         self.iteration += 1
         ts = now or datetime.utcnow()
-
-        print(f"[{self.iteration}] Fetching data for {len(self.cfg.symbols)} symbols...", end="", flush=True)
-        bars = self.data.download_bars(
-            symbols=self.cfg.symbols,
-            period=self.cfg.period,
-            interval=self.cfg.interval,
-        )
-        print(" [OK]", flush=True)
+        if self.decision_log is not None:
+            self.decision_log.begin_step(ts)
+        if fetched is None:
+            self.timer.start_step()
+        step_t0 = self.timer.now()
+
+        if fetched is None:
+            print(
+                f"[{self.iteration}] Fetching data for {len(self.cfg.symbols)} symbols...",
+                end="",
+                flush=True,
+            )
+            fetched = self._fetch_ohlcv()
+            print(" [OK]", flush=True)
 
         # Normalize bars per symbol first (process in batches to reduce memory spikes).
+        stage_t0 = self.timer.now()
         ohlcv_by_symbol: Dict[str, pd.DataFrame] = {}
         prices: Dict[str, float] = {}
         batch_size = 10 if self.cfg.memory_mode else 20  # Smaller batches in memory_mode
         for i in range(0, len(self.cfg.symbols), batch_size):
             batch = self.cfg.symbols[i:i + batch_size]
             for sym in batch:
-                ohlcv = _normalize_ohlcv(bars, sym)
+                ohlcv = fetched[sym]
                 ohlcv_by_symbol[sym] = ohlcv
                 px = float(ohlcv["Close"].iloc[-1])
                 prices[sym] = px
@@ -461,10 +825,12 @@ class PaperEngine:
         # Calculate correlations and optimize allocations (Phase 19)
         if self.portfolio_optimization_enabled:
             self.portfolio_optimizer.calculate_correlations(list(prices.keys()))
+        self.timer.add("prepare", stage_t0)
         
         print(f"[{self.iteration}] Processing {len(ohlcv_by_symbol)} symbols...", end="", flush=True)
 
         # 1) Learning update from previous step (based on previous strategy signals).
+        stage_t0 = self.timer.now()
         if self.enable_learning and self._prev_prices is not None and self._prev_signals_by_symbol:
             rewards_sum = {name: 0.0 for name in self.strategies.keys()}
             n = 0
@@ -493,7 +859,10 @@ class PaperEngine:
                     note="weights_update",
                 )
 
+        self.timer.add("learning_update", stage_t0)
+
         # 2) Weekly bounded parameter tuning (opt-in).
+        stage_t0 = self.timer.now()
         if self.enable_learning and self.tune_weekly:
             tune = maybe_tune_weekly(
                 now=ts,
@@ -504,6 +873,9 @@ class PaperEngine:
             if tune.tuned:
                 self.params = tune.params
                 self.strategies = self._build_strategies(self.params)
+                # New strategy instances start with empty streaming state.
+                self._stream_last_ts.clear()
+                self._stream_outputs.clear()
                 # Ensure ensemble keeps all strategies.
                 for name in self.strategies.keys():
                     self.ensemble.weights.setdefault(name, 1.0)
@@ -515,18 +887,21 @@ class PaperEngine:
                     note=tune.note,
                 )
 
+        self.timer.add("tuning", stage_t0)
+
         # 3) Adaptive learning: market regime detection + strategy analysis
         # BUG FIX #1: Initialize regime_by_symbol from adaptive_decision
         regime_by_symbol: Dict[str, Dict] = {}
         if self.enable_learning:
             equity_series = pd.Series(self.equity_history) if self.equity_history else None
-            adaptive_decision = self.adaptive_controller.step(
-                ohlcv_by_symbol=ohlcv_by_symbol,
-                current_params=self.params,
-                trades=self.trade_history,
-                equity_series=equity_series,
-                now=ts,
-            )
+            with self.timer.span("regime"):
+                adaptive_decision = self.adaptive_controller.step(
+                    ohlcv_by_symbol=ohlcv_by_symbol,
+                    current_params=self.params,
+                    trades=self.trade_history,
+                    equity_series=equity_series,
+                    now=ts,
+                )
             
             # BUG FIX #1: Extract regime data from adaptive_decision
             if hasattr(adaptive_decision, 'regime_by_symbol'):
@@ -598,7 +973,7 @@ class PaperEngine:
                                 type="MARKET",
                                 tag=f"autocorrect:{correction.reason.replace(' ', '_')}",
                             )
-                            res = self.broker.submit_order(order)
+                            res = self._submit_order(order)
                             if isinstance(res, OrderRejection):
                                 rejections.append(res)
                             else:
@@ -612,7 +987,19 @@ class PaperEngine:
                             if correction.take_profit:
                                 pos.take_profit = correction.take_profit
 
+        # Exit scan: every open position at once, before any signal is computed.
+        with self.timer.span("exit_scan"):
+            exiting = self._run_exits(ts, prices, decisions, signals, fills, rejections)
+
+        # Compute phase: per-symbol signals, independent of broker state.
+        with self.timer.span("compute"):
+            signals_by_symbol = self._compute_signals(ohlcv_by_symbol, skip=exiting)
+
+        # Execute phase: symbols in configured order against the shared portfolio.
+        execute_t0 = self.timer.now()
         for sym in self.cfg.symbols:
+            if sym in exiting:
+                continue  # Closed by the exit scan; no strategy evaluation this bar
             ohlcv = ohlcv_by_symbol[sym]
             px = float(prices[sym])
             
@@ -633,20 +1020,15 @@ class PaperEngine:
                 )
 
             # Strategy outputs for explainability.
-            outputs: Dict[str, StrategyOutput] = {
-                name: strat.evaluate(ohlcv) for name, strat in self.strategies.items()
-            }
+            computed = signals_by_symbol[sym]
+            outputs = computed.outputs
             current_signals_by_symbol[sym] = {name: int(out.signal) for name, out in outputs.items()}
 
-            # Multi-level profit-taking and time-based exits
+            # Phase 21: Options Hedging - Protect profitable positions with puts/collars
             pos = self.broker.portfolio().get_position(sym)
             if pos.qty > 0 and sym in self._position_entry_prices:
                 entry_price = self._position_entry_prices[sym]
-                # BUG FIX #2: Use safe getter to prevent KeyError
-                bars_held = self.iteration - self._get_position_entry_bars(sym)
                 profit_pct = (px - entry_price) / entry_price if entry_price > 0 else 0
-                
-                # Phase 21: Options Hedging - Protect profitable positions with puts/collars
                 if self.hedging_enabled and profit_pct > 0.01 and sym not in self._hedged_positions:
                     try:
                         # Check if position should be hedged
@@ -681,133 +1063,6 @@ class PaperEngine:
                                       flush=True)
                     except Exception as e:
                         print(f"   [HEDGE] {sym}: Failed to create hedge - {e}", flush=True)
-                
-                # Multi-level take profit: exit 50% at +1.5% profit, 25% at +3%, close 25% at +5%
-                # BUG FIX #8: Prevent order spam - only one exit per symbol per iteration
-                if sym not in self._exited_this_iteration:
-                    take_profits = [
-                        (0.50, 0.015),  # 50% position at 1.5% profit
-                        (0.25, 0.030),  # 25% position at 3% profit (of remaining)
-                        (0.25, 0.050),  # 25% position at 5% profit (of remaining)
-                    ]
-                    
-                    for qty_pct, profit_threshold in take_profits:
-                        if profit_pct >= profit_threshold and pos.qty > 0:
-                            shares_to_exit = max(1, int(pos.qty * qty_pct))
-                            order = Order(
-                                id=uuid.uuid4().hex,
-                                ts=ts,
-                                symbol=sym,
-                                side="SELL",
-                                qty=shares_to_exit,
-                                type="MARKET",
-                                tag=f"partial_tp:{profit_pct:.1%}",
-                            )
-                            res = self.broker.submit_order(order)
-                            if not isinstance(res, OrderRejection):
-                                fills.append(res)
-                                self.repo.log_order_filled(order)
-                                self.repo.log_fill(res)
-                                pos = self.broker.portfolio().get_position(sym)  # Refresh
-                            break  # BUG FIX #8: Only one profit level per iteration
-                
-                # Time-based exit: close after 20 bars if no strong profit
-                if bars_held > 20 and profit_pct < 0.01 and pos.qty > 0:
-                    order = Order(
-                        id=uuid.uuid4().hex,
-                        ts=ts,
-                        symbol=sym,
-                        side="SELL",
-                        qty=int(pos.qty),
-                        type="MARKET",
-                        tag="time_exit:20bars",
-                    )
-                    res = self.broker.submit_order(order)
-                    if not isinstance(res, OrderRejection):
-                        fills.append(res)
-                        self.repo.log_order_filled(order)
-                        self.repo.log_fill(res)
-                        # BUG FIX #6: Use atomic clear method
-                        self._clear_position_entry(sym)
-                        # BUG FIX #5: Mark as exited this iteration
-                        self._exited_this_iteration.add(sym)
-
-            # Risk exits (stop-loss and take-profit)
-            pos = self.broker.portfolio().get_position(sym)
-            if pos.qty > 0:
-                if pos.stop_loss is not None and px <= float(pos.stop_loss):
-                    order = Order(
-                        id=uuid.uuid4().hex,
-                        ts=ts,
-                        symbol=sym,
-                        side="SELL",
-                        qty=int(pos.qty),
-                        type="MARKET",
-                        tag="stop_loss",
-                    )
-                    res = self.broker.submit_order(order)
-                    if isinstance(res, OrderRejection):
-                        rejections.append(res)
-                        self.repo.log_order_rejected(order, reason=res.reason)
-                    else:
-                        fills.append(res)
-                        self.repo.log_order_filled(order)
-                        self.repo.log_fill(res)
-
-                    dec = StrategyDecision(
-                        signal=0,
-                        confidence=1.0,
-                        votes={"risk_exit": 0},
-                        weights=self.ensemble.normalized(),
-                        explanations={
-                            "risk_exit": {
-                                "reason": "stop_loss",
-                                "stop_loss": float(pos.stop_loss),
-                                "price": float(px),
-                            }
-                        },
-                    )
-                    decisions[sym] = dec
-                    signals[sym] = 0
-                    self.repo.log_strategy_decision(ts=ts, symbol=sym, mode="risk_exit", decision=dec)
-                    continue
-
-                if pos.take_profit is not None and px >= float(pos.take_profit):
-                    order = Order(
-                        id=uuid.uuid4().hex,
-                        ts=ts,
-                        symbol=sym,
-                        side="SELL",
-                        qty=int(pos.qty),
-                        type="MARKET",
-                        tag="take_profit",
-                    )
-                    res = self.broker.submit_order(order)
-                    if isinstance(res, OrderRejection):
-                        rejections.append(res)
-                        self.repo.log_order_rejected(order, reason=res.reason)
-                    else:
-                        fills.append(res)
-                        self.repo.log_order_filled(order)
-                        self.repo.log_fill(res)
-
-                    dec = StrategyDecision(
-                        signal=0,
-                        confidence=1.0,
-                        votes={"risk_exit": 0},
-                        weights=self.ensemble.normalized(),
-                        explanations={
-                            "risk_exit": {
-                                "reason": "take_profit",
-                                "take_profit": float(pos.take_profit),
-                                "price": float(px),
-                            }
-                        },
-                    )
-                    decisions[sym] = dec
-                    signals[sym] = 0
-                    self.repo.log_strategy_decision(ts=ts, symbol=sym, mode="risk_exit", decision=dec)
-                    continue
 
             # Choose decision mode.
             mode = self.strategy_mode
@@ -839,21 +1094,12 @@ class PaperEngine:
                 )
 
             # ML Signal Integration (Phase 16)
-            # Train ML model if enough data available
-            if self.ml_enabled and sym not in self._ml_trained_symbols and len(ohlcv) >= 50:
+            # Model training and prediction ran in the compute phase.
+            ml_signal = computed.ml_signal
+            if computed.ml_error:
+                print(f"[ML] Prediction error for {sym}: {computed.ml_error}")
+            if ml_signal is not None:
                 try:
-                    self.ml_manager.train_symbol(sym, ohlcv)
-                    self._ml_trained_symbols.add(sym)
-                    print(f"[ML] Model trained for {sym}")
-                except Exception as e:
-                    print(f"[ML] Training failed for {sym}: {e}")
-            
-            # Get ML prediction if available
-            ml_signal = None
-            if self.ml_enabled and sym in self._ml_trained_symbols and len(ohlcv) >= 20:
-                try:
-                    ml_signal = self.ml_manager.predict_signal(sym, ohlcv)
-                    
                     # Blend ML signal with ensemble decision
                     # ML acts as a filter: reduce confidence if ML disagrees
                     ml_agrees = (dec.signal == 1 and ml_signal.is_buy_signal(0.5)) or \
@@ -881,7 +1127,7 @@ class PaperEngine:
 
             decisions[sym] = dec
             signals[sym] = int(dec.signal)
-            self.repo.log_strategy_decision(ts=ts, symbol=sym, mode=mode, decision=dec)
+            self._log_decision(ts, sym, mode, dec)
             
             # Multi-Timeframe Signal Validation (Phase 26)
             # Feed signal to MTF validator and check confirmation
@@ -963,6 +1209,7 @@ class PaperEngine:
 
             # Execute to target position (long/flat).
             if confirmed_signal and pos.qty == 0:
+                sizing_t0 = self.timer.now()
                 # Volatility-based stops: higher volatility = wider stops (give winning trades more room)
                 ohlcv = ohlcv_by_symbol[sym]
                 returns = ohlcv['Close'].pct_change().dropna()
@@ -1033,20 +1280,8 @@ class PaperEngine:
                     # Update risk sizer state
                     sharpe, max_dd, win_rate, num_trades, pnl = self._calculate_metrics()
                     
-                    # Get consecutive win/loss counts
-                    consecutive_wins = 0
-                    consecutive_losses = 0
-                    if self.trade_history:
-                        for trade in reversed(self.trade_history):
-                            if trade.get("pnl", 0) > 0:
-                                consecutive_wins += 1
-                            else:
-                                break
-                        for trade in reversed(self.trade_history):
-                            if trade.get("pnl", 0) <= 0:
-                                consecutive_losses += 1
-                            else:
-                                break
+                    consecutive_wins = self.online_metrics.consecutive_wins
+                    consecutive_losses = self.online_metrics.consecutive_losses
                     
                     # Get current volatility
                     ohlcv = ohlcv_by_symbol[sym]
@@ -1071,6 +1306,7 @@ class PaperEngine:
                     shares = int(shares * risk_mult)
                     risk_level = self.risk_sizer.get_risk_level()
                     print(f"   [RISK] {sym}: Risk level {risk_level}, mult {risk_mult:.2f}x", flush=True)
+                self.timer.add("sizing", sizing_t0)
 
                 if shares > 0:
                     order = Order(
@@ -1082,7 +1318,7 @@ class PaperEngine:
                         type="MARKET",
                         tag=f"signal_long:{mode}",
                     )
-                    res = self.broker.submit_order(order)
+                    res = self._submit_order(order)
                     if isinstance(res, OrderRejection):
                         rejections.append(res)
                         self.repo.log_order_rejected(order, reason=res.reason)
@@ -1121,7 +1357,7 @@ class PaperEngine:
                     type="MARKET",
                     tag=f"signal_flat:{mode}",
                 )
-                res = self.broker.submit_order(order)
+                res = self._submit_order(order)
                 if isinstance(res, OrderRejection):
                     rejections.append(res)
                     self.repo.log_order_rejected(order, reason=res.reason)
@@ -1140,17 +1376,18 @@ class PaperEngine:
                     # Phase 24: Remove position from monitor when closed
                     if self.position_monitoring_enabled and sym in self.position_monitor.positions:
                         self.position_monitor.remove_position(sym)
+        self.timer.add("execute", execute_t0)
 
         self.repo.log_snapshot(ts=ts, portfolio=self.broker.portfolio(), prices=prices)
 
         # Track equity and trades for learning
         eq = self.broker.portfolio().equity(self.broker.prices())
-        self.equity_history.append(float(eq))
+        self.online_metrics.record_equity(float(eq))
         
         # Track completed trades for analysis
         for fill in fills:
             # Simple trade tracking: BUY at fill.price, will be matched with SELL later
-            self.trade_history.append({
+            self.online_metrics.record_trade({
                 "symbol": fill.symbol,
                 "side": fill.side,
                 "qty": fill.qty,
@@ -1224,14 +1461,36 @@ class PaperEngine:
                 iteration=self.iteration,
                 portfolio=self.broker.portfolio(),
                 prices=prices,
-                equity_history=self.equity_history,
-                trade_history=self.trade_history,
+                metrics=self.online_metrics,
                 fills=fills,
                 rejections=rejections,
             )
             # Print real-time metrics summary
             self.metrics_collector.print_status()
 
+        if self.decision_log is not None:
+            self.decision_log.end_step()
+
+        if flush and hasattr(self.repo, "flush"):
+            # Batched writes: one commit for everything this step logged.
+            self.repo.flush()
+
+        self.timer.add("step", step_t0)
+        stage_latency = self.timer.step_totals_ms()
+        if self.timer.enabled:
+            fetch_ms = stage_latency.get("fetch", 0.0) + stage_latency.get("normalize", 0.0)
+            order_ms = stage_latency.get("order_submit", 0.0)
+            self.latency_optimizer.record_metrics(
+                data_fetch_ms=fetch_ms,
+                analysis_ms=max(stage_latency.get("step", 0.0) - fetch_ms - order_ms, 0.0),
+                order_ms=order_ms,
+            )
+            if self.cfg.latency_snapshot_path:
+                try:
+                    self.timer.publish(self.cfg.latency_snapshot_path)
+                except OSError as e:
+                    print(f"[WARN] Could not publish stage latency: {e}", flush=True)
+
         return PaperEngineUpdate(
             ts=ts,
             iteration=self.iteration,
@@ -1247,8 +1506,23 @@ class PaperEngine:
             win_rate=win_rate,
             num_trades=num_trades,
             current_pnl=pnl,
+            stage_latency_ms=stage_latency,
+            latency_ms=self.timer.snapshot(),
         )
 
+    def close(self) -> None:
+        """Shut down the compute and ML training worker pools."""
+        for service in (self._compute_pool, self._ml_training):
+            if service is not None:
+                service.close()
+        self._ml_training = None
+
+    def __enter__(self) -> "PaperEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
 def run_paper_engine(
     *,
@@ -1257,15 +1531,14 @@ def run_paper_engine(
 ) -> Iterator[PaperEngineUpdate]:
     """Run paper trading loop (with sleeping) and yield updates."""
 
-    engine = PaperEngine(cfg=cfg, provider=provider)
-
-    while True:
-        if cfg.iterations > 0 and engine.iteration >= cfg.iterations:
-            break
+    with PaperEngine(cfg=cfg, provider=provider) as engine:
+        while True:
+            if cfg.iterations > 0 and engine.iteration >= cfg.iterations:
+                break
 
-        yield engine.step()
+            yield engine.step()
 
-        if cfg.iterations > 0 and engine.iteration >= cfg.iterations:
-            break
+            if cfg.iterations > 0 and engine.iteration >= cfg.iterations:
+                break
 
-        time.sleep(max(0.0, float(cfg.sleep_seconds)))
+            time.sleep(max(0.0, float(cfg.sleep_seconds)))
@@ -0,0 +1,135 @@
+"""Parallel per-symbol signal computation for `PaperEngine.step`.
+
+A paper step has two phases. The compute phase evaluates strategies and ML
+predictions for each symbol; it reads only that symbol's bars, never broker
+state. The execute phase then walks the symbols in configured order and
+submits orders against the shared portfolio.
+
+`SignalComputePool` runs the compute phase over contiguous symbol shards on a
+thread or process pool. Each shard is processed in order and the results are
+merged by symbol, so the decisions do not depend on the worker count.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from trading_bot.strategy.base import StrategyOutput
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class SymbolSignals:
+    """Compute-phase result for one symbol."""
+
+    outputs: Dict[str, StrategyOutput]
+    ml_signal: Optional[Any] = None
+    ml_error: str = ""
+
+
+def shard(symbols: Sequence[str], n: int) -> List[List[str]]:
+    """Split ``symbols`` into at most ``n`` contiguous, near-equal shards."""
+    n = max(1, min(int(n), len(symbols)))
+    size, extra = divmod(len(symbols), n)
+    out, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        out.append(list(symbols[start:end]))
+        start = end
+    return [s for s in out if s]
+
+
+def evaluate_shard(
+    strategies: Mapping[str, Any],
+    items: Sequence[Tuple[str, pd.DataFrame]],
+) -> Dict[str, Dict[str, StrategyOutput]]:
+    """Run every strategy's ``evaluate`` on each (symbol, ohlcv) pair.
+
+    Module-level so a process pool can pickle it.
+    """
+    return {
+        sym: {name: strat.evaluate(ohlcv) for name, strat in strategies.items()}
+        for sym, ohlcv in items
+    }
+
+
+class SignalComputePool:
+    """Runs per-symbol work over symbol shards on persistent pools.
+
+    In-process work (anything touching engine state, such as streaming
+    strategy state or ML models) always runs on threads. With
+    ``executor="process"``, stateless strategy evaluation is sent to worker
+    processes instead.
+    """
+
+    def __init__(self, workers: int, executor: str = "thread") -> None:
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+        self.workers = max(1, int(workers))
+        self.executor = executor
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._procs: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="signal-compute"
+            )
+        return self._threads
+
+    def _eval_pool(self) -> Executor:
+        if self.executor != "process":
+            return self._thread_pool()
+        if self._procs is None:
+            self._procs = ProcessPoolExecutor(max_workers=self.workers)
+        return self._procs
+
+    def map_symbols(self, fn: Callable[[str], Any], symbols: Sequence[str]) -> Dict[str, Any]:
+        """``{sym: fn(sym)}`` computed in-process; exceptions propagate."""
+        if not self.parallel or len(symbols) < 2:
+            return {sym: fn(sym) for sym in symbols}
+        pool = self._thread_pool()
+        futures = [
+            pool.submit(lambda part: [(s, fn(s)) for s in part], part)
+            for part in shard(symbols, self.workers)
+        ]
+        merged = dict(pair for fut in futures for pair in fut.result())
+        return {sym: merged[sym] for sym in symbols}
+
+    def evaluate(
+        self,
+        strategies: Mapping[str, Any],
+        ohlcv_by_symbol: Mapping[str, pd.DataFrame],
+        symbols: Sequence[str],
+    ) -> Dict[str, Dict[str, StrategyOutput]]:
+        """Stateless strategy evaluation, on worker processes when configured."""
+        if not self.parallel or len(symbols) < 2:
+            return evaluate_shard(strategies, [(s, ohlcv_by_symbol[s]) for s in symbols])
+        pool = self._eval_pool()
+        futures = [
+            pool.submit(evaluate_shard, strategies, [(s, ohlcv_by_symbol[s]) for s in part])
+            for part in shard(symbols, self.workers)
+        ]
+        merged: Dict[str, Dict[str, StrategyOutput]] = {}
+        for fut in futures:
+            merged.update(fut.result())
+        return {sym: merged[sym] for sym in symbols}
+
+    def close(self) -> None:
+        for pool in (self._threads, self._procs):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._threads = None
+        self._procs = None
@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 import logging
 
+from trading_bot.performance.stage_timer import default_timer, read_published, snapshot_path
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -82,6 +84,22 @@ def info():
     }), 200
 
 
+@app.route('/latency', methods=['GET'])
+def latency():
+    """Per-stage trading loop latency (ms): count, mean, p50, p90, p99, max
+
+    Served from the snapshot the engine publishes after each step; this API
+    runs in its own process. Falls back to this process's timer when no
+    engine has published yet.
+    """
+    body = read_published(snapshot_path())
+    if body is None:
+        body = {**default_timer.to_dict(), 'published_at': None}
+    body['source'] = 'engine' if body['published_at'] else 'local'
+    body['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(body), 200
+
+
 @app.route('/ready', methods=['GET'])
 def ready():
     """Readiness check - services are ready to receive traffic"""
@@ -1,20 +1,15 @@
 from __future__ import annotations
 
-import hashlib
 import logging
-import numpy as np
-import threading
 
+import numpy as np
 import pandas as pd
 from ta.momentum import RSIIndicator
 from ta.trend import MACD, SMAIndicator
 
-logger = logging.getLogger(__name__)
+from trading_bot.indicators.cache import INDICATOR_COLUMNS, IndicatorCache, indicator_cache
 
-# OPTIMIZATION: Cache computed indicators to avoid recalculation
-_indicator_cache: dict[str, pd.DataFrame] = {}
-_cache_lock = threading.Lock()  # Thread-safe access to cache
-_cache_max_size = 50  # Prevent unbounded memory growth
+logger = logging.getLogger(__name__)
 
 # PRIORITY 1: Numba JIT compilation for 50-100x faster indicators
 _numba_available = False
@@ -69,6 +64,27 @@ except ImportError:
     logger.debug("Numba not available. Run: pip install numba")
 
 
+def _compute_columns(
+    close: pd.Series,
+    *,
+    rsi_period: int,
+    macd_fast: int,
+    macd_slow: int,
+    macd_signal: int,
+    sma_fast: int,
+    sma_slow: int,
+) -> dict[str, np.ndarray]:
+    macd = MACD(close=close, window_fast=macd_fast, window_slow=macd_slow, window_sign=macd_signal)
+    return {
+        "rsi": RSIIndicator(close=close, window=rsi_period).rsi().to_numpy(),
+        "macd": macd.macd().to_numpy(),
+        "macd_signal": macd.macd_signal().to_numpy(),
+        "macd_diff": macd.macd_diff().to_numpy(),
+        "sma_fast": SMAIndicator(close=close, window=sma_fast).sma_indicator().to_numpy(),
+        "sma_slow": SMAIndicator(close=close, window=sma_slow).sma_indicator().to_numpy(),
+    }
+
+
 def add_indicators(
     df: pd.DataFrame,
     *,
@@ -79,45 +95,48 @@ def add_indicators(
     macd_signal: int = 9,
     sma_fast: int = 20,
     sma_slow: int = 50,
+    symbol: str | None = None,
+    interval: str | None = None,
+    cache: IndicatorCache | None = indicator_cache,
 ) -> pd.DataFrame:
+    """Return a copy of ``df`` with RSI, MACD and SMA columns added.
+
+    Results are memoized in ``cache`` (the process-wide `indicator_cache` by
+    default; pass ``None`` to bypass it). ``symbol`` and ``interval`` are
+    optional but let a growing series reuse its previous result and only
+    compute the appended bars.
+    """
     if close_col not in df.columns:
         raise ValueError(f"Missing required column: {close_col}")
-    
-    # OPTIMIZATION: Hash last 50 rows to create cache key (25% smaller cache)
-    # Skip expensive indicator calculation if we've computed this exact data before
-    cache_key = None
-    try:
-        df_tail = df.tail(50).to_string()
-        cache_key = hashlib.sha256(df_tail.encode()).hexdigest()
-        
-        with _cache_lock:
-            if cache_key in _indicator_cache:
-                # Return cached result
-                return _indicator_cache[cache_key]
-    except Exception as e:
-        logger.debug(f"Cache key generation failed: {e}")
-        cache_key = None
-
-    out = df.copy()
-    close = out[close_col]
-
-    out["rsi"] = RSIIndicator(close=close, window=rsi_period).rsi()
 
-    macd = MACD(close=close, window_fast=macd_fast, window_slow=macd_slow, window_sign=macd_signal)
-    out["macd"] = macd.macd()
-    out["macd_signal"] = macd.macd_signal()
-    out["macd_diff"] = macd.macd_diff()
+    params = (
+        int(rsi_period),
+        int(macd_fast),
+        int(macd_slow),
+        int(macd_signal),
+        int(sma_fast),
+        int(sma_slow),
+    )
 
-    out["sma_fast"] = SMAIndicator(close=close, window=sma_fast).sma_indicator()
-    out["sma_slow"] = SMAIndicator(close=close, window=sma_slow).sma_indicator()
+    def compute(close: pd.Series) -> dict[str, np.ndarray]:
+        return _compute_columns(
+            close,
+            rsi_period=params[0],
+            macd_fast=params[1],
+            macd_slow=params[2],
+            macd_signal=params[3],
+            sma_fast=params[4],
+            sma_slow=params[5],
+        )
 
-    # OPTIMIZATION: Cache computed result for next identical OHLCV data (thread-safe)
-    if cache_key is not None:
-        with _cache_lock:
-            if len(_indicator_cache) >= _cache_max_size:
-                # Simple FIFO eviction when cache is full
-                oldest_key = next(iter(_indicator_cache))
-                del _indicator_cache[oldest_key]
-            _indicator_cache[cache_key] = out
+    close = df[close_col]
+    if cache is None or close.empty:
+        columns = compute(close)
+    else:
+        series = (symbol, interval, close_col, params)
+        columns = cache.get_or_compute(series, close, params, compute)
 
+    out = df.copy()
+    for name in INDICATOR_COLUMNS:
+        out[name] = columns[name]
     return out
@@ -0,0 +1,211 @@
+"""Shared, parameter-aware cache for `add_indicators`.
+
+Entries are keyed on everything that determines the result:
+
+* the series identity: ``(symbol, interval, close_col, params)``
+* the data: last timestamp, row count and a fingerprint of the close
+  column and index
+
+So calls with different windows or different histories can never collide.
+The fingerprint is a BLAKE2 digest of the raw array bytes, which is much
+cheaper than stringifying the frame.
+
+Only the indicator columns are stored, not the caller's frame. A hit copies
+the caller's frame and attaches the cached columns, so callers cannot mutate
+a shared entry.
+
+When a frame extends a cached one by a few bars (same prefix, more rows), only
+the new bars are computed. This uses the streaming indicators, which reproduce
+the `ta` values exactly. The cache is bounded by an approximate byte budget and
+evicts least-recently-used entries first.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trading_bot.indicators.streaming import RollingMean, StreamingMACD, StreamingRSI
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_COLUMNS = ("rsi", "macd", "macd_signal", "macd_diff", "sma_fast", "sma_slow")
+
+# (rsi_period, macd_fast, macd_slow, macd_signal, sma_fast, sma_slow)
+Params = Tuple[int, int, int, int, int, int]
+
+
+def fingerprint(close: np.ndarray, index: pd.Index) -> bytes:
+    """Digest of the close values and index labels."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(close).tobytes())
+    if isinstance(index, pd.DatetimeIndex):
+        h.update(index.asi8.tobytes())
+    elif index.dtype.kind in "iuf":
+        h.update(np.ascontiguousarray(index.to_numpy()).tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    return h.digest()
+
+
+class _IndicatorState:
+    """Streaming indicator state positioned after the last cached bar."""
+
+    def __init__(self, params: Params) -> None:
+        rsi_period, macd_fast, macd_slow, macd_signal, sma_fast, sma_slow = params
+        self.rsi = StreamingRSI(rsi_period)
+        self.macd = StreamingMACD(macd_fast, macd_slow, macd_signal)
+        self.sma_fast = RollingMean(sma_fast)
+        self.sma_slow = RollingMean(sma_slow)
+
+    def feed(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        n = len(close)
+        cols = {name: np.empty(n, dtype=np.float64) for name in INDICATOR_COLUMNS}
+        for i, c in enumerate(close.tolist()):
+            cols["rsi"][i] = self.rsi.update(c)
+            self.macd.update(c)
+            cols["macd"][i] = self.macd.macd
+            cols["macd_signal"][i] = self.macd.signal
+            cols["macd_diff"][i] = self.macd.diff
+            cols["sma_fast"][i] = self.sma_fast.update(c)
+            cols["sma_slow"][i] = self.sma_slow.update(c)
+        return cols
+
+
+@dataclass
+class _Entry:
+    close: np.ndarray
+    index: pd.Index
+    columns: Dict[str, np.ndarray]
+    nbytes: int
+    state: Optional[_IndicatorState] = field(default=None, repr=False)
+
+
+class IndicatorCache:
+    """Byte-bounded LRU of indicator columns with incremental extension."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = int(max_bytes)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._latest: Dict[Hashable, Hashable] = {}  # series -> newest entry key
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "extensions": self.extensions,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.extensions = self.evictions = 0
+
+    def get_or_compute(
+        self,
+        series: Hashable,
+        close: pd.Series,
+        params: Params,
+        compute,
+    ) -> Dict[str, np.ndarray]:
+        """Return indicator columns for ``close``.
+
+        ``compute(close)`` is the full (vectorized) computation used on a miss
+        that cannot be served by extending a cached prefix.
+        """
+        values = close.to_numpy()
+        index = close.index
+        last = index[-1] if len(index) else None
+        key = (series, last, len(values), fingerprint(values, index))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.columns
+            base_key = self._latest.get(series)
+            base = self._entries.get(base_key) if base_key is not None else None
+
+        columns = None
+        state = None
+        if base is not None and self._extends(base, values, index):
+            columns, state = self._extend(base, values, params)
+        if columns is None:
+            columns = compute(close)
+
+        nbytes = sum(a.nbytes for a in columns.values()) + values.nbytes + index.memory_usage()
+        new = _Entry(close=values, index=index, columns=columns, nbytes=int(nbytes), state=state)
+        with self._lock:
+            if state is not None:
+                self.extensions += 1
+            else:
+                self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = new
+                self._bytes += new.nbytes
+                self._latest[series] = key
+                self._evict()
+        return columns
+
+    @staticmethod
+    def _extends(base: _Entry, values: np.ndarray, index: pd.Index) -> bool:
+        m = len(base.close)
+        if not 0 < m < len(values):
+            return False
+        # The streaming recursions are float64; other dtypes take the full path.
+        if values.dtype != np.float64 or not np.isfinite(values[m:]).all():
+            return False
+        return bool(
+            np.array_equal(base.close, values[:m]) and base.index.equals(index[:m])
+        )
+
+    @staticmethod
+    def _extend(
+        base: _Entry, values: np.ndarray, params: Params
+    ) -> Tuple[Optional[Dict[str, np.ndarray]], Optional[_IndicatorState]]:
+        if not np.isfinite(base.close).all():
+            return None, None
+        state = base.state
+        if state is None:
+            state = _IndicatorState(params)
+            state.feed(base.close)
+            base.state = state
+        state = copy.deepcopy(state)
+        tail = state.feed(values[len(base.close):])
+        columns = {
+            name: np.concatenate([base.columns[name], tail[name]]) for name in INDICATOR_COLUMNS
+        }
+        return columns, state
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+            if self._latest.get(key[0]) == key:
+                del self._latest[key[0]]
+
+
+indicator_cache = IndicatorCache()
@@ -0,0 +1,314 @@
+"""Incremental (streaming) indicators with O(1) work per bar.
+
+Each class consumes one observation at a time and keeps only the state it
+needs, so the cost of a new bar does not grow with the length of the session.
+
+The update rules deliberately mirror the arithmetic used by pandas and `ta`
+(exponentially weighted means with ``adjust=False``, compensated rolling sums,
+Wilder-smoothed ATR seeded with a simple mean).  Feeding a series through these
+objects produces the same values as the vectorized indicators used by the
+strategies' ``evaluate`` path, which lets callers swap one for the other.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, List, Tuple
+
+import numpy as np
+
+NAN = float("nan")
+
+
+def _is_nan(x: float) -> bool:
+    return x != x
+
+
+class StreamingEMA:
+    """Exponentially weighted mean matching ``Series.ewm(..., adjust=False).mean()``.
+
+    Exactly one of ``span`` or ``alpha`` must be given.  Values are NaN until
+    ``min_periods`` non-NaN observations have been seen; NaN inputs are carried
+    through the recursion the same way pandas does with ``ignore_na=False``.
+    """
+
+    def __init__(
+        self,
+        *,
+        span: float | None = None,
+        alpha: float | None = None,
+        min_periods: int = 0,
+    ) -> None:
+        if (span is None) == (alpha is None):
+            raise ValueError("Pass exactly one of span or alpha")
+        if span is not None:
+            if span < 1:
+                raise ValueError("span must be >= 1")
+            com = (float(span) - 1) / 2
+        else:
+            if not 0 < float(alpha) <= 1:
+                raise ValueError("alpha must satisfy 0 < alpha <= 1")
+            com = (1 - float(alpha)) / float(alpha)
+
+        self._alpha = 1.0 / (1.0 + com)
+        self._old_wt_factor = 1.0 - self._alpha
+        self._com_is_one = com == 1
+        self.min_periods = max(int(min_periods), 1)
+        self.reset()
+
+    def reset(self) -> None:
+        self._weighted = NAN
+        self._old_wt = 1.0
+        self._nobs = 0
+        self._started = False
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        is_obs = not _is_nan(x)
+        if not self._started:
+            self._started = True
+            self._weighted = x
+        elif not _is_nan(self._weighted):
+            self._old_wt *= self._old_wt_factor
+            if is_obs:
+                if self._weighted != x:
+                    old_wt = self._old_wt
+                    new_wt = 1.0 - old_wt if self._com_is_one else self._alpha
+                    self._weighted = (old_wt * self._weighted + new_wt * x) / (old_wt + new_wt)
+                self._old_wt = 1.0
+        elif is_obs:
+            self._weighted = x
+
+        self._nobs += int(is_obs)
+        self.value = self._weighted if self._nobs >= self.min_periods else NAN
+        return self.value
+
+
+class StreamingRSI:
+    """Wilder RSI matching ``ta.momentum.RSIIndicator(close, window).rsi()``."""
+
+    def __init__(self, window: int = 14) -> None:
+        self.window = int(window)
+        self._up = StreamingEMA(alpha=1.0 / self.window, min_periods=self.window)
+        self._down = StreamingEMA(alpha=1.0 / self.window, min_periods=self.window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._up.reset()
+        self._down.reset()
+        self._prev_close = NAN
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        diff = close - self._prev_close
+        self._prev_close = close
+
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else -0.0
+        emaup = self._up.update(up)
+        emadn = self._down.update(down)
+
+        if emadn == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - (100.0 / (1.0 + emaup / emadn))
+        return self.value
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram matching ``ta.trend.MACD``."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self._fast = StreamingEMA(span=int(fast), min_periods=int(fast))
+        self._slow = StreamingEMA(span=int(slow), min_periods=int(slow))
+        self._signal = StreamingEMA(span=int(signal), min_periods=int(signal))
+        self.reset()
+
+    def reset(self) -> None:
+        self._fast.reset()
+        self._slow.reset()
+        self._signal.reset()
+        self.macd = NAN
+        self.signal = NAN
+        self.diff = NAN
+
+    def update(self, close: float) -> float:
+        """Consume one close and return the MACD histogram (``macd_diff``)."""
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        self.signal = self._signal.update(self.macd)
+        self.diff = self.macd - self.signal
+        return self.diff
+
+
+class StreamingATR:
+    """True-range ATR matching ``ta.volatility.AverageTrueRange``.
+
+    Like `ta`, the value is ``0.0`` until ``window`` bars have been seen, then
+    seeded with the mean true range and Wilder-smoothed afterwards.
+    """
+
+    def __init__(self, window: int = 14) -> None:
+        self.window = int(window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._prev_close = NAN
+        self._seed: List[float] = []
+        self._count = 0
+        self.value = 0.0
+
+    @staticmethod
+    def true_range(high: float, low: float, prev_close: float) -> float:
+        candidates = [high - low, abs(high - prev_close), abs(low - prev_close)]
+        valid = [c for c in candidates if not _is_nan(c)]
+        return max(valid) if valid else NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = self.true_range(float(high), float(low), self._prev_close)
+        self._prev_close = float(close)
+        self._count += 1
+
+        if self._count < self.window:
+            self._seed.append(tr)
+        elif self._count == self.window:
+            self._seed.append(tr)
+            self.value = float(np.asarray(self._seed, dtype=np.float64).sum() / self.window)
+            self._seed = []
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+        return self.value
+
+
+class _RollingExtreme:
+    """Sliding-window max/min over the last ``window`` values via a monotonic deque."""
+
+    _keep_max = True
+
+    def __init__(self, window: int) -> None:
+        if int(window) < 1:
+            raise ValueError("window must be >= 1")
+        self.window = int(window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._dq: Deque[Tuple[int, float]] = deque()
+        self._n = 0
+        self._nan_idx: Deque[int] = deque()
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        i = self._n
+        self._n += 1
+
+        if _is_nan(x):
+            self._nan_idx.append(i)
+        else:
+            dq = self._dq
+            if self._keep_max:
+                while dq and dq[-1][1] <= x:
+                    dq.pop()
+            else:
+                while dq and dq[-1][1] >= x:
+                    dq.pop()
+            dq.append((i, x))
+
+        oldest = i - self.window + 1
+        while self._dq and self._dq[0][0] < oldest:
+            self._dq.popleft()
+        while self._nan_idx and self._nan_idx[0] < oldest:
+            self._nan_idx.popleft()
+
+        # pandas requires a full window of non-NaN observations.
+        if self._n < self.window or self._nan_idx:
+            self.value = NAN
+        else:
+            self.value = self._dq[0][1]
+        return self.value
+
+
+class RollingMax(_RollingExtreme):
+    """Matches ``Series.rolling(window).max()``."""
+
+    _keep_max = True
+
+
+class RollingMin(_RollingExtreme):
+    """Matches ``Series.rolling(window).min()``."""
+
+    _keep_max = False
+
+
+class RollingMean:
+    """Simple moving average matching ``Series.rolling(window).mean()``.
+
+    Uses the same Kahan-compensated add/remove running sum as pandas so the
+    result is identical, not just close.
+    """
+
+    def __init__(self, window: int) -> None:
+        if int(window) < 1:
+            raise ValueError("window must be >= 1")
+        self.window = int(window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._buf: Deque[float] = deque()
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._nobs = 0
+        self._neg_ct = 0
+        self._same_ct = 0
+        self._prev = NAN
+        self.value = NAN
+
+    def _add(self, x: float) -> None:
+        if _is_nan(x):
+            return
+        self._nobs += 1
+        y = x - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg_ct += 1
+        if x == self._prev:
+            self._same_ct += 1
+        else:
+            self._same_ct = 1
+        self._prev = x
+
+    def _remove(self, x: float) -> None:
+        if _is_nan(x):
+            return
+        self._nobs -= 1
+        y = -x - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg_ct -= 1
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        self._buf.append(x)
+        if len(self._buf) > self.window:
+            self._remove(self._buf.popleft())
+        self._add(x)
+
+        if self._nobs >= self.window and self._nobs > 0:
+            result = self._sum / float(self._nobs)
+            if self._same_ct >= self._nobs:
+                result = self._prev
+            elif self._neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self._neg_ct == self._nobs and result > 0:
+                result = 0.0
+            self.value = result
+        else:
+            self.value = NAN
+        return self.value
@@ -6,7 +6,7 @@ This is the main brain of self-learning system.
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
@@ -14,7 +14,8 @@ import pandas as pd
 
 from trading_bot.learn.ensemble import ExponentialWeightsEnsemble
 from trading_bot.learn.metrics import PerformanceMetrics, calculate_metrics, score_performance
-from trading_bot.learn.regime import Regime, RegimeState, detect_regime, regime_adjusted_weights
+from trading_bot.learn.regime import Regime, regime_adjusted_weights
+from trading_bot.learn.regime_panel import RegimePanel, aggregate_regimes
 from trading_bot.learn.trade_analyzer import (
     StrategyAnalysis,
     analyze_recent_trades,
@@ -33,6 +34,7 @@ class AdaptiveDecision:
     performance: Optional[PerformanceMetrics]
     anomalies: list[str]
     explanation: Dict[str, Any]
+    regime_by_symbol: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
 
 class AdaptiveLearningController:
@@ -60,6 +62,8 @@ class AdaptiveLearningController:
         # OPTIMIZATION: Cache trade analysis to avoid recomputation
         self._last_trades_hash: int | None = None
         self._last_analysis_cache: dict | None = None
+        # Per-symbol regime buffers, fed only new bars each step
+        self.regime_panel = RegimePanel()
     
     def step(
         self,
@@ -84,31 +88,10 @@ class AdaptiveLearningController:
         """
         now = now or datetime.utcnow()
         
-        # 1. Detect market regime(s)
-        regime_states = {}
-        if ohlcv_by_symbol:
-            # Average regime across symbols
-            regimes = []
-            for sym, df in ohlcv_by_symbol.items():
-                if not df.empty:
-                    rs = detect_regime(df)
-                    regime_states[sym] = rs
-                    regimes.append(rs)
-            
-            # Use first as primary (could average)
-            primary_regime = regimes[0] if regimes else RegimeState(
-                regime=Regime.INSUFFICIENT_DATA,
-                confidence=0.0,
-                volatility=0.0,
-                trend_strength=0.0,
-            )
-        else:
-            primary_regime = RegimeState(
-                regime=Regime.INSUFFICIENT_DATA,
-                confidence=0.0,
-                volatility=0.0,
-                trend_strength=0.0,
-            )
+        # 1. Detect market regime(s): per symbol in one batch, then a
+        # breadth-weighted vote across the universe
+        regime_states = self.regime_panel.update(ohlcv_by_symbol or {})
+        primary_regime = aggregate_regimes(regime_states)
         
         # Update regime history
         self.regime_history.append((now, primary_regime.regime, primary_regime.confidence))
@@ -189,6 +172,10 @@ class AdaptiveLearningController:
             performance=performance,
             anomalies=anomalies,
             explanation=explanation,
+            regime_by_symbol={
+                sym: {"regime": rs.regime.value, "confidence": rs.confidence}
+                for sym, rs in regime_states.items()
+            },
         )
     
     def regime_summary(self) -> Dict[str, Any]:
@@ -7,7 +7,7 @@ import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Tuple, Callable, Any
+from typing import Dict, List, Optional, Tuple, Callable, Any, Union
 from datetime import datetime
 from enum import Enum
 import numpy as np
@@ -15,6 +15,8 @@ import pandas as pd
 from functools import lru_cache
 import threading
 
+from trading_bot.core.shared_panel import SharedOHLCVPanel
+
 logger = logging.getLogger(__name__)
 
 
@@ -98,6 +100,41 @@ class CalculationCache:
         }
 
 
+def _run_strategy(
+    strategy_name: str,
+    strategy_func: Callable,
+    market_data: Union[pd.DataFrame, SharedOHLCVPanel],
+    symbols: List[str],
+) -> StrategyResult:
+    """Run one strategy and time it; also the process-pool entry point.
+    
+    A shared panel is handed to the strategy as a zero-copy (field, symbol) frame.
+    """
+    start_time = time.time()
+    try:
+        if isinstance(market_data, SharedOHLCVPanel):
+            market_data = market_data.to_frame()
+        signal, confidence, metrics = strategy_func(market_data, symbols)
+        
+        return StrategyResult(
+            strategy_name=strategy_name,
+            signal=int(signal),
+            confidence=float(confidence),
+            execution_time_ms=(time.time() - start_time) * 1000,
+            metrics=metrics or {}
+        )
+    
+    except Exception as e:
+        logger.error(f"Strategy {strategy_name} execution failed: {e}")
+        return StrategyResult(
+            strategy_name=strategy_name,
+            signal=0,
+            confidence=0.0,
+            execution_time_ms=(time.time() - start_time) * 1000,
+            error=str(e)
+        )
+
+
 class ConcurrentStrategyExecutor:
     """Execute multiple strategies concurrently with intelligent coordination."""
     
@@ -117,23 +154,44 @@ class ConcurrentStrategyExecutor:
     def execute_strategies(
         self,
         strategies: Dict[str, Callable],
-        market_data: pd.DataFrame,
+        market_data: Union[pd.DataFrame, SharedOHLCVPanel],
         symbols: List[str]
     ) -> Dict[str, StrategyResult]:
-        """Execute multiple strategies concurrently."""
+        """Execute multiple strategies concurrently.
+        
+        With a process pool configured and a `SharedOHLCVPanel` as market data,
+        strategies (which must then be picklable) run in worker processes that
+        attach to the panel by name instead of receiving a pickled DataFrame.
+        """
         
         futures = {}
         results = {}
+        use_processes = self.process_executor is not None and isinstance(
+            market_data, SharedOHLCVPanel
+        )
         
         # Submit all strategies
         for strategy_name, strategy_func in strategies.items():
-            future = self.thread_executor.submit(
-                self._execute_single_strategy,
-                strategy_name,
-                strategy_func,
-                market_data,
-                symbols
-            )
+            if use_processes:
+                cached = self._cached_result(strategy_name, market_data, symbols)
+                if cached is not None:
+                    results[strategy_name] = cached
+                    continue
+                future = self.process_executor.submit(
+                    _run_strategy,
+                    strategy_name,
+                    strategy_func,
+                    market_data,
+                    symbols
+                )
+            else:
+                future = self.thread_executor.submit(
+                    self._execute_single_strategy,
+                    strategy_name,
+                    strategy_func,
+                    market_data,
+                    symbols
+                )
             futures[strategy_name] = future
         
         # Collect results
@@ -142,6 +200,8 @@ class ConcurrentStrategyExecutor:
                 result = future.result(timeout=self.config.timeout_seconds)
                 results[strategy_name] = result
                 self.strategy_results[strategy_name] = result
+                if use_processes and result.error is None and self.config.enable_caching:
+                    self.cache.set(self._cache_key(strategy_name, market_data, symbols), result)
             except asyncio.TimeoutError:
                 logger.warning(f"Strategy {strategy_name} timed out after {self.config.timeout_seconds}s")
                 results[strategy_name] = StrategyResult(
@@ -163,55 +223,54 @@ class ConcurrentStrategyExecutor:
         
         return results
     
+    @staticmethod
+    def _cache_key(
+        strategy_name: str,
+        market_data: Union[pd.DataFrame, SharedOHLCVPanel],
+        symbols: List[str]
+    ) -> str:
+        # A published panel is immutable, so its block name identifies the data;
+        # for frames use data shape and sum to avoid unhashable types
+        if isinstance(market_data, SharedOHLCVPanel):
+            data_hash = hash((market_data.name, market_data.values.shape, tuple(symbols)))
+        else:
+            data_hash = hash((market_data.shape, market_data['Close'].sum(), tuple(symbols)))
+        return f"{strategy_name}_{data_hash}"
+    
+    def _cached_result(
+        self,
+        strategy_name: str,
+        market_data: Union[pd.DataFrame, SharedOHLCVPanel],
+        symbols: List[str]
+    ) -> Optional[StrategyResult]:
+        if not self.config.enable_caching:
+            return None
+        cached = self.cache.get(
+            self._cache_key(strategy_name, market_data, symbols), self.config.cache_ttl_seconds
+        )
+        if cached is not None:
+            logger.debug(f"{strategy_name}: Cache hit")
+        return cached
+    
     def _execute_single_strategy(
         self,
         strategy_name: str,
         strategy_func: Callable,
-        market_data: pd.DataFrame,
+        market_data: Union[pd.DataFrame, SharedOHLCVPanel],
         symbols: List[str]
     ) -> StrategyResult:
         """Execute a single strategy with caching."""
-        start_time = time.time()
+        cached = self._cached_result(strategy_name, market_data, symbols)
+        if cached is not None:
+            return cached
         
-        # Check cache - use data shape and sum as key to avoid unhashable types
-        data_hash = hash((market_data.shape, market_data['Close'].sum(), tuple(symbols)))
-        cache_key = f"{strategy_name}_{data_hash}"
+        result = _run_strategy(strategy_name, strategy_func, market_data, symbols)
         
-        if self.config.enable_caching:
-            cached = self.cache.get(cache_key, self.config.cache_ttl_seconds)
-            if cached is not None:
-                logger.debug(f"{strategy_name}: Cache hit")
-                return cached
+        # Cache result
+        if self.config.enable_caching and result.error is None:
+            self.cache.set(self._cache_key(strategy_name, market_data, symbols), result)
         
-        # Execute strategy
-        try:
-            signal, confidence, metrics = strategy_func(market_data, symbols)
-            
-            execution_time = (time.time() - start_time) * 1000
-            
-            result = StrategyResult(
-                strategy_name=strategy_name,
-                signal=int(signal),
-                confidence=float(confidence),
-                execution_time_ms=execution_time,
-                metrics=metrics or {}
-            )
-            
-            # Cache result
-            if self.config.enable_caching:
-                self.cache.set(cache_key, result)
-            
-            return result
-        
-        except Exception as e:
-            logger.error(f"Strategy {strategy_name} execution failed: {e}")
-            return StrategyResult(
-                strategy_name=strategy_name,
-                signal=0,
-                confidence=0.0,
-                execution_time_ms=(time.time() - start_time) * 1000,
-                error=str(e)
-            )
+        return result
     
     def aggregate_signals(
         self,
@@ -0,0 +1,308 @@
+"""Incremental ML feature pipeline.
+
+`MLFeatureEngine.calculate_features` rebuilds every rolling feature over the
+full OHLCV history, even when only the last row is used. `SymbolFeatureState`
+produces the same feature row for one new bar from a fixed-size tail: ring
+buffers for the rolling windows (20-50 bars) and running sums for the EWMs.
+The cost per bar is therefore independent of history length.
+
+`FeaturePipeline` keeps one state per symbol. Each `sync(symbol, df)` feeds
+only the bars newer than the last one seen, and keeps the feature rows for
+training, so training and prediction share one feature build. A revised last
+bar (same timestamp, new values) is re-applied from a one-bar checkpoint. A
+history that no longer lines up is replayed from scratch.
+
+Values match `calculate_features` on the same history up to floating-point
+rounding.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Same names and order as MLFeatureEngine.calculate_features appends them.
+FEATURE_COLUMNS = (
+    "returns", "log_returns", "rsi_14", "rsi_7", "momentum_10", "momentum_20",
+    "sma_5", "sma_10", "sma_20", "ema_12", "ema_26", "macd", "macd_signal", "macd_diff",
+    "volatility_10", "volatility_20", "atr_14", "volume_sma_20", "volume_ratio",
+    "volume_change", "high_low_ratio", "close_range", "body_size", "upper_shadow",
+    "lower_shadow", "volatility_regime", "highest_20", "lowest_20", "position_in_range",
+    "returns_std_10", "returns_skew_20", "bb_middle", "bb_std", "bb_upper", "bb_lower",
+    "bb_position",
+)
+
+_NAN = float("nan")
+
+
+def lowercase_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with open/high/low/close/volume column names lower-cased."""
+    rename = {c: c.lower() for c in df.columns if isinstance(c, str) and c.lower() in OHLCV_COLUMNS}
+    out = df.rename(columns=rename) if any(k != v for k, v in rename.items()) else df
+    missing = [c for c in OHLCV_COLUMNS if c not in out.columns]
+    if missing:
+        raise ValueError(f"OHLCV frame missing columns: {missing}")
+    return out
+
+
+def _window(buf: deque, n: int) -> Optional[np.ndarray]:
+    """Last ``n`` values, or None if fewer are held or any is NaN (pandas min_periods)."""
+    if len(buf) < n:
+        return None
+    arr = np.fromiter(buf, dtype=np.float64, count=len(buf))[-n:]
+    if np.isnan(arr).any():
+        return None
+    return arr
+
+
+def _mean(buf: deque, n: int) -> float:
+    arr = _window(buf, n)
+    return _NAN if arr is None else float(arr.mean())
+
+
+def _std(buf: deque, n: int) -> float:
+    arr = _window(buf, n)
+    return _NAN if arr is None else float(arr.std(ddof=1))
+
+
+def _skew(buf: deque, n: int) -> float:
+    arr = _window(buf, n)
+    if arr is None:
+        return _NAN
+    d = arr - arr.mean()
+    m2 = float((d * d).mean())
+    if m2 <= 0.0:
+        return _NAN
+    m3 = float((d * d * d).mean())
+    return math.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+
+
+def _rsi(gains: deque, losses: deque, period: int) -> float:
+    gain = _mean(gains, period)
+    loss = _mean(losses, period)
+    if loss == 0.0:
+        loss = 1e-6
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+class _Ewm:
+    """pandas ``ewm(span=..., adjust=True).mean()`` as a running ratio."""
+
+    __slots__ = ("decay", "num", "den")
+
+    def __init__(self, span: int) -> None:
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.num = 0.0
+        self.den = 0.0
+
+    def update(self, x: float) -> float:
+        self.num = x + self.decay * self.num
+        self.den = 1.0 + self.decay * self.den
+        return self.num / self.den
+
+
+class SymbolFeatureState:
+    """Streaming feature state for one symbol; `update` is O(1) in history length."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.closes: deque = deque(maxlen=21)
+        self.returns: deque = deque(maxlen=20)
+        self.gains: deque = deque(maxlen=14)
+        self.losses: deque = deque(maxlen=14)
+        self.tr: deque = deque(maxlen=14)
+        self.volumes: deque = deque(maxlen=20)
+        self.vol20: deque = deque(maxlen=50)
+        self.prev_volume = _NAN
+        self.ema_12 = _Ewm(12)
+        self.ema_26 = _Ewm(26)
+        self.macd_signal = _Ewm(9)
+
+    def copy(self) -> "SymbolFeatureState":
+        other = SymbolFeatureState.__new__(SymbolFeatureState)
+        for name, value in self.__dict__.items():
+            if isinstance(value, deque):
+                value = deque(value, maxlen=value.maxlen)
+            elif isinstance(value, _Ewm):
+                ewm = _Ewm.__new__(_Ewm)
+                ewm.decay, ewm.num, ewm.den = value.decay, value.num, value.den
+                value = ewm
+            setattr(other, name, value)
+        return other
+
+    def update(self, o: float, hi: float, lo: float, c: float, v: float) -> np.ndarray:
+        """Feed one bar and return its feature row in `FEATURE_COLUMNS` order."""
+        prev_c = self.closes[-1] if self.closes else _NAN
+        self.count += 1
+        self.closes.append(c)
+
+        if prev_c == prev_c:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.float64(c) / np.float64(prev_c)
+                ret = float(ratio - 1.0)
+                log_ret = float(np.log(ratio))
+        else:
+            ret = log_ret = _NAN
+        self.returns.append(ret)
+
+        delta = c - prev_c
+        self.gains.append(delta if delta > 0 else 0.0)
+        self.losses.append(-delta if delta < 0 else 0.0)
+        rsi_14 = _rsi(self.gains, self.losses, 14)
+        rsi_7 = _rsi(self.gains, self.losses, 7)
+
+        n = len(self.closes)
+        momentum_10 = c - self.closes[-11] if n >= 11 else _NAN
+        momentum_20 = c - self.closes[-21] if n >= 21 else _NAN
+        sma_5 = _mean(self.closes, 5)
+        sma_10 = _mean(self.closes, 10)
+        sma_20 = _mean(self.closes, 20)
+
+        ema_12 = self.ema_12.update(c)
+        ema_26 = self.ema_26.update(c)
+        macd = ema_12 - ema_26
+        macd_signal = self.macd_signal.update(macd)
+
+        volatility_10 = _std(self.returns, 10)
+        volatility_20 = _std(self.returns, 20)
+        self.vol20.append(volatility_20)
+
+        tr = max(hi - lo, max(abs(hi - prev_c), abs(lo - prev_c))) if prev_c == prev_c else _NAN
+        self.tr.append(tr)
+        atr_14 = _mean(self.tr, 14)
+
+        self.volumes.append(v)
+        volume_sma_20 = _mean(self.volumes, 20)
+        denom = 1.0 if volume_sma_20 == 0 else volume_sma_20
+        volume_ratio = v / denom
+        pv = self.prev_volume
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volume_change = float(np.float64(v) / np.float64(pv) - 1.0) if pv == pv else _NAN
+        self.prev_volume = v
+
+        vol_regime_mean = _mean(self.vol20, 50)
+        volatility_regime = 1.0 if volatility_20 > vol_regime_mean else 0.0
+
+        window = _window(self.closes, 20)
+        highest_20 = float(window.max()) if window is not None else _NAN
+        lowest_20 = float(window.min()) if window is not None else _NAN
+        bb_std = _std(self.closes, 20)
+        bb_upper = sma_20 + bb_std * 2
+        bb_lower = sma_20 - bb_std * 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            high_low_ratio = float(np.float64(hi) / np.float64(lo))
+
+        return np.array(
+            [
+                ret, log_ret, rsi_14, rsi_7, momentum_10, momentum_20,
+                sma_5, sma_10, sma_20, ema_12, ema_26, macd, macd_signal, macd - macd_signal,
+                volatility_10, volatility_20, atr_14, volume_sma_20, volume_ratio,
+                volume_change, high_low_ratio, (c - lo) / (hi - lo + 1e-6), abs(c - o),
+                hi - max(o, c), min(o, c) - lo, volatility_regime, highest_20, lowest_20,
+                (c - lowest_20) / (highest_20 - lowest_20 + 1e-6),
+                volatility_10, _skew(self.returns, 20), sma_20, bb_std, bb_upper, bb_lower,
+                (c - bb_lower) / (bb_upper - bb_lower + 1e-6),
+            ],
+            dtype=np.float64,
+        )
+
+
+class _SymbolPipeline:
+    __slots__ = ("state", "checkpoint", "index", "rows", "last_bar")
+
+    def __init__(self) -> None:
+        self.state = SymbolFeatureState()
+        self.checkpoint: Optional[SymbolFeatureState] = None
+        self.index: List = []
+        self.rows: List[np.ndarray] = []
+        self.last_bar: Optional[tuple] = None
+
+    def feed(self, ts, bar: tuple) -> None:
+        self.checkpoint = self.state.copy()
+        self.rows.append(self.state.update(*bar))
+        self.index.append(ts)
+        self.last_bar = bar
+
+    def revise_last(self, bar: tuple) -> None:
+        self.state = self.checkpoint.copy()
+        self.rows[-1] = self.state.update(*bar)
+        self.last_bar = bar
+
+
+class FeaturePipeline:
+    """Per-symbol incremental feature builder shared by training and prediction."""
+
+    def __init__(self, max_rows: int = 5_000) -> None:
+        self.max_rows = int(max_rows)
+        self._symbols: Dict[str, _SymbolPipeline] = {}
+        self.bars_fed = 0
+        self.rebuilds = 0
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        if symbol is None:
+            self._symbols.clear()
+        else:
+            self._symbols.pop(symbol, None)
+
+    def sync(self, symbol: str, df: pd.DataFrame) -> None:
+        """Bring ``symbol``'s state up to the last bar of ``df``."""
+        df = lowercase_ohlcv(df)
+        if df.empty:
+            return
+        values = df[list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64)
+        index = df.index
+        pipe = self._symbols.get(symbol)
+
+        start = 0
+        if pipe is not None and pipe.index:
+            last_ts = pipe.index[-1]
+            pos = index.get_indexer([last_ts])[0] if index.is_unique else -1
+            if pos < 0:
+                pipe = None
+            else:
+                bar = tuple(values[pos])
+                if bar != pipe.last_bar:
+                    pipe.revise_last(bar)
+                start = pos + 1
+
+        if pipe is None:
+            pipe = self._symbols[symbol] = _SymbolPipeline()
+            self.rebuilds += 1
+            start = 0
+
+        for i in range(start, len(values)):
+            pipe.feed(index[i], tuple(values[i]))
+        self.bars_fed += len(values) - start
+
+        if len(pipe.rows) > self.max_rows:
+            drop = len(pipe.rows) - self.max_rows
+            del pipe.rows[:drop]
+            del pipe.index[:drop]
+
+    def latest(self, symbol: str, df: pd.DataFrame) -> pd.Series:
+        """Feature row for the last bar of ``df`` (OHLCV included, lower-case)."""
+        self.sync(symbol, df)
+        pipe = self._symbols[symbol]
+        base = lowercase_ohlcv(df).iloc[-1]
+        feats = pd.Series(pipe.rows[-1], index=FEATURE_COLUMNS, name=pipe.index[-1])
+        return pd.concat([base, feats])
+
+    def frame(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` (lower-case OHLCV) with feature columns for every row it shares with the state.
+
+        Rows older than the state's history come back as NaN.
+        """
+        self.sync(symbol, df)
+        pipe = self._symbols[symbol]
+        feats = pd.DataFrame(
+            np.vstack(pipe.rows), index=pd.Index(pipe.index), columns=FEATURE_COLUMNS
+        )
+        feats["volatility_regime"] = feats["volatility_regime"].astype(int)
+        base = lowercase_ohlcv(df)
+        return pd.concat([base, feats.reindex(base.index)], axis=1)
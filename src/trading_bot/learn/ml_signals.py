@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple, Dict, List
 from dataclasses import dataclass, field
 
+from trading_bot.learn.ml_features import FeaturePipeline, lowercase_ohlcv
+from trading_bot.learn.model_registry import UNIVERSE_KEY
+
 try:
     import xgboost as xgb
     XGBOOST_AVAILABLE = True
@@ -166,6 +169,8 @@ class MLModelTrainer:
         self.scaler: Optional[StandardScaler] = None
         self.feature_names: List[str] = []
         self.trained = False
+        self.metrics: Dict[str, float] = {}
+        self.version = "1.0"  # Registry version once saved (see ModelRegistry)
         
         if not XGBOOST_AVAILABLE:
             print("[ML] XGBoost not installed, using fallback signals")
@@ -206,23 +211,44 @@ class MLModelTrainer:
         
         return X, y, feature_cols
 
-    def train(self, df: pd.DataFrame, test_size: float = 0.2):
+    def train(
+        self,
+        df: pd.DataFrame,
+        test_size: float = 0.2,
+        features: Optional[pd.DataFrame] = None,
+    ):
         """
         Train XGBoost model
         
         Args:
             df: DataFrame with OHLCV data
             test_size: test set fraction
+            features: precomputed ``calculate_features`` output for ``df``
+                (e.g. from `FeaturePipeline.frame`); built here when omitted
         """
         if not XGBOOST_AVAILABLE:
             print("[ML] Cannot train: XGBoost not available")
             return
         
         # Calculate features
-        df_featured = MLFeatureEngine.calculate_features(df)
+        if features is None:
+            features = MLFeatureEngine.calculate_features(lowercase_ohlcv(df))
         
         # Prepare data
-        X, y, feature_names = self.prepare_training_data(df_featured)
+        X, y, feature_names = self.prepare_training_data(features)
+        self.fit(X, y, feature_names, test_size)
+
+    def fit(self, X: pd.DataFrame, y: pd.Series, feature_names: List[str], test_size: float = 0.2):
+        """
+        Fit the model on prepared samples (see `prepare_training_data`)
+        
+        Samples are split in order, so the last ``test_size`` fraction is
+        held out for evaluation.
+        """
+        if not XGBOOST_AVAILABLE:
+            print("[ML] Cannot train: XGBoost not available")
+            return
+        
         self.feature_names = feature_names
         
         if len(X) < 50:
@@ -266,72 +292,115 @@ class MLModelTrainer:
         test_score = self.model.score(X_test_scaled, y_test)
         
         self.trained = True
+        self.metrics = {
+            "train_acc": float(train_score),
+            "test_acc": float(test_score),
+            "samples": float(len(X)),
+        }
         print(f"[ML] Model trained: train_acc={train_score:.3f}, test_acc={test_score:.3f}")
 
-    def predict(self, df: pd.DataFrame) -> MLSignal:
+    def train_frames(self, frames: Dict[str, pd.DataFrame], test_size: float = 0.2):
+        """
+        Train one model on several symbols' feature frames
+        
+        Targets are built per symbol, then samples are merged in time order so
+        the held-out tail is the most recent period across all symbols.
+        
+        Args:
+            frames: symbol -> ``calculate_features`` output
+            test_size: test set fraction
+        """
+        parts = [self.prepare_training_data(df) for df in frames.values()]
+        if not parts:
+            return
+        X = pd.concat([p[0] for p in parts]).sort_index(kind="stable")
+        y = pd.concat([p[1] for p in parts]).sort_index(kind="stable")
+        self.fit(X, y, parts[-1][2], test_size)
+
+    def predict(self, df: pd.DataFrame, features: Optional[pd.Series] = None) -> MLSignal:
         """
         Generate ML signal for latest bar
         
         Args:
             df: DataFrame with recent OHLCV data (needs at least 20 bars)
+            features: precomputed feature row for the last bar of ``df``
+                (e.g. from `FeaturePipeline.latest`); built here when omitted
             
         Returns:
             MLSignal with prediction and confidence
         """
         symbol = df.index.name or "UNKNOWN"
         
-        # Default fallback signal
-        fallback = MLSignal(
-            symbol=symbol,
-            prediction=0.5,
-            confidence=0.3,
-            probability_up=0.5,
-            model_version="fallback"
-        )
-        
         if len(df) < 20:
-            return fallback
+            return self._fallback_signal(symbol)
         
         # Calculate features
-        df_featured = MLFeatureEngine.calculate_features(df)
-        latest = df_featured.iloc[-1]
+        if features is None:
+            features = MLFeatureEngine.calculate_features(lowercase_ohlcv(df)).iloc[-1]
+        return self.predict_batch({symbol: features})[symbol]
+
+    def predict_batch(self, rows: Dict[str, pd.Series]) -> Dict[str, MLSignal]:
+        """
+        Generate ML signals for several symbols with one ``predict_proba`` call
+        
+        Args:
+            rows: symbol -> feature row of its latest bar
+            
+        Returns:
+            symbol -> MLSignal, in the order of ``rows``
+        """
+        if not rows:
+            return {}
         
         # If no model, use heuristics
         if not self.trained or self.model is None:
-            return self._heuristic_signal(symbol, latest)
+            return {sym: self._heuristic_signal(sym, row) for sym, row in rows.items()}
         
-        # Prepare features
-        X = latest[self.feature_names].fillna(0).values.reshape(1, -1)
+        # Stack features, one row per symbol
+        X = np.vstack([
+            row.reindex(self.feature_names).fillna(0).to_numpy(dtype=np.float64)
+            for row in rows.values()
+        ])
         
         # Scale
         if self.scaler is not None:
             try:
-                X = self.scaler.transform(X)
+                X = self.scaler.transform(pd.DataFrame(X, columns=self.feature_names))
             except Exception:
                 pass
         
         # Predict
         try:
-            prob_class_0 = self.model.predict_proba(X)[0][0]
-            prob_class_1 = 1 - prob_class_0
-            
-            # Map to 0-1 scale (0=sell, 1=buy)
-            prediction = prob_class_1
-            
-            # Confidence based on how far from 0.5
+            prob_up = 1 - self.model.predict_proba(X)[:, 0]
+        except Exception as e:
+            print(f"[ML] Prediction error: {e}")
+            return {sym: self._fallback_signal(sym) for sym in rows}
+        
+        signals = {}
+        for sym, p in zip(rows, prob_up):
+            # Map to 0-1 scale (0=sell, 1=buy); confidence based on how far from 0.5
+            prediction = float(p)
             confidence = abs(prediction - 0.5) * 2
-            
-            return MLSignal(
-                symbol=symbol,
+            signals[sym] = MLSignal(
+                symbol=sym,
                 prediction=prediction,
                 confidence=min(confidence, 1.0),
-                probability_up=prob_class_1,
+                probability_up=prediction,
                 features_used=len(self.feature_names),
-                model_version="xgboost_1.0"
+                model_version=f"xgboost_{self.version}"
             )
-        except Exception as e:
-            print(f"[ML] Prediction error: {e}")
-            return fallback
+        return signals
+
+    @staticmethod
+    def _fallback_signal(symbol: str) -> MLSignal:
+        """Default signal when there is too little data or prediction fails"""
+        return MLSignal(
+            symbol=symbol,
+            prediction=0.5,
+            confidence=0.3,
+            probability_up=0.5,
+            model_version="fallback"
+        )
 
     def _heuristic_signal(self, symbol: str, latest: pd.Series) -> MLSignal:
         """
@@ -379,18 +448,51 @@ class MLModelTrainer:
 
 
 class MLSignalManager:
-    """Manage ML signals for multiple symbols"""
+    """Manage ML signals for multiple symbols
+    
+    Features come from one incremental `FeaturePipeline`, shared by training
+    and prediction, so each new bar costs O(1) per symbol regardless of
+    history length. With ``pooled=True`` every symbol shares one model
+    (trained by `train_universe`), and `predict_signals` scores the whole
+    universe with a single ``predict_proba`` call; otherwise there is one
+    call per per-symbol model.
+    
+    Models can also be trained elsewhere (see `ModelTrainingService`): use
+    `due_for_training` to pick what to fit and `install` to swap a finished
+    model in. `load_registry` restores saved models on a warm restart.
+    """
 
-    def __init__(self):
+    def __init__(self, pooled: bool = False):
         self.models: Dict[str, MLModelTrainer] = {}
         self.signals: Dict[str, MLSignal] = {}
         self.last_training: Dict[str, datetime] = {}
         self.training_interval = timedelta(hours=4)  # Retrain every 4 hours
+        self.features = FeaturePipeline()
+        self.pooled = pooled
+        self._pooled_model: Optional[MLModelTrainer] = None
+        self.model_versions: Dict[str, int] = {}  # registry key -> installed version
+
+    def _model(self, symbol: str) -> MLModelTrainer:
+        if symbol not in self.models:
+            if self.pooled:
+                if self._pooled_model is None:
+                    self._pooled_model = MLModelTrainer("model_universe")
+                self.models[symbol] = self._pooled_model
+            else:
+                self.models[symbol] = MLModelTrainer(f"model_{symbol}")
+        return self.models[symbol]
+
+    def _needs_training(self, symbol: str, now: datetime) -> bool:
+        last_train = self.last_training.get(symbol, datetime.min)
+        return not ((now - last_train) < self.training_interval and symbol in self.last_training)
 
     def train_symbol(self, symbol: str, df: pd.DataFrame) -> bool:
         """
         Train or update model for a symbol
         
+        With a pooled model this retrains the shared model on ``symbol``
+        alone; use `train_universe` instead.
+        
         Args:
             symbol: Trading symbol
             df: Historical OHLCV data
@@ -398,24 +500,133 @@ class MLSignalManager:
         Returns:
             True if training successful
         """
-        if symbol not in self.models:
-            self.models[symbol] = MLModelTrainer(f"model_{symbol}")
+        model = self._model(symbol)
         
         # Check if retraining needed
         now = datetime.now()
-        last_train = self.last_training.get(symbol, datetime.min)
-        
-        if (now - last_train) < self.training_interval and symbol in self.last_training:
+        if not self._needs_training(symbol, now):
             return True  # Skip retraining, still valid
         
         try:
-            self.models[symbol].train(df)
+            model.train(df, features=self.features.frame(symbol, df))
             self.last_training[symbol] = now
             return True
         except Exception as e:
             print(f"[ML] Training failed for {symbol}: {e}")
             return False
 
+    def train_universe(self, frames: Dict[str, pd.DataFrame]) -> bool:
+        """
+        Train the pooled model on every symbol's history (see `train_frames`)
+        
+        Args:
+            frames: symbol -> historical OHLCV data
+            
+        Returns:
+            True if training successful
+        """
+        if not self.pooled:
+            raise ValueError("train_universe requires MLSignalManager(pooled=True)")
+        if not frames:
+            return False
+        
+        now = datetime.now()
+        if not any(self._needs_training(sym, now) for sym in frames):
+            return True  # Skip retraining, still valid
+        
+        try:
+            model = self._model(next(iter(frames)))
+            model.train_frames(self.training_frames(frames))
+            for sym in frames:
+                self.last_training[sym] = now
+            return True
+        except Exception as e:
+            print(f"[ML] Universe training failed: {e}")
+            return False
+
+    def registry_key(self, symbol: str) -> str:
+        """Key the symbol's model is stored under in a `ModelRegistry`"""
+        return UNIVERSE_KEY if self.pooled else symbol
+
+    def training_frames(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Feature frames for ``frames`` (symbol -> OHLCV), built incrementally"""
+        return {sym: self.features.frame(sym, df) for sym, df in frames.items()}
+
+    def due_for_training(
+        self, frames: Dict[str, pd.DataFrame], now: Optional[datetime] = None
+    ) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Symbols whose model is missing or older than ``training_interval``
+        
+        Args:
+            frames: symbol -> historical OHLCV data eligible for training
+            
+        Returns:
+            registry key -> {symbol: OHLCV} to train that key's model on
+        """
+        now = now or datetime.now()
+        if self.pooled:
+            due = any(self._needs_training(sym, now) for sym in frames)
+            return {UNIVERSE_KEY: dict(frames)} if due and frames else {}
+        return {sym: {sym: df} for sym, df in frames.items() if self._needs_training(sym, now)}
+
+    def mark_trained(self, symbols: List[str], when: Optional[datetime] = None):
+        """Restart the retraining clock for ``symbols`` (e.g. after a failed fit)"""
+        when = when or datetime.now()
+        for sym in symbols:
+            self.last_training[sym] = when
+
+    def install(self, key: str, trainer: MLModelTrainer, version: int = 0,
+                symbols: Optional[List[str]] = None):
+        """
+        Swap in a model trained elsewhere
+        
+        The swap is a single reference assignment, so a concurrent prediction
+        uses either the old model or the new one, never a mix.
+        
+        Args:
+            key: registry key (a symbol, or UNIVERSE_KEY when pooled)
+            trainer: fitted model
+            version: registry version, for reporting
+            symbols: symbols it was trained on (restarts their retraining clock)
+        """
+        if key == UNIVERSE_KEY:
+            self._pooled_model = trainer
+            self.models = {sym: trainer for sym in self.models}
+        else:
+            self.models[key] = trainer
+        self.model_versions[key] = version
+        self.mark_trained(list(symbols or ([] if key == UNIVERSE_KEY else [key])))
+
+    def load_registry(self, registry, symbols: List[str]) -> Dict[str, int]:
+        """
+        Install the latest saved model for each symbol's key (warm restart)
+        
+        Models saved with a different feature schema are skipped.
+        
+        Args:
+            registry: ModelRegistry
+            symbols: symbols to restore
+            
+        Returns:
+            symbol -> installed version, for symbols that now have a saved model
+        """
+        loaded: Dict[str, int] = {}
+        for key in dict.fromkeys(self.registry_key(sym) for sym in symbols):
+            found = registry.load(key)
+            if found is None:
+                continue
+            trainer, record = found
+            created = datetime.fromisoformat(record.created_at).astimezone().replace(tzinfo=None)
+            covered = symbols if key == UNIVERSE_KEY else [key]
+            if key == UNIVERSE_KEY:
+                for sym in covered:
+                    self._model(sym)
+            self.install(key, trainer, record.version)
+            self.mark_trained(covered, created)
+            loaded.update({sym: record.version for sym in covered})
+        return loaded
+
     def predict_signal(self, symbol: str, df: pd.DataFrame) -> MLSignal:
         """
         Get ML signal for a symbol
@@ -427,13 +638,37 @@ class MLSignalManager:
         Returns:
             MLSignal prediction
         """
-        if symbol not in self.models:
-            self.models[symbol] = MLModelTrainer(f"model_{symbol}")
+        return self.predict_signals({symbol: df})[symbol]
+
+    def predict_signals(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, MLSignal]:
+        """
+        Get ML signals for many symbols at once
+        
+        Each symbol's feature row is updated incrementally, then the rows are
+        stacked and scored with one ``predict_proba`` call per model.
         
-        df.index.name = symbol
-        signal = self.models[symbol].predict(df)
-        self.signals[symbol] = signal
-        return signal
+        Args:
+            frames: symbol -> recent OHLCV data
+            
+        Returns:
+            symbol -> MLSignal, in the order of ``frames``
+        """
+        signals: Dict[str, MLSignal] = {}
+        batches: Dict[int, Tuple[MLModelTrainer, Dict[str, pd.Series]]] = {}
+        for symbol, df in frames.items():
+            model = self._model(symbol)
+            if len(df) < 20:
+                signals[symbol] = model._fallback_signal(symbol)
+                continue
+            row = self.features.latest(symbol, df)
+            batches.setdefault(id(model), (model, {}))[1][symbol] = row
+        
+        for model, rows in batches.values():
+            signals.update(model.predict_batch(rows))
+        
+        ordered = {sym: signals[sym] for sym in frames}
+        self.signals.update(ordered)
+        return ordered
 
     def get_top_signals(self, n: int = 5, threshold: float = 0.6) -> List[Tuple[str, MLSignal]]:
         """
@@ -0,0 +1,164 @@
+"""Versioned on-disk registry of trained ML models.
+
+Models are stored per key (a symbol, or `UNIVERSE_KEY` for a pooled model)::
+
+    <root>/<KEY>/v000003.pkl    pickled MLModelTrainer
+                 v000003.json   ModelRecord metadata
+                 latest.json    {"version": 3}
+
+Each file is written to a temp name and renamed into place, and
+``latest.json`` is replaced last. Readers and crashed writers therefore only
+ever see complete versions. A record keeps the feature schema hash, so a model
+trained on a different feature set is never loaded after the features change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from trading_bot.learn.ml_features import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_KEY = "_UNIVERSE"
+_LATEST_FILE = "latest.json"
+_SAFE = re.compile(r"[^A-Za-z0-9._-]")
+_VERSION_FILE = re.compile(r"^v(\d+)\.pkl$")
+
+
+def feature_schema_hash(feature_names: Sequence[str]) -> str:
+    """Short stable hash of an ordered feature list."""
+    return hashlib.sha1("\n".join(feature_names).encode()).hexdigest()[:16]
+
+
+SCHEMA_HASH = feature_schema_hash(FEATURE_COLUMNS)
+
+
+@dataclass(frozen=True)
+class ModelRecord:
+    """Metadata for one saved model version."""
+
+    key: str
+    version: int
+    schema_hash: str
+    window_start: str
+    window_end: str
+    symbols: List[str] = field(default_factory=list)
+    metrics: Dict[str, float] = field(default_factory=dict)
+    created_at: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelRecord":
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """Saves, versions and loads `MLModelTrainer` objects by key."""
+
+    def __init__(self, root: str | Path = ".cache/models", keep: int = 3) -> None:
+        self.root = Path(root)
+        self.keep = max(1, int(keep))
+        self._lock = threading.Lock()
+
+    def _dir(self, key: str) -> Path:
+        return self.root / _SAFE.sub("_", key.upper())
+
+    def versions(self, key: str) -> List[int]:
+        d = self._dir(key)
+        if not d.exists():
+            return []
+        found = (_VERSION_FILE.match(p.name) for p in d.iterdir())
+        return sorted(int(m.group(1)) for m in found if m)
+
+    def save(
+        self,
+        key: str,
+        trainer,
+        *,
+        window: Tuple[Any, Any],
+        symbols: Sequence[str] = (),
+    ) -> ModelRecord:
+        """Persist ``trainer`` as the next version of ``key`` and make it the latest."""
+        with self._lock:
+            d = self._dir(key)
+            d.mkdir(parents=True, exist_ok=True)
+            existing = self.versions(key)
+            version = (existing[-1] if existing else 0) + 1
+            trainer.version = f"v{version}"
+            record = ModelRecord(
+                key=key,
+                version=version,
+                schema_hash=feature_schema_hash(trainer.feature_names),
+                window_start=str(window[0]),
+                window_end=str(window[1]),
+                symbols=list(symbols),
+                metrics=dict(getattr(trainer, "metrics", {}) or {}),
+                created_at=datetime.now(timezone.utc).isoformat(),
+            )
+            _write_atomic(d / f"v{version:06d}.pkl", pickle.dumps(trainer))
+            _write_atomic(d / f"v{version:06d}.json", json.dumps(record.to_dict()).encode())
+            _write_atomic(d / _LATEST_FILE, json.dumps({"version": version}).encode())
+            for old in existing[: max(0, len(existing) + 1 - self.keep)]:
+                for suffix in ("pkl", "json"):
+                    (d / f"v{old:06d}.{suffix}").unlink(missing_ok=True)
+        return record
+
+    def record(self, key: str, version: Optional[int] = None) -> Optional[ModelRecord]:
+        """Metadata for ``version`` (default: the latest), or None."""
+        d = self._dir(key)
+        try:
+            if version is None:
+                version = int(json.loads((d / _LATEST_FILE).read_text())["version"])
+            return ModelRecord.from_dict(json.loads((d / f"v{version:06d}.json").read_text()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def load(
+        self,
+        key: str,
+        version: Optional[int] = None,
+        schema_hash: Optional[str] = SCHEMA_HASH,
+    ) -> Optional[Tuple[Any, ModelRecord]]:
+        """``(trainer, record)`` for ``version`` (default: latest), or None.
+
+        Models whose schema hash differs from ``schema_hash`` are skipped
+        (pass None to load regardless).
+        """
+        record = self.record(key, version)
+        if record is None:
+            return None
+        if schema_hash is not None and record.schema_hash != schema_hash:
+            logger.info(
+                "[ML] Skipping %s v%d: feature schema %s != %s",
+                key, record.version, record.schema_hash, schema_hash,
+            )
+            return None
+        try:
+            with open(self._dir(key) / f"v{record.version:06d}.pkl", "rb") as f:
+                trainer = pickle.load(f)
+        except Exception as e:
+            logger.warning("[ML] Could not load %s v%d: %s", key, record.version, e)
+            return None
+        return trainer, record
@@ -0,0 +1,217 @@
+"""Universe-wide regime detection over a (symbols x bars) panel.
+
+`detect_regime` only looks at the last 30 bars of a symbol: a 14-bar ATR, a
+10/30 SMA crossover and a 20-bar high/low range. `RegimePanel` keeps those
+bars for every symbol in fixed-size close/high/low arrays and shifts in only
+the bars that are new since the last call. It then classifies the whole
+universe with a few array operations. Per-symbol results match
+`detect_regime` on the same history.
+
+`aggregate_regimes` turns the per-symbol states into one market regime by a
+breadth-weighted vote. Each symbol votes for its regime with its
+confidence, and the winning regime's confidence is its vote divided by the
+number of voting symbols.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from trading_bot.learn.regime import Regime, RegimeState
+
+# Bars needed by detect_regime: the slow SMA is the longest window.
+PANEL_BARS = 30
+_ATR_PERIOD = 14
+_FAST, _SLOW = 10, 30
+_SR_LOOKBACK = 20
+_MIN_ROWS = 5
+_SQRT_252 = 252 ** 0.5
+
+_UP, _DOWN, _RANGING, _VOLATILE = 0, 1, 2, 3
+_CODES = (Regime.TRENDING_UP, Regime.TRENDING_DOWN, Regime.RANGING, Regime.VOLATILE)
+
+
+def insufficient_regime(**explanation) -> RegimeState:
+    return RegimeState(
+        regime=Regime.INSUFFICIENT_DATA,
+        confidence=0.0,
+        volatility=0.0,
+        trend_strength=0.0,
+        explanation=explanation,
+    )
+
+
+class RegimePanel:
+    """Incremental regime state for a universe of symbols."""
+
+    def __init__(self) -> None:
+        self._slots: Dict[str, int] = {}
+        self._close = np.full((0, PANEL_BARS), np.nan)
+        self._high = np.full((0, PANEL_BARS), np.nan)
+        self._low = np.full((0, PANEL_BARS), np.nan)
+        self._rows = np.zeros(0, dtype=np.int64)  # len(df) as detect_regime sees it
+        self._last_ts: List[Optional[pd.Timestamp]] = []
+        self.bars_fed = 0
+        self.reloads = 0
+
+    def _slot(self, symbol: str) -> int:
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = self._slots[symbol] = len(self._slots)
+            if slot >= len(self._rows):
+                grow = max(8, len(self._rows))
+                pad = np.full((grow, PANEL_BARS), np.nan)
+                self._close = np.vstack([self._close, pad])
+                self._high = np.vstack([self._high, pad])
+                self._low = np.vstack([self._low, pad])
+                self._rows = np.concatenate([self._rows, np.zeros(grow, dtype=np.int64)])
+                self._last_ts.extend([None] * grow)
+        return slot
+
+    def _ingest(self, slot: int, df: pd.DataFrame) -> None:
+        """Shift the bars after the last one seen into ``slot``'s buffers.
+
+        Only the last ``PANEL_BARS + 1`` rows are read. A revised last bar, or
+        a history whose tail no longer holds the last seen bar, reloads the
+        buffers from the tail.
+        """
+        n = len(df)
+        k = min(n, PANEL_BARS + 1)
+        stamps = df.index[-k:]
+        cols = [df[c].to_numpy(dtype=np.float64)[-k:] for c in ("Close", "High", "Low")]
+        bufs = (self._close, self._high, self._low)
+
+        last = self._last_ts[slot]
+        hits = np.flatnonzero(stamps == last) if last is not None else ()
+        reload = len(hits) != 1
+        if not reload:
+            pos = int(hits[0])
+            reload = any(col[pos] != buf[slot, -1] for col, buf in zip(cols, bufs))
+        if reload and last is not None:
+            self.reloads += 1
+
+        take = min(n, PANEL_BARS) if reload else k - 1 - pos
+        if take > 0:
+            for col, buf in zip(cols, bufs):
+                row = buf[slot]
+                if reload:
+                    row[:] = np.nan
+                else:
+                    row[:-take] = row[take:].copy()
+                row[-take:] = col[-take:]
+            self.bars_fed += take
+        self._rows[slot] = n
+        self._last_ts[slot] = stamps[-1]
+
+    def update(self, ohlcv_by_symbol: Mapping[str, pd.DataFrame]) -> Dict[str, RegimeState]:
+        """Feed new bars and return the regime of every non-empty symbol."""
+        symbols = [sym for sym, df in ohlcv_by_symbol.items() if not df.empty]
+        slots = np.array([self._slot(sym) for sym in symbols], dtype=np.int64)
+        for sym, slot in zip(symbols, slots):
+            self._ingest(int(slot), ohlcv_by_symbol[sym])
+        return self._classify(symbols, slots)
+
+    def _classify(self, symbols: List[str], slots: np.ndarray) -> Dict[str, RegimeState]:
+        if not symbols:
+            return {}
+        close, high, low = self._close[slots], self._high[slots], self._low[slots]
+        rows = self._rows[slots]
+        last = close[:, -1]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prev = np.concatenate([np.full((len(slots), 1), np.nan), close[:, :-1]], axis=1)
+            tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+            atr = tr[:, -_ATR_PERIOD:].mean(axis=1)
+            volatility = np.where((atr <= 0) | (last <= 0), 0.0, atr / last * _SQRT_252)
+
+            fast = close[:, -_FAST:].mean(axis=1)
+            slow = close[:, -_SLOW:].mean(axis=1)
+            fast = np.where(np.isnan(fast), 0.0, fast)
+            slow = np.where(np.isnan(slow), 0.0, slow)
+            has_trend = (rows >= _SLOW) & (slow > 0)
+            direction = np.where(has_trend, np.sign(fast - slow), 0.0)
+            gap = np.abs(fast - slow) / np.where(slow > 0, slow, 1.0)
+            strength = np.where(has_trend, np.minimum(1.0, gap / 0.05), 0.0)
+
+        has_sr = rows >= _SR_LOOKBACK
+        support = np.nanmin(np.where(has_sr[:, None], low[:, -_SR_LOOKBACK:], np.inf), axis=1)
+        resistance = np.nanmax(np.where(has_sr[:, None], high[:, -_SR_LOOKBACK:], -np.inf), axis=1)
+
+        volatile = volatility > 0.40
+        trending = ~volatile & (strength > 0.5)
+        trend_code = np.where(direction > 0, _UP, _DOWN)
+        code = np.where(volatile, _VOLATILE, np.where(trending, trend_code, _RANGING))
+        trend_conf = np.where(trending, strength, 1.0 - strength)
+        confidence = np.minimum(1.0, np.where(volatile, volatility / 0.60, trend_conf))
+
+        out: Dict[str, RegimeState] = {}
+        for i, sym in enumerate(symbols):
+            if rows[i] < _MIN_ROWS:
+                out[sym] = insufficient_regime(reason="insufficient_data", rows=int(rows[i]))
+                continue
+            vol = float(volatility[i])
+            trend = float(strength[i])
+            sup = float(support[i]) if has_sr[i] else None
+            res = float(resistance[i]) if has_sr[i] else None
+            out[sym] = RegimeState(
+                regime=_CODES[code[i]],
+                confidence=float(confidence[i]),
+                volatility=vol,
+                trend_strength=trend,
+                support=sup,
+                resistance=res,
+                explanation={
+                    "volatility_annualized": round(vol, 4),
+                    "trend_strength": round(trend, 4),
+                    "trend_direction": float(direction[i]),
+                    "support": round(sup, 2) if sup else None,
+                    "resistance": round(res, 2) if res else None,
+                },
+            )
+        return out
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+def aggregate_regimes(states: Mapping[str, RegimeState]) -> RegimeState:
+    """Breadth-weighted market regime across ``states``.
+
+    Symbols without enough data do not vote. Ties go to the regime listed
+    first in `Regime`.
+    """
+    voting = [s for s in states.values() if s.regime is not Regime.INSUFFICIENT_DATA]
+    if not voting:
+        return insufficient_regime(reason="insufficient_data", symbols=len(states))
+
+    n = len(voting)
+    votes = {r: 0.0 for r in _CODES}
+    counts = {r: 0 for r in _CODES}
+    for s in voting:
+        votes[s.regime] += s.confidence
+        counts[s.regime] += 1
+    regime = max(_CODES, key=lambda r: (votes[r], -_CODES.index(r)))
+    members = [s for s in voting if s.regime is regime]
+    volatility = float(np.nanmedian([s.volatility for s in voting]))
+    trend_strength = float(np.mean([s.trend_strength for s in members]))
+
+    explanation: Dict[str, float | str] = {
+        "method": "breadth_weighted_vote",
+        "symbols": float(n),
+        "volatility_annualized": round(volatility, 4),
+        "trend_strength": round(trend_strength, 4),
+    }
+    for r in _CODES:
+        explanation[f"breadth_{r.value}"] = round(counts[r] / n, 4)
+        explanation[f"vote_{r.value}"] = round(votes[r] / n, 4)
+
+    return RegimeState(
+        regime=regime,
+        confidence=float(min(1.0, votes[regime] / n)),
+        volatility=volatility,
+        trend_strength=trend_strength,
+        explanation=explanation,
+    )
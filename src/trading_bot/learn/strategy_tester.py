@@ -12,6 +12,7 @@ OPTIMIZATIONS:
 - Result caching to avoid redundant backtests
 - Batch data loading to minimize I/O
 - Parallel candidate testing with concurrent.futures
+- Process-pool testing over a shared-memory OHLCV panel (no per-task pickling)
 """
 
 from __future__ import annotations
@@ -19,9 +20,9 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 
@@ -29,6 +30,7 @@ from trading_bot.learn.strategy_maker import StrategyCandidate, StrategyPerforma
 from trading_bot.data.providers import MarketDataProvider, YFinanceProvider
 from trading_bot.broker.paper import PaperBroker, PaperBrokerConfig
 from trading_bot.core.models import Order
+from trading_bot.core.shared_panel import SharedOHLCVPanel
 
 logger = logging.getLogger(__name__)
 
@@ -94,7 +96,7 @@ class StrategyTester:
         self,
         candidate: StrategyCandidate,
         symbols: List[str],
-        ohlcv: Optional[pd.DataFrame] = None,
+        ohlcv: Optional[Union[pd.DataFrame, SharedOHLCVPanel]] = None,
     ) -> Optional[StrategyPerformance]:
         """
         Test a strategy candidate on historical data.
@@ -102,14 +104,17 @@ class StrategyTester:
         Args:
             candidate: Strategy to test
             symbols: Symbols to trade
-            ohlcv: Optionally pass preloaded data to avoid redundant downloads
+            ohlcv: Optionally pass preloaded data (a DataFrame or shared panel)
+                to avoid redundant downloads
             
         Returns:
             StrategyPerformance with results, or None if test failed
         """
         try:
             # Use provided data or download with caching
-            if ohlcv is None:
+            if isinstance(ohlcv, SharedOHLCVPanel):
+                ohlcv = ohlcv.wide("Close")  # Zero-copy view of the shared closes
+            elif ohlcv is None:
                 cache_key = f"ohlcv_{'_'.join(sorted(symbols + [self.benchmark_symbol]))}_1y"
                 ohlcv = self._get_cached_data(cache_key)
                 
@@ -433,27 +438,45 @@ class StrategyTester:
             return 0.0
 
 
+def _test_candidate_in_worker(
+    tester: StrategyTester,
+    candidate: StrategyCandidate,
+    panel: SharedOHLCVPanel,
+) -> Optional[StrategyPerformance]:
+    """Process-pool entry point; ``panel`` arrives as its spec and attaches by name"""
+    return tester.test_candidate(candidate, [], panel)
+
+
 class BatchStrategyTester:
     """Test multiple strategy candidates in batch with parallel execution"""
     
-    def __init__(self, tester: Optional[StrategyTester] = None, max_workers: int = 4):
+    def __init__(
+        self,
+        tester: Optional[StrategyTester] = None,
+        max_workers: int = 4,
+        use_processes: bool = False,
+    ):
         """
         Initialize batch tester.
         
         Args:
             tester: StrategyTester instance
-            max_workers: Number of parallel threads (default 4, max 8)
+            max_workers: Number of parallel workers (default 4, max 8)
+            use_processes: Test in worker processes over a shared-memory panel
+                instead of threads (the tester must be picklable)
         """
         self.tester = tester or StrategyTester()
         self.max_workers = min(8, max(1, int(max_workers)))
+        self.use_processes = use_processes
         self.results: List[StrategyPerformance] = []
-        self._data_cache: Optional[pd.DataFrame] = None
+        self._data_cache: Optional[Union[pd.DataFrame, SharedOHLCVPanel]] = None
     
     def test_batch(
         self,
         candidates: List[StrategyCandidate],
         symbols: List[str],
         parallel: bool = True,
+        ohlcv: Optional[Union[pd.DataFrame, SharedOHLCVPanel]] = None,
     ) -> List[StrategyPerformance]:
         """
         Test multiple candidates (optionally in parallel).
@@ -462,6 +485,7 @@ class BatchStrategyTester:
             candidates: Candidates to test
             symbols: Trading symbols
             parallel: Whether to test in parallel (faster on multi-core)
+            ohlcv: Preloaded data (DataFrame or shared panel); downloaded if omitted
         
         Returns:
             List of performance results (in order of input candidates)
@@ -471,7 +495,7 @@ class BatchStrategyTester:
         # Pre-load data once to avoid redundant downloads (major optimization)
         logger.info(f"Pre-loading market data for {len(symbols)} symbols...")
         cache_key = f"ohlcv_{'_'.join(sorted(symbols + [self.tester.benchmark_symbol]))}_1y"
-        self._data_cache = self.tester._get_cached_data(cache_key)
+        self._data_cache = ohlcv if ohlcv is not None else self.tester._get_cached_data(cache_key)
         
         if self._data_cache is None:
             self._data_cache = self.tester.data_provider.download_bars(
@@ -481,7 +505,9 @@ class BatchStrategyTester:
             )
             self.tester._set_cached_data(cache_key, self._data_cache)
         
-        if parallel:
+        if parallel and self.use_processes:
+            self.results = self._test_batch_processes(candidates)
+        elif parallel:
             self.results = self._test_batch_parallel(candidates)
         else:
             self.results = self._test_batch_sequential(candidates)
@@ -530,6 +556,34 @@ class BatchStrategyTester:
         
         return [r for r in results if r is not None]
     
+    def _test_batch_processes(self, candidates: List[StrategyCandidate]) -> List[StrategyPerformance]:
+        """Test candidates in worker processes that share one published OHLCV panel"""
+        owned = not isinstance(self._data_cache, SharedOHLCVPanel)
+        panel = SharedOHLCVPanel.from_wide(self._data_cache) if owned else self._data_cache
+        results = [None] * len(candidates)
+        
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(_test_candidate_in_worker, self.tester, cand, panel): i
+                    for i, cand in enumerate(candidates)
+                }
+                
+                completed = 0
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    try:
+                        results[idx] = future.result()
+                        completed += 1
+                        logger.info(f"[{completed}/{len(candidates)}] Test {idx} completed")
+                    except Exception as e:
+                        logger.error(f"Error testing candidate {idx}: {e}")
+        finally:
+            if owned:
+                panel.unlink()
+        
+        return [r for r in results if r is not None]
+    
     def get_passed_candidates(self) -> List[StrategyPerformance]:
         """Get all candidates that passed testing"""
         return [r for r in self.results if r.passed]
@@ -0,0 +1,136 @@
+"""Background ML model training.
+
+`ModelTrainingService` fits models on a worker pool and saves each result to
+a `ModelRegistry`, so an XGBoost fit never runs on the trading loop. The loop
+submits feature frames and calls `poll` once per step to collect finished
+models. The process executor (the default) keeps fits off the engine's GIL.
+Only one job per key runs at a time. Until its result is installed, the
+engine keeps serving the previous model version or the heuristic fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from trading_bot.learn.model_registry import ModelRecord, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class TrainingResult:
+    """Outcome of one background fit."""
+
+    key: str
+    symbols: List[str] = field(default_factory=list)
+    trainer: Optional[Any] = None
+    record: Optional[ModelRecord] = None
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.record is not None
+
+
+def train_and_save(
+    root: str,
+    keep: int,
+    key: str,
+    frames: Dict[str, pd.DataFrame],
+) -> Tuple[Any, Optional[ModelRecord]]:
+    """Fit one model on ``frames`` (symbol -> feature frame) and save it.
+
+    Module-level so a process pool can pickle it. Returns ``(trainer, None)``
+    when there was too little data to fit.
+    """
+    from trading_bot.learn.ml_signals import MLModelTrainer
+
+    trainer = MLModelTrainer(f"model_{key}")
+    trainer.train_frames(frames)
+    if not trainer.trained:
+        return trainer, None
+    start = min(df.index[0] for df in frames.values())
+    end = max(df.index[-1] for df in frames.values())
+    record = ModelRegistry(root, keep).save(key, trainer, window=(start, end), symbols=list(frames))
+    return trainer, record
+
+
+class ModelTrainingService:
+    """Runs `train_and_save` jobs on a persistent pool, one in flight per key."""
+
+    def __init__(self, registry: ModelRegistry, workers: int = 1, executor: str = "process"):
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+        self.registry = registry
+        self.workers = max(1, int(workers))
+        self.executor = executor
+        self._pool: Optional[Executor] = None
+        self._jobs: Dict[str, Tuple[List[str], Future]] = {}
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.executor == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="model-train"
+                )
+        return self._pool
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._jobs
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def submit(self, key: str, frames: Dict[str, pd.DataFrame]) -> bool:
+        """Queue a fit of ``key`` on ``frames``; False if one is already running."""
+        if key in self._jobs or not frames:
+            return False
+        fut = self._get_pool().submit(
+            train_and_save, str(Path(self.registry.root)), self.registry.keep, key, frames
+        )
+        self._jobs[key] = (list(frames), fut)
+        return True
+
+    def poll(self) -> List[TrainingResult]:
+        """Results of every job that has finished since the last call."""
+        results = []
+        for key, (symbols, fut) in list(self._jobs.items()):
+            if fut.done():
+                del self._jobs[key]
+                results.append(self._result(key, symbols, fut))
+        return results
+
+    def wait(self, timeout: Optional[float] = None) -> List[TrainingResult]:
+        """Block until all running jobs finish (or ``timeout``), then `poll`."""
+        if self._jobs:
+            wait_futures([fut for _, fut in self._jobs.values()], timeout=timeout)
+        return self.poll()
+
+    @staticmethod
+    def _result(key: str, symbols: List[str], fut: Future) -> TrainingResult:
+        try:
+            trainer, record = fut.result()
+        except Exception as e:
+            logger.warning("[ML] Background training failed for %s: %s", key, e)
+            return TrainingResult(key, symbols, error=str(e))
+        if record is None:
+            return TrainingResult(key, symbols, trainer, error="not enough training data")
+        return TrainingResult(key, symbols, trainer, record)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._jobs.clear()
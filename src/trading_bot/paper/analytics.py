@@ -7,9 +7,10 @@ from rich.console import Console
 from trading_bot.analytics.duckdb_pipeline import build_analytics_db, performance_summary
 
 
-def paper_analytics_build(*, db_path: str, duckdb_path: str) -> int:
-    build_analytics_db(sqlite_db=Path(db_path), duckdb_db=Path(duckdb_path))
-    Console().print(f"Built DuckDB analytics DB: {duckdb_path} (from {db_path})")
+def paper_analytics_build(*, db_path: str, duckdb_path: str, full: bool = False) -> int:
+    added = build_analytics_db(sqlite_db=Path(db_path), duckdb_db=Path(duckdb_path), full=full)
+    rows = ", ".join(f"{table}=+{n}" for table, n in added.items())
+    Console().print(f"Synced DuckDB analytics DB: {duckdb_path} (from {db_path}) {rows}")
     return 0
 
 
@@ -17,6 +17,7 @@ import numpy as np
 import pandas as pd
 
 from .latency_optimizer import LatencyOptimizer, LatencyMetrics
+from .stage_timer import LatencyHistogram, StageTimer, default_timer
 
 logger = logging.getLogger(__name__)
 
@@ -233,6 +234,9 @@ class IndicatorBatcher:
 __all__ = [
     "LatencyOptimizer",
     "LatencyMetrics",
+    "LatencyHistogram",
+    "StageTimer",
+    "default_timer",
     "PerformanceMetrics",
     "VectorizedIndicators",
     "BatchDataProcessor",
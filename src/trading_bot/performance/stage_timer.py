@@ -0,0 +1,303 @@
+"""Per-stage latency spans for the trading loop.
+
+`StageTimer` records how long named stages take (data fetch, strategy
+evaluation, order submission, ...) into `LatencyHistogram`s. Each histogram
+is HDR-style: it has a fixed number of log-linear buckets, so recording costs
+O(1), memory stays constant, and percentile error is bounded by the bucket
+width (at most 2**-6, about 1.6%, with the default 7 sub-bucket bits).
+
+Spans can be opened with a context manager or a decorator::
+
+    timer = StageTimer()
+    with timer.span("fetch"):
+        ...
+
+    @timer.timed("evaluate")
+    def evaluate(...): ...
+
+With ``enabled=False`` every span is a shared no-op object, so instrumented
+code costs a single attribute check. ``default_timer`` is the process-wide
+instance that the paper engine records into.
+
+The health API runs in its own process (its own container under
+docker-compose), so it cannot see the engine's timer. The engine publishes
+`StageTimer.to_dict` to a JSON file after every step (`StageTimer.publish`,
+path from ``LATENCY_SNAPSHOT_PATH``), and the API serves `read_published`.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+_NS_PER_MS = 1_000_000.0
+
+LATENCY_SNAPSHOT_ENV = "LATENCY_SNAPSHOT_PATH"
+DEFAULT_SNAPSHOT_PATH = "logs/latency.json"
+
+
+class LatencyHistogram:
+    """Log-linear histogram of non-negative integer durations (nanoseconds).
+
+    Values below ``2**sub_bucket_bits`` get one bucket each. Every higher
+    power-of-two range is split into ``2**(sub_bucket_bits - 1)`` equal
+    buckets, so a recorded value and its bucket's reported value differ by at
+    most ``2**-(sub_bucket_bits - 1)``. Values above ``max_value`` are clamped.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7, max_value: int = 1 << 40) -> None:
+        if not 2 <= int(sub_bucket_bits) <= 16:
+            raise ValueError("sub_bucket_bits must be between 2 and 16")
+        self.sub_bucket_bits = int(sub_bucket_bits)
+        self.max_value = int(max_value)
+        self._sub = 1 << self.sub_bucket_bits
+        self._half = self._sub >> 1
+        self._counts: List[int] = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return self._sub + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _bucket_high(self, index: int) -> int:
+        """Largest value that maps to ``index``."""
+        if index < self._sub:
+            return index
+        k = index - self._sub
+        shift = k // self._half + 1
+        sub = k % self._half + self._half
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        value = min(max(int(value), 0), self.max_value)
+        self._counts[self._index(value)] += 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> int:
+        """Value at or below which ``q`` percent of recorded values fall."""
+        return self.percentiles([q])[0]
+
+    def percentiles(self, qs) -> List[int]:
+        """`percentile` for several ``qs`` in one pass over the buckets."""
+        if self.count == 0:
+            return [0 for _ in qs]
+        ranks = [max(1, int(-(-min(max(q, 0.0), 100.0) * self.count // 100))) for q in qs]
+        order = sorted(range(len(ranks)), key=ranks.__getitem__)
+        out = [self.max] * len(ranks)
+        pos = 0
+        last = self._index(self.max)
+        for index, seen in enumerate(accumulate(self._counts[: last + 1])):
+            while pos < len(order) and seen >= ranks[order[pos]]:
+                out[order[pos]] = min(self._bucket_high(index), self.max)
+                pos += 1
+            if pos == len(order):
+                break
+        return out
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.sub_bucket_bits != self.sub_bucket_bits or other.max_value != self.max_value:
+            raise ValueError("histograms must share sub_bucket_bits and max_value")
+        if other.count == 0:
+            return
+        for i, c in enumerate(other._counts):
+            if c:
+                self._counts[i] += c
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def summary_ms(self) -> Dict[str, float]:
+        """count, mean, p50, p90, p99 and max in milliseconds."""
+        if self.count == 0:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p90, p99 = self.percentiles([50, 90, 99])
+        return {
+            "count": self.count,
+            "mean": self.total / self.count / _NS_PER_MS,
+            "p50": p50 / _NS_PER_MS,
+            "p90": p90 / _NS_PER_MS,
+            "p99": p99 / _NS_PER_MS,
+            "max": self.max / _NS_PER_MS,
+        }
+
+
+class _Span:
+    __slots__ = ("_timer", "_stage", "_start")
+
+    def __init__(self, timer: "StageTimer", stage: str) -> None:
+        self._timer = timer
+        self._stage = stage
+        self._start = 0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._timer.record_ns(self._stage, time.perf_counter_ns() - self._start)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class StageTimer:
+    """Thread-safe registry of per-stage latency histograms."""
+
+    def __init__(self, enabled: bool = True, sub_bucket_bits: int = 7) -> None:
+        self.enabled = bool(enabled)
+        self.sub_bucket_bits = int(sub_bucket_bits)
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._step_ns: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str):
+        """Context manager that records the time spent inside it under ``stage``."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, stage)
+
+    def timed(self, stage: Optional[str] = None) -> Callable:
+        """Decorator form of `span`; ``stage`` defaults to the function's qualified name."""
+
+        def decorate(fn: Callable) -> Callable:
+            name = stage or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record_ns(name, time.perf_counter_ns() - start)
+
+            return wrapper
+
+        return decorate
+
+    def now(self) -> int:
+        """Start mark for a region that is not a single block (see `add`)."""
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def add(self, stage: str, start: int) -> None:
+        """Record the time since ``start`` (from `now`) under ``stage``."""
+        if self.enabled:
+            self.record_ns(stage, time.perf_counter_ns() - start)
+
+    def record_ns(self, stage: str, elapsed_ns: int) -> None:
+        with self._lock:
+            hist = self._hists.get(stage)
+            if hist is None:
+                hist = self._hists[stage] = LatencyHistogram(self.sub_bucket_bits)
+            hist.record(elapsed_ns)
+            self._step_ns[stage] = self._step_ns.get(stage, 0) + int(elapsed_ns)
+
+    def start_step(self) -> None:
+        """Reset the per-step totals returned by `step_totals_ms`."""
+        with self._lock:
+            self._step_ns.clear()
+
+    def step_totals_ms(self) -> Dict[str, float]:
+        """Total milliseconds per stage since the last `start_step`."""
+        with self._lock:
+            return {k: v / _NS_PER_MS for k, v in sorted(self._step_ns.items())}
+
+    def histogram(self, stage: str) -> Optional[LatencyHistogram]:
+        return self._hists.get(stage)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count/mean/p50/p90/p99/max in milliseconds."""
+        with self._lock:
+            return {stage: h.summary_ms() for stage, h in sorted(self._hists.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+            self._step_ns.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """What the health API's ``/latency`` reports."""
+        return {
+            "enabled": self.enabled,
+            "stages": self.snapshot(),
+            "last_step": self.step_totals_ms(),
+        }
+
+    def publish(self, path: str | Path) -> None:
+        """Atomically write `to_dict` (plus pid and time) to ``path`` as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = {
+            **self.to_dict(),
+            "pid": os.getpid(),
+            "published_at": datetime.now(timezone.utc).isoformat(),
+        }
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(body))
+        os.replace(tmp, path)
+
+
+def snapshot_path() -> str:
+    """Where engines publish and the health API reads stage latency."""
+    return os.environ.get(LATENCY_SNAPSHOT_ENV, DEFAULT_SNAPSHOT_PATH)
+
+
+def read_published(path: str | Path) -> Optional[Dict[str, Any]]:
+    """The last snapshot `StageTimer.publish` wrote to ``path``, or None."""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class TimedCalls:
+    """Proxy that times calls to ``target`` methods whose names start with ``prefix``.
+
+    Every other attribute is passed through unchanged. The proxy lets code time a
+    collaborator's calls (for example all ``repo.log_*`` writes) without touching
+    each call site.
+    """
+
+    def __init__(self, target, timer: StageTimer, stage: str, prefix="") -> None:
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_timer", timer)
+        object.__setattr__(self, "_stage", stage)
+        object.__setattr__(self, "_prefix", prefix)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if callable(attr) and name.startswith(self._prefix) and self._timer.enabled:
+            return self._timer.timed(self._stage)(attr)
+        return attr
+
+
+default_timer = StageTimer()
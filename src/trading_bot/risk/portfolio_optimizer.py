@@ -10,6 +10,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 
+from trading_bot.risk.streaming_covariance import StreamingCovariance
+
 
 @dataclass
 class CorrelationMatrix:
@@ -20,17 +22,21 @@ class CorrelationMatrix:
     avg_correlation: float
     max_correlation: float
     min_correlation: float
+    index: Dict[str, int] = field(default_factory=dict, repr=False)
+    
+    def __post_init__(self):
+        if not self.index:
+            self.index = {sym: i for i, sym in enumerate(self.symbols)}
     
     def get_correlation(self, sym1: str, sym2: str) -> float:
         """Get correlation between two symbols"""
         if sym1 == sym2:
             return 1.0
-        try:
-            idx1 = self.symbols.index(sym1)
-            idx2 = self.symbols.index(sym2)
-            return float(self.correlation[idx1, idx2])
-        except (ValueError, IndexError):
+        idx1 = self.index.get(sym1)
+        idx2 = self.index.get(sym2)
+        if idx1 is None or idx2 is None:
             return 0.0
+        return float(self.correlation[idx1, idx2])
 
 
 @dataclass
@@ -76,6 +82,10 @@ class PortfolioOptimizer:
     """
     Portfolio-level optimization engine.
     Adjusts position sizes based on correlations, volatility, and Sharpe ratio.
+    
+    Returns stream into a `StreamingCovariance` as bars arrive, so each new
+    bar costs a rank-1 update of the N x N statistics instead of copying
+    OHLCV history and rebuilding the correlation matrix.
     """
     
     def __init__(
@@ -84,13 +94,18 @@ class PortfolioOptimizer:
         rebalance_interval: int = 20,  # Rebalance every 20 bars
         max_concentration: float = 0.25,  # Max 25% in single position
         correlation_threshold: float = 0.7,  # Flag high correlations
+        ewma_halflife: Optional[float] = None,  # Exponentially weighted covariance instead
     ):
         self.lookback_bars = lookback_bars
         self.rebalance_interval = rebalance_interval
         self.max_concentration = max_concentration
         self.correlation_threshold = correlation_threshold
         
-        self.ohlcv_history: Dict[str, pd.DataFrame] = {}
+        # Returns window: the 2 x lookback_bars bars of history previously kept per symbol
+        self.covariance = StreamingCovariance(
+            window=max(2, lookback_bars * 2 - 1), halflife=ewma_halflife
+        )
+        self._last_bar: Dict[str, Tuple[object, float]] = {}  # symbol -> (timestamp, close)
         self.last_rebalance_bar = 0
         self.correlation_matrix: Optional[CorrelationMatrix] = None
         self.risk_metrics: Optional[PortfolioRiskMetrics] = None
@@ -98,11 +113,36 @@ class PortfolioOptimizer:
         self.rebalance_history: List[Tuple[int, float]] = []  # (bar, sharpe)
     
     def update_history(self, symbol: str, ohlcv: pd.DataFrame):
-        """Update OHLCV history for correlation calculation"""
-        # Keep only recent bars
-        if len(ohlcv) > self.lookback_bars * 2:
-            ohlcv = ohlcv.iloc[-self.lookback_bars * 2:]
-        self.ohlcv_history[symbol] = ohlcv.copy()
+        """Stream the returns of bars not seen before into the covariance window"""
+        if len(ohlcv) < 2:
+            return
+        k = min(len(ohlcv), self.covariance.window + 1)
+        stamps = ohlcv.index[-k:]
+        closes = ohlcv['Close'].to_numpy(dtype=np.float64)[-k:]
+        
+        # Position of the last bar already streamed; re-send it if it was revised
+        start = 1
+        seen = self._last_bar.get(symbol)
+        if seen is not None:
+            hits = np.flatnonzero(stamps == seen[0])
+            if len(hits) == 1:
+                pos = int(hits[0])
+                start = pos if closes[pos] != seen[1] and pos > 0 else pos + 1
+        
+        if start < k:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = closes[start:] / closes[start - 1:-1] - 1.0
+            self.covariance.update(symbol, stamps[start:], returns)
+        self._last_bar[symbol] = (stamps[-1], float(closes[-1]))
+    
+    def returns_by_symbol(self) -> Dict[str, np.ndarray]:
+        """Windowed returns per symbol (oldest first)"""
+        out = {}
+        for symbol in self.covariance.symbols:
+            ret = self.covariance.returns(symbol)
+            if len(ret) > 0:
+                out[symbol] = ret
+        return out
     
     def calculate_correlations(self, symbols: List[str]) -> Optional[CorrelationMatrix]:
         """
@@ -117,39 +157,13 @@ class PortfolioOptimizer:
         if len(symbols) < 2:
             return None
         
-        # Collect returns for all symbols
-        returns_data = {}
-        min_len = float('inf')
-        
-        for sym in symbols:
-            if sym not in self.ohlcv_history:
-                continue
-            
-            df = self.ohlcv_history[sym]
-            if len(df) < 2:
-                continue
-            
-            # Calculate returns
-            returns = df['Close'].pct_change().dropna()
-            if len(returns) == 0:
-                continue
-            
-            returns_data[sym] = returns
-            min_len = min(min_len, len(returns))
-        
-        if len(returns_data) < 2 or min_len < 10:
+        # Apply this step's bars, then read the matrix for symbols with enough returns
+        self.covariance.flush()
+        symbol_list = [s for s in symbols if self.covariance.observations(s) >= 10]
+        if len(symbol_list) < 2:
             return None
         
-        # Align all returns to same length
-        returns_list = []
-        symbol_list = []
-        for sym, ret in returns_data.items():
-            returns_list.append(ret.values[-min_len:])
-            symbol_list.append(sym)
-        
-        # Create correlation matrix
-        returns_array = np.array(returns_list).T
-        corr_matrix = np.corrcoef(returns_array, rowvar=False)
+        symbol_list, corr_matrix = self.covariance.correlation(symbol_list)
         corr_matrix = np.nan_to_num(corr_matrix, nan=0.0)  # Replace NaN with 0
         
         # Calculate summary statistics
@@ -159,7 +173,7 @@ class PortfolioOptimizer:
         max_corr = np.max(corr_matrix[mask]) if np.any(mask) else 0.0
         min_corr = np.min(corr_matrix[mask]) if np.any(mask) else 0.0
         
-        return CorrelationMatrix(
+        self.correlation_matrix = CorrelationMatrix(
             timestamp=datetime.now(),
             symbols=symbol_list,
             correlation=corr_matrix,
@@ -167,6 +181,7 @@ class PortfolioOptimizer:
             max_correlation=float(max_corr),
             min_correlation=float(min_corr),
         )
+        return self.correlation_matrix
     
     def calculate_portfolio_metrics(
         self,
@@ -321,10 +336,8 @@ class PortfolioOptimizer:
             return {}  # Not yet due for rebalance
         
         # Collect returns for metrics
-        returns_by_symbol = {}
-        for symbol, df in self.ohlcv_history.items():
-            if len(df) > 1:
-                returns_by_symbol[symbol] = df['Close'].pct_change().dropna().values
+        self.covariance.flush()
+        returns_by_symbol = self.returns_by_symbol()
         
         # Calculate portfolio metrics
         self.risk_metrics = self.calculate_portfolio_metrics(
@@ -0,0 +1,269 @@
+"""Streaming covariance/correlation of per-symbol returns.
+
+`StreamingCovariance` holds the last ``window`` return rows (one row per bar
+timestamp, one column per symbol) in a preallocated ring buffer. It keeps
+the matrices needed for pairwise-complete statistics, so a symbol that
+misses a bar or joins late only affects its own pairs:
+
+    M = sum(m m^T)      joint observation counts
+    S = sum(x m^T)      sum of x_i over bars where j is also observed
+    Q = sum(x^2 m^T)    same for x_i^2
+    C = sum(x x^T)      cross products
+
+(``m`` is the row's observed mask; ``x`` is the row with missing values set
+to 0.) A new bar adds one rank-1 term to each matrix, and the bar leaving
+the window subtracts its term, so an update costs O(N^2) rather than
+rebuilding from the whole window. The sums are recomputed exactly from the
+buffer once per ``window`` bars to stop floating-point drift.
+
+With ``halflife`` set, covariances are exponentially weighted instead. The
+buffer is still kept so `returns` can report the recent window. In that mode
+only bars newer than the last applied one update the statistics.
+
+Rows cannot be inserted behind the newest one, so a staged bar that is older
+than the last applied bar and has no row in the window (older than the
+window, or a timestamp no other symbol had) is dropped. Drops are counted in
+``rows_rejected`` and logged.
+
+Symbols map to columns through a dict, and capacity doubles as symbols are
+added.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingCovariance:
+    """Windowed (or EWMA) return covariance updated one bar at a time."""
+
+    def __init__(
+        self,
+        window: int = 99,
+        halflife: Optional[float] = None,
+        capacity: int = 16,
+    ) -> None:
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = int(window)
+        self.halflife = halflife
+        self.alpha = None if halflife is None else 1.0 - 0.5 ** (1.0 / float(halflife))
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self._cap = 0
+        self._buf = np.empty((self.window, 0))
+        self._ts: List[Any] = [None] * self.window
+        self._slot_of: Dict[Any, int] = {}
+        self._head = 0  # next slot to write
+        self._rows = 0  # rows held (<= window)
+        self._last_ts: Any = None
+        self._since_resync = 0
+        self._staged: Dict[Any, Dict[int, float]] = {}
+        self.rows_applied = 0
+        self.rows_rejected = 0
+        self._resize(max(2, int(capacity)))
+
+    # -- symbols -----------------------------------------------------------
+
+    def _resize(self, cap: int) -> None:
+        old = self._cap
+        buf = np.full((self.window, cap), np.nan)
+        buf[:, :old] = self._buf
+        self._buf = buf
+
+        def grow(a: Optional[np.ndarray]) -> np.ndarray:
+            out = np.zeros((cap, cap))
+            if a is not None:
+                out[:old, :old] = a
+            return out
+
+        for name in ("_M", "_S", "_Q", "_C", "_ew_cov"):
+            setattr(self, name, grow(getattr(self, name, None)))
+        ew_mean = np.zeros(cap)
+        ew_seen = np.zeros(cap, dtype=bool)
+        if old:
+            ew_mean[:old] = self._ew_mean
+            ew_seen[:old] = self._ew_seen
+        self._ew_mean, self._ew_seen = ew_mean, ew_seen
+        self._cap = cap
+
+    def add_symbol(self, symbol: str) -> int:
+        idx = self.index.get(symbol)
+        if idx is None:
+            idx = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if idx >= self._cap:
+                self._resize(self._cap * 2)
+        return idx
+
+    # -- updates -----------------------------------------------------------
+
+    def update(self, symbol: str, timestamps: Sequence[Any], returns: Iterable[float]) -> None:
+        """Stage ``symbol``'s returns at ``timestamps``; applied by `flush`.
+
+        A timestamp already in the window revises that bar's value.
+        """
+        idx = self.add_symbol(symbol)
+        for ts, r in zip(timestamps, returns):
+            self._staged.setdefault(ts, {})[idx] = float(r)
+
+    def flush(self) -> int:
+        """Apply staged returns in timestamp order; returns rows touched."""
+        if not self._staged:
+            return 0
+        staged, self._staged = self._staged, {}
+        touched = rejected = 0
+        for ts in sorted(staged):
+            values = staged[ts]
+            slot = self._slot_of.get(ts)
+            if slot is not None:
+                if self.alpha is not None:
+                    self._write(self._buf[slot], values)
+                else:
+                    old = self._buf[slot].copy()
+                    self._write(self._buf[slot], values)
+                    self._accumulate(old, -1.0)
+                    self._accumulate(self._buf[slot], 1.0)
+                touched += 1
+            elif self._last_ts is None or ts > self._last_ts:
+                self._push(ts, values)
+                touched += 1
+            else:
+                rejected += 1
+        self.rows_applied += touched
+        if rejected:
+            self.rows_rejected += rejected
+            logger.warning(
+                "Dropped %d staged bar(s) older than %s with no row in the window",
+                rejected,
+                self._last_ts,
+            )
+        return touched
+
+    @staticmethod
+    def _write(row: np.ndarray, values: Dict[int, float]) -> None:
+        idx = np.fromiter(values.keys(), dtype=np.int64, count=len(values))
+        row[idx] = np.fromiter(values.values(), dtype=np.float64, count=len(values))
+
+    def _push(self, ts: Any, values: Dict[int, float]) -> None:
+        slot = self._head
+        if self._rows == self.window:
+            if self.alpha is None:
+                self._accumulate(self._buf[slot], -1.0)
+            del self._slot_of[self._ts[slot]]
+        else:
+            self._rows += 1
+        row = self._buf[slot]
+        row[:] = np.nan
+        self._write(row, values)
+        self._ts[slot] = ts
+        self._slot_of[ts] = slot
+        self._head = (slot + 1) % self.window
+        self._last_ts = ts
+
+        if self.alpha is None:
+            self._accumulate(row, 1.0)
+            self._since_resync += 1
+            if self._since_resync >= self.window:
+                self.resync()
+        else:
+            self._ewma(row)
+
+    def _accumulate(self, row: np.ndarray, sign: float) -> None:
+        """Add (``sign=1``) or remove (``sign=-1``) one row's rank-1 terms."""
+        n = len(self.symbols)
+        row = row[:n]
+        m = ~np.isnan(row)
+        if not m.any():
+            return
+        x = np.where(m, row, 0.0)
+        mf = m.astype(np.float64)
+        xs, ms = sign * x, sign * mf
+        self._M[:n, :n] += np.outer(ms, mf)
+        self._S[:n, :n] += np.outer(xs, mf)
+        self._Q[:n, :n] += np.outer(xs * x, mf)
+        self._C[:n, :n] += np.outer(xs, x)
+
+    def _ewma(self, row: np.ndarray) -> None:
+        obs = np.flatnonzero(~np.isnan(row))
+        if len(obs) == 0:
+            return
+        fresh = obs[~self._ew_seen[obs]]
+        self._ew_mean[fresh] = row[fresh]
+        self._ew_seen[fresh] = True
+        a = self.alpha
+        block = np.ix_(obs, obs)
+        d = row[obs] - self._ew_mean[obs]
+        self._ew_cov[block] = (1.0 - a) * (self._ew_cov[block] + a * np.outer(d, d))
+        self._ew_mean[obs] += a * d
+
+    def resync(self) -> None:
+        """Recompute the windowed sums exactly from the buffer."""
+        self._since_resync = 0
+        if self.alpha is not None:
+            return
+        n = len(self.symbols)
+        rows = self._buf[: self._rows, :n]
+        m = (~np.isnan(rows)).astype(np.float64)
+        x = np.where(m > 0, rows, 0.0)
+        self._M[:n, :n] = m.T @ m
+        self._S[:n, :n] = x.T @ m
+        self._Q[:n, :n] = (x * x).T @ m
+        self._C[:n, :n] = x.T @ x
+
+    # -- queries -----------------------------------------------------------
+
+    def _indices(self, symbols: Optional[Sequence[str]]) -> Tuple[List[str], np.ndarray]:
+        if symbols is None:
+            symbols = self.symbols
+        names = [s for s in symbols if s in self.index]
+        return names, np.array([self.index[s] for s in names], dtype=np.int64)
+
+    def observations(self, symbol: str) -> int:
+        """Returns held for ``symbol`` in the current window."""
+        idx = self.index.get(symbol)
+        if idx is None or self._rows == 0:
+            return 0
+        return int(np.count_nonzero(~np.isnan(self._buf[: self._rows, idx])))
+
+    def returns(self, symbol: str) -> np.ndarray:
+        """``symbol``'s returns in the window, oldest first, missing bars dropped."""
+        idx = self.index.get(symbol)
+        if idx is None or self._rows == 0:
+            return np.empty(0)
+        order = np.arange(self._head - self._rows, self._head) % self.window
+        col = self._buf[order, idx]
+        return col[~np.isnan(col)]
+
+    def covariance(self, symbols: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Sample covariance (pairwise-complete) or EWMA covariance for ``symbols``."""
+        names, idx = self._indices(symbols)
+        block = np.ix_(idx, idx)
+        if self.alpha is not None:
+            return names, self._ew_cov[block].copy()
+        M, S, C = self._M[block], self._S[block], self._C[block]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (C - S * S.T / M) / (M - 1.0)
+        cov[M < 2] = np.nan
+        return names, cov
+
+    def correlation(self, symbols: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Correlation for ``symbols``; NaN where undefined."""
+        names, idx = self._indices(symbols)
+        block = np.ix_(idx, idx)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.alpha is not None:
+                cov = self._ew_cov[block]
+                sd = np.sqrt(np.diag(cov))
+                return names, cov / np.outer(sd, sd)
+            M, S, Q, C = self._M[block], self._S[block], self._Q[block], self._C[block]
+            num = C - S * S.T / M
+            var_i = Q - S * S / M
+            corr = num / np.sqrt(var_i * var_i.T)
+        corr[M < 2] = np.nan
+        return names, corr
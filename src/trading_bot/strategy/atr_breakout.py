@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
 
 import pandas as pd
 from ta.volatility import AverageTrueRange
 
-from trading_bot.strategy.base import StrategyOutput
+from trading_bot.indicators.streaming import RollingMax, RollingMin, StreamingATR
+from trading_bot.strategy.base import CausalOutputs, StrategyOutput
+from trading_bot.strategy.latch import position_latch
+
+
+@dataclass
+class _AtrStream:
+    atr: StreamingATR
+    roll_high: RollingMax
+    roll_low: RollingMin
+    rows: int = 0
+    in_long: bool = False
 
 
 @dataclass
@@ -16,6 +27,9 @@ class AtrBreakoutStrategy:
     breakout_lookback: int = 20
     atr_mult: float = 1.0
 
+    # Per-key incremental state for `update`; not part of the strategy's identity.
+    _streams: Dict[str, _AtrStream] = field(default_factory=dict, init=False, repr=False, compare=False)
+
     def evaluate(self, df: pd.DataFrame) -> StrategyOutput:
         if df.empty:
             return StrategyOutput(signal=0, confidence=0.0, explanation={"error": "empty_df"})
@@ -26,16 +40,71 @@ class AtrBreakoutStrategy:
 
         # Check if we have enough data for the ATR window
         if len(df) < int(self.atr_period):
-            return StrategyOutput(
-                signal=0,
-                confidence=0.0,
-                explanation={
-                    "error": "insufficient_data",
-                    "rows": len(df),
-                    "atr_period": int(self.atr_period),
-                },
+            return self._insufficient(len(df))
+
+        close = df["Close"].astype(float)
+        atr, roll_high, roll_low = self._indicators(df)
+        sig = self._latch(close, atr, roll_high, roll_low)
+
+        last_atr = float(atr.iloc[-1]) if pd.notna(atr.iloc[-1]) else float("nan")
+        last_rh = float(roll_high.iloc[-1]) if pd.notna(roll_high.iloc[-1]) else float("nan")
+        last_rl = float(roll_low.iloc[-1]) if pd.notna(roll_low.iloc[-1]) else float("nan")
+        last_close = float(close.iloc[-1])
+        return self._output(
+            last_atr=last_atr,
+            last_rh=last_rh,
+            last_rl=last_rl,
+            last_close=last_close,
+            signal=int(sig.iloc[-1]),
+        )
+
+    def signals(self, df: pd.DataFrame) -> pd.Series:
+        """In-position (1) / flat (0) series with one value per row of ``df``."""
+        if df.empty:
+            return pd.Series(dtype="int64")
+        for col in ("High", "Low", "Close"):
+            if col not in df.columns:
+                raise ValueError(f"Missing {col} column")
+        if len(df) < int(self.atr_period):
+            return pd.Series(0, index=df.index, dtype="int64")
+        atr, roll_high, roll_low = self._indicators(df)
+        return self._latch(df["Close"].astype(float), atr, roll_high, roll_low)
+
+    def evaluate_all(self, df: pd.DataFrame) -> CausalOutputs:
+        """Outputs for every prefix of ``df`` from one pass over the history.
+
+        ATR (seeded at ``atr_period``), the shifted rolling extremes and the
+        latch are causal, so row ``i`` of the full-history arrays is exactly
+        what `evaluate` sees on ``df.iloc[: i + 1]``.
+        """
+        for col in ("High", "Low", "Close"):
+            if col not in df.columns:
+                raise ValueError(f"Missing {col} column")
+        if len(df) < int(self.atr_period):
+            return CausalOutputs(len(df), lambda i: self._insufficient(i + 1))
+
+        close = df["Close"].astype(float)
+        atr, roll_high, roll_low = self._indicators(df)
+        sig = self._latch(close, atr, roll_high, roll_low).to_numpy()
+        atr_vals = atr.to_numpy(dtype=float)
+        rh_vals = roll_high.to_numpy(dtype=float)
+        rl_vals = roll_low.to_numpy(dtype=float)
+        close_vals = close.to_numpy(dtype=float)
+
+        def build(i: int) -> StrategyOutput:
+            if i + 1 < int(self.atr_period):
+                return self._insufficient(i + 1)
+            return self._output(
+                last_atr=float(atr_vals[i]),
+                last_rh=float(rh_vals[i]),
+                last_rl=float(rl_vals[i]),
+                last_close=float(close_vals[i]),
+                signal=int(sig[i]),
             )
 
+        return CausalOutputs(len(df), build)
+
+    def _indicators(self, df: pd.DataFrame) -> tuple[pd.Series, pd.Series, pd.Series]:
         high = df["High"].astype(float)
         low = df["Low"].astype(float)
         close = df["Close"].astype(float)
@@ -50,36 +119,91 @@ class AtrBreakoutStrategy:
         # Use previous rolling high/low to avoid lookahead.
         roll_high = high.rolling(window=int(self.breakout_lookback)).max().shift(1)
         roll_low = low.rolling(window=int(self.breakout_lookback)).min().shift(1)
+        return atr, roll_high, roll_low
+
+    def _latch(
+        self, close: pd.Series, atr: pd.Series, roll_high: pd.Series, roll_low: pd.Series
+    ) -> pd.Series:
+        # NaN comparisons are False, so rows without a full lookback never flip state.
+        band = atr * float(self.atr_mult)
+        entry = (close > roll_high + band).to_numpy()
+        exit_ = (close < roll_low - band).to_numpy()
+        return pd.Series(position_latch(entry, exit_), index=close.index, dtype="int64")
+
+    def update(self, bar: Mapping[str, Any], *, key: str = "default") -> StrategyOutput:
+        """Consume one new bar and return what `evaluate` would on the full history.
+
+        State is kept per ``key`` (typically the symbol), so one instance can
+        stream a whole universe. Work per call is O(1).
+        """
+        for col in ("High", "Low", "Close"):
+            if col not in bar:
+                raise ValueError(f"Missing {col} column")
 
-        sig = pd.Series(0, index=df.index, dtype="int64")
-        in_long = False
-        for idx in df.index:
-            rh = roll_high.loc[idx]
-            if isinstance(rh, pd.Series):
-                rh = rh.iloc[0] if len(rh) > 0 else float('nan')
-            rl = roll_low.loc[idx]
-            if isinstance(rl, pd.Series):
-                rl = rl.iloc[0] if len(rl) > 0 else float('nan')
-            a = atr.loc[idx]
-            if isinstance(a, pd.Series):
-                a = a.iloc[0] if len(a) > 0 else float('nan')
-            c = close.loc[idx]
-            if isinstance(c, pd.Series):
-                c = c.iloc[0] if len(c) > 0 else float('nan')
-
-            if not in_long and pd.notna(rh) and pd.notna(a) and float(c) > float(rh) + float(a) * float(self.atr_mult):
-                in_long = True
-            elif in_long and pd.notna(rl) and pd.notna(a) and float(c) < float(rl) - float(a) * float(self.atr_mult):
-                in_long = False
-
-            sig.loc[idx] = 1 if in_long else 0
-
-        last_atr = float(atr.iloc[-1]) if pd.notna(atr.iloc[-1]) else float("nan")
-        last_rh = float(roll_high.iloc[-1]) if pd.notna(roll_high.iloc[-1]) else float("nan")
-        last_rl = float(roll_low.iloc[-1]) if pd.notna(roll_low.iloc[-1]) else float("nan")
-        last_close = float(close.iloc[-1])
-        signal = int(sig.iloc[-1])
+        st = self._streams.get(key)
+        if st is None:
+            st = self._streams[key] = _AtrStream(
+                atr=StreamingATR(int(self.atr_period)),
+                roll_high=RollingMax(int(self.breakout_lookback)),
+                roll_low=RollingMin(int(self.breakout_lookback)),
+            )
 
+        high = float(bar["High"])
+        low = float(bar["Low"])
+        c = float(bar["Close"])
+
+        # Previous-window extremes (the streaming equivalent of `.shift(1)`).
+        rh = st.roll_high.value
+        rl = st.roll_low.value
+        a = st.atr.update(high, low, c)
+        st.roll_high.update(high)
+        st.roll_low.update(low)
+        st.rows += 1
+
+        mult = float(self.atr_mult)
+        if not st.in_long and pd.notna(rh) and pd.notna(a) and c > rh + a * mult:
+            st.in_long = True
+        elif st.in_long and pd.notna(rl) and pd.notna(a) and c < rl - a * mult:
+            st.in_long = False
+
+        if st.rows < int(self.atr_period):
+            return self._insufficient(st.rows)
+
+        return self._output(
+            last_atr=float(a),
+            last_rh=float(rh),
+            last_rl=float(rl),
+            last_close=c,
+            signal=1 if st.in_long else 0,
+        )
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Drop streaming state for ``key`` (or for every key)."""
+        if key is None:
+            self._streams.clear()
+        else:
+            self._streams.pop(key, None)
+
+    def _insufficient(self, rows: int) -> StrategyOutput:
+        return StrategyOutput(
+            signal=0,
+            confidence=0.0,
+            explanation={
+                "error": "insufficient_data",
+                "rows": rows,
+                "atr_period": int(self.atr_period),
+            },
+        )
+
+    def _output(
+        self,
+        *,
+        last_atr: float,
+        last_rh: float,
+        last_rl: float,
+        last_close: float,
+        signal: int,
+    ) -> StrategyOutput:
         # Confidence increases with distance beyond the breakout threshold.
         if pd.isna(last_atr) or last_atr <= 0 or pd.isna(last_rh):
             conf = 0.0
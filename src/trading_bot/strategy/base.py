@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Protocol
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Protocol, Sequence
 
 import pandas as pd
 
@@ -13,6 +13,35 @@ class StrategyOutput:
     explanation: Dict[str, Any]
 
 
+class CausalOutputs(Sequence[StrategyOutput]):
+    """Lazy per-row outputs of a strategy over a whole history.
+
+    Element ``i`` is what ``evaluate(df.iloc[: i + 1])`` returns. Outputs are
+    built on access from arrays the strategy precomputed once, so holding one
+    of these per symbol costs a few arrays rather than a dict per row.
+    """
+
+    def __init__(self, n: int, build: Callable[[int], StrategyOutput]) -> None:
+        self._n = int(n)
+        self._build = build
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> StrategyOutput:  # type: ignore[override]
+        if not isinstance(i, int):
+            raise TypeError("CausalOutputs only supports integer indexing")
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return self._build(i)
+
+    def __iter__(self) -> Iterator[StrategyOutput]:
+        for i in range(self._n):
+            yield self._build(i)
+
+
 class Strategy(Protocol):
     name: str
 
@@ -20,6 +49,16 @@ class Strategy(Protocol):
         ...
 
 
+class StreamingStrategy(Strategy, Protocol):
+    """Strategy that can also consume one bar at a time with O(1) work."""
+
+    def update(self, bar: Mapping[str, Any], *, key: str = "default") -> StrategyOutput:
+        ...
+
+    def reset(self, key: Optional[str] = None) -> None:
+        ...
+
+
 @dataclass(frozen=True)
 class StrategyDecision:
     """Explainable decision used by the engine and persisted for auditability."""
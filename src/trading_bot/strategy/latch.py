@@ -0,0 +1,99 @@
+"""Vectorized enter/exit latch shared by the long/flat strategies.
+
+Every built-in strategy turns an entry mask and an exit mask into an
+in-position series with the same state machine::
+
+    if not in_long and entry[i]:
+        in_long = True
+    elif in_long and exit[i]:
+        in_long = False
+
+`position_latch` computes that series in one pass over NumPy arrays instead of
+a per-row ``.loc`` loop. When Numba is installed a compiled loop is used;
+otherwise a closed-form NumPy version gives bit-identical results.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_numba_available = False
+_latch_numba_fn = None
+
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def _latch_numba_impl(entry: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+        out = np.zeros(entry.shape[0], dtype=np.int64)
+        in_long = False
+        for i in range(entry.shape[0]):
+            if not in_long and entry[i]:
+                in_long = True
+            elif in_long and exit_[i]:
+                in_long = False
+            out[i] = 1 if in_long else 0
+        return out
+
+    _latch_numba_fn = _latch_numba_impl
+    _numba_available = True
+except ImportError:
+    logger.debug("Numba not available; using NumPy latch")
+
+
+def _latch_numpy(entry: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """Closed-form latch.
+
+    A bar with exactly one of entry/exit set forces the state (entry -> 1,
+    exit -> 0). A bar with both set toggles it (flat enters, long exits) and
+    a bar with neither keeps it. So the state at ``i`` is the value forced at
+    the most recent forcing bar, flipped once per "both" bar since then.
+    """
+    n = entry.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    both = entry & exit_
+    forcing = entry ^ exit_
+
+    last = np.maximum.accumulate(np.where(forcing, np.arange(n), -1))
+    has_last = last >= 0
+    last_idx = np.where(has_last, last, 0)
+
+    base = entry[last_idx] & has_last
+    cum_both = np.cumsum(both, dtype=np.int64)
+    flips = cum_both - np.where(has_last, cum_both[last_idx], 0)
+
+    return (base ^ (flips & 1).astype(bool)).astype(np.int64)
+
+
+def _as_mask(x) -> np.ndarray:
+    arr = np.asarray(x)
+    if arr.dtype == bool:
+        return arr
+    if arr.dtype.kind == "f":
+        # NaN means "condition unknown", which the loops treated as False.
+        return np.nan_to_num(arr, nan=0.0) != 0
+    return arr.astype(bool)
+
+
+def position_latch(entry, exit_, *, use_numba: bool | None = None) -> np.ndarray:
+    """Return the 0/1 in-position array for boolean ``entry``/``exit_`` masks.
+
+    Inputs may be arrays or Series; NaN in float masks counts as False. The
+    result is an ``int64`` array of the same length.
+    """
+    entry = _as_mask(entry)
+    exit_ = _as_mask(exit_)
+    if entry.shape != exit_.shape or entry.ndim != 1:
+        raise ValueError("entry and exit masks must be 1-D and the same length")
+
+    if use_numba is None:
+        use_numba = _numba_available
+    if use_numba and _latch_numba_fn is not None:
+        return _latch_numba_fn(entry, exit_)
+    return _latch_numpy(entry, exit_)
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
 
 import pandas as pd
 from ta.trend import MACD
 
-from trading_bot.strategy.base import StrategyOutput
+from trading_bot.indicators.streaming import RollingMean, StreamingMACD
+from trading_bot.strategy.base import CausalOutputs, StrategyOutput
+from trading_bot.strategy.latch import position_latch
+
+
+@dataclass
+class _MacdStream:
+    macd: StreamingMACD
+    vol_ma: RollingMean
+    in_long: bool = False
 
 
 @dataclass
@@ -18,6 +27,11 @@ class MacdVolumeMomentumStrategy:
     vol_sma: int = 20
     vol_mult: float = 1.0
 
+    # Per-key incremental state for `update`; not part of the strategy's identity.
+    _streams: Dict[str, _MacdStream] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
     def evaluate(self, df: pd.DataFrame) -> StrategyOutput:
         if df.empty:
             return StrategyOutput(signal=0, confidence=0.0, explanation={"error": "empty_df"})
@@ -26,46 +40,124 @@ class MacdVolumeMomentumStrategy:
             if col not in df.columns:
                 raise ValueError(f"Missing {col} column")
 
-        close = df["Close"].astype(float)
         volume = df["Volume"].astype(float)
+        macd_diff, vol_ma = self._indicators(df)
+        sig = self._latch(macd_diff, volume, vol_ma)
+
+        last_md = float(macd_diff.iloc[-1]) if pd.notna(macd_diff.iloc[-1]) else float("nan")
+        last_vol = float(volume.iloc[-1])
+        last_vol_ma = float(vol_ma.iloc[-1]) if pd.notna(vol_ma.iloc[-1]) else float("nan")
+        return self._output(
+            last_md=last_md, last_vol=last_vol, last_vol_ma=last_vol_ma, signal=int(sig.iloc[-1])
+        )
 
+    def signals(self, df: pd.DataFrame) -> pd.Series:
+        """In-position (1) / flat (0) series with one value per row of ``df``."""
+        if df.empty:
+            return pd.Series(dtype="int64")
+        for col in ("Close", "Volume"):
+            if col not in df.columns:
+                raise ValueError(f"Missing {col} column")
+        macd_diff, vol_ma = self._indicators(df)
+        return self._latch(macd_diff, df["Volume"].astype(float), vol_ma)
+
+    def evaluate_all(self, df: pd.DataFrame) -> CausalOutputs:
+        """Outputs for every prefix of ``df`` from one pass over the history.
+
+        MACD, the volume SMA and the latch are causal, so row ``i`` of the
+        full-history arrays is exactly what `evaluate` sees on ``df.iloc[: i + 1]``.
+        """
+        for col in ("Close", "Volume"):
+            if col not in df.columns:
+                raise ValueError(f"Missing {col} column")
+        if df.empty:
+            return CausalOutputs(0, self.evaluate)
+
+        volume = df["Volume"].astype(float)
+        macd_diff, vol_ma = self._indicators(df)
+        sig = self._latch(macd_diff, volume, vol_ma).to_numpy()
+        md_vals = macd_diff.to_numpy(dtype=float)
+        vol_vals = volume.to_numpy(dtype=float)
+        vol_ma_vals = vol_ma.to_numpy(dtype=float)
+        return CausalOutputs(
+            len(df),
+            lambda i: self._output(
+                last_md=float(md_vals[i]),
+                last_vol=float(vol_vals[i]),
+                last_vol_ma=float(vol_ma_vals[i]),
+                signal=int(sig[i]),
+            ),
+        )
+
+    def _indicators(self, df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+        close = df["Close"].astype(float)
+        volume = df["Volume"].astype(float)
         macd = MACD(
             close=close,
             window_fast=int(self.macd_fast),
             window_slow=int(self.macd_slow),
             window_sign=int(self.macd_signal),
         )
-        macd_diff = macd.macd_diff()
-
         vol_ma = volume.rolling(window=int(self.vol_sma)).mean()
+        return macd.macd_diff(), vol_ma
+
+    def _latch(self, macd_diff: pd.Series, volume: pd.Series, vol_ma: pd.Series) -> pd.Series:
+        # NaN comparisons are False, so warm-up rows never flip state.
         vol_ok = volume >= (vol_ma * float(self.vol_mult))
+        entry = ((macd_diff > 0) & vol_ok).to_numpy()
+        exit_ = (macd_diff < 0).to_numpy()
+        return pd.Series(position_latch(entry, exit_), index=macd_diff.index, dtype="int64")
 
-        sig = pd.Series(0, index=df.index, dtype="int64")
-        in_long = False
-        for idx in df.index:
-            md = macd_diff.loc[idx]
-            if isinstance(md, pd.Series):
-                md = md.iloc[0] if len(md) > 0 else float('nan')
-            
-            vol_ok_val = vol_ok.loc[idx]
-            if isinstance(vol_ok_val, pd.Series):
-                vol_ok_val = vol_ok_val.iloc[0] if len(vol_ok_val) > 0 else False
-            v_ok = bool(vol_ok_val) if pd.notna(vol_ok_val) else False
-
-            if not in_long and pd.notna(md) and float(md) > 0 and v_ok:
-                in_long = True
-            elif in_long and pd.notna(md) and float(md) < 0:
-                in_long = False
-            sig.loc[idx] = 1 if in_long else 0
+    def update(self, bar: Mapping[str, Any], *, key: str = "default") -> StrategyOutput:
+        """Consume one new bar and return what `evaluate` would on the full history.
 
-        last_md = float(macd_diff.iloc[-1]) if pd.notna(macd_diff.iloc[-1]) else float("nan")
-        last_vol = float(volume.iloc[-1])
-        last_vol_ma = float(vol_ma.iloc[-1]) if pd.notna(vol_ma.iloc[-1]) else float("nan")
-        signal = int(sig.iloc[-1])
+        State is kept per ``key`` (typically the symbol), so one instance can
+        stream a whole universe. Work per call is O(1).
+        """
+        for col in ("Close", "Volume"):
+            if col not in bar:
+                raise ValueError(f"Missing {col} column")
+
+        st = self._streams.get(key)
+        if st is None:
+            st = self._streams[key] = _MacdStream(
+                macd=StreamingMACD(int(self.macd_fast), int(self.macd_slow), int(self.macd_signal)),
+                vol_ma=RollingMean(int(self.vol_sma)),
+            )
+
+        volume = float(bar["Volume"])
+        md = st.macd.update(float(bar["Close"]))
+        vol_ma = st.vol_ma.update(volume)
+        v_ok = pd.notna(vol_ma) and volume >= vol_ma * float(self.vol_mult)
+
+        if not st.in_long and pd.notna(md) and md > 0 and v_ok:
+            st.in_long = True
+        elif st.in_long and pd.notna(md) and md < 0:
+            st.in_long = False
+
+        return self._output(
+            last_md=float(md),
+            last_vol=volume,
+            last_vol_ma=float(vol_ma),
+            signal=1 if st.in_long else 0,
+        )
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Drop streaming state for ``key`` (or for every key)."""
+        if key is None:
+            self._streams.clear()
+        else:
+            self._streams.pop(key, None)
 
+    def _output(
+        self, *, last_md: float, last_vol: float, last_vol_ma: float, signal: int
+    ) -> StrategyOutput:
         # Confidence: MACD diff magnitude plus volume confirmation.
         md_conf = 0.0 if pd.isna(last_md) else min(1.0, abs(last_md) / 0.5)
-        v_conf = 0.0 if pd.isna(last_vol_ma) or last_vol_ma <= 0 else min(1.0, last_vol / last_vol_ma)
+        if pd.isna(last_vol_ma) or last_vol_ma <= 0:
+            v_conf = 0.0
+        else:
+            v_conf = min(1.0, last_vol / last_vol_ma)
         conf = min(1.0, 0.5 * md_conf + 0.5 * min(1.0, v_conf / float(self.vol_mult)))
 
         explanation: Dict[str, Any] = {
@@ -3,6 +3,7 @@ from __future__ import annotations
 import pandas as pd
 
 from trading_bot.indicators import add_indicators
+from trading_bot.strategy.latch import position_latch
 
 
 def zscore(series: pd.Series, window: int) -> pd.Series:
@@ -63,17 +64,7 @@ def generate_signals(
 
     long_exit = (out["z"] >= -abs(zscore_exit)) | (out["rsi"] >= rsi_overbought)
 
-    signal = pd.Series(0, index=out.index, dtype="int64")
-    in_long = False
-    for idx in out.index:
-        if not in_long and bool(long_entry.loc[idx]):
-            in_long = True
-            signal.loc[idx] = 1
-        elif in_long and bool(long_exit.loc[idx]):
-            in_long = False
-            signal.loc[idx] = 0
-        else:
-            signal.loc[idx] = 1 if in_long else 0
-
-    out["signal"] = signal
+    out["signal"] = pd.Series(
+        position_latch(long_entry.to_numpy(), long_exit.to_numpy()), index=out.index, dtype="int64"
+    )
     return out
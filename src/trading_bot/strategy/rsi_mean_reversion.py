@@ -1,12 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
 
 import pandas as pd
 from ta.momentum import RSIIndicator
 
-from trading_bot.strategy.base import StrategyOutput
+from trading_bot.indicators.streaming import StreamingRSI
+from trading_bot.strategy.base import CausalOutputs, StrategyOutput
+from trading_bot.strategy.latch import position_latch
+
+
+@dataclass
+class _RsiStream:
+    rsi: StreamingRSI
+    in_long: bool = False
 
 
 @dataclass
@@ -16,31 +24,88 @@ class RsiMeanReversionStrategy:
     entry_oversold: float = 30.0
     exit_rsi: float = 50.0
 
+    # Per-key incremental state for `update`; not part of the strategy's identity.
+    _streams: Dict[str, _RsiStream] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
     def evaluate(self, df: pd.DataFrame) -> StrategyOutput:
         if df.empty:
             return StrategyOutput(signal=0, confidence=0.0, explanation={"error": "empty_df"})
         if "Close" not in df.columns:
             raise ValueError("Missing Close column")
 
-        close = df["Close"].astype(float)
-        rsi = RSIIndicator(close=close, window=int(self.rsi_period)).rsi()
-
-        sig = pd.Series(0, index=df.index, dtype="int64")
-        in_long = False
-        for idx in df.index:
-            rsi_val = rsi.loc[idx]
-            if isinstance(rsi_val, pd.Series):
-                rsi_val = rsi_val.iloc[0] if len(rsi_val) > 0 else float('nan')
-            r = float(rsi_val) if pd.notna(rsi_val) else float("nan")
-            if not in_long and pd.notna(rsi_val) and r <= float(self.entry_oversold):
-                in_long = True
-            elif in_long and pd.notna(rsi_val) and r >= float(self.exit_rsi):
-                in_long = False
-            sig.loc[idx] = 1 if in_long else 0
+        rsi = self._rsi(df)
+        sig = self._latch(rsi)
 
         last_rsi = float(rsi.iloc[-1]) if pd.notna(rsi.iloc[-1]) else float("nan")
-        signal = int(sig.iloc[-1])
+        return self._output(last_rsi=last_rsi, signal=int(sig.iloc[-1]))
+
+    def signals(self, df: pd.DataFrame) -> pd.Series:
+        """In-position (1) / flat (0) series with one value per row of ``df``."""
+        if df.empty:
+            return pd.Series(dtype="int64")
+        if "Close" not in df.columns:
+            raise ValueError("Missing Close column")
+        return self._latch(self._rsi(df))
+
+    def evaluate_all(self, df: pd.DataFrame) -> CausalOutputs:
+        """Outputs for every prefix of ``df`` from one pass over the history.
+
+        RSI and the latch are causal, so row ``i`` of the full-history arrays
+        is exactly what `evaluate` sees on ``df.iloc[: i + 1]``.
+        """
+        if "Close" not in df.columns:
+            raise ValueError("Missing Close column")
+        if df.empty:
+            return CausalOutputs(0, self.evaluate)
+
+        rsi = self._rsi(df)
+        rsi_vals = rsi.to_numpy(dtype=float)
+        sig = self._latch(rsi).to_numpy()
+        return CausalOutputs(
+            len(df), lambda i: self._output(last_rsi=float(rsi_vals[i]), signal=int(sig[i]))
+        )
+
+    def _rsi(self, df: pd.DataFrame) -> pd.Series:
+        close = df["Close"].astype(float)
+        return RSIIndicator(close=close, window=int(self.rsi_period)).rsi()
+
+    def _latch(self, rsi: pd.Series) -> pd.Series:
+        # NaN RSI compares False on both sides, so warm-up rows never flip state.
+        entry = (rsi <= float(self.entry_oversold)).to_numpy()
+        exit_ = (rsi >= float(self.exit_rsi)).to_numpy()
+        return pd.Series(position_latch(entry, exit_), index=rsi.index, dtype="int64")
+
+    def update(self, bar: Mapping[str, Any], *, key: str = "default") -> StrategyOutput:
+        """Consume one new bar and return what `evaluate` would on the full history.
+
+        State is kept per ``key`` (typically the symbol), so one instance can
+        stream a whole universe. Work per call is O(1).
+        """
+        if "Close" not in bar:
+            raise ValueError("Missing Close column")
+
+        st = self._streams.get(key)
+        if st is None:
+            st = self._streams[key] = _RsiStream(rsi=StreamingRSI(int(self.rsi_period)))
+
+        r = st.rsi.update(float(bar["Close"]))
+        if not st.in_long and pd.notna(r) and r <= float(self.entry_oversold):
+            st.in_long = True
+        elif st.in_long and pd.notna(r) and r >= float(self.exit_rsi):
+            st.in_long = False
+
+        return self._output(last_rsi=float(r), signal=1 if st.in_long else 0)
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Drop streaming state for ``key`` (or for every key)."""
+        if key is None:
+            self._streams.clear()
+        else:
+            self._streams.pop(key, None)
 
+    def _output(self, *, last_rsi: float, signal: int) -> StrategyOutput:
         if pd.isna(last_rsi):
             conf = 0.0
         elif signal == 1:
@@ -0,0 +1,276 @@
+"""Per-iteration state deltas for Socket.IO dashboards.
+
+Dashboards used to poll whole-state JSON, so every poll re-serialized the
+prices of all symbols, the full equity history and the ensemble data. Here the
+trading loop publishes each `PaperEngineUpdate` to a `DeltaHub`, which pushes
+only what changed to subscribed clients:
+
+- `StateTracker.apply` diffs an update against the last one it saw. The delta
+  holds changed prices and signals, the iteration's fills, changed positions
+  (``None`` for a closed one) and the appended equity point. Positions are
+  compared as arrays straight from the portfolio's `PositionLedger`.
+- A client gets a full snapshot when it subscribes (the handshake). After
+  that it receives deltas numbered ``seq``, each one continuing from the
+  previous.
+- A client has at most one delta in flight. Deltas published before it acks
+  (or before ``ack_timeout`` passes, for clients that never ack) are merged
+  into one pending delta, so a slow client sees fewer, larger messages. The
+  trading loop never waits on any client.
+- If a pending delta grows past ``max_pending`` fills or equity points, it is
+  dropped and the client is sent a fresh snapshot instead.
+
+The hub has no Socket.IO dependency. `TradingBotAPI` runs the sender loop and
+does the emitting.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from trading_bot.core.models import Fill
+
+
+def _fill_dict(fill: Fill) -> Dict[str, Any]:
+    return {
+        "ts": fill.ts.isoformat(),
+        "symbol": fill.symbol,
+        "side": fill.side,
+        "qty": int(fill.qty),
+        "price": float(fill.price),
+        "fee": float(fill.fee),
+        "note": fill.note,
+    }
+
+
+@dataclass
+class Delta:
+    """Changes since the previous delta; ``first_seq..seq`` once coalesced."""
+
+    seq: int
+    first_seq: int
+    ts: str
+    prices: Dict[str, float] = field(default_factory=dict)
+    signals: Dict[str, int] = field(default_factory=dict)
+    positions: Dict[str, Optional[Dict[str, float]]] = field(default_factory=dict)
+    fills: List[Dict[str, Any]] = field(default_factory=list)
+    equity: List[Tuple[str, float]] = field(default_factory=list)
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    def merged(self, newer: Delta) -> Delta:
+        """This delta followed by ``newer``, as one delta (later values win)."""
+        return Delta(
+            seq=newer.seq,
+            first_seq=self.first_seq,
+            ts=newer.ts,
+            prices={**self.prices, **newer.prices},
+            signals={**self.signals, **newer.signals},
+            positions={**self.positions, **newer.positions},
+            fills=self.fills + newer.fills,
+            equity=self.equity + newer.equity,
+            metrics={**self.metrics, **newer.metrics},
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "first_seq": self.first_seq,
+            "ts": self.ts,
+            "prices": self.prices,
+            "signals": self.signals,
+            "positions": self.positions,
+            "fills": self.fills,
+            "equity": self.equity,
+            "metrics": self.metrics,
+        }
+
+
+class StateTracker:
+    """Last published dashboard state, and the diff against each new update."""
+
+    def __init__(self, *, equity_points: int = 500, recent_fills: int = 50) -> None:
+        self.seq = 0
+        self.ts = ""
+        self.prices: Dict[str, float] = {}
+        self.signals: Dict[str, int] = {}
+        self.positions: Dict[str, Dict[str, float]] = {}
+        self.equity: deque = deque(maxlen=equity_points)
+        self.fills: deque = deque(maxlen=recent_fills)
+        self.metrics: Dict[str, float] = {}
+        self._ledger = None
+        self._qty = np.zeros(0, dtype=np.int64)
+        self._avg = np.zeros(0)
+
+    def apply(self, update) -> Delta:
+        self.seq += 1
+        self.ts = update.ts.isoformat()
+        delta = Delta(seq=self.seq, first_seq=self.seq, ts=self.ts)
+
+        for sym, px in update.prices.items():
+            px = float(px)
+            if self.prices.get(sym) != px:
+                self.prices[sym] = delta.prices[sym] = px
+        for sym, sig in update.signals.items():
+            sig = int(sig)
+            if self.signals.get(sym) != sig:
+                self.signals[sym] = delta.signals[sym] = sig
+
+        delta.positions = self._diff_positions(update.portfolio)
+        for sym, pos in delta.positions.items():
+            if pos is None:
+                self.positions.pop(sym, None)
+            else:
+                self.positions[sym] = pos
+
+        delta.fills = [_fill_dict(f) for f in update.fills]
+        self.fills.extend(delta.fills)
+
+        equity = float(update.portfolio.equity(update.prices))
+        delta.equity = [(self.ts, equity)]
+        self.equity.append(delta.equity[0])
+
+        delta.metrics = {
+            "equity": equity,
+            "cash": float(update.portfolio.cash),
+            "sharpe_ratio": float(update.sharpe_ratio or 0.0),
+            "max_drawdown_pct": float(update.max_drawdown_pct or 0.0),
+            "win_rate": float(update.win_rate or 0.0),
+            "num_trades": int(update.num_trades or 0),
+        }
+        self.metrics = delta.metrics
+        return delta
+
+    def _diff_positions(self, portfolio) -> Dict[str, Optional[Dict[str, float]]]:
+        ledger = portfolio.ledger
+        n = len(ledger)
+        qty, avg = ledger.qty[:n], ledger.avg_price[:n]
+        if ledger is not self._ledger:  # new portfolio: everything held is new
+            self._ledger = ledger
+            self._qty = np.zeros(0, dtype=np.int64)
+            self._avg = np.zeros(0)
+            gone = {sym: None for sym in self.positions}
+        else:
+            gone = {}
+        prev_qty = np.zeros(n, dtype=np.int64)
+        prev_avg = np.zeros(n)
+        prev_qty[: len(self._qty)] = self._qty
+        prev_avg[: len(self._avg)] = self._avg
+
+        changed: Dict[str, Optional[Dict[str, float]]] = gone
+        for slot in np.flatnonzero((qty != prev_qty) | (avg != prev_avg)):
+            sym = ledger.symbols[slot]
+            if qty[slot] == 0:
+                changed[sym] = None
+            else:
+                changed[sym] = {"qty": int(qty[slot]), "avg_price": float(avg[slot])}
+        self._qty = qty.copy()
+        self._avg = avg.copy()
+        return changed
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "ts": self.ts,
+            "prices": dict(self.prices),
+            "signals": dict(self.signals),
+            "positions": dict(self.positions),
+            "fills": list(self.fills),
+            "equity": list(self.equity),
+            "metrics": dict(self.metrics),
+        }
+
+
+@dataclass
+class _Client:
+    pending: Optional[Delta] = None
+    resync: bool = False  # pending overflowed: send a snapshot next
+    in_flight_since: Optional[float] = None
+
+
+class DeltaHub:
+    """Fans tracker deltas out to subscribed clients with per-client coalescing."""
+
+    def __init__(
+        self,
+        tracker: Optional[StateTracker] = None,
+        *,
+        max_pending: int = 1_000,
+        ack_timeout: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tracker = tracker or StateTracker()
+        self.max_pending = int(max_pending)
+        self.ack_timeout = float(ack_timeout)
+        self._clock = clock
+        self._clients: Dict[str, _Client] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def publish(self, update) -> None:
+        """Record one engine update; called from the trading loop."""
+        with self._lock:
+            delta = self.tracker.apply(update)
+            for client in self._clients.values():
+                if client.resync:
+                    continue
+                pending = delta if client.pending is None else client.pending.merged(delta)
+                if len(pending.fills) > self.max_pending or len(pending.equity) > self.max_pending:
+                    client.pending, client.resync = None, True
+                else:
+                    client.pending = pending
+        if self._clients:
+            self._ready.set()
+
+    def subscribe(self, sid: str) -> Dict[str, Any]:
+        """Register ``sid`` and return the snapshot its deltas continue from."""
+        with self._lock:
+            self._clients[sid] = _Client()
+            return self.tracker.snapshot()
+
+    def unsubscribe(self, sid: str) -> None:
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def ack(self, sid: str) -> None:
+        """``sid`` processed its last message; send the next one when ready."""
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                return
+            client.in_flight_since = None
+            if client.pending is not None or client.resync:
+                self._ready.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until something may be ready to send."""
+        ready = self._ready.wait(timeout)
+        self._ready.clear()
+        return ready
+
+    def drain(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """``(sid, event, payload)`` for every client free to receive now.
+
+        ``event`` is ``"delta"`` or ``"snapshot"``. Each returned client is
+        marked in flight until it acks or ``ack_timeout`` passes.
+        """
+        now = self._clock()
+        out: List[Tuple[str, str, Dict[str, Any]]] = []
+        with self._lock:
+            for sid, client in self._clients.items():
+                sent = client.in_flight_since
+                if sent is not None and now - sent < self.ack_timeout:
+                    continue
+                if client.resync:
+                    out.append((sid, "snapshot", self.tracker.snapshot()))
+                elif client.pending is not None:
+                    out.append((sid, "delta", client.pending.to_dict()))
+                else:
+                    continue
+                client.pending, client.resync = None, False
+                client.in_flight_since = now
+        return out
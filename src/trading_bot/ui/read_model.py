@@ -0,0 +1,138 @@
+"""Cached dashboard view of the trading database.
+
+`/api/data` used to open a new engine, run ``create_all``, load every
+portfolio snapshot and replay up to 1000 fills on each poll, so it got slower
+as the database aged. `DashboardReadModel` reads only the read-model tables
+the repository maintains on write (latest holdings plus the equity ring, see
+``db/models.py``), through the repository's shared engine:
+
+- A view is cached per ``(limit, before)`` page for ``ttl`` seconds, so
+  polling dashboards cost no database work inside the TTL.
+- After the TTL one indexed ``max(seq)`` query decides whether the cached view
+  is still current. Only a new snapshot triggers a reload.
+- Each view carries its serialized body and an ETag derived from the ring
+  sequence number, so a client that already has the view gets a 304.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import OperationalError
+
+from trading_bot.db.repository import EQUITY_RING_SIZE, SqliteRepository
+
+DEFAULT_HISTORY_LIMIT = 100
+
+# Shown until the engine publishes a live update
+DEFAULT_ENSEMBLE = {
+    "signal": 0,
+    "confidence": 0.0,
+    "weights": {"atr_breakout": 0.33, "macd_volume": 0.33, "rsi_mean_reversion": 0.34},
+    "strategy_signals": {"atr_breakout": 0, "macd_volume": 0, "rsi_mean_reversion": 0},
+}
+
+
+@dataclass(frozen=True)
+class DashboardView:
+    payload: Dict[str, Any]
+    body: bytes  # payload serialized once, served as-is while cached
+    etag: str
+    version: int  # newest equity-ring seq, -1 for an empty database
+
+
+def empty_payload() -> Dict[str, Any]:
+    return {
+        "portfolio": {"equity": 100000, "cash": 100000, "holdings": {}},
+        "prices": {},
+        "sharpe_ratio": 0,
+        "max_drawdown_pct": 0,
+        "win_rate": 0,
+        "num_trades": 0,
+        "equity_history": [],
+        "equity_history_next": None,
+        "ensemble": DEFAULT_ENSEMBLE,
+    }
+
+
+class DashboardReadModel:
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        ttl: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._repo = SqliteRepository(db_path=self.db_path)
+        self._lock = threading.Lock()
+        # (limit, before) -> (view, expires_at)
+        self._cache: Dict[Tuple[int, Optional[int]], Tuple[DashboardView, float]] = {}
+
+    def get(
+        self, *, limit: int = DEFAULT_HISTORY_LIMIT, before: Optional[int] = None
+    ) -> DashboardView:
+        """Portfolio, holdings and one page of equity history.
+
+        ``before`` is the ``equity_history_next`` cursor of the previous page.
+        """
+        key = (max(1, min(int(limit), EQUITY_RING_SIZE)), before)
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now < cached[1]:
+                return cached[0]
+            version = self._version()
+            if cached is not None and cached[0].version == version:
+                view = cached[0]
+            else:
+                view = self._load(key, version)
+            if len(self._cache) > 64:  # pages nobody asks for again
+                self._cache.clear()
+            self._cache[key] = (view, now + self.ttl)
+            return view
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _version(self) -> int:
+        if not os.path.exists(self.db_path):
+            return -1
+        # Read-only: the engine creates and backfills the read-model tables
+        try:
+            return self._repo.read_model_version()
+        except OperationalError:  # not created yet
+            return -1
+
+    def _load(self, key: Tuple[int, Optional[int]], version: int) -> DashboardView:
+        limit, before = key
+        payload = empty_payload()
+        if version >= 0:
+            points = self._repo.equity_history(limit=limit, before=before)
+            latest = points[-1:] if before is None else self._repo.equity_history(limit=1)
+            if latest:
+                payload["portfolio"]["equity"] = float(latest[0].equity)
+                payload["portfolio"]["cash"] = float(latest[0].cash)
+            payload["equity_history"] = [float(p.equity) for p in points]
+            if len(points) == limit:
+                payload["equity_history_next"] = points[0].seq
+            payload["portfolio"]["holdings"] = {
+                h.symbol: {
+                    "quantity": h.qty,
+                    "cost_basis": float(h.qty * h.avg_price),
+                    "avg_cost": float(h.avg_price),
+                }
+                for h in self._repo.latest_holdings()
+            }
+            payload["num_trades"] = len(payload["portfolio"]["holdings"])
+        body = json.dumps(payload).encode()
+        return DashboardView(payload, body, f"rm-{version}-{limit}-{before}", version)
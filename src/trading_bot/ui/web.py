@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import threading
 from collections import deque
 from pathlib import Path
@@ -12,6 +13,16 @@ from flask import Flask, jsonify, render_template_string, request
 from flask_cors import CORS
 
 from trading_bot.engine.paper import PaperEngineUpdate
+from trading_bot.ui.read_model import (
+    DEFAULT_ENSEMBLE,
+    DEFAULT_HISTORY_LIMIT,
+    DashboardReadModel,
+    empty_payload,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "/app/data/trades.sqlite"
 
 # Configure logging to also send to dashboard
 class DashboardLogHandler(logging.Handler):
@@ -33,11 +44,17 @@ class DashboardLogHandler(logging.Handler):
             self.handleError(record)
 
 
-def create_web_app():
+def create_web_app(db_path: str | None = None, *, cache_ttl: float = 1.0):
     """Create and configure Flask application."""
     app = Flask(__name__, template_folder=str(Path(__file__).parent))
     CORS(app)
 
+    # One read model (shared engine + TTL cache) for every request
+    read_model = DashboardReadModel(
+        db_path or os.environ.get("TRADING_BOT_DB", DEFAULT_DB_PATH), ttl=cache_ttl
+    )
+    app.read_model = read_model
+
     # Shared state - use deque for O(1) performance
     log_buffer = deque(maxlen=500)
     app.state = {
@@ -934,60 +951,26 @@ def create_web_app():
     # ============ API ENDPOINTS ============
     @app.route("/api/data")
     def get_data():
-        """API endpoint to return current trading data from database or live update."""
+        """API endpoint to return current trading data from database or live update.
+
+        Database data comes from the cached read model. Query parameters
+        ``history_limit`` and ``before`` page through the equity history, and
+        responses carry an ETag so unchanged polls get a 304.
+        """
         update = app.state.get("current_update")
-        
-        # Try to read from SQLite database if available
-        import os
-        from sqlalchemy import create_engine, desc
-        from sqlalchemy.orm import Session
-        from trading_bot.db.models import PortfolioSnapshot, FillEvent, Base
-        
-        db_path = "/app/data/trades.sqlite"
-        equity_history = []
-        portfolio_data = {
-            "equity": 100000,
-            "cash": 100000,
-            "holdings": {}
-        }
-        
-        if os.path.exists(db_path):
-            try:
-                engine = create_engine(f"sqlite:///{db_path}")
-                Base.metadata.create_all(engine)
-                with Session(engine) as session:
-                    # Get latest portfolio snapshot
-                    latest_snapshot = session.query(PortfolioSnapshot).order_by(desc(PortfolioSnapshot.ts)).first()
-                    if latest_snapshot:
-                        portfolio_data["equity"] = float(latest_snapshot.equity)
-                        portfolio_data["cash"] = float(latest_snapshot.cash)
-                    
-                    # Get equity history from all snapshots
-                    snapshots = session.query(PortfolioSnapshot).order_by(PortfolioSnapshot.ts).all()
-                    equity_history = [float(s.equity) for s in snapshots[-100:]]  # Last 100
-                    
-                    # Get recent fills for holdings
-                    recent_fills = session.query(FillEvent).order_by(desc(FillEvent.ts)).limit(1000).all()
-                    holdings_qty = {}
-                    for fill in reversed(recent_fills):  # Process in chronological order
-                        if fill.symbol not in holdings_qty:
-                            holdings_qty[fill.symbol] = 0
-                        if fill.side.upper() == 'BUY':
-                            holdings_qty[fill.symbol] += fill.qty
-                        else:
-                            holdings_qty[fill.symbol] -= fill.qty
-                    
-                    # Only show positions with qty > 0
-                    for symbol, qty in holdings_qty.items():
-                        if qty > 0:
-                            portfolio_data["holdings"][symbol] = {
-                                "quantity": qty,
-                                "cost_basis": 0,
-                                "avg_cost": 0
-                            }
-            except Exception as e:
-                logger.warning(f"Could not read database: {e}")
-        
+        try:
+            limit = int(request.args.get("history_limit", DEFAULT_HISTORY_LIMIT))
+            before = request.args.get("before", type=int)
+        except ValueError:
+            return jsonify({"error": "history_limit must be an integer"}), 400
+
+        try:
+            view = read_model.get(limit=limit, before=before)
+        except Exception as e:
+            logger.warning(f"Could not read database: {e}")
+            view = None
+        portfolio_data = view.payload["portfolio"] if view else {"equity": 100000, "cash": 100000, "holdings": {}}
+
         # If we have live update from bot, use it, otherwise use database data
         if update:
             holdings = {}
@@ -999,7 +982,8 @@ def create_web_app():
                         "avg_cost": holding.avg_cost
                     }
 
-            return jsonify({
+            equity_history = view.payload["equity_history"] if view else []
+            response = jsonify({
                 "portfolio": {
                     "equity": float(update.portfolio.equity(update.prices)) if hasattr(update.portfolio, 'equity') else portfolio_data["equity"],
                     "cash": float(update.portfolio.cash) if hasattr(update.portfolio, 'cash') else portfolio_data["cash"],
@@ -1011,34 +995,16 @@ def create_web_app():
                 "win_rate": float(update.win_rate) if update.win_rate else 0,
                 "num_trades": int(update.num_trades) if update.num_trades else 0,
                 "equity_history": [float(x) for x in app.state.get("equity_history", equity_history)],
-                "ensemble": app.state.get("ensemble_data", {
-                    "signal": 0,
-                    "confidence": 0.0,
-                    "weights": {"atr_breakout": 0.33, "macd_volume": 0.33, "rsi_mean_reversion": 0.34},
-                    "strategy_signals": {"atr_breakout": 0, "macd_volume": 0, "rsi_mean_reversion": 0}
-                })
+                "ensemble": app.state.get("ensemble_data", DEFAULT_ENSEMBLE)
             })
+            response.add_etag()
+        elif view is not None:
+            # Return database data when no live update (cached body, no re-serialization)
+            response = app.response_class(view.body, mimetype="application/json")
+            response.set_etag(view.etag)
         else:
-            # Return database data when no live update
-            return jsonify({
-                "portfolio": {
-                    "equity": portfolio_data["equity"],
-                    "cash": portfolio_data["cash"],
-                    "holdings": portfolio_data["holdings"]
-                },
-                "prices": {},
-                "sharpe_ratio": 0,
-                "max_drawdown_pct": 0,
-                "win_rate": 0,
-                "num_trades": len([h for h in portfolio_data["holdings"]]),
-                "equity_history": equity_history,
-                "ensemble": {
-                    "signal": 0,
-                    "confidence": 0.0,
-                    "weights": {"atr_breakout": 0.33, "macd_volume": 0.33, "rsi_mean_reversion": 0.34},
-                    "strategy_signals": {"atr_breakout": 0, "macd_volume": 0, "rsi_mean_reversion": 0}
-                }
-            })
+            return jsonify(empty_payload())
+        return response.make_conditional(request)
 
     @app.route("/api/logs")
     def get_logs():
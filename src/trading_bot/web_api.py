@@ -29,6 +29,7 @@ from trading_bot.options.strategies import GreeksCalculator, OptionType, IncomeS
 from trading_bot.engine.paper import PaperEngineConfig, run_paper_engine
 from trading_bot.configs.config import load_config
 from trading_bot.data.providers import AlpacaProvider, MockDataProvider
+from trading_bot.ui.delta_stream import DeltaHub
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -148,6 +149,9 @@ class TradingBotAPI:
         self.trading_active = False
         self.config_path = config_path or "configs/default.yaml"
         
+        # Per-iteration deltas pushed to subscribed dashboards
+        self.stream = DeltaHub()
+        
         # Setup log handler
         self.log_handler = WebSocketLogHandler(self.socketio)
         self.log_handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
@@ -478,10 +482,22 @@ class TradingBotAPI:
         def handle_connect():
             logger.info("[WS] Client connected")
             emit('connection_response', {'data': 'Connected to Trading Bot API'})
+            # Handshake: full state once, deltas from here on
+            emit('snapshot', self.stream.subscribe(request.sid))
         
         @self.socketio.on('disconnect')
         def handle_disconnect():
             logger.info("[WS] Client disconnected")
+            self.stream.unsubscribe(request.sid)
+        
+        @self.socketio.on('request_snapshot')
+        def handle_snapshot_request():
+            """Resubscribe after a missed delta"""
+            emit('snapshot', self.stream.subscribe(request.sid))
+        
+        @self.socketio.on('delta_ack')
+        def handle_delta_ack(data=None):
+            self.stream.ack(request.sid)
         
         @self.socketio.on('request_status')
         def handle_status_request():
@@ -500,6 +516,15 @@ class TradingBotAPI:
             """Send recent logs"""
             logs = list(self.log_handler.logs)
             emit('logs_history', {'logs': logs})
+        
+        self.socketio.start_background_task(self._stream_deltas)
+    
+    def _stream_deltas(self):
+        """Send coalesced deltas to clients as they become free"""
+        while True:
+            self.stream.wait(timeout=self.stream.ack_timeout)
+            for sid, event, payload in self.stream.drain():
+                self.socketio.emit(event, payload, to=sid)
     
     def _start_trading_loop(self):
         """Start background trading loop thread"""
@@ -601,20 +626,7 @@ class TradingBotAPI:
                     logger.info("[Trading Loop] Trading loop stopped by user")
                     break
                 
-                # Log trading activity
-                if update.fills:
-                    for fill in update.fills:
-                        logger.info(f"[Trade] FILL: {fill.symbol} {fill.qty} @ {fill.price}")
-                
-                if update.rejections:
-                    for rejection in update.rejections:
-                        logger.warning(f"[Order Rejected] {rejection.order_id}: {rejection.reason}")
-                
-                # Log key metrics every 10 iterations
-                if iteration % 10 == 0:
-                    portfolio_value = float(update.portfolio.equity(prices)) if update.portfolio else 0.0
-                    num_positions = len(update.portfolio.positions) if update.portfolio and update.portfolio.positions else 0
-                    logger.info(f"[Trading Loop] Iteration {iteration} | Equity: ${portfolio_value:.2f} | Positions: {num_positions} | Signals: {len(update.signals) if hasattr(update, 'signals') else 0}")
+                self._handle_update(update, iteration)
                     
         except Exception as e:
             error_msg = str(e)
@@ -633,20 +645,7 @@ class TradingBotAPI:
                             logger.info("[Trading Loop] Trading loop stopped by user")
                             break
                         
-                        # Log trading activity
-                        if update.fills:
-                            for fill in update.fills:
-                                logger.info(f"[Trade] FILL: {fill.symbol} {fill.qty} @ {fill.price}")
-                        
-                        if update.rejections:
-                            for rejection in update.rejections:
-                                logger.warning(f"[Order Rejected] {rejection.order_id}: {rejection.reason}")
-                        
-                        # Log key metrics every 10 iterations
-                        if iteration % 10 == 0:
-                            portfolio_value = float(update.portfolio.equity(prices)) if update.portfolio else 0.0
-                            num_positions = len(update.portfolio.positions) if update.portfolio and update.portfolio.positions else 0
-                            logger.info(f"[Trading Loop] Iteration {iteration} | Equity: ${portfolio_value:.2f} | Positions: {num_positions} | Signals: {len(update.signals) if hasattr(update, 'signals') else 0}")
+                        self._handle_update(update, iteration)
                 except Exception as retry_error:
                     logger.error(f"[Trading Loop] Error in fallback trading loop: {retry_error}", exc_info=True)
             else:
@@ -654,6 +653,25 @@ class TradingBotAPI:
         finally:
             logger.info("[Trading Loop] Trading loop ended")
     
+    def _handle_update(self, update, iteration):
+        """Log one engine update and publish its delta to dashboards"""
+        # Log trading activity
+        if update.fills:
+            for fill in update.fills:
+                logger.info(f"[Trade] FILL: {fill.symbol} {fill.qty} @ {fill.price}")
+        
+        if update.rejections:
+            for rejection in update.rejections:
+                logger.warning(f"[Order Rejected] {rejection.order_id}: {rejection.reason}")
+        
+        self.stream.publish(update)
+        
+        # Log key metrics every 10 iterations
+        if iteration % 10 == 0:
+            portfolio_value = float(update.portfolio.equity(update.prices)) if update.portfolio else 0.0
+            num_positions = len(update.portfolio.positions) if update.portfolio and update.portfolio.positions else 0
+            logger.info(f"[Trading Loop] Iteration {iteration} | Equity: ${portfolio_value:.2f} | Positions: {num_positions} | Signals: {len(update.signals) if hasattr(update, 'signals') else 0}")
+    
     def run(self, host='127.0.0.1', port=5000, debug=False):
         """Start the API server"""
         logger.info(f"[API] Starting server on {host}:{port}")
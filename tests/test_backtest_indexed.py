@@ -0,0 +1,108 @@
+"""
+Parity tests for the bar-indexed backtest core.
+
+`engine_mode="indexed"` precomputes strategy outputs once per symbol and walks
+row offsets; it must produce exactly the same equity curve, trades and
+BacktestResult as the per-date slicing path (`engine_mode="slice"`).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.backtest.engine import BacktestConfig, BacktestEngine
+from trading_bot.strategy.rsi_mean_reversion import RsiMeanReversionStrategy
+
+
+class _FakeProvider:
+    """Long-format bars (Date/Symbol columns) like the real providers return."""
+
+    def __init__(self, bars: pd.DataFrame) -> None:
+        self._bars = bars
+
+    def download_bars(self, *, symbols, period, interval):
+        return self._bars[self._bars["Symbol"].isin(symbols)].copy()
+
+
+def _universe(seed: int = 0, n: int = 120) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2021-01-04", periods=n)
+    frames = []
+    for k, sym in enumerate(["AAA", "BBB", "CCC", "DDD"]):
+        close = np.maximum(50 + 10 * k + np.cumsum(rng.normal(0, 1.2 + 0.4 * k, n)), 1.0)
+        df = pd.DataFrame(
+            {
+                "Date": dates,
+                "Symbol": sym,
+                "Open": close,
+                "High": close + rng.random(n) * 1.5,
+                "Low": np.maximum(close - rng.random(n) * 1.5, 0.5),
+                "Close": close,
+                "Volume": rng.integers(100_000, 1_000_000, n).astype(float),
+            }
+        )
+        if sym == "CCC":
+            df = df.iloc[40:]  # listed later than the others
+        if sym == "DDD":
+            df = df.drop(df.index[rng.choice(n, 25, replace=False)])  # gaps -> stale prices
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "bt.yaml"
+    # Small per-trade risk with wide stops keeps order sizes within cash so fills happen.
+    path.write_text(
+        "risk:\n  max_risk_per_trade: 0.001\n  stop_loss_pct: 0.5\n  take_profit_pct: 0.9\n"
+    )
+    return str(path)
+
+
+def _run(config_path: str, bars: pd.DataFrame, *, mode: str, strategy_mode: str = "ensemble"):
+    cfg = BacktestConfig(
+        config_path=config_path,
+        symbols=["AAA", "BBB", "CCC", "DDD"],
+        commission_bps=5.0,
+        slippage_bps=2.0,
+        strategy_mode=strategy_mode,
+        engine_mode=mode,
+    )
+    engine = BacktestEngine(cfg, provider=_FakeProvider(bars))
+    result = engine.run()
+    return engine, result
+
+
+class TestIndexedBacktestParity:
+    """Indexed and sliced cores agree bar for bar"""
+
+    @pytest.mark.parametrize("seed", [0, 1])
+    def test_ensemble_matches_slice_path(self, config_path, seed):
+        bars = _universe(seed)
+        slow, slow_result = _run(config_path, bars, mode="slice")
+        fast, fast_result = _run(config_path, bars, mode="indexed")
+
+        assert slow.trades, "fixture should produce trades"
+        assert fast.equity_history == slow.equity_history
+        assert fast.trades == slow.trades
+        assert fast_result == slow_result
+
+    def test_single_strategy_mode_matches_slice_path(self, config_path, monkeypatch):
+        bars = _universe(3)
+        # Keep the single-strategy mode active so trades actually happen.
+        monkeypatch.setattr(
+            BacktestEngine,
+            "_build_strategies",
+            lambda self: {"mean_reversion_rsi": RsiMeanReversionStrategy(entry_oversold=40.0)},
+        )
+        mode = "mean_reversion_rsi"
+        slow, slow_result = _run(config_path, bars, mode="slice", strategy_mode=mode)
+        fast, fast_result = _run(config_path, bars, mode="indexed", strategy_mode=mode)
+
+        assert slow.trades, "fixture should produce trades"
+        assert fast.trades == slow.trades
+        assert fast_result == slow_result
+
+    def test_unknown_engine_mode_raises(self, config_path):
+        with pytest.raises(ValueError):
+            _run(config_path, _universe(0, n=60), mode="bogus")
@@ -0,0 +1,113 @@
+"""
+Tests for the asyncio bar runner.
+"""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from trading_bot.engine.bar_runner import BarRunner
+from trading_bot.performance.stage_timer import StageTimer
+
+
+class _Every:
+    """Schedule stub: a bar every ``seconds``, starting now."""
+
+    def __init__(self, seconds):
+        self.interval = timedelta(seconds=seconds)
+        self.next_run_utc = None
+
+    def due(self, now):
+        self.next_run_utc = self.next_run_utc or now
+        return now >= self.next_run_utc
+
+    def mark_ran(self, now):
+        self.next_run_utc = now + self.interval
+
+    def seconds_until_next(self, now):
+        return max(0.0, (self.next_run_utc - now).total_seconds())
+
+
+class _Repo:
+    def __init__(self, error=None):
+        self.flushes = 0
+        self.error = error
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+        if self.error is not None:
+            raise self.error
+
+
+class _Engine:
+    def __init__(self, repo):
+        self.iteration = 0
+        self.repo = repo
+        self.timer = StageTimer()
+        self.calls = []
+
+    def prefetch(self):
+        self.calls.append("prefetch")
+        return {"AAA": self.iteration}
+
+    def step(self, *, now, fetched, flush):
+        assert not flush
+        self.calls.append("step")
+        self.iteration += 1
+        return SimpleNamespace(iteration=self.iteration, ts=now, fetched=fetched)
+
+
+def _run(runner, iterations):
+    return asyncio.run(runner.run(iterations=iterations))
+
+
+class TestBarRunner:
+    def test_steps_flushes_and_notifies_each_bar(self):
+        engine = _Engine(_Repo())
+        seen = []
+
+        async def notify(update):
+            seen.append(update.iteration)
+
+        notifiers = [notify, lambda u: seen.append(-u.iteration)]
+        runner = BarRunner(engine, _Every(0.02), notify=notifiers)
+        assert _run(runner, 3) == 3
+
+        assert engine.calls == ["prefetch", "step"] * 3
+        assert engine.repo.flushes == 3
+        assert sorted(seen) == [-3, -2, -1, 1, 2, 3]
+        assert [r.iteration for r in runner.reports] == [1, 2, 3]
+        assert runner.stats()["deadline_misses"] == 0
+        assert engine.timer.histogram("bar_ready").count == 3
+
+        # Bars land on the schedule's boundaries, not a fixed sleep apart
+        ts = [r.bar_ts for r in runner.reports]
+        assert ts[2] - ts[1] == ts[1] - ts[0] == timedelta(seconds=0.02)
+
+    def test_straggler_cut_off_at_deadline(self):
+        engine = _Engine(_Repo())
+
+        async def slow(update):
+            await asyncio.sleep(5)
+
+        runner = BarRunner(engine, _Every(0.01), notify=[slow], deadline=0.05)
+        _run(runner, 2)
+
+        assert [r.cancelled for r in runner.reports] == [("slow",), ("slow",)]
+        assert all(r.missed for r in runner.reports)
+        assert runner.misses == 2
+
+    def test_flush_failure_stops_the_runner(self):
+        engine = _Engine(_Repo(error=RuntimeError("batch failed")))
+        runner = BarRunner(engine, _Every(0.01))
+        with pytest.raises(RuntimeError, match="batch failed"):
+            _run(runner, 5)
+        assert engine.iteration < 5
+
+    def test_flush_timeout_is_a_miss_not_an_error(self):
+        engine = _Engine(_Repo(error=TimeoutError("write-behind flush timed out")))
+        runner = BarRunner(engine, _Every(0.01))
+        assert _run(runner, 2) == 2
+        assert [r.cancelled for r in runner.reports] == [("flush",), ("flush",)]
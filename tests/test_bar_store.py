@@ -0,0 +1,210 @@
+"""
+Tests for the columnar bar store and AlpacaProvider's delta downloads.
+
+The provider is driven by a local fake of alpaca-py's historical data client,
+so no network access or credentials are needed.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.broker.bar_store import BAR_COLUMNS, BarStore
+
+pytest.importorskip("alpaca.data.requests")
+
+from trading_bot.broker.alpaca import AlpacaConfig, AlpacaProvider  # noqa: E402
+
+
+def _bars(start: str, n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Volume": rng.integers(1_000, 9_000, n).astype(float),
+        },
+        index=pd.date_range(start, periods=n, freq="D", tz="UTC").astype("datetime64[ns, UTC]"),
+    )
+
+
+class _FakeBarSet:
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+
+
+class _FakeClient:
+    """Serves daily bars up to ``now`` for a fixed universe and logs requests."""
+
+    def __init__(self, symbols, days: int = 400) -> None:
+        end = pd.Timestamp(datetime.now(timezone.utc)).normalize()
+        self.data = {
+            sym: _bars(str((end - pd.Timedelta(days=days - 1)).date()), days, seed=k)
+            for k, sym in enumerate(symbols)
+        }
+        self.requests = []
+
+    def get_stock_bars(self, req):
+        syms = list(req.symbol_or_symbols)
+        start, end = pd.Timestamp(req.start), pd.Timestamp(req.end)
+        if start.tzinfo is None:  # alpaca-py normalizes to naive UTC
+            start, end = start.tz_localize("UTC"), end.tz_localize("UTC")
+        self.requests.append((tuple(syms), start))
+        frames = []
+        for sym in syms:
+            df = self.data[sym]
+            df = df[(df.index >= start) & (df.index <= end)]
+            df = df.rename(columns=str.lower)
+            df.index = pd.MultiIndex.from_arrays(
+                [[sym] * len(df), df.index], names=["symbol", "timestamp"]
+            )
+            frames.append(df)
+        return _FakeBarSet(pd.concat(frames))
+
+
+def _provider(client, tmp_path) -> AlpacaProvider:
+    cfg = AlpacaConfig(api_key="k", api_secret="s", base_url="http://fake")
+    return AlpacaProvider(config=cfg, client=client, cache_dir=str(tmp_path))
+
+
+class TestBarStore:
+    """Append-only per-symbol storage"""
+
+    def test_append_and_range_read(self, tmp_path):
+        store = BarStore(tmp_path)
+        bars = _bars("2024-01-01", 30)
+        assert store.append("AAA", "1d", bars.iloc[:20]) == 20
+        assert store.append("AAA", "1d", bars.iloc[20:]) == 10
+
+        pd.testing.assert_frame_equal(store.read("AAA", "1d"), bars, check_freq=False)
+        window = store.read("AAA", "1d", start="2024-01-05", end="2024-01-09")
+        pd.testing.assert_frame_equal(window, bars.loc["2024-01-05":"2024-01-09"], check_freq=False)
+        assert store.bounds("AAA", "1d") == (bars.index[0], bars.index[-1])
+        assert store.symbols("1d") == ["AAA"]
+
+    def test_tail_upsert_replaces_overlapping_bars(self, tmp_path):
+        store = BarStore(tmp_path)
+        bars = _bars("2024-01-01", 10)
+        store.append("AAA", "1d", bars)
+        revised = bars.iloc[-2:].copy()
+        revised["Close"] += 5.0
+        store.append("AAA", "1d", pd.concat([revised, _bars("2024-01-11", 3, seed=9)]))
+
+        out = store.read("AAA", "1d")
+        assert len(out) == 13
+        np.testing.assert_array_equal(out["Close"].iloc[8:10], revised["Close"])
+
+    def test_interrupted_append_is_ignored_and_repaired(self, tmp_path):
+        store = BarStore(tmp_path)
+        bars = _bars("2024-01-01", 10)
+        store.append("AAA", "1d", bars.iloc[:5])
+        # Simulate a crash after the value columns were written but before ts.i64.
+        d = tmp_path / "1d" / "AAA"
+        with open(d / "close.f64", "ab") as fh:
+            fh.write(np.array([1.0, 2.0]).tobytes())
+
+        assert store.row_count("AAA", "1d") == 5
+        store.append("AAA", "1d", bars.iloc[5:])
+        pd.testing.assert_frame_equal(store.read("AAA", "1d"), bars, check_freq=False)
+
+    def test_missing_columns_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            BarStore(tmp_path).append("AAA", "1d", _bars("2024-01-01", 3).drop(columns="Volume"))
+
+    def test_empty_symbol_reads_empty(self, tmp_path):
+        out = BarStore(tmp_path).read("NONE", "1d")
+        assert out.empty and list(out.columns) == list(BAR_COLUMNS)
+
+
+class TestAlpacaProviderDeltaFetch:
+    """Only missing bars are requested from the client"""
+
+    def test_layout_matches_fresh_download(self, tmp_path):
+        client = _FakeClient(["AAA", "BBB"])
+        wide = _provider(client, tmp_path).download_bars(symbols=["BBB", "AAA"], period="30d")
+
+        assert list(wide.columns) == [(c, s) for c in BAR_COLUMNS for s in ("AAA", "BBB")]
+        assert wide.index.name == "timestamp"
+        expected = client.data["AAA"]
+        expected = expected[expected.index >= wide.index[0]]
+        np.testing.assert_array_equal(wide[("Close", "AAA")].to_numpy(), expected["Close"])
+
+    def test_fresh_symbols_are_not_refetched(self, tmp_path):
+        client = _FakeClient(["AAA", "BBB"])
+        provider = _provider(client, tmp_path)
+        first = provider.download_bars(symbols=["AAA", "BBB"], period="60d")
+        client.requests.clear()
+
+        second = provider.download_bars(symbols=["AAA", "BBB"], period="60d")
+        assert client.requests == []
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_stale_symbols_fetch_only_the_tail(self, tmp_path):
+        client = _FakeClient(["AAA", "BBB"])
+        provider = _provider(client, tmp_path)
+        provider.download_bars(symbols=["AAA", "BBB"], period="60d")
+        overlap = provider.bar_store.tail("AAA", "1d", 2).index[0]
+        client.requests.clear()
+
+        out = provider.download_bars(symbols=["AAA", "BBB"], period="60d", cache_ttl_minutes=0)
+        assert client.requests == [(("AAA", "BBB"), overlap)]
+        assert out[("Close", "BBB")].notna().all()
+
+    def test_revised_history_triggers_full_refetch(self, tmp_path):
+        client = _FakeClient(["AAA", "BBB"])
+        provider = _provider(client, tmp_path)
+        provider.download_bars(symbols=["AAA", "BBB"], period="60d")
+        client.requests.clear()
+        # A 2:1 split re-adjusts every past AAA bar
+        client.data["AAA"][["Open", "High", "Low", "Close"]] /= 2.0
+
+        out = provider.download_bars(symbols=["AAA", "BBB"], period="60d", cache_ttl_minutes=0)
+        assert [r[0] for r in client.requests] == [("AAA", "BBB"), ("AAA",)]
+        expected = client.data["AAA"]
+        expected = expected[expected.index >= out.index[0]]
+        np.testing.assert_allclose(out[("Close", "AAA")].to_numpy(), expected["Close"])
+        assert provider.bar_store.row_count("BBB", "1d") == len(out)
+
+    def test_empty_tail_marks_symbols_fresh(self, tmp_path):
+        client = _FakeClient(["AAA", "BBB"])
+        provider = _provider(client, tmp_path)
+        first = provider.download_bars(symbols=["AAA", "BBB"], period="60d")
+        fetched_at = provider.bar_store.fetch_info("AAA", "1d")["fetched_at"]
+        requests = []
+
+        def no_new_bars(req):  # e.g. outside market hours
+            requests.append(tuple(req.symbol_or_symbols))
+            return _FakeBarSet(pd.DataFrame())
+
+        client.get_stock_bars = no_new_bars
+        out = provider.download_bars(symbols=["AAA", "BBB"], period="60d", cache_ttl_minutes=0)
+        assert requests == [("AAA", "BBB")]  # the tail only, no full refetch
+        assert provider.bar_store.fetch_info("AAA", "1d")["fetched_at"] > fetched_at
+        pd.testing.assert_frame_equal(out, first)
+
+    def test_universe_change_fetches_only_new_symbol(self, tmp_path):
+        client = _FakeClient(["AAA", "BBB", "CCC"])
+        provider = _provider(client, tmp_path)
+        provider.download_bars(symbols=["AAA", "BBB"], period="60d")
+        client.requests.clear()
+
+        out = provider.download_bars(symbols=["AAA", "BBB", "CCC"], period="60d")
+        assert [r[0] for r in client.requests] == [("CCC",)]
+        assert set(out.columns.get_level_values("symbol")) == {"AAA", "BBB", "CCC"}
+
+    def test_longer_period_triggers_full_refetch(self, tmp_path):
+        client = _FakeClient(["AAA"])
+        provider = _provider(client, tmp_path)
+        short = provider.download_bars(symbols=["AAA"], period="30d")
+        long = provider.download_bars(symbols=["AAA"], period="200d")
+
+        assert len(client.requests) == 2
+        assert len(long) > len(short)
+        assert list(long.columns) == list(BAR_COLUMNS)  # single symbol is flattened
+        now = datetime.now(timezone.utc)
+        assert long.index[0] >= now - timedelta(days=200)
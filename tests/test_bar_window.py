@@ -0,0 +1,126 @@
+"""
+Tests for the rolling OHLCV window and the paper engine's delta bar fetching.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.engine.bar_window import BarWindow
+
+
+def _bars(n: int, start: str = "2024-01-01", seed: int = 0, tz=None) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    df = pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Volume": rng.integers(1_000, 9_000, n),
+        },
+        index=pd.date_range(start, periods=n, freq="D", tz=tz),
+    )
+    for col in ("Open", "High", "Low", "Close"):
+        df[col] = df[col].astype(np.float32)
+    df["Volume"] = df["Volume"].astype(np.uint32)
+    return df
+
+
+def _same(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    # Index values must match; the datetime unit may differ across pandas versions.
+    pd.testing.assert_frame_equal(a, b, check_freq=False, check_index_type=False)
+
+
+class TestBarWindow:
+    """Appends in place and keeps the newest `capacity` bars"""
+
+    def test_rolling_appends_match_tail_of_full_history(self):
+        full = _bars(300)
+        win = BarWindow.from_frame(full.iloc[:50])
+        assert win.capacity == 50
+        for i in range(50, 300, 3):
+            win.update(full.iloc[i:i + 3])
+            end = min(i + 3, 300)
+            _same(win.frame(), full.iloc[max(end - 50, 0):end])
+
+    def test_old_bars_are_ignored_and_last_bar_is_replaced(self):
+        full = _bars(20)
+        win = BarWindow.from_frame(full.iloc[:10], capacity=30)
+        assert win.update(full.iloc[:5]) == 0
+
+        revised = full.iloc[9:11].copy()
+        revised.loc[revised.index[0], "Close"] = 1.0
+        assert win.update(revised) == 2
+        out = win.frame()
+        assert len(out) == 11
+        assert out["Close"].iloc[9] == np.float32(1.0)
+        assert win.last_timestamp == full.index[10]
+
+    def test_dtypes_and_timezone_are_preserved(self):
+        full = _bars(30, tz="America/New_York")
+        win = BarWindow.from_frame(full.iloc[:10].astype({"Close": np.float64}), capacity=15)
+        win.update(full.iloc[10:])
+        out = win.frame()
+        assert out["Close"].dtype == np.float32 and out["Volume"].dtype == np.uint32
+        assert str(out.index.tz) == "America/New_York"
+        _same(out, full.iloc[-15:])
+
+    def test_burst_larger_than_capacity_keeps_newest(self):
+        full = _bars(40)
+        win = BarWindow.from_frame(full.iloc[:5], capacity=8)
+        win.update(full.iloc[5:])
+        _same(win.frame(), full.iloc[-8:])
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            BarWindow(0)
+
+
+class _DeltaProvider:
+    """Serves a growing history; records the periods it was asked for."""
+
+    def __init__(self, frames) -> None:
+        self.frames = frames
+        self.visible = 60
+        self.calls = []
+
+    def download_bars(self, *, symbols, period, interval):
+        self.calls.append((tuple(symbols), period))
+        days = int(period[:-1]) if period.endswith("d") else 10_000
+        parts = {}
+        for sym in symbols:
+            df = self.frames[sym].iloc[: self.visible]
+            parts[sym] = df.iloc[-min(days, len(df)):].astype({"Close": np.float64})
+        wide = pd.concat(parts, axis=1).swaplevel(0, 1, axis=1)
+        if len(symbols) == 1:
+            wide.columns = wide.columns.droplevel(1)
+        return wide
+
+
+class TestPaperEngineIncrementalFetch:
+    """After warm-up the engine asks only for the missing days"""
+
+    def test_delta_fetch_matches_full_download(self):
+        paper = pytest.importorskip("trading_bot.engine.paper")
+        today = pd.Timestamp.now(tz="UTC").normalize()
+        start = str((today - pd.Timedelta(days=60)).date())
+        frames = {s: _bars(80, start=start, seed=k, tz="UTC") for k, s in enumerate(["AAA", "BBB"])}
+        provider = _DeltaProvider(frames)
+        engine = paper.PaperEngine.__new__(paper.PaperEngine)
+        engine.cfg = paper.PaperEngineConfig(
+            config_path="", db_path="", symbols=["AAA", "BBB"], incremental_bars=True
+        )
+        engine.data = provider
+        engine._bar_windows = {}
+        engine.timer = paper.StageTimer(enabled=False)
+
+        engine._fetch_ohlcv()
+        assert provider.calls == [(("AAA", "BBB"), "6mo")]
+
+        provider.visible = 61  # today's bar arrives
+        got = engine._fetch_ohlcv()
+        assert provider.calls[-1] == (("AAA", "BBB"), "2d")
+        for sym in ("AAA", "BBB"):
+            _same(got[sym], frames[sym].iloc[1:61])
@@ -0,0 +1,164 @@
+"""
+Tests for the dashboard read model: holdings/equity ring maintained on write,
+the TTL cache and ETag handling on /api/data.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from trading_bot.core.models import Portfolio, Position
+from trading_bot.db import repository as repository_module
+from trading_bot.db.repository import SqliteRepository
+from trading_bot.db.write_behind import BatchedSqliteRepository
+from trading_bot.ui.read_model import DashboardReadModel
+
+
+def _snapshot(repo, step: int, positions) -> None:
+    ts = datetime(2024, 1, 2) + timedelta(minutes=step)
+    portfolio = Portfolio(
+        cash=1_000.0 + step,
+        positions={s: Position(symbol=s, qty=q, avg_price=10.0) for s, q in positions.items()},
+    )
+    repo.log_snapshot(ts=ts, portfolio=portfolio, prices={s: 12.0 for s in positions})
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestReadModelTables:
+    """The repository keeps the read model current on every snapshot"""
+
+    def test_ring_wraps_and_pages(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(repository_module, "EQUITY_RING_SIZE", 5)
+        repo = SqliteRepository(db_path=tmp_path / "t.sqlite")
+        repo.init_db()
+        for step in range(12):
+            _snapshot(repo, step, {"AAA": 1})
+
+        con = sqlite3.connect(repo.db_path)
+        try:
+            assert con.execute("SELECT COUNT(*) FROM equity_ring").fetchone()[0] == 5
+        finally:
+            con.close()
+        assert repo.read_model_version() == 11
+        page = repo.equity_history(limit=3)
+        assert [p.seq for p in page] == [9, 10, 11]
+        assert [p.seq for p in repo.equity_history(limit=3, before=page[0].seq)] == [7, 8]
+
+    def test_latest_holdings_drop_closed_positions(self, tmp_path):
+        repo = SqliteRepository(db_path=tmp_path / "t.sqlite")
+        _snapshot(repo, 0, {"AAA": 5, "BBB": 2})
+        _snapshot(repo, 1, {"AAA": 7, "BBB": 0})
+        holdings = repo.latest_holdings()
+        assert [(h.symbol, h.qty, h.last_price) for h in holdings] == [("AAA", 7, 12.0)]
+
+    def test_backfill_from_existing_snapshots(self, tmp_path):
+        path = tmp_path / "old.sqlite"
+        repo = SqliteRepository(db_path=path)
+        for step in range(3):
+            _snapshot(repo, step, {"AAA": 1})
+        con = sqlite3.connect(path)
+        con.execute("DROP TABLE equity_ring")
+        con.execute("DROP TABLE holdings_latest")
+        con.commit()
+        con.close()
+        repository_module._EQUITY_SEQ.pop(str(path.resolve()))
+
+        repo.init_db()
+        assert [p.cash for p in repo.equity_history()] == [1_000.0, 1_001.0, 1_002.0]
+        assert [h.symbol for h in repo.latest_holdings()] == ["AAA"]
+        _snapshot(repo, 3, {"AAA": 1})
+        assert repo.read_model_version() == 3
+
+    def test_write_behind_matches_direct(self, tmp_path):
+        direct = SqliteRepository(db_path=tmp_path / "direct.sqlite")
+        batched = BatchedSqliteRepository(db_path=tmp_path / "batched.sqlite")
+        try:
+            for step in range(4):
+                for repo in (direct, batched):
+                    _snapshot(repo, step, {"AAA": step, "BBB": 1})
+            rows = [[(p.seq, p.equity) for p in r.equity_history()] for r in (direct, batched)]
+            assert rows[0] == rows[1]
+            assert [h.qty for h in batched.latest_holdings()] == [3, 1]
+        finally:
+            batched.close()
+
+
+class TestDashboardReadModel:
+    """Views are cached for the TTL and revalidated by ring version"""
+
+    def test_ttl_and_version(self, tmp_path, monkeypatch):
+        repo = SqliteRepository(db_path=tmp_path / "t.sqlite")
+        _snapshot(repo, 0, {"AAA": 4})
+        clock = FakeClock()
+        model = DashboardReadModel(repo.db_path, ttl=1.0, clock=clock)
+
+        first = model.get()
+        assert first.payload["portfolio"]["holdings"]["AAA"] == {
+            "quantity": 4, "cost_basis": 40.0, "avg_cost": 10.0,
+        }
+        assert first.payload["equity_history"] == [pytest.approx(1_048.0)]
+
+        _snapshot(repo, 1, {"AAA": 5})
+        assert model.get() is first  # inside the TTL
+        clock.now = 2.0
+        second = model.get()
+        assert second.version == 1 and second.etag != first.etag
+
+        calls = []
+        monkeypatch.setattr(model, "_load", lambda *a: calls.append(a))
+        clock.now = 4.0
+        assert model.get() is second  # revalidated, not reloaded
+        assert not calls
+
+    def test_missing_database(self, tmp_path):
+        view = DashboardReadModel(tmp_path / "absent.sqlite").get()
+        assert view.version == -1
+        assert view.payload["portfolio"]["equity"] == 100000
+        assert not (tmp_path / "absent.sqlite").exists()
+
+    def test_does_not_create_read_model_tables(self, tmp_path):
+        path = tmp_path / "old.sqlite"
+        con = sqlite3.connect(path)
+        con.execute("CREATE TABLE portfolio_snapshots (id INTEGER PRIMARY KEY)")
+        con.commit()
+        con.close()
+
+        assert DashboardReadModel(path).get().version == -1
+        con = sqlite3.connect(path)
+        try:
+            tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master")}
+        finally:
+            con.close()
+        assert tables == {"portfolio_snapshots"}
+
+
+class TestApiDataEndpoint:
+    """/api/data serves the cached view with ETag / If-None-Match"""
+
+    def test_etag_round_trip(self, tmp_path):
+        web = pytest.importorskip("trading_bot.ui.web")
+        repo = SqliteRepository(db_path=tmp_path / "t.sqlite")
+        _snapshot(repo, 0, {"AAA": 4})
+        client = web.create_web_app(str(repo.db_path), cache_ttl=0.0).test_client()
+
+        resp = client.get("/api/data?history_limit=10")
+        assert resp.status_code == 200
+        assert resp.get_json()["portfolio"]["holdings"]["AAA"]["quantity"] == 4
+        etag = resp.headers["ETag"]
+
+        again = client.get("/api/data?history_limit=10", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+
+        _snapshot(repo, 1, {"AAA": 5})
+        changed = client.get("/api/data?history_limit=10", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert len(changed.get_json()["equity_history"]) == 2
+        assert client.get("/api/data?history_limit=x").status_code == 400
@@ -0,0 +1,205 @@
+"""
+Tests for the compact strategy-decision log.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from trading_bot.db.decision_log import (
+    DecisionLog,
+    PayloadCodec,
+    fields_json,
+    parse_fields,
+    schema_id,
+)
+from trading_bot.strategy.base import StrategyDecision
+
+T0 = datetime(2024, 1, 2, 14, 30)
+WEIGHTS = {"rsi": 0.5, "macd": 0.5}
+
+
+def _dec(signal=1, rsi=28.0, weights=WEIGHTS, conf=0.6):
+    return StrategyDecision(
+        signal=signal,
+        confidence=conf,
+        votes={"rsi": signal, "macd": 0},
+        weights=dict(weights),
+        explanations={
+            "rsi": {"rsi": rsi, "oversold": True, "note": "x", "lookback": 14, "extra": None}
+        },
+    )
+
+
+class _Repo:
+    """Collects decision-log writes; keyed rows overwrite like the SQLite tables."""
+
+    def __init__(self):
+        self.schemas, self.steps, self.runs = {}, {}, {}
+
+    def close_open_decision_runs(self):
+        return 0
+
+    def log_decision_schema(self, *, schema_id, fields_json):
+        self.schemas[schema_id] = fields_json
+
+    def log_decision_step(self, *, ts, weights):
+        self.steps[ts] = weights
+
+    def log_decision_run(self, **values):
+        self.runs[(values["symbol"], values["first_ts"])] = values
+
+
+def _steps(log, decisions_per_step):
+    for i, decisions in enumerate(decisions_per_step):
+        log.begin_step(T0 + timedelta(minutes=i))
+        for sym, dec in decisions.items():
+            log.record(sym, "ensemble", dec)
+        log.end_step()
+
+
+class TestPayloadCodec:
+    def test_round_trip(self):
+        codec = PayloadCodec()
+        rsi = {"v": 1.5, "ok": False, "tags": [1, 2], "s": "é"}
+        payload = {"votes": {"rsi": 1}, "explanations": {"rsi": rsi, "m": {}}}
+        sid, data, new = codec.encode(payload)
+        assert new and codec.decode(sid, data) == payload
+        # Same layout, new values: same schema, not new
+        rsi = {"v": 2.5, "ok": True, "tags": [], "s": ""}
+        payload2 = {"votes": {"rsi": 0}, "explanations": {"rsi": rsi, "m": {}}}
+        sid2, data2, new2 = codec.encode(payload2)
+        assert sid2 == sid and not new2 and data2 != data
+
+    def test_schema_ids_are_stable(self):
+        codec = PayloadCodec()
+        sid, data, _ = codec.encode({"a": {"b": 1.0}})
+        fields = codec.fields(sid)
+        assert schema_id(parse_fields(fields_json(fields))) == sid
+        other = PayloadCodec()
+        other.register(sid, parse_fields(fields_json(fields)))
+        assert other.decode(sid, data) == {"a": {"b": 1.0}}
+
+    def test_smaller_than_json(self):
+        import json
+
+        dec = _dec()
+        _, data, _ = PayloadCodec().encode({"votes": dec.votes, "explanations": dec.explanations})
+        assert len(data) < len(json.dumps(dec.votes)) + len(json.dumps(dec.explanations))
+
+
+class TestDecisionLog:
+    def test_unchanged_decisions_collapse(self):
+        repo = _Repo()
+        log = DecisionLog(repo)
+        _steps(log, [{"AAA": _dec(), "BBB": _dec(0)}] * 3 + [{"AAA": _dec(0), "BBB": _dec(0)}])
+
+        assert len(repo.steps) == 4 and all(w == WEIGHTS for w in repo.steps.values())
+        aaa = [v for k, v in sorted(repo.runs.items()) if k[0] == "AAA"]
+        assert [(r["first_ts"], r["last_ts"], r["signal"]) for r in aaa] == [
+            (T0, T0 + timedelta(minutes=2), 1),
+            (T0 + timedelta(minutes=3), None, 0),
+        ]
+        bbb = [v for k, v in repo.runs.items() if k[0] == "BBB"]
+        assert len(bbb) == 1 and bbb[0]["last_ts"] is None and bbb[0]["weights_json"] is None
+        assert len(repo.schemas) == 1
+
+    def test_sampling_skips_indicator_noise_but_not_signal_changes(self):
+        repo = _Repo()
+        log = DecisionLog(repo, sample_every=1, sampling={"AAA": 3})
+        bars = [{"AAA": _dec(rsi=20.0 + i), "BBB": _dec(rsi=20.0 + i)} for i in range(6)]
+        _steps(log, bars + [{"AAA": _dec(0), "BBB": _dec(0)}])
+
+        firsts = lambda sym: sorted(k[1] for k in repo.runs if k[0] == sym)  # noqa: E731
+        # AAA stores new values on bars 0 and 3 only; the signal change at bar 6 opens a run
+        assert firsts("AAA") == [T0, T0 + timedelta(minutes=3), T0 + timedelta(minutes=6)]
+        assert len(firsts("BBB")) == 7
+
+    def test_fewer_rows_than_full_log_with_moving_indicators(self, tmp_path):
+        pytest.importorskip("sqlalchemy")
+        import sqlite3
+
+        from trading_bot.db.repository import SqliteRepository
+
+        symbols = ["AAA", "BBB", "CCC", "DDD"]
+        # Every indicator value moves on every bar; AAA's signal flips once
+        bars = [
+            {sym: _dec(int(sym == "AAA" and i >= 25), rsi=20.0 + i + k, conf=0.5 + i / 100)
+             for k, sym in enumerate(symbols)}
+            for i in range(50)
+        ]
+        full = SqliteRepository(db_path=tmp_path / "full.sqlite")
+        full.init_db()
+        for i, decisions in enumerate(bars):
+            for sym, dec in decisions.items():
+                full.log_strategy_decision(
+                    ts=T0 + timedelta(minutes=i), symbol=sym, mode="ensemble", decision=dec
+                )
+        compact = SqliteRepository(db_path=tmp_path / "compact.sqlite")
+        compact.init_db()
+        log = DecisionLog(compact)
+        _steps(log, bars)
+        log.close()
+
+        def rows(repo, tables):
+            con = sqlite3.connect(repo.db_path)
+            try:
+                return sum(con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables)
+            finally:
+                con.close()
+
+        full_rows = rows(full, ["strategy_decisions"])
+        compact_rows = rows(compact, ["decision_schemas", "decision_steps", "decision_runs"])
+        assert full_rows == 200
+        # 50 steps, 1 schema, 5 runs per symbol (values stored every 10 bars) + AAA's flip
+        assert compact_rows == 50 + 1 + 4 * 5 + 1
+        assert compact_rows < full_rows
+        assert len(compact.decision_history()) == 200
+
+    def test_weight_override_and_missing_symbol_closes_run(self):
+        repo = _Repo()
+        log = DecisionLog(repo)
+        _steps(log, [{"AAA": _dec(), "BBB": _dec(weights={"rsi": 1.0})}, {"AAA": _dec()}])
+
+        bbb = repo.runs[("BBB", T0)]
+        assert bbb["weights_json"] == '{"rsi": 1.0}'
+        assert bbb["last_ts"] == T0  # not decided on at step 2
+        assert repo.runs[("AAA", T0)]["last_ts"] is None
+
+
+class TestDecisionHistory:
+    def test_rebuilds_per_bar_view(self, tmp_path):
+        pytest.importorskip("sqlalchemy")
+        from trading_bot.db.repository import SqliteRepository
+
+        repo = SqliteRepository(db_path=tmp_path / "trades.sqlite")
+        repo.init_db()
+        log = DecisionLog(repo)
+        bars = [{"AAA": _dec(), "BBB": _dec(0, weights={"rsi": 1.0})}] * 2
+        bars += [{"AAA": _dec(0, rsi=40.0)}]
+        _steps(log, bars)
+
+        history = repo.decision_history()
+        assert [(h["ts"], h["symbol"]) for h in history] == [
+            (T0, "AAA"),
+            (T0, "BBB"),
+            (T0 + timedelta(minutes=1), "AAA"),
+            (T0 + timedelta(minutes=1), "BBB"),
+            (T0 + timedelta(minutes=2), "AAA"),
+        ]
+        expected = [(0, "AAA"), (0, "BBB"), (1, "AAA"), (1, "BBB"), (2, "AAA")]
+        for h, (ts, sym) in zip(history, expected):
+            dec = bars[ts][sym]
+            assert (h["signal"], h["confidence"], h["votes"], h["weights"], h["explanations"]) == (
+                dec.signal,
+                dec.confidence,
+                dec.votes,
+                dec.weights,
+                dec.explanations,
+            )
+        aaa = repo.decision_history(symbol="AAA", start=T0 + timedelta(minutes=1))
+        assert [h["ts"] for h in aaa] == [T0 + timedelta(minutes=1), T0 + timedelta(minutes=2)]
+
+        # A restarted process closes the runs left open at the last logged step
+        assert repo.close_open_decision_runs() == 1
+        assert len(repo.decision_history()) == 5
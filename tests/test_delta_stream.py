@@ -0,0 +1,125 @@
+"""
+Tests for per-iteration dashboard deltas and per-client coalescing.
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from trading_bot.core.models import Fill, Portfolio, Position
+from trading_bot.ui.delta_stream import DeltaHub, StateTracker
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _update(step, portfolio, prices, *, fills=(), signals=None):
+    return SimpleNamespace(
+        ts=datetime(2024, 1, 2) + timedelta(minutes=step),
+        prices=dict(prices),
+        signals=signals or {},
+        fills=list(fills),
+        portfolio=portfolio,
+        sharpe_ratio=0.0,
+        max_drawdown_pct=0.0,
+        win_rate=0.0,
+        num_trades=len(fills),
+    )
+
+
+class TestStateTracker:
+    """Deltas carry only what changed since the previous update"""
+
+    def test_diff(self):
+        portfolio = Portfolio(cash=1_000.0)
+        portfolio.positions["AAA"] = Position(symbol="AAA", qty=5, avg_price=10.0)
+        tracker = StateTracker()
+
+        first = tracker.apply(_update(0, portfolio, {"AAA": 10.0, "BBB": 20.0}, signals={"AAA": 1}))
+        assert first.prices == {"AAA": 10.0, "BBB": 20.0}
+        assert first.positions == {"AAA": {"qty": 5, "avg_price": 10.0}}
+        assert first.equity[0][1] == 1_050.0
+
+        portfolio.positions["AAA"].qty = 0
+        portfolio.positions["BBB"] = Position(symbol="BBB", qty=2, avg_price=20.0)
+        fill = Fill(
+            order_id="1", ts=datetime(2024, 1, 2), symbol="BBB", side="BUY", qty=2, price=20.0
+        )
+        second = tracker.apply(
+            _update(1, portfolio, {"AAA": 10.0, "BBB": 21.0}, fills=[fill], signals={"AAA": 1})
+        )
+        assert second.seq == 2
+        assert second.prices == {"BBB": 21.0}
+        assert second.signals == {}
+        assert second.positions == {"AAA": None, "BBB": {"qty": 2, "avg_price": 20.0}}
+        assert [f["symbol"] for f in second.fills] == ["BBB"]
+
+        snap = tracker.snapshot()
+        assert snap["seq"] == 2
+        assert snap["positions"] == {"BBB": {"qty": 2, "avg_price": 20.0}}
+        assert len(snap["equity"]) == 2
+
+    def test_new_portfolio_closes_old_positions(self):
+        tracker = StateTracker()
+        old = Portfolio(cash=0.0, positions={"AAA": Position(symbol="AAA", qty=1, avg_price=1.0)})
+        tracker.apply(_update(0, old, {"AAA": 1.0}))
+        new = Portfolio(cash=0.0, positions={"BBB": Position(symbol="BBB", qty=1, avg_price=1.0)})
+        delta = tracker.apply(_update(1, new, {"AAA": 1.0}))
+        assert delta.positions == {"AAA": None, "BBB": {"qty": 1, "avg_price": 1.0}}
+
+
+class TestDeltaHub:
+    """One message in flight per client; later deltas coalesce"""
+
+    def test_coalesces_until_ack(self):
+        clock = FakeClock()
+        hub = DeltaHub(clock=clock, ack_timeout=5.0)
+        portfolio = Portfolio(cash=100.0)
+        hub.publish(_update(0, portfolio, {"AAA": 1.0}))
+
+        snap = hub.subscribe("fast")
+        hub.subscribe("slow")
+        assert snap["seq"] == 1 and snap["prices"] == {"AAA": 1.0}
+
+        hub.publish(_update(1, portfolio, {"AAA": 2.0}))
+        sent = hub.drain()
+        assert sorted(sid for sid, _, _ in sent) == ["fast", "slow"]
+        assert sent[0][1] == "delta" and sent[0][2]["first_seq"] == 2
+
+        hub.publish(_update(2, portfolio, {"AAA": 3.0}))
+        hub.publish(_update(3, portfolio, {"AAA": 4.0, "BBB": 1.0}))
+        hub.ack("fast")
+        sent = hub.drain()
+        assert [sid for sid, _, _ in sent] == ["fast"]
+        delta = sent[0][2]
+        assert (delta["first_seq"], delta["seq"]) == (3, 4)
+        assert delta["prices"] == {"AAA": 4.0, "BBB": 1.0}
+        assert len(delta["equity"]) == 2
+
+        clock.now = 10.0  # slow never acked: resend after the timeout
+        assert [(sid, d["first_seq"]) for sid, _, d in hub.drain()] == [("slow", 3)]
+        assert hub.drain() == []
+
+    def test_overflow_resyncs_with_snapshot(self):
+        hub = DeltaHub(max_pending=3)
+        portfolio = Portfolio(cash=100.0)
+        hub.subscribe("a")
+        hub.publish(_update(0, portfolio, {"AAA": 1.0}))
+        hub.drain()  # in flight now
+        for step in range(1, 6):
+            hub.publish(_update(step, portfolio, {"AAA": float(step)}))
+        hub.ack("a")
+        [(sid, event, payload)] = hub.drain()
+        assert event == "snapshot"
+        assert payload["seq"] == 6
+
+    def test_unsubscribed_clients_get_nothing(self):
+        hub = DeltaHub()
+        hub.subscribe("a")
+        hub.unsubscribe("a")
+        hub.publish(_update(0, Portfolio(cash=1.0), {}))
+        assert hub.drain() == []
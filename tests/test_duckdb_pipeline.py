@@ -0,0 +1,101 @@
+"""
+Tests for the incremental SQLite -> DuckDB analytics sync.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from trading_bot.analytics import duckdb_pipeline
+from trading_bot.analytics.duckdb_pipeline import build_analytics_db, performance_summary
+from trading_bot.core.models import Fill, Order, Portfolio, Position
+from trading_bot.db.repository import SqliteRepository
+
+duckdb = pytest.importorskip("duckdb")
+
+T0 = datetime(2024, 1, 2, 9, 30)
+
+
+def _log(repo, step: int, equity_cash: float, *, side="BUY", tag="signal_long:ensemble") -> None:
+    ts = T0 + timedelta(hours=step * 12)
+    order = Order(id=f"o{step}", ts=ts, symbol="AAA", side=side, qty=10, tag=tag)
+    repo.log_order_filled(order)
+    fill = Fill(
+        order_id=order.id, ts=ts, symbol="AAA", side=side, qty=10, price=100.0 + step, fee=1.0,
+        note=tag,
+    )
+    repo.log_fill(fill)
+    position = Position(symbol="AAA", qty=10, avg_price=100.0)
+    portfolio = Portfolio(cash=equity_cash, positions={"AAA": position})
+    repo.log_snapshot(ts=ts, portfolio=portfolio, prices={"AAA": 100.0 + step})
+
+
+@pytest.fixture(params=["native", "chunked"])
+def paths(request, tmp_path, monkeypatch):
+    if request.param == "chunked":
+        monkeypatch.setattr(duckdb_pipeline, "_attach_sqlite", lambda con, db: False)
+        monkeypatch.setattr(duckdb_pipeline, "CHUNK_ROWS", 2)
+    repo = SqliteRepository(db_path=tmp_path / "events.sqlite")
+    repo.init_db()
+    return repo, tmp_path / "analytics.duckdb"
+
+
+def _query(path, sql):
+    con = duckdb.connect(str(path), read_only=True)
+    try:
+        return con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+class TestIncrementalSync:
+    """Only new rows are appended and the aggregates follow them"""
+
+    def test_appends_new_rows(self, paths):
+        repo, target = paths
+        for step in range(3):
+            _log(repo, step, 1_000.0)
+        assert build_analytics_db(sqlite_db=repo.db_path, duckdb_db=target)["fills"] == 3
+
+        _log(repo, 3, 900.0, side="SELL", tag="stop_loss")
+        added = build_analytics_db(sqlite_db=repo.db_path, duckdb_db=target)
+        assert added == {"orders": 1, "fills": 1, "portfolio_snapshots": 1, "position_snapshots": 1}
+        assert build_analytics_db(sqlite_db=repo.db_path, duckdb_db=target)["fills"] == 0
+
+        assert _query(target, "select count(*), count(distinct id) from orders") == [(4, 4)]
+        attribution = "select strategy, n_fills, sold from strategy_attribution order by 1"
+        assert _query(target, attribution) == [("ensemble", 3, 0), ("stop_loss", 1, 10)]
+        [(open_qty, pnl)] = _query(target, "select open_qty, total_pnl from symbol_pnl")
+        assert open_qty == 20
+        # buys 100+101+102, sell 103 (x10 each), 4 fees, 20 open marked at 103
+        assert pnl == pytest.approx(1030 - 3030 - 4 + 20 * 103)
+
+        daily = "select day, open_equity, close_equity, snapshots from daily_equity order by day"
+        days = _query(target, daily)
+        assert [d[3] for d in days] == [2, 2]
+        assert days[1][2] == pytest.approx(900.0 + 10 * 103)
+
+    def test_full_resync_matches_incremental(self, paths):
+        repo, target = paths
+        for step in range(4):
+            _log(repo, step, 1_000.0 - step)
+            build_analytics_db(sqlite_db=repo.db_path, duckdb_db=target)
+        incremental = _query(target, "select * from daily_equity order by day")
+        build_analytics_db(sqlite_db=repo.db_path, duckdb_db=target, full=True)
+        assert _query(target, "select * from daily_equity order by day") == incremental
+        assert _query(target, "select count(*) from fills") == [(4,)]
+
+
+class TestPerformanceSummary:
+    def test_drawdown_in_sql(self, paths):
+        repo, target = paths
+        cash = [1_000.0, 2_000.0, 500.0, 1_500.0]
+        for step, c in enumerate(cash):
+            _log(repo, step, c)
+        build_analytics_db(sqlite_db=repo.db_path, duckdb_db=target)
+        summary = performance_summary(duckdb_db=target)
+        equity = [c + 10 * (100.0 + step) for step, c in enumerate(cash)]
+        assert summary.start_equity == pytest.approx(equity[0])
+        assert summary.end_equity == pytest.approx(equity[-1])
+        assert summary.max_drawdown == pytest.approx(equity[2] / equity[1] - 1.0)
+        assert summary.start_ts == T0
@@ -0,0 +1,114 @@
+"""
+Tests for the vectorized exit scan and the engine's exit stage.
+"""
+
+import uuid
+from datetime import datetime
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from trading_bot.broker.paper import PaperBroker
+from trading_bot.core.models import Order
+from trading_bot.engine.exit_scan import ExitOrder, scan_exits
+
+NAN = np.nan
+
+
+def _scan(rows):
+    """rows: (symbol, qty, price, stop, take, entry, bars_held)"""
+    cols = list(zip(*rows))
+    return scan_exits(
+        list(cols[0]),
+        qty=np.array(cols[1]),
+        price=np.array(cols[2], dtype=float),
+        stop_loss=np.array(cols[3], dtype=float),
+        take_profit=np.array(cols[4], dtype=float),
+        entry_price=np.array(cols[5], dtype=float),
+        bars_held=np.array(cols[6]),
+    )
+
+
+class TestScanExits:
+    """Array scan reproduces the per-symbol exit rules"""
+
+    def test_rules(self):
+        exits = _scan([
+            ("FLAT", 0, 50.0, 60.0, NAN, 100.0, 30),
+            ("STOP", 10, 94.0, 95.0, 120.0, 100.0, 3),
+            ("TAKE", 10, 121.0, 90.0, 120.0, NAN, 3),    # untracked: risk exits only
+            ("PTP", 10, 102.0, 90.0, 120.0, 100.0, 3),   # +2%: first level, 50%
+            ("PTPT", 1, 125.0, 90.0, 120.0, 100.0, 3),   # partial takes the only share
+            ("BOTH", 9, 130.0, 90.0, 120.0, 100.0, 3),   # partial then target on the rest
+            ("TIME", 10, 100.5, 90.0, 120.0, 100.0, 21),
+            ("YOUNG", 10, 100.5, 90.0, 120.0, 100.0, 20),
+            ("NONE", 10, 100.0, NAN, NAN, NAN, 99),
+        ])
+        assert exits == [
+            ExitOrder("STOP", "stop_loss", 0, pytest.approx(-0.06), 95.0),
+            ExitOrder("TAKE", "take_profit", 0, 0.0, 120.0),
+            ExitOrder("PTP", "partial_tp", 5, pytest.approx(0.02)),
+            ExitOrder("PTPT", "partial_tp", 1, pytest.approx(0.25)),
+            ExitOrder("BOTH", "partial_tp", 4, pytest.approx(0.30)),
+            ExitOrder("BOTH", "take_profit", 0, pytest.approx(0.30), 120.0),
+            ExitOrder("TIME", "time_exit", 0, pytest.approx(0.005)),
+        ]
+        assert [e.closes_position for e in exits] == [True, True, False, False, False, True, True]
+
+    def test_time_exit_beats_stop(self):
+        exits = _scan([("A", 10, 90.0, 95.0, NAN, 100.0, 25)])
+        assert [e.reason for e in exits] == ["time_exit"]
+
+    def test_empty(self):
+        assert scan_exits([], *(np.empty(0),) * 6) == []
+
+
+class TestEngineExitStage:
+    """`PaperEngine._run_exits` submits the batch and reports closing symbols"""
+
+    def _engine(self, paper, symbols):
+        engine = paper.PaperEngine.__new__(paper.PaperEngine)
+        engine.cfg = paper.PaperEngineConfig(config_path="", db_path="", symbols=symbols)
+        engine.broker = PaperBroker(start_cash=100_000.0)
+        engine.repo = Mock()
+        engine.decision_log = None
+        engine.ensemble = Mock(normalized=Mock(return_value={}))
+        engine.timer = paper.StageTimer(enabled=False)
+        engine.iteration = 30
+        engine.position_monitoring_enabled = False
+        engine._exited_this_iteration = set()
+        engine._position_entry_bars = {}
+        engine._position_entry_prices = {}
+        return engine
+
+    def test_run_exits(self):
+        paper = pytest.importorskip("trading_bot.engine.paper")
+        engine = self._engine(paper, ["AAA", "BBB", "CCC"])
+        broker = engine.broker
+        for sym in ("AAA", "BBB", "CCC"):
+            broker.set_price(sym, 100.0)
+            broker.submit_order(Order(uuid.uuid4().hex, datetime.utcnow(), sym, "BUY", 10))
+            engine._position_entry_prices[sym] = 100.0
+            engine._position_entry_bars[sym] = 25
+        broker.portfolio().get_position("AAA").stop_loss = 95.0
+
+        prices = {"AAA": 94.0, "BBB": 102.0, "CCC": 100.0}
+        for sym, px in prices.items():
+            broker.set_price(sym, px)
+        decisions, signals, fills, rejections = {}, {}, [], []
+        exiting = engine._run_exits(
+            datetime.utcnow(), prices, decisions, signals, fills, rejections
+        )
+
+        assert exiting == frozenset({"AAA"})
+        assert [(f.symbol, f.qty, f.note) for f in fills] == [
+            ("AAA", 10, "stop_loss"),
+            ("BBB", 5, "partial_tp:2.0%"),
+        ]
+        assert not rejections
+        assert signals == {"AAA": 0}
+        assert decisions["AAA"].explanations["risk_exit"]["stop_loss"] == 95.0
+        assert "AAA" not in engine._position_entry_prices
+        assert engine._exited_this_iteration == {"AAA"}
+        assert broker.portfolio().get_position("BBB").qty == 5
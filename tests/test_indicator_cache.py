@@ -0,0 +1,109 @@
+"""
+Tests for the parameter-aware indicator cache behind `add_indicators`.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.indicators import add_indicators
+from trading_bot.indicators.cache import INDICATOR_COLUMNS, IndicatorCache
+
+
+def _ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(100 + np.cumsum(rng.normal(0, 1.5, n)), 1.0)
+    return pd.DataFrame(
+        {"Close": close, "Volume": rng.integers(1_000, 5_000, n).astype(float)},
+        index=pd.date_range("2022-01-03", periods=n, freq="D"),
+    )
+
+
+def _uncached(df: pd.DataFrame, **kw) -> pd.DataFrame:
+    return add_indicators(df, cache=None, **kw)
+
+
+class TestIndicatorCache:
+    """Keys, incremental extension, eviction and counters"""
+
+    def test_hit_returns_equal_independent_frame(self):
+        cache = IndicatorCache()
+        df = _ohlcv(200)
+        first = add_indicators(df, symbol="A", interval="1d", cache=cache)
+        second = add_indicators(df, symbol="A", interval="1d", cache=cache)
+
+        pd.testing.assert_frame_equal(first, _uncached(df))
+        pd.testing.assert_frame_equal(second, first)
+        second["rsi"] = 0.0
+        pd.testing.assert_frame_equal(add_indicators(df, symbol="A", cache=cache), first)
+        assert cache.hits >= 1
+
+    def test_parameters_are_part_of_the_key(self):
+        cache = IndicatorCache()
+        df = _ohlcv(200)
+        add_indicators(df, cache=cache)
+        out = add_indicators(df, rsi_period=5, sma_fast=10, cache=cache)
+
+        pd.testing.assert_frame_equal(out, _uncached(df, rsi_period=5, sma_fast=10))
+        assert cache.hits == 0 and cache.misses == 2
+
+    def test_same_tail_different_history_does_not_collide(self):
+        cache = IndicatorCache()
+        a = _ohlcv(200, seed=1)
+        b = a.copy()
+        b.iloc[:100, 0] += 5.0  # only the early history differs
+        add_indicators(a, cache=cache)
+        pd.testing.assert_frame_equal(add_indicators(b, cache=cache), _uncached(b))
+
+    @pytest.mark.parametrize("step", [1, 7])
+    def test_appended_bars_are_computed_incrementally(self, step):
+        cache = IndicatorCache()
+        df = _ohlcv(260, seed=2)
+        for n in range(60, 261, step):
+            out = add_indicators(df.iloc[:n], symbol="A", interval="1d", cache=cache)
+            expected = _uncached(df.iloc[:n])
+            for col in INDICATOR_COLUMNS:
+                np.testing.assert_array_equal(out[col].to_numpy(), expected[col].to_numpy())
+
+        assert cache.misses == 1
+        assert cache.extensions == len(range(60, 261, step)) - 1
+
+    def test_float32_input_takes_the_full_path(self):
+        cache = IndicatorCache()
+        df = _ohlcv(120).astype(np.float32)
+        add_indicators(df.iloc[:100], symbol="A", cache=cache)
+        out = add_indicators(df, symbol="A", cache=cache)
+        pd.testing.assert_frame_equal(out, _uncached(df))
+        assert cache.extensions == 0
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        df = _ohlcv(500)
+        probe = IndicatorCache()
+        add_indicators(df, symbol="A", cache=probe)
+        cache = IndicatorCache(max_bytes=int(probe.stats()["bytes"] * 2.5))
+
+        add_indicators(df, symbol="A", cache=cache)
+        add_indicators(df, symbol="B", cache=cache)
+        add_indicators(df, symbol="A", cache=cache)  # refresh A
+        add_indicators(df, symbol="C", cache=cache)  # evicts B
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= stats["max_bytes"]
+        add_indicators(df, symbol="A", cache=cache)
+        assert cache.hits == 2
+
+    def test_clear_resets_counters(self):
+        cache = IndicatorCache()
+        add_indicators(_ohlcv(80), cache=cache)
+        cache.clear()
+        assert cache.stats() == {
+            "hits": 0,
+            "misses": 0,
+            "extensions": 0,
+            "evictions": 0,
+            "entries": 0,
+            "bytes": 0,
+            "max_bytes": cache.max_bytes,
+        }
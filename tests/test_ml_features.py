@@ -0,0 +1,143 @@
+"""
+Tests for the incremental ML feature pipeline and batched ML predictions.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.learn.ml_features import FEATURE_COLUMNS, FeaturePipeline, SymbolFeatureState
+from trading_bot.learn.ml_signals import (
+    XGBOOST_AVAILABLE,
+    MLFeatureEngine,
+    MLModelTrainer,
+    MLSignalManager,
+)
+
+
+def _ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(100 + np.cumsum(rng.normal(0, 1.5, n)), 5.0)
+    open_ = close + rng.normal(0, 0.5, n)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + rng.uniform(0, 1, n),
+            "low": np.minimum(open_, close) - rng.uniform(0, 1, n),
+            "close": close,
+            "volume": rng.integers(1_000, 9_000, n).astype(float),
+        },
+        index=pd.date_range("2023-01-02", periods=n, freq="D"),
+    )
+
+
+def _assert_features_match(got: pd.DataFrame, want: pd.DataFrame):
+    for col in FEATURE_COLUMNS:
+        rtol = 1e-6 if col == "returns_skew_20" else 1e-9
+        np.testing.assert_allclose(
+            got[col].to_numpy(float), want[col].to_numpy(float), rtol=rtol, atol=1e-9,
+            err_msg=col,
+        )
+
+
+class TestSymbolFeatureState:
+    """Streaming rows equal the full `calculate_features` rebuild"""
+
+    def test_matches_full_rebuild(self):
+        df = _ohlcv(160)
+        state = SymbolFeatureState()
+        rows = np.vstack([state.update(*bar) for bar in df.to_numpy(float)])
+        got = pd.DataFrame(rows, index=df.index, columns=FEATURE_COLUMNS)
+        want = MLFeatureEngine.calculate_features(df)
+        assert list(want.columns[5:]) == list(FEATURE_COLUMNS)
+        _assert_features_match(got, want)
+
+
+class TestFeaturePipeline:
+    """Incremental sync over a growing, revised or replaced history"""
+
+    def test_growing_history_feeds_only_new_bars(self):
+        df = _ohlcv(120)
+        pipe = FeaturePipeline()
+        for n in range(30, 121, 7):
+            row = pipe.latest("AAA", df.iloc[:n])
+            want = MLFeatureEngine.calculate_features(df.iloc[:n]).iloc[-1]
+            _assert_features_match(row.to_frame().T, want.to_frame().T)
+        assert pipe.bars_fed == 120 - (120 - 30) % 7
+        assert pipe.rebuilds == 1
+
+    def test_revised_last_bar(self):
+        df = _ohlcv(60)
+        pipe = FeaturePipeline()
+        pipe.sync("AAA", df)
+        revised = df.copy()
+        revised.iloc[-1, revised.columns.get_loc("close")] *= 1.05
+        got = pipe.frame("AAA", revised)
+        _assert_features_match(got, MLFeatureEngine.calculate_features(revised))
+        assert pipe.rebuilds == 1
+
+    def test_misaligned_history_rebuilds(self):
+        df = _ohlcv(80)
+        pipe = FeaturePipeline()
+        pipe.sync("AAA", df)
+        other = _ohlcv(50, seed=3)
+        other.index = other.index + pd.Timedelta(days=500)
+        got = pipe.frame("AAA", other)
+        _assert_features_match(got, MLFeatureEngine.calculate_features(other))
+        assert pipe.rebuilds == 2
+
+    def test_titlecase_columns(self):
+        df = _ohlcv(40)
+        titled = df.rename(columns=str.title)
+        row = FeaturePipeline().latest("AAA", titled)
+        assert row["close"] == df["close"].iloc[-1]
+        assert np.isfinite(row["rsi_14"])
+
+    def test_max_rows_trims_training_frame(self):
+        df = _ohlcv(100)
+        got = FeaturePipeline(max_rows=30).frame("AAA", df)
+        assert got["sma_5"].iloc[:70].isna().all()
+        assert got["sma_5"].iloc[70:].notna().all()
+
+
+@pytest.mark.skipif(not XGBOOST_AVAILABLE, reason="xgboost not installed")
+class TestBatchedPredictions:
+    """One stacked predict_proba call gives the per-symbol answers"""
+
+    def test_batch_matches_single_predictions(self):
+        trainer = MLModelTrainer("m")
+        trainer.train(_ohlcv(300, seed=1))
+        assert trainer.trained
+
+        frames = {f"S{k}": _ohlcv(80, seed=10 + k) for k in range(5)}
+        rows = {s: MLFeatureEngine.calculate_features(df).iloc[-1] for s, df in frames.items()}
+        batch = trainer.predict_batch(rows)
+        for sym, df in frames.items():
+            df.index.name = sym
+            single = trainer.predict(df)
+            assert batch[sym].symbol == sym
+            assert batch[sym].probability_up == pytest.approx(single.probability_up, abs=1e-6)
+
+    def test_pooled_manager_uses_one_call(self, monkeypatch):
+        frames = {f"S{k}": _ohlcv(200, seed=20 + k).rename(columns=str.title) for k in range(4)}
+        mgr = MLSignalManager(pooled=True)
+        assert mgr.train_universe(frames)
+        model = mgr.models["S0"]
+        assert all(m is model for m in mgr.models.values())
+
+        calls = []
+        original = model.model.predict_proba
+        monkeypatch.setattr(
+            model.model, "predict_proba", lambda X: calls.append(len(X)) or original(X)
+        )
+        signals = mgr.predict_signals(frames)
+        assert list(signals) == list(frames)
+        assert calls == [4]
+        assert all(s.model_version == "xgboost_1.0" for s in signals.values())
+
+    def test_short_history_gets_fallback(self):
+        mgr = MLSignalManager()
+        signals = mgr.predict_signals({"A": _ohlcv(10), "B": _ohlcv(40)})
+        assert signals["A"].model_version == "fallback"
+        assert signals["B"].model_version == "heuristic_fallback"
+        assert mgr.predict_signal("A", _ohlcv(10)).model_version == "fallback"
@@ -0,0 +1,169 @@
+"""
+Tests for the versioned model registry and the background training service.
+"""
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.learn.ml_signals import XGBOOST_AVAILABLE, MLModelTrainer, MLSignalManager
+from trading_bot.learn.model_registry import (
+    SCHEMA_HASH,
+    UNIVERSE_KEY,
+    ModelRegistry,
+    feature_schema_hash,
+)
+from trading_bot.learn.training_service import ModelTrainingService
+
+pytestmark = pytest.mark.skipif(not XGBOOST_AVAILABLE, reason="xgboost not installed")
+
+
+def _ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(100 + np.cumsum(rng.normal(0, 1.5, n)), 5.0)
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.5, n),
+            "High": close + rng.uniform(0.5, 1.5, n),
+            "Low": close - rng.uniform(0.5, 1.5, n),
+            "Close": close,
+            "Volume": rng.integers(1_000, 9_000, n).astype(float),
+        },
+        index=pd.date_range("2023-01-02", periods=n, freq="D"),
+    )
+
+
+def _trained(seed: int = 0) -> MLModelTrainer:
+    trainer = MLModelTrainer("m")
+    trainer.train(_ohlcv(200, seed))
+    assert trainer.trained
+    return trainer
+
+
+class TestModelRegistry:
+    """Versions, latest pointer, schema check and pruning"""
+
+    def test_save_and_load_latest(self, tmp_path):
+        reg = ModelRegistry(tmp_path)
+        first = reg.save("AAPL", _trained(0), window=("2023-01-02", "2023-07-20"), symbols=["AAPL"])
+        second = reg.save("AAPL", _trained(1), window=("2023-01-02", "2023-07-21"))
+        assert (first.version, second.version) == (1, 2)
+        assert second.schema_hash == SCHEMA_HASH
+        assert set(second.metrics) == {"train_acc", "test_acc", "samples"}
+
+        trainer, record = reg.load("AAPL")
+        assert record == second
+        assert trainer.version == "v2" and trainer.trained
+        assert reg.load("AAPL", version=1)[1] == first
+        assert reg.load("MSFT") is None
+
+    def test_schema_mismatch_is_not_loaded(self, tmp_path):
+        reg = ModelRegistry(tmp_path)
+        trainer = _trained()
+        trainer.feature_names = trainer.feature_names[:-1]
+        record = reg.save("AAPL", trainer, window=(0, 1))
+        assert record.schema_hash == feature_schema_hash(trainer.feature_names)
+        assert reg.load("AAPL") is None
+        assert reg.load("AAPL", schema_hash=None) is not None
+
+    def test_prunes_old_versions_and_leaves_no_temp_files(self, tmp_path):
+        reg = ModelRegistry(tmp_path, keep=2)
+        trainer = _trained()
+        for _ in range(4):
+            reg.save("AAPL", trainer, window=(0, 1))
+        assert reg.versions("AAPL") == [3, 4]
+        files = sorted(p.name for p in (tmp_path / "AAPL").iterdir())
+        assert files == [
+            "latest.json", "v000003.json", "v000003.pkl", "v000004.json", "v000004.pkl"
+        ]
+        assert json.loads((tmp_path / "AAPL" / "latest.json").read_text()) == {"version": 4}
+
+
+class TestModelTrainingService:
+    """Background fits are saved, reported once and never overlap per key"""
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_fit_in_background(self, tmp_path, executor):
+        mgr = MLSignalManager()
+        service = ModelTrainingService(ModelRegistry(tmp_path), executor=executor)
+        try:
+            frames = mgr.training_frames({"AAPL": _ohlcv(200)})
+            assert service.submit("AAPL", frames)
+            assert not service.submit("AAPL", frames)
+            results = service.wait(timeout=120)
+        finally:
+            service.close()
+        assert [r.key for r in results] == ["AAPL"] and results[0].ok
+        assert results[0].record.window_end.startswith("2023-07-20")
+        assert service.pending == 0 and service.poll() == []
+        assert ModelRegistry(tmp_path).record("AAPL").version == 1
+
+    def test_too_little_data_is_reported(self, tmp_path):
+        service = ModelTrainingService(ModelRegistry(tmp_path), executor="thread")
+        try:
+            service.submit("AAPL", MLSignalManager().training_frames({"AAPL": _ohlcv(40)}))
+            (result,) = service.wait(timeout=60)
+        finally:
+            service.close()
+        assert not result.ok and result.error
+        assert ModelRegistry(tmp_path).versions("AAPL") == []
+
+
+class TestManagerSwapAndWarmRestart:
+    """Installed models replace the heuristic; saved models survive a restart"""
+
+    def test_install_swaps_from_heuristic(self):
+        mgr = MLSignalManager()
+        df = _ohlcv(80, seed=5)
+        assert mgr.predict_signal("AAPL", df).model_version == "heuristic_fallback"
+        trainer = _trained()
+        trainer.version = "v7"
+        mgr.install("AAPL", trainer, 7, ["AAPL"])
+        assert mgr.predict_signal("AAPL", df).model_version == "xgboost_v7"
+        assert mgr.due_for_training({"AAPL": df}) == {}
+
+    def test_pooled_warm_restart(self, tmp_path):
+        reg = ModelRegistry(tmp_path)
+        frames = {s: _ohlcv(200, seed=k) for k, s in enumerate(["A", "B", "C"])}
+        first = MLSignalManager(pooled=True)
+        assert list(first.due_for_training(frames)) == [UNIVERSE_KEY]
+        trainer = MLModelTrainer("pooled")
+        trainer.train_frames(first.training_frames(frames))
+        reg.save(UNIVERSE_KEY, trainer, window=(0, 1), symbols=list(frames))
+
+        restarted = MLSignalManager(pooled=True)
+        assert restarted.load_registry(reg, list(frames)) == {"A": 1, "B": 1, "C": 1}
+        assert restarted.due_for_training(frames) == {}
+        signals = restarted.predict_signals(frames)
+        assert {s.model_version for s in signals.values()} == {"xgboost_v1"}
+
+
+class TestPaperEngineBackgroundTraining:
+    """The engine schedules fits off the loop and installs them on a later step"""
+
+    def test_schedule_and_install(self, tmp_path):
+        paper = pytest.importorskip("trading_bot.engine.paper")
+        engine = paper.PaperEngine.__new__(paper.PaperEngine)
+        engine.ml_manager = MLSignalManager()
+        engine._ml_trained_symbols = set()
+        engine._ml_training = ModelTrainingService(ModelRegistry(tmp_path), executor="thread")
+        data = {"AAA": _ohlcv(200, seed=1), "BBB": _ohlcv(30, seed=2)}
+        try:
+            engine._schedule_ml_training(data)
+            assert engine._ml_trained_symbols == {"AAA"}
+            assert engine._ml_training.in_flight("AAA")
+            assert engine.ml_manager.predict_signal("AAA", data["AAA"]).model_version == (
+                "heuristic_fallback"
+            )
+            deadline = time.monotonic() + 120
+            while not engine.ml_manager.model_versions and time.monotonic() < deadline:
+                time.sleep(0.05)
+                engine._schedule_ml_training(data)
+        finally:
+            engine._ml_training.close()
+        assert engine.ml_manager.model_versions == {"AAA": 1}
+        assert engine._ml_training.pending == 0
+        assert engine.ml_manager.predict_signal("AAA", data["AAA"]).model_version == "xgboost_v1"
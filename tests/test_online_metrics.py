@@ -0,0 +1,91 @@
+"""
+Tests for the streaming engine metrics.
+"""
+
+import numpy as np
+import pytest
+
+from trading_bot.analytics.realtime_metrics import MetricsCollector
+from trading_bot.core.models import Portfolio
+from trading_bot.engine.online_metrics import OnlineMetrics
+
+
+def _batch(equity, trades, start):
+    """The full-history computation `PaperEngine._calculate_metrics` used to run."""
+    eq = np.array(equity, dtype=float)
+    excess = np.diff(eq) / eq[:-1] - 0.02 / 252
+    sharpe = float(np.sqrt(252) * np.mean(excess) / (np.std(excess) + 1e-8))
+    cummax = np.maximum.accumulate(eq)
+    max_dd = float(np.min((eq - cummax) / cummax))
+    wins = sum(1 for t in trades if t.get("pnl", 0) > 0)
+    return sharpe, max_dd, wins / len(trades), len(trades), float(eq[-1] - start)
+
+
+class TestOnlineMetrics:
+    def test_matches_full_history(self):
+        rng = np.random.default_rng(7)
+        equity = [100_000.0]
+        metrics = OnlineMetrics(100_000.0)
+        for r in rng.normal(0.0005, 0.01, 500):
+            equity.append(equity[-1] * (1 + r))
+            metrics.record_equity(equity[-1])
+        trades = [{"pnl": float(p)} for p in rng.normal(0, 1, 200)]
+        for t in trades:
+            metrics.record_trade(t)
+
+        assert metrics.snapshot() == pytest.approx(_batch(equity, trades, 100_000.0), rel=1e-9)
+        assert list(metrics.equity) == equity
+
+    def test_empty(self):
+        assert OnlineMetrics(1_000.0).snapshot() == (0.0, 0.0, 0.0, 0, 0.0)
+
+    def test_rings_are_bounded(self):
+        metrics = OnlineMetrics(100.0, equity_len=4, trade_len=3)
+        for eq in (110.0, 90.0, 120.0, 130.0, 125.0):
+            metrics.record_equity(eq)
+        for pnl in (5.0, 5.0, -1.0, -2.0):
+            metrics.record_trade({"pnl": pnl})
+
+        assert list(metrics.equity) == [90.0, 120.0, 130.0, 125.0]
+        # Drawdown and P&L still cover the whole session
+        assert metrics.max_drawdown == pytest.approx(90.0 / 110.0 - 1)
+        assert metrics.current_pnl == pytest.approx(25.0)
+        # The first win left the ring
+        assert metrics.num_trades == 3
+        assert metrics.win_rate == pytest.approx(1 / 3)
+
+    def test_streaks(self):
+        metrics = OnlineMetrics(100.0, trade_len=2)
+        for pnl in (1.0, 2.0, 3.0):
+            metrics.record_trade({"pnl": pnl})
+        assert (metrics.consecutive_wins, metrics.consecutive_losses) == (2, 0)
+        metrics.record_trade({"pnl": 0.0})  # flat counts as a loss
+        metrics.record_trade({})
+        assert (metrics.consecutive_wins, metrics.consecutive_losses) == (0, 2)
+
+
+class TestMetricsCollector:
+    """The real-time collector reads the engine's OnlineMetrics"""
+
+    def test_snapshot_uses_online_metrics_after_ring_wraps(self):
+        metrics = OnlineMetrics(100.0, equity_len=3)
+        for eq in (110.0, 90.0, 120.0, 130.0):
+            metrics.record_equity(eq)
+        metrics.record_trade({"pnl": 4.0})
+        assert metrics.equity[0] != metrics.start_equity
+
+        snap = MetricsCollector().collect_metrics(
+            ts=None,
+            iteration=4,
+            portfolio=Portfolio(cash=130.0),
+            prices={},
+            metrics=metrics,
+            fills=[],
+            rejections=[],
+        )
+        assert snap.current_pnl == pytest.approx(30.0)
+        assert snap.current_pnl_pct == pytest.approx(0.30)
+        assert snap.max_drawdown_pct == metrics.max_drawdown
+        assert snap.sharpe_ratio == metrics.sharpe
+        assert snap.volatility_pct == metrics.volatility
+        assert (snap.win_rate, snap.num_trades, snap.consecutive_wins) == (1.0, 1, 1)
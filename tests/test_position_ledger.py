@@ -0,0 +1,138 @@
+"""
+Tests for the array-backed position ledger behind Portfolio/Position.
+"""
+
+import pickle
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from trading_bot.broker.paper import PaperBroker
+from trading_bot.core import ledger as ledger_module
+from trading_bot.core.ledger import PositionLedger
+from trading_bot.core.models import Order, Portfolio, Position
+
+
+def _order(symbol: str, side: str, qty: int) -> Order:
+    return Order(id=uuid.uuid4().hex, ts=datetime.utcnow(), symbol=symbol, side=side, qty=qty)
+
+
+def _brute_force(portfolio: Portfolio, prices) -> tuple:
+    mv = upnl = 0.0
+    for sym, pos in portfolio.positions.items():
+        if pos.qty == 0 or sym not in prices:
+            continue
+        mv += pos.qty * prices[sym]
+        upnl += (prices[sym] - pos.avg_price) * pos.qty
+    return portfolio.cash + mv, upnl
+
+
+class TestLedgerTotals:
+    """Running totals match a full recomputation"""
+
+    def test_random_fills_and_marks(self, monkeypatch):
+        monkeypatch.setattr(ledger_module, "RESYNC_EVERY", 50)
+        rng = np.random.default_rng(0)
+        broker = PaperBroker(start_cash=1_000_000.0)
+        symbols = [f"S{i}" for i in range(12)]
+        prices = {}
+        for _ in range(400):
+            sym = symbols[rng.integers(len(symbols))]
+            prices[sym] = float(rng.uniform(10, 200))
+            broker.set_price(sym, prices[sym])
+            pos = broker.portfolio().get_position(sym)
+            if rng.random() < 0.6:
+                broker.submit_order(_order(sym, "BUY", int(rng.integers(1, 20))))
+            elif pos.qty > 0:
+                broker.submit_order(_order(sym, "SELL", int(rng.integers(1, pos.qty + 1))))
+
+        portfolio = broker.portfolio()
+        equity, upnl = _brute_force(portfolio, prices)
+        assert portfolio.equity(broker.prices()) == pytest.approx(equity, rel=1e-12)
+        assert portfolio.equity() == pytest.approx(equity, rel=1e-12)
+        assert portfolio.unrealized_pnl() == pytest.approx(upnl, abs=1e-6)
+        assert portfolio.realized_pnl() == pytest.approx(
+            sum(p.realized_pnl for p in portfolio.positions.values()), abs=1e-6
+        )
+
+        # An explicit price mapping is valued independently of the marks
+        shifted = {s: p * 1.1 for s, p in prices.items()}
+        assert portfolio.equity(shifted) == pytest.approx(_brute_force(portfolio, shifted)[0])
+        assert portfolio.equity() == pytest.approx(equity, rel=1e-12)
+
+    def test_set_marks_vectorized(self):
+        portfolio = Portfolio(cash=0.0)
+        for sym, qty, avg in [("A", 10, 5.0), ("B", 3, 20.0), ("C", 0, 0.0)]:
+            portfolio.positions[sym] = Position(symbol=sym, qty=qty, avg_price=avg)
+        assert portfolio.market_value() == 0.0  # nothing marked yet
+        portfolio.set_marks({"A": 6.0, "B": 25.0, "Z": 1.0})
+        assert portfolio.market_value() == pytest.approx(135.0)
+        assert portfolio.unrealized_pnl() == pytest.approx(25.0)
+        portfolio.set_marks({"A": 4.0})
+        assert portfolio.unrealized_pnl() == pytest.approx(5.0)
+        assert portfolio.marks == {"A": 4.0, "B": 25.0, "Z": 1.0}
+
+    def test_triggered_exits(self):
+        ledger = PositionLedger(capacity=2)
+        rows = [
+            ("A", 10, 95.0, 110.0, 94.0),   # stop
+            ("B", 10, 95.0, 110.0, 111.0),  # take profit
+            ("C", 10, 95.0, 110.0, 100.0),  # neither
+            ("D", 0, 95.0, 110.0, 90.0),    # flat
+            ("E", 5, None, None, 1.0),      # no levels
+            ("F", 5, 100.0, 90.0, 95.0),    # both crossed: stop wins
+        ]
+        for sym, qty, stop, take, mark in rows:
+            ledger.add(sym, qty=qty, stop_loss=stop, take_profit=take, mark=mark)
+        assert ledger.triggered() == [("A", "stop_loss"), ("B", "take_profit"), ("F", "stop_loss")]
+
+
+class TestPositionView:
+    """Position keeps its dataclass-style API over ledger storage"""
+
+    def test_standalone_position(self):
+        pos = Position(symbol="AAPL", qty=5, avg_price=100.0)
+        assert pos.stop_loss is None
+        pos.stop_loss = 95.0
+        pos.qty -= 2
+        assert pos == Position(symbol="AAPL", qty=3, avg_price=100.0, stop_loss=95.0)
+        assert pos.market_value(110.0) == 330.0
+        assert pos.unrealized_pnl(110.0) == pytest.approx(30.0)
+        assert "qty=3" in repr(pos)
+
+    def test_positions_bind_to_portfolio(self):
+        pos = Position(symbol="AAPL", qty=5, avg_price=100.0)
+        portfolio = Portfolio(cash=1_000.0, positions={"AAPL": pos})
+        portfolio.set_mark("AAPL", 110.0)
+        assert portfolio.equity() == pytest.approx(1_550.0)
+        pos.qty = 10  # the caller's object writes through to the ledger
+        assert portfolio.get_position("AAPL") is pos
+        assert portfolio.equity() == pytest.approx(2_100.0)
+
+        removed = portfolio.positions.pop("AAPL")
+        assert removed.qty == 10
+        assert portfolio.equity() == pytest.approx(1_000.0)
+        assert portfolio.get_position("AAPL").qty == 0
+
+    def test_pickle_round_trip(self):
+        broker = PaperBroker(start_cash=10_000.0)
+        broker.set_price("A", 50.0)
+        broker.submit_order(_order("A", "BUY", 10))
+        restored = pickle.loads(pickle.dumps(broker.portfolio()))
+        assert restored == broker.portfolio()
+        assert restored.equity() == pytest.approx(broker.portfolio().equity())
+
+
+class TestPaperBrokerPrices:
+    """prices() is a live read-only view rather than a copy"""
+
+    def test_live_read_only_view(self):
+        broker = PaperBroker()
+        view = broker.prices()
+        broker.set_price("AAPL", 150.0)
+        assert view == {"AAPL": 150.0}
+        assert broker.prices() is view
+        with pytest.raises(TypeError):
+            view["AAPL"] = 1.0
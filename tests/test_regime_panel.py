@@ -0,0 +1,130 @@
+"""
+Tests for the batched, incremental regime panel and the breadth-weighted aggregate.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.learn.adaptive_controller import AdaptiveLearningController
+from trading_bot.learn.ensemble import ExponentialWeightsEnsemble
+from trading_bot.learn.regime import Regime, RegimeState, detect_regime
+from trading_bot.learn.regime_panel import RegimePanel, aggregate_regimes
+
+
+def _ohlcv(n: int, seed: int, drift: float = 0.0, noise: float = 1.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(100 + np.cumsum(drift + rng.normal(0, noise, n)), 1.0)
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + rng.uniform(0, 2 * noise, n),
+            "Low": close - rng.uniform(0, 2 * noise, n),
+            "Close": close,
+            "Volume": 1_000.0,
+        },
+        index=pd.date_range("2023-01-02", periods=n, freq="D"),
+    )
+
+
+def _assert_same(got: RegimeState, want: RegimeState):
+    assert got.regime is want.regime
+    for name in ("confidence", "volatility", "trend_strength"):
+        a, b = getattr(got, name), getattr(want, name)
+        assert (math.isnan(a) and math.isnan(b)) or a == pytest.approx(b, rel=1e-9, abs=1e-12)
+    assert got.support == pytest.approx(want.support)
+    assert got.resistance == pytest.approx(want.resistance)
+    assert got.explanation.keys() == want.explanation.keys()
+
+
+def _universe():
+    return {
+        "UP": _ohlcv(120, 1, drift=1.0, noise=0.3),
+        "DOWN": _ohlcv(120, 2, drift=-0.6, noise=0.3),
+        "FLAT": _ohlcv(120, 3, noise=0.2),
+        "WILD": _ohlcv(120, 4, noise=6.0),
+        "NEW": _ohlcv(120, 5).iloc[-12:],
+    }
+
+
+class TestRegimePanel:
+    """Per-symbol states equal `detect_regime` on the same history"""
+
+    @pytest.mark.parametrize("n", [3, 5, 13, 14, 20, 29, 30, 31, 50, 51, 200])
+    def test_matches_detect_regime_by_length(self, n):
+        df = _ohlcv(n, seed=n, drift=0.2)
+        _assert_same(RegimePanel().update({"S": df})["S"], detect_regime(df))
+
+    def test_incremental_growth_matches_full_recompute(self):
+        data = _universe()
+        panel = RegimePanel()
+        for end in [*range(2, 120, 3), 120]:
+            window = {s: df.iloc[:end] for s, df in data.items()}
+            got = panel.update(window)
+            assert list(got) == [s for s, df in window.items() if not df.empty]
+            for sym, state in got.items():
+                _assert_same(state, detect_regime(window[sym]))
+        assert panel.reloads == 0
+        assert panel.bars_fed == sum(len(df) for df in data.values())
+
+    def test_rolling_window_revised_bar_and_gap(self):
+        df = _ohlcv(200, seed=9, drift=0.5)
+        panel = RegimePanel()
+        panel.update({"S": df.iloc[:100]})
+        rolled = df.iloc[40:105]  # trimmed front, five new bars
+        _assert_same(panel.update({"S": rolled})["S"], detect_regime(rolled))
+        assert panel.reloads == 0
+
+        revised = rolled.copy()
+        revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.2
+        _assert_same(panel.update({"S": revised})["S"], detect_regime(revised))
+        _assert_same(panel.update({"S": df})["S"], detect_regime(df))  # 95-bar gap
+        assert panel.reloads == 2
+
+
+class TestAggregateRegimes:
+    """Breadth-weighted vote across the universe"""
+
+    def _state(self, regime, conf):
+        return RegimeState(regime=regime, confidence=conf, volatility=0.2, trend_strength=0.6)
+
+    def test_confidence_weighted_majority(self):
+        states = {
+            "A": self._state(Regime.TRENDING_UP, 0.9),
+            "B": self._state(Regime.TRENDING_UP, 0.7),
+            "C": self._state(Regime.RANGING, 0.95),
+            "D": self._state(Regime.INSUFFICIENT_DATA, 0.0),
+        }
+        agg = aggregate_regimes(states)
+        assert agg.regime is Regime.TRENDING_UP
+        assert agg.confidence == pytest.approx(1.6 / 3)
+        assert agg.explanation["breadth_trending_up"] == pytest.approx(0.6667)
+        assert agg.explanation["symbols"] == 3
+
+    def test_first_symbol_no_longer_decides(self):
+        states = {"A": self._state(Regime.VOLATILE, 1.0)}
+        states.update({s: self._state(Regime.RANGING, 0.6) for s in "BCD"})
+        assert aggregate_regimes(states).regime is Regime.RANGING
+
+    def test_no_voters(self):
+        assert aggregate_regimes({}).regime is Regime.INSUFFICIENT_DATA
+
+
+class TestAdaptiveControllerRegime:
+    """The controller reports the aggregate and every symbol's regime"""
+
+    def test_step_uses_panel(self):
+        ctrl = AdaptiveLearningController(
+            ExponentialWeightsEnsemble.uniform(
+                ["mean_reversion_rsi", "momentum_macd_volume", "breakout_atr"]
+            )
+        )
+        data = _universe()
+        decision = ctrl.step(ohlcv_by_symbol=data, current_params={})
+        states = {s: detect_regime(df) for s, df in data.items()}
+        assert decision.regime is aggregate_regimes(states).regime
+        assert decision.regime_by_symbol["WILD"]["regime"] == states["WILD"].regime.value
+        assert set(decision.explanation["regime_symbols"]) == set(data)
+        assert ctrl.step(ohlcv_by_symbol={}, current_params={}).regime is Regime.INSUFFICIENT_DATA
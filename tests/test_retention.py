@@ -0,0 +1,170 @@
+"""
+Tests for batched, archive-before-delete retention.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from trading_bot.core.models import Portfolio  # noqa: E402
+from trading_bot.db.decision_log import DecisionLog  # noqa: E402
+from trading_bot.db.maintenance import prune_old_events  # noqa: E402
+from trading_bot.db.repository import SqliteRepository  # noqa: E402
+from trading_bot.strategy.base import StrategyDecision  # noqa: E402
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+OLD = datetime(2024, 2, 1, 9, 0)  # naive UTC, as the repository stores it
+
+
+def _seed(repo):
+    repo.init_db()
+    for i in range(30):  # 09:00 - 10:27 on an old day
+        ts = OLD + timedelta(minutes=3 * i)
+        for sym in ("AAA", "BBB"):
+            repo.log_strategy_decision(
+                ts=ts,
+                symbol=sym,
+                mode="ensemble",
+                decision=StrategyDecision(
+                    signal=i % 2, confidence=0.5, votes={}, weights={}, explanations={}
+                ),
+            )
+        repo.log_snapshot(ts=ts, portfolio=Portfolio(cash=1_000.0 + i), prices={})
+    recent = NOW.replace(tzinfo=None) - timedelta(hours=1)
+    repo.log_snapshot(ts=recent, portfolio=Portfolio(cash=5.0), prices={})
+
+
+def _count(path, table):
+    con = sqlite3.connect(path)
+    try:
+        return con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    finally:
+        con.close()
+
+
+def _log_decisions(repo):
+    """An old closed run (with its own schema) and a recent run left open."""
+    log = DecisionLog(repo)
+    old = StrategyDecision(
+        signal=1, confidence=0.5, votes={"rsi": 1}, weights={}, explanations={"rsi": {"v": 28.0}}
+    )
+    new = StrategyDecision(
+        signal=-1, confidence=0.5, votes={"macd": -1}, weights={}, explanations={"macd": 0.1}
+    )
+    recent = NOW.replace(tzinfo=None) - timedelta(hours=2)
+    steps = [(OLD + timedelta(minutes=i), old) for i in range(4)]
+    steps += [(recent + timedelta(minutes=i), new) for i in range(2)]
+    for ts, decision in steps:
+        log.begin_step(ts)
+        log.record("AAA", "ensemble", decision)
+        log.end_step()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SqliteRepository(db_path=tmp_path / "trades.sqlite")
+    _seed(repo)
+    return repo
+
+
+class TestPruneOldEvents:
+    def test_batches_roll_up_and_delete(self, repo):
+        with Session(repo._engine()) as session:
+            stats = prune_old_events(session, days_to_keep=7, batch_size=7, pause=0, now=NOW)
+
+        assert stats["strategy_decisions_deleted"] == 60
+        assert stats["portfolio_snapshots_deleted"] == 30
+        assert stats["batches"] == 9 + 5
+        assert _count(repo.db_path, "portfolio_snapshots") == 1  # the recent one
+
+        con = sqlite3.connect(repo.db_path)
+        try:
+            decisions = con.execute(
+                "SELECT symbol, decisions, long_signals, confidence_sum "
+                "FROM strategy_decisions_hourly ORDER BY hour, symbol"
+            ).fetchall()
+            equity = con.execute(
+                "SELECT snapshots, open_equity, high_equity, low_equity, close_equity "
+                "FROM equity_hourly ORDER BY hour"
+            ).fetchall()
+        finally:
+            con.close()
+        # 09:xx holds i = 0..19, 10:xx holds i = 20..29; merged across batches
+        assert decisions == [
+            ("AAA", 20, 10, pytest.approx(10.0)),
+            ("BBB", 20, 10, pytest.approx(10.0)),
+            ("AAA", 10, 5, pytest.approx(5.0)),
+            ("BBB", 10, 5, pytest.approx(5.0)),
+        ]
+        assert equity == [
+            (20, 1000.0, 1019.0, 1000.0, 1019.0),
+            (10, 1020.0, 1029.0, 1020.0, 1029.0),
+        ]
+
+    def test_compact_decision_log_keeps_open_runs(self, repo):
+        _log_decisions(repo)
+        with Session(repo._engine()) as session:
+            stats = prune_old_events(session, batch_size=3, pause=0, now=NOW)
+
+        assert stats["decision_runs_deleted"] == 1
+        assert stats["decision_steps_deleted"] == 4
+        assert stats["decision_schemas_deleted"] == 1
+        assert [_count(repo.db_path, t) for t in ("decision_runs", "decision_steps")] == [1, 2]
+        assert _count(repo.db_path, "decision_schemas") == 1
+        history = repo.decision_history()
+        assert [(h["signal"], h["explanations"]) for h in history] == [(-1, {"macd": 0.1})] * 2
+
+    def test_archives_before_delete(self, repo, tmp_path):
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("pyarrow")
+        archive = tmp_path / "archive"
+        with Session(repo._engine()) as session:
+            stats = prune_old_events(
+                session, batch_size=1_000, pause=0, now=NOW, archive_dir=archive
+            )
+
+        part = archive / "strategy_decisions" / "date=2024-02-01"
+        files = sorted(part.glob("*.parquet"))
+        assert stats["archived_files"] == 2
+        assert len(files) == 1
+        df = pd.read_parquet(files[0])
+        assert len(df) == 60 and df["id"].is_monotonic_increasing
+        assert len(pd.read_parquet(archive / "portfolio_snapshots" / "date=2024-02-01")) == 30
+
+    def test_archives_compact_decision_log(self, repo, tmp_path):
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("pyarrow")
+        _log_decisions(repo)
+        archive = tmp_path / "archive"
+        with Session(repo._engine()) as session:
+            prune_old_events(session, pause=0, now=NOW, archive_dir=archive)
+
+        runs = pd.read_parquet(archive / "decision_runs" / "date=2024-02-01")
+        assert list(runs["symbol"]) == ["AAA"] and runs["last_ts"].notna().all()
+        assert len(pd.read_parquet(archive / "decision_steps" / "date=2024-02-01")) == 4
+        assert len(pd.read_parquet(archive / "decision_schemas")) == 1
+
+    def test_archive_failure_keeps_rows(self, repo, tmp_path, monkeypatch):
+        from trading_bot.db import maintenance
+
+        def boom(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(maintenance, "_require_parquet", lambda: None)
+        monkeypatch.setattr(maintenance, "_archive", boom)
+        with Session(repo._engine()) as session, pytest.raises(OSError):
+            prune_old_events(session, pause=0, now=NOW, archive_dir=tmp_path / "archive")
+        assert _count(repo.db_path, "strategy_decisions") == 60
+
+    def test_cli_archiving_is_opt_in(self):
+        from trading_bot.cli import build_parser
+
+        args = build_parser().parse_args(["maintenance", "cleanup"])
+        assert args.archive_dir is None
+        args = build_parser().parse_args(["maintenance", "cleanup", "--archive-dir", "arch"])
+        assert args.archive_dir == "arch"
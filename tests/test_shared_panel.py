@@ -0,0 +1,142 @@
+"""
+Tests for the shared-memory OHLCV panel and its use by process-pool workers.
+"""
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.core.shared_panel import PANEL_FIELDS, SharedOHLCVPanel
+from trading_bot.learn.concurrent_executor import (
+    ConcurrentExecutionConfig,
+    ConcurrentStrategyExecutor,
+)
+
+
+def _ohlcv(n: int, seed: int, start: str = "2023-01-02") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1_000, 5_000, n).astype(float),
+        },
+        index=pd.date_range(start, periods=n, freq="D", tz="UTC"),
+    )
+
+
+def _close_sum(panel: SharedOHLCVPanel, symbol: str) -> float:
+    return float(np.nansum(panel.column("Close", symbol), dtype=np.float64))
+
+
+def _last_close(market_data: pd.DataFrame, symbols):
+    return 1, 0.5, {"last": float(market_data["Close"][symbols[0]].iloc[-1])}
+
+
+@pytest.fixture
+def frames():
+    return {"AAA": _ohlcv(40, 1), "BBB": _ohlcv(30, 2, start="2023-01-12")}
+
+
+@pytest.fixture
+def panel(frames):
+    with SharedOHLCVPanel.publish(frames) as published:
+        yield published
+
+
+class TestPublish:
+    """Frames are aligned on the union of timestamps and stored as float32"""
+
+    def test_layout_and_alignment(self, panel, frames):
+        assert panel.symbols == ("AAA", "BBB")
+        assert panel.spec.fields == PANEL_FIELDS
+        assert panel.values.shape == (5, 2, 40)
+        assert panel.values.dtype == np.float32
+        assert panel.timestamps.equals(frames["AAA"].index)
+        assert np.isnan(panel.column("Close", "BBB")[:10]).all()
+        np.testing.assert_allclose(
+            panel.column("Close", "BBB")[10:], frames["BBB"]["Close"], rtol=1e-6
+        )
+
+    def test_frame_trims_missing_bars(self, panel, frames):
+        df = panel.frame("BBB")
+        assert list(df.columns) == list(PANEL_FIELDS)
+        assert df.index.equals(frames["BBB"].index)
+        np.testing.assert_allclose(df["Volume"], frames["BBB"]["Volume"])
+
+    def test_views_share_the_block(self, panel):
+        wide = panel.wide("Close")
+        assert list(wide.columns) == ["AAA", "BBB"]
+        assert np.shares_memory(wide.to_numpy(), panel.values)
+        frame = panel.to_frame()
+        assert frame[("High", "AAA")].iloc[0] == pytest.approx(panel.column("High", "AAA")[0])
+        assert np.shares_memory(frame.to_numpy(), panel.values)
+
+    def test_date_column_frames(self):
+        df = _ohlcv(20, 3).rename_axis("Date").reset_index()
+        with SharedOHLCVPanel.publish({"CCC": df}) as published:
+            assert published.timestamps[0] == df["Date"].iloc[0]
+            assert "CCC" in published and "ZZZ" not in published
+
+    def test_from_wide(self, frames):
+        wide = pd.concat(frames, axis=1).swaplevel(0, 1, axis=1)
+        with SharedOHLCVPanel.from_wide(wide) as published:
+            assert published.symbols == ("AAA", "BBB")
+            np.testing.assert_allclose(
+                published.frame("AAA")["Low"], frames["AAA"]["Low"], rtol=1e-6
+            )
+        closes = pd.DataFrame({s: df["Close"] for s, df in frames.items()})
+        with SharedOHLCVPanel.from_wide(closes) as published:
+            assert published.spec.fields == ("Close",)
+            assert published.wide().shape == (40, 2)
+
+
+class TestAttach:
+    """Workers attach by name instead of receiving the data"""
+
+    def test_pickles_as_spec(self, panel):
+        payload = pickle.dumps(panel)
+        assert len(payload) < 1_000
+        attached = pickle.loads(payload)
+        assert attached is not panel and not attached.owner
+        assert attached is SharedOHLCVPanel.attach(panel.spec)  # cached per process
+        assert not attached.values.flags.writeable
+        assert _close_sum(attached, "AAA") == pytest.approx(_close_sum(panel, "AAA"))
+        attached.close()
+
+    def test_process_pool_workers(self, panel):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            got = list(pool.map(_close_sum, [panel, panel], ["AAA", "BBB"]))
+        assert got == pytest.approx([_close_sum(panel, "AAA"), _close_sum(panel, "BBB")])
+
+    def test_unlink_frees_block(self, frames):
+        published = SharedOHLCVPanel.publish(frames)
+        spec = published.spec
+        published.unlink()
+        with pytest.raises(FileNotFoundError):
+            SharedOHLCVPanel.attach(spec)
+
+
+class TestConcurrentExecutor:
+    """Strategies receive the panel as a (field, symbol) frame"""
+
+    @pytest.mark.parametrize("use_process_pool", [False, True])
+    def test_execute_on_panel(self, panel, use_process_pool):
+        executor = ConcurrentStrategyExecutor(
+            ConcurrentExecutionConfig(use_process_pool=use_process_pool, timeout_seconds=30.0)
+        )
+        try:
+            results = executor.execute_strategies({"last": _last_close}, panel, ["AAA"])
+            again = executor.execute_strategies({"last": _last_close}, panel, ["AAA"])
+        finally:
+            executor.shutdown()
+        result = results["last"]
+        assert result.error is None and result.signal == 1
+        assert result.metrics["last"] == pytest.approx(float(panel.column("Close", "AAA")[-1]))
+        assert again["last"] is result
@@ -0,0 +1,152 @@
+"""
+Tests for the sharded per-symbol compute phase used by `PaperEngine.step`.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.engine.signal_compute import SignalComputePool, evaluate_shard, shard
+from trading_bot.strategy.atr_breakout import AtrBreakoutStrategy
+from trading_bot.strategy.macd_volume_momentum import MacdVolumeMomentumStrategy
+from trading_bot.strategy.rsi_mean_reversion import RsiMeanReversionStrategy
+
+
+def _ohlcv(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(100 + np.cumsum(rng.normal(0, 2, n)), 1.0)
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + rng.uniform(0, 2, n),
+            "Low": close - rng.uniform(0, 2, n),
+            "Close": close,
+            "Volume": rng.integers(1_000, 9_000, n).astype(float),
+        },
+        index=pd.date_range("2023-01-02", periods=n, freq="D"),
+    )
+
+
+def _universe(n_symbols: int = 13):
+    return {f"S{k:02d}": _ohlcv(120, seed=k) for k in range(n_symbols)}
+
+
+def _strategies():
+    return {
+        "mean_reversion_rsi": RsiMeanReversionStrategy(),
+        "momentum_macd_volume": MacdVolumeMomentumStrategy(),
+        "breakout_atr": AtrBreakoutStrategy(),
+    }
+
+
+def _summary(outputs):
+    return {
+        sym: {name: (int(o.signal), float(o.confidence)) for name, o in by_name.items()}
+        for sym, by_name in outputs.items()
+    }
+
+
+class TestShard:
+    """Contiguous, near-equal shards that preserve order"""
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 5, 20])
+    def test_shards_cover_symbols_in_order(self, n):
+        symbols = [f"S{k}" for k in range(11)]
+        parts = shard(symbols, n)
+        assert [s for part in parts for s in part] == symbols
+        assert len(parts) == min(n, 11)
+        assert max(map(len, parts)) - min(map(len, parts)) <= 1
+
+    def test_empty(self):
+        assert shard([], 4) == []
+
+
+class TestSignalComputePool:
+    """Results are identical for any worker count and executor"""
+
+    @pytest.mark.parametrize("executor,workers", [("thread", 4), ("process", 2)])
+    def test_evaluate_matches_sequential(self, executor, workers):
+        data = _universe()
+        symbols = list(data)
+        expected = _summary(evaluate_shard(_strategies(), list(data.items())))
+
+        pool = SignalComputePool(workers, executor)
+        try:
+            got = pool.evaluate(_strategies(), data, symbols)
+        finally:
+            pool.close()
+        assert list(got) == symbols
+        assert _summary(got) == expected
+
+    def test_map_symbols_keeps_symbol_order_and_raises(self):
+        pool = SignalComputePool(3)
+        try:
+            symbols = [f"S{k}" for k in range(10)][::-1]
+            assert pool.map_symbols(lambda s: s.lower(), symbols) == {s: s.lower() for s in symbols}
+            with pytest.raises(KeyError):
+                pool.map_symbols(lambda s: {}[s], symbols)
+        finally:
+            pool.close()
+
+    def test_unknown_executor_rejected(self):
+        with pytest.raises(ValueError):
+            SignalComputePool(2, "gpu")
+
+
+class TestPaperEngineComputePhase:
+    """`PaperEngine._compute_signals` does not depend on the worker count"""
+
+    def _engine(self, paper, workers, executor="thread", streaming=False):
+        engine = paper.PaperEngine.__new__(paper.PaperEngine)
+        engine.cfg = paper.PaperEngineConfig(
+            config_path="",
+            db_path="",
+            symbols=list(_universe()),
+            streaming_indicators=streaming,
+            compute_workers=workers,
+            compute_executor=executor,
+        )
+        engine.strategies = engine._build_strategies(paper.default_params())
+        engine.ml_enabled = False
+        engine._stream_last_ts = {}
+        engine._stream_outputs = {}
+        engine._compute_pool = paper.SignalComputePool(workers, executor)
+        engine._ml_training = None
+        engine.timer = paper.StageTimer(enabled=False)
+        return engine
+
+    @pytest.mark.parametrize(
+        "workers,executor,streaming",
+        [(4, "thread", False), (4, "thread", True), (2, "process", False), (3, "process", True)],
+    )
+    def test_parallel_matches_sequential(self, workers, executor, streaming):
+        paper = pytest.importorskip("trading_bot.engine.paper")
+        data = _universe()
+        base = self._engine(paper, 1, streaming=streaming)
+        other = self._engine(paper, workers, executor, streaming=streaming)
+        try:
+            for n in (100, 110, 120):  # later steps take the streaming path
+                window = {s: df.iloc[:n] for s, df in data.items()}
+                want = {s: r.outputs for s, r in base._compute_signals(window).items()}
+                got = {s: r.outputs for s, r in other._compute_signals(window).items()}
+                assert list(got) == list(want)
+                assert _summary(got) == _summary(want)
+        finally:
+            other.close()
+
+    def test_close_shuts_down_worker_pools(self):
+        paper = pytest.importorskip("trading_bot.engine.paper")
+        closed = []
+
+        class _Training:
+            def close(self):
+                closed.append(True)
+
+        with self._engine(paper, 2, "process") as engine:
+            engine._ml_training = _Training()
+            window = {s: df.iloc[:100] for s, df in _universe().items()}
+            engine._compute_signals(window)
+            assert engine._compute_pool._procs is not None
+        assert engine._compute_pool._procs is None
+        assert engine._ml_training is None
+        assert closed == [True]
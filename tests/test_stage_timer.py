@@ -0,0 +1,175 @@
+"""
+Tests for the per-stage latency spans and HDR-style histograms.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from trading_bot.performance.stage_timer import (
+    LATENCY_SNAPSHOT_ENV,
+    LatencyHistogram,
+    StageTimer,
+    TimedCalls,
+    read_published,
+)
+
+
+class TestLatencyHistogram:
+    """Bounded relative error, exact counts, mergeable"""
+
+    def test_percentiles_within_bucket_error(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(mean=13, sigma=1.5, size=20_000).astype(np.int64)
+        hist = LatencyHistogram(sub_bucket_bits=7)
+        for v in values:
+            hist.record(int(v))
+
+        assert hist.count == len(values)
+        assert hist.min == values.min() and hist.max == values.max()
+        for q in (50, 90, 99, 99.9):
+            exact = np.percentile(values, q, method="inverted_cdf")
+            assert abs(hist.percentile(q) - exact) <= exact / 64 + 1
+        assert hist.percentiles([99, 50]) == [hist.percentile(99), hist.percentile(50)]
+
+    def test_small_values_are_exact(self):
+        hist = LatencyHistogram()
+        for v in range(100):
+            hist.record(v)
+        assert hist.percentile(50) == 49
+        assert hist.percentile(100) == 99
+        assert hist.percentile(0) == 0
+
+    def test_merge_and_clamp(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for v in (10, 1_000, 100_000):
+            a.record(v)
+        b.record(-5)
+        b.record(1 << 50)  # clamped to max_value
+        a.merge(b)
+        assert a.count == 5
+        assert a.min == 0 and a.max == a.max_value
+        with pytest.raises(ValueError):
+            a.merge(LatencyHistogram(sub_bucket_bits=5))
+
+    def test_empty_summary(self):
+        assert LatencyHistogram().summary_ms()["p99"] == 0.0
+
+
+class TestStageTimer:
+    """Spans, decorator, no-op mode and per-step totals"""
+
+    def test_span_and_decorator_record(self):
+        timer = StageTimer()
+
+        @timer.timed("work")
+        def work():
+            time.sleep(0.002)
+            return 7
+
+        with timer.span("fetch"):
+            time.sleep(0.001)
+        assert work() == 7
+        assert work() == 7
+
+        snap = timer.snapshot()
+        assert snap["fetch"]["count"] == 1 and snap["work"]["count"] == 2
+        assert snap["work"]["p50"] >= 1.9
+        assert set(snap["work"]) == {"count", "mean", "p50", "p90", "p99", "max"}
+
+    def test_exceptions_are_still_timed(self):
+        timer = StageTimer()
+        with pytest.raises(RuntimeError):
+            with timer.span("boom"):
+                raise RuntimeError
+        assert timer.snapshot()["boom"]["count"] == 1
+
+    def test_disabled_timer_records_nothing(self):
+        timer = StageTimer(enabled=False)
+        with timer.span("a"):
+            pass
+        assert timer.timed("b")(lambda: 3)() == 3
+        timer.add("c", timer.now())
+        assert timer.snapshot() == {} and timer.step_totals_ms() == {}
+
+    def test_step_totals_reset_but_histograms_accumulate(self):
+        timer = StageTimer()
+        timer.record_ns("db_log", 2_000_000)
+        timer.record_ns("db_log", 1_000_000)
+        assert timer.step_totals_ms() == {"db_log": 3.0}
+        timer.start_step()
+        timer.record_ns("db_log", 500_000)
+        assert timer.step_totals_ms() == {"db_log": 0.5}
+        assert timer.snapshot()["db_log"]["count"] == 3
+
+    def test_concurrent_spans(self):
+        timer = StageTimer()
+
+        def worker():
+            for _ in range(500):
+                with timer.span("evaluate"):
+                    pass
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert timer.snapshot()["evaluate"]["count"] == 2_000
+
+    def test_timed_calls_proxy(self):
+        class Repo:
+            db_path = "x.sqlite"
+
+            def log_fill(self, n):
+                return n + 1
+
+            def latest(self):
+                return "row"
+
+        timer = StageTimer()
+        repo = TimedCalls(Repo(), timer, "db_log", prefix="log_")
+        assert repo.log_fill(1) == 2
+        assert repo.latest() == "row"
+        assert repo.db_path == "x.sqlite"
+        assert not hasattr(repo, "flush")
+        assert timer.snapshot()["db_log"]["count"] == 1
+
+
+class TestHealthApiLatency:
+    """The health API serves the snapshot an engine process published"""
+
+    def test_publish_round_trip(self, tmp_path):
+        timer = StageTimer()
+        timer.start_step()
+        timer.record_ns("fetch", 3_000_000)
+        path = tmp_path / "logs" / "latency.json"
+        timer.publish(path)
+
+        body = read_published(path)
+        assert body["stages"] == timer.snapshot()
+        assert body["last_step"] == {"fetch": 3.0}
+        assert body["published_at"]
+        assert read_published(tmp_path / "missing.json") is None
+
+    def test_latency_endpoint_reads_published_snapshot(self, tmp_path, monkeypatch):
+        health_api = pytest.importorskip("trading_bot.health_api")
+        path = tmp_path / "latency.json"
+        monkeypatch.setenv(LATENCY_SNAPSHOT_ENV, str(path))
+        engine_timer = StageTimer()  # stands in for the engine process's timer
+        engine_timer.record_ns("order_submit", 2_000_000)
+        engine_timer.publish(path)
+
+        body = health_api.app.test_client().get("/latency").get_json()
+        assert body["source"] == "engine"
+        assert body["stages"]["order_submit"]["count"] == 1
+
+    def test_latency_endpoint_falls_back_to_local_timer(self, tmp_path, monkeypatch):
+        health_api = pytest.importorskip("trading_bot.health_api")
+        monkeypatch.setenv(LATENCY_SNAPSHOT_ENV, str(tmp_path / "none.json"))
+        health_api.default_timer.record_ns("fetch", 3_000_000)
+        body = health_api.app.test_client().get("/latency").get_json()
+        assert body["source"] == "local"
+        assert body["stages"]["fetch"]["count"] >= 1
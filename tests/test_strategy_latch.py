@@ -0,0 +1,222 @@
+"""
+Parity tests for the vectorized enter/exit latch.
+
+The reference implementations below are the per-row `.loc` loops the
+strategies used before `position_latch`; the vectorized path must reproduce
+them bit-for-bit on random OHLCV fixtures.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import MACD
+from ta.volatility import AverageTrueRange
+
+from trading_bot.strategy import latch
+from trading_bot.strategy.atr_breakout import AtrBreakoutStrategy
+from trading_bot.strategy.latch import position_latch
+from trading_bot.strategy.macd_volume_momentum import MacdVolumeMomentumStrategy
+from trading_bot.strategy.mean_reversion_momentum import generate_signals
+from trading_bot.strategy.rsi_mean_reversion import RsiMeanReversionStrategy
+
+SEEDS = [0, 1, 2, 3, 4]
+
+
+def _ohlcv(n: int, seed: int, vol: float = 1.5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(100 + np.cumsum(rng.normal(0, vol, n)), 1.0)
+    df = pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.5, n),
+            "High": close + rng.random(n) * 2,
+            "Low": np.maximum(close - rng.random(n) * 2, 0.5),
+            "Close": close,
+            "Volume": rng.integers(100_000, 2_000_000, n),
+        },
+        index=pd.date_range("2020-01-01", periods=n, freq="D"),
+    )
+    for col in ("Open", "High", "Low", "Close"):
+        df[col] = df[col].astype(np.float32)
+    df["Volume"] = df["Volume"].astype(np.uint32)
+    return df
+
+
+def _reference_latch(entry, exit_) -> np.ndarray:
+    out = np.zeros(len(entry), dtype=np.int64)
+    in_long = False
+    for i in range(len(entry)):
+        if not in_long and entry[i]:
+            in_long = True
+        elif in_long and exit_[i]:
+            in_long = False
+        out[i] = 1 if in_long else 0
+    return out
+
+
+def _legacy_rsi(strat: RsiMeanReversionStrategy, df: pd.DataFrame) -> pd.Series:
+    rsi = RSIIndicator(close=df["Close"].astype(float), window=int(strat.rsi_period)).rsi()
+    sig = pd.Series(0, index=df.index, dtype="int64")
+    in_long = False
+    for idx in df.index:
+        rsi_val = rsi.loc[idx]
+        r = float(rsi_val) if pd.notna(rsi_val) else float("nan")
+        if not in_long and pd.notna(rsi_val) and r <= float(strat.entry_oversold):
+            in_long = True
+        elif in_long and pd.notna(rsi_val) and r >= float(strat.exit_rsi):
+            in_long = False
+        sig.loc[idx] = 1 if in_long else 0
+    return sig
+
+
+def _legacy_macd(strat: MacdVolumeMomentumStrategy, df: pd.DataFrame) -> pd.Series:
+    close = df["Close"].astype(float)
+    volume = df["Volume"].astype(float)
+    macd_diff = MACD(
+        close=close,
+        window_fast=int(strat.macd_fast),
+        window_slow=int(strat.macd_slow),
+        window_sign=int(strat.macd_signal),
+    ).macd_diff()
+    vol_ma = volume.rolling(window=int(strat.vol_sma)).mean()
+    vol_ok = volume >= (vol_ma * float(strat.vol_mult))
+    sig = pd.Series(0, index=df.index, dtype="int64")
+    in_long = False
+    for idx in df.index:
+        md = macd_diff.loc[idx]
+        vol_ok_val = vol_ok.loc[idx]
+        v_ok = bool(vol_ok_val) if pd.notna(vol_ok_val) else False
+        if not in_long and pd.notna(md) and float(md) > 0 and v_ok:
+            in_long = True
+        elif in_long and pd.notna(md) and float(md) < 0:
+            in_long = False
+        sig.loc[idx] = 1 if in_long else 0
+    return sig
+
+
+def _legacy_atr(strat: AtrBreakoutStrategy, df: pd.DataFrame) -> pd.Series:
+    high = df["High"].astype(float)
+    low = df["Low"].astype(float)
+    close = df["Close"].astype(float)
+    atr = AverageTrueRange(
+        high=high, low=low, close=close, window=int(strat.atr_period)
+    ).average_true_range()
+    roll_high = high.rolling(window=int(strat.breakout_lookback)).max().shift(1)
+    roll_low = low.rolling(window=int(strat.breakout_lookback)).min().shift(1)
+    sig = pd.Series(0, index=df.index, dtype="int64")
+    in_long = False
+    m = float(strat.atr_mult)
+    for idx in df.index:
+        rh, rl, a, c = roll_high.loc[idx], roll_low.loc[idx], atr.loc[idx], close.loc[idx]
+        if not in_long and pd.notna(rh) and pd.notna(a) and float(c) > float(rh) + float(a) * m:
+            in_long = True
+        elif in_long and pd.notna(rl) and pd.notna(a) and float(c) < float(rl) - float(a) * m:
+            in_long = False
+        sig.loc[idx] = 1 if in_long else 0
+    return sig
+
+
+class TestPositionLatch:
+    """The latch primitive itself"""
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    @pytest.mark.parametrize("density", [0.05, 0.3, 0.7])
+    def test_numpy_matches_reference_loop(self, seed, density):
+        rng = np.random.default_rng(seed)
+        entry = rng.random(500) < density
+        exit_ = rng.random(500) < density
+        expected = _reference_latch(entry, exit_)
+        np.testing.assert_array_equal(position_latch(entry, exit_, use_numba=False), expected)
+
+    @pytest.mark.skipif(not latch._numba_available, reason="numba not installed")
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_numba_matches_reference_loop(self, seed):
+        rng = np.random.default_rng(seed)
+        entry = rng.random(500) < 0.3
+        exit_ = rng.random(500) < 0.3
+        np.testing.assert_array_equal(
+            position_latch(entry, exit_, use_numba=True), _reference_latch(entry, exit_)
+        )
+
+    def test_simultaneous_entry_and_exit_toggles(self):
+        entry = np.array([True, True, True, False, True])
+        exit_ = np.array([True, True, True, True, True])
+        np.testing.assert_array_equal(position_latch(entry, exit_), [1, 0, 1, 0, 1])
+
+    def test_nan_in_float_masks_is_false(self):
+        entry = np.array([np.nan, 1.0, np.nan, 0.0])
+        exit_ = np.array([np.nan, np.nan, 1.0, np.nan])
+        np.testing.assert_array_equal(position_latch(entry, exit_), [0, 1, 0, 0])
+
+    def test_empty_and_mismatched_inputs(self):
+        assert position_latch(np.array([], dtype=bool), np.array([], dtype=bool)).shape == (0,)
+        with pytest.raises(ValueError):
+            position_latch(np.zeros(3, dtype=bool), np.zeros(4, dtype=bool))
+
+
+class TestStrategyLatchParity:
+    """Vectorized strategy signals are identical to the legacy per-row loops"""
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    @pytest.mark.parametrize(
+        "strat",
+        [
+            RsiMeanReversionStrategy(),
+            RsiMeanReversionStrategy(rsi_period=5, entry_oversold=40.0, exit_rsi=45.0),
+        ],
+    )
+    def test_rsi(self, strat, seed):
+        df = _ohlcv(400, seed)
+        pd.testing.assert_series_equal(strat.signals(df), _legacy_rsi(strat, df), check_names=False)
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    @pytest.mark.parametrize(
+        "strat",
+        [
+            MacdVolumeMomentumStrategy(),
+            MacdVolumeMomentumStrategy(
+                macd_fast=5, macd_slow=13, macd_signal=4, vol_sma=5, vol_mult=0.7
+            ),
+        ],
+    )
+    def test_macd_volume(self, strat, seed):
+        df = _ohlcv(400, seed)
+        expected = _legacy_macd(strat, df)
+        pd.testing.assert_series_equal(strat.signals(df), expected, check_names=False)
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    @pytest.mark.parametrize(
+        "strat",
+        [
+            AtrBreakoutStrategy(),
+            AtrBreakoutStrategy(atr_period=7, breakout_lookback=5, atr_mult=0.1),
+        ],
+    )
+    def test_atr_breakout(self, strat, seed):
+        df = _ohlcv(400, seed, vol=3.0)
+        pd.testing.assert_series_equal(strat.signals(df), _legacy_atr(strat, df), check_names=False)
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_evaluate_uses_last_latched_value(self, seed):
+        df = _ohlcv(300, seed)
+        for strat in (
+            RsiMeanReversionStrategy(),
+            MacdVolumeMomentumStrategy(),
+            AtrBreakoutStrategy(),
+        ):
+            assert strat.evaluate(df).signal == int(strat.signals(df).iloc[-1])
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_generate_signals(self, seed):
+        df = _ohlcv(400, seed, vol=4.0)
+        out = generate_signals(df, zscore_entry=1.0, rsi_oversold=45, zscore_exit=0.2)
+        entry = (
+            (out["z"] <= -1.0)
+            & (out["rsi"] <= 45)
+            & (out["macd_diff"] >= 0)
+            & (out["sma_fast"] >= out["sma_slow"])
+        )
+        exit_ = (out["z"] >= -0.2) | (out["rsi"] >= 70)
+        np.testing.assert_array_equal(
+            out["signal"].to_numpy(), _reference_latch(entry.to_numpy(), exit_.to_numpy())
+        )
@@ -0,0 +1,186 @@
+"""
+Tests for the streaming covariance/correlation engine and its use in PortfolioOptimizer.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.risk.portfolio_optimizer import PortfolioOptimizer
+from trading_bot.risk.streaming_covariance import StreamingCovariance
+
+
+def _returns(n: int, k: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.01, (n, 1))
+    data = common + rng.normal(0, 0.01, (n, k))
+    return pd.DataFrame(
+        data,
+        index=pd.date_range("2023-01-02", periods=n, freq="D"),
+        columns=[f"S{i}" for i in range(k)],
+    )
+
+
+def _feed(cov: StreamingCovariance, frame: pd.DataFrame, flush_every: int = 1):
+    for i, (ts, row) in enumerate(frame.iterrows()):
+        for sym, value in row.items():
+            if not np.isnan(value):
+                cov.update(sym, [ts], [value])
+        if (i + 1) % flush_every == 0:
+            cov.flush()
+    cov.flush()
+
+
+class TestWindowedStatistics:
+    """Rank-1 updates agree with a full recompute over the window"""
+
+    def test_matches_numpy_over_rolling_window(self):
+        frame = _returns(250, 6)
+        cov = StreamingCovariance(window=40, capacity=2)  # forces capacity growth
+        _feed(cov, frame)
+        tail = frame.iloc[-40:]
+        names, corr = cov.correlation()
+        assert names == list(frame.columns)
+        np.testing.assert_allclose(corr, np.corrcoef(tail.to_numpy().T), atol=1e-10)
+        np.testing.assert_allclose(cov.covariance()[1], np.cov(tail.to_numpy().T), atol=1e-14)
+        np.testing.assert_allclose(cov.returns("S3"), tail["S3"].to_numpy())
+        assert cov.observations("S3") == 40
+
+    def test_incremental_equals_resync(self):
+        cov = StreamingCovariance(window=30)
+        _feed(cov, _returns(47, 4, seed=1))
+        before = cov.correlation()[1]
+        cov.resync()
+        np.testing.assert_allclose(before, cov.correlation()[1], atol=1e-12)
+
+    def test_missing_and_late_symbols_are_pairwise_complete(self):
+        frame = _returns(80, 4, seed=2)
+        frame.iloc[::7, 1] = np.nan
+        frame.iloc[:50, 3] = np.nan  # joins late
+        cov = StreamingCovariance(window=60)
+        _feed(cov, frame, flush_every=5)
+        names, corr = cov.correlation()
+        expected = frame.iloc[-60:].corr(min_periods=2)
+        np.testing.assert_allclose(corr, expected.loc[names, names].to_numpy(), atol=1e-10)
+        assert cov.observations("S3") == 30
+
+    def test_revised_bar_replaces_value(self):
+        frame = _returns(50, 3, seed=3)
+        cov = StreamingCovariance(window=20)
+        _feed(cov, frame)
+        revised = frame.copy()
+        revised.iloc[-1, 0] = 0.05
+        cov.update("S0", [revised.index[-1]], [0.05])
+        assert cov.flush() == 1
+        np.testing.assert_allclose(
+            cov.correlation()[1], revised.iloc[-20:].corr().to_numpy(), atol=1e-10
+        )
+
+    def test_older_bars_outside_window_are_ignored(self):
+        frame = _returns(30, 2, seed=4)
+        cov = StreamingCovariance(window=10)
+        _feed(cov, frame)
+        cov.update("S0", [frame.index[0]], [1.0])
+        assert cov.flush() == 0
+        assert cov.rows_rejected == 1
+
+    def test_late_symbol_history_is_applied_or_rejected(self, caplog):
+        frame = _returns(40, 3, seed=5)
+        late = frame.pop("S2")
+        cov = StreamingCovariance(window=20)
+        _feed(cov, frame)
+        # 25 bars of history: 20 land on rows in the window, 5 predate it,
+        # and one off-grid timestamp has no row at all.
+        stamps = list(late.index[-25:]) + [late.index[-3] + pd.Timedelta(hours=12)]
+        cov.update("S2", stamps, list(late.iloc[-25:]) + [0.5])
+        with caplog.at_level("WARNING", logger="trading_bot.risk.streaming_covariance"):
+            assert cov.flush() == 20
+        assert cov.rows_rejected == 6
+        assert "Dropped 6 staged bar(s)" in caplog.text
+        frame["S2"] = late
+        names, corr = cov.correlation()
+        expected = frame.iloc[-20:].corr()
+        np.testing.assert_allclose(corr, expected.loc[names, names].to_numpy(), atol=1e-10)
+
+    def test_unknown_symbols_and_short_window(self):
+        cov = StreamingCovariance(window=5)
+        cov.update("A", [1], [0.01])
+        cov.update("B", [1], [0.02])
+        cov.flush()
+        names, corr = cov.correlation(["A", "B", "ZZZ"])
+        assert names == ["A", "B"]
+        assert np.isnan(corr).all()
+        with pytest.raises(ValueError):
+            StreamingCovariance(window=1)
+
+
+class TestEwmaStatistics:
+    """Exponentially weighted mode follows the EWMA recursion"""
+
+    def test_matches_reference_recursion(self):
+        frame = _returns(120, 3, seed=5)
+        halflife = 10.0
+        cov = StreamingCovariance(window=30, halflife=halflife)
+        _feed(cov, frame)
+
+        a = 1.0 - 0.5 ** (1.0 / halflife)
+        x = frame.to_numpy()
+        mean, ref = x[0].copy(), np.zeros((3, 3))
+        for row in x:
+            d = row - mean
+            ref = (1.0 - a) * (ref + a * np.outer(d, d))
+            mean += a * d
+        np.testing.assert_allclose(cov.covariance()[1], ref, rtol=1e-10)
+        sd = np.sqrt(np.diag(ref))
+        np.testing.assert_allclose(cov.correlation()[1], ref / np.outer(sd, sd), rtol=1e-10)
+        assert len(cov.returns("S0")) == 30
+
+
+class TestPortfolioOptimizerCorrelations:
+    """The optimizer streams closes into the engine and keeps its matrix"""
+
+    def _ohlcv(self, n: int, seed: int) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        return pd.DataFrame(
+            {"Close": close}, index=pd.date_range("2023-01-02", periods=n, freq="D")
+        )
+
+    def test_growing_history_matches_full_recompute(self):
+        data = {s: self._ohlcv(160, k) for k, s in enumerate(["AAA", "BBB", "CCC"])}
+        opt = PortfolioOptimizer(lookback_bars=20)
+        assert opt.covariance.window == 39
+        for end in [*range(2, 160, 3), 160]:
+            for sym, df in data.items():
+                opt.update_history(sym, df.iloc[:end])
+            result = opt.calculate_correlations(list(data))
+        assert result is opt.correlation_matrix
+        closes = pd.DataFrame({s: df["Close"] for s, df in data.items()})
+        expected = closes.pct_change().iloc[-39:].corr().to_numpy()
+        np.testing.assert_allclose(result.correlation, expected, atol=1e-10)
+        assert result.get_correlation("AAA", "CCC") == pytest.approx(expected[0, 2])
+        assert result.get_correlation("AAA", "ZZZ") == 0.0
+        assert len(opt.returns_by_symbol()["BBB"]) == 39
+
+    def test_revised_last_close(self):
+        df = self._ohlcv(60, 7)
+        other = self._ohlcv(60, 8)
+        opt = PortfolioOptimizer(lookback_bars=20)
+        opt.update_history("A", df)
+        opt.update_history("B", other)
+        revised = df.copy()
+        revised.iloc[-1, 0] *= 1.03
+        opt.update_history("A", revised)
+        result = opt.calculate_correlations(["A", "B"])
+        want = pd.DataFrame({"A": revised["Close"], "B": other["Close"]}).pct_change()
+        np.testing.assert_allclose(
+            result.correlation, want.iloc[-39:].corr().to_numpy(), atol=1e-10
+        )
+
+    def test_insufficient_history(self):
+        opt = PortfolioOptimizer()
+        opt.update_history("A", self._ohlcv(8, 1))
+        opt.update_history("B", self._ohlcv(30, 2))
+        assert opt.calculate_correlations(["A", "B"]) is None
+        assert opt.calculate_correlations(["B"]) is None
+        assert opt.correlation_matrix is None
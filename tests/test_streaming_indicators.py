@@ -0,0 +1,151 @@
+"""
+Tests for the incremental indicator layer and the strategies' streaming path.
+
+Every streaming indicator must reproduce its vectorized (pandas / `ta`)
+counterpart exactly, and `Strategy.update(bar)` must return the same
+StrategyOutput as `Strategy.evaluate(df)` on the history seen so far.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import MACD
+from ta.volatility import AverageTrueRange
+
+from trading_bot.indicators.streaming import (
+    RollingMax,
+    RollingMean,
+    RollingMin,
+    StreamingATR,
+    StreamingEMA,
+    StreamingMACD,
+    StreamingRSI,
+)
+from trading_bot.strategy.atr_breakout import AtrBreakoutStrategy
+from trading_bot.strategy.macd_volume_momentum import MacdVolumeMomentumStrategy
+from trading_bot.strategy.rsi_mean_reversion import RsiMeanReversionStrategy
+
+
+def _ohlcv(n: int, seed: int) -> pd.DataFrame:
+    """Random-walk OHLCV frame with the same dtypes the engine produces."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    close = np.maximum(close, 1.0)
+    high = close + rng.random(n) * 2
+    low = np.maximum(close - rng.random(n) * 2, 0.5)
+    df = pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.5, n),
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": rng.integers(100_000, 2_000_000, n),
+        },
+        index=pd.date_range("2022-01-03", periods=n, freq="D"),
+    )
+    for col in ("Open", "High", "Low", "Close"):
+        df[col] = df[col].astype(np.float32)
+    df["Volume"] = df["Volume"].astype(np.uint32)
+    return df
+
+
+def _assert_same(streamed, expected) -> None:
+    np.testing.assert_array_equal(
+        np.asarray(streamed, dtype=float), np.asarray(expected, dtype=float)
+    )
+
+
+def _assert_output_equal(a, b) -> None:
+    assert a.signal == b.signal
+    assert a.confidence == b.confidence
+    assert a.explanation.keys() == b.explanation.keys()
+    for k, v in a.explanation.items():
+        w = b.explanation[k]
+        if isinstance(v, float) and math.isnan(v):
+            assert isinstance(w, float) and math.isnan(w), k
+        else:
+            assert v == w, k
+
+
+class TestStreamingIndicators:
+    """Streaming indicators match their vectorized counterparts bit-for-bit"""
+
+    @pytest.fixture
+    def df(self):
+        return _ohlcv(400, seed=7).astype(float)
+
+    def test_rsi_matches_ta(self, df):
+        rsi = StreamingRSI(14)
+        _assert_same([rsi.update(c) for c in df["Close"]], RSIIndicator(df["Close"], 14).rsi())
+
+    def test_macd_matches_ta(self, df):
+        macd = StreamingMACD(12, 26, 9)
+        streamed = [macd.update(c) for c in df["Close"]]
+        _assert_same(streamed, MACD(df["Close"], 26, 12, 9).macd_diff())
+
+    def test_atr_matches_ta(self, df):
+        atr = StreamingATR(14)
+        streamed = [atr.update(h, lo, c) for h, lo, c in zip(df["High"], df["Low"], df["Close"])]
+        expected = AverageTrueRange(df["High"], df["Low"], df["Close"], 14).average_true_range()
+        _assert_same(streamed, expected)
+
+    @pytest.mark.parametrize("window", [1, 5, 20])
+    def test_rolling_windows_match_pandas(self, df, window):
+        mx, mn, sma = RollingMax(window), RollingMin(window), RollingMean(window)
+        _assert_same([mx.update(x) for x in df["High"]], df["High"].rolling(window).max())
+        _assert_same([mn.update(x) for x in df["Low"]], df["Low"].rolling(window).min())
+        _assert_same([sma.update(x) for x in df["Volume"]], df["Volume"].rolling(window).mean())
+
+    def test_ema_handles_leading_and_interior_nans(self, df):
+        x = df["Close"].copy()
+        x.iloc[:5] = np.nan
+        x.iloc[50] = np.nan
+        ema = StreamingEMA(span=9, min_periods=9)
+        _assert_same([ema.update(v) for v in x], x.ewm(span=9, min_periods=9, adjust=False).mean())
+
+    def test_ema_requires_exactly_one_parameter(self):
+        with pytest.raises(ValueError):
+            StreamingEMA()
+        with pytest.raises(ValueError):
+            StreamingEMA(span=10, alpha=0.1)
+
+
+class TestStrategyStreamingParity:
+    """`update(bar)` returns exactly what `evaluate(df)` returns on the same history"""
+
+    @pytest.mark.parametrize("seed", [0, 1])
+    @pytest.mark.parametrize(
+        "strategy",
+        [
+            RsiMeanReversionStrategy(),
+            RsiMeanReversionStrategy(rsi_period=5, entry_oversold=40.0, exit_rsi=55.0),
+            MacdVolumeMomentumStrategy(),
+            MacdVolumeMomentumStrategy(
+                macd_fast=5, macd_slow=13, macd_signal=4, vol_sma=5, vol_mult=0.8
+            ),
+            AtrBreakoutStrategy(),
+            AtrBreakoutStrategy(atr_period=10, breakout_lookback=5, atr_mult=0.25),
+        ],
+    )
+    def test_update_matches_evaluate_every_bar(self, strategy, seed):
+        df = _ohlcv(120, seed=seed)
+        strategy.reset()
+        for i in range(len(df)):
+            streamed = strategy.update(df.iloc[i], key="SYM")
+            _assert_output_equal(streamed, strategy.evaluate(df.iloc[: i + 1]))
+
+    def test_streams_are_isolated_per_key(self):
+        strat = RsiMeanReversionStrategy()
+        a, b = _ohlcv(60, seed=3), _ohlcv(60, seed=4)
+        for i in range(len(a)):
+            out_a = strat.update(a.iloc[i], key="A")
+            out_b = strat.update(b.iloc[i], key="B")
+        _assert_output_equal(out_a, strat.evaluate(a))
+        _assert_output_equal(out_b, strat.evaluate(b))
+
+    def test_update_rejects_missing_columns(self):
+        with pytest.raises(ValueError):
+            AtrBreakoutStrategy().update({"Close": 1.0})
@@ -0,0 +1,172 @@
+"""
+Tests for the vectorized parameter-sweep simulator.
+
+The simulator is checked against a plain per-bar loop of the same sleeve model
+and against `PaperBroker` fills on a single symbol.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.backtest.vectorized import (
+    VectorSimConfig,
+    build_signal_tensor,
+    results_frame,
+    simulate_signal_grid,
+)
+from trading_bot.broker.paper import PaperBroker, PaperBrokerConfig
+from trading_bot.core.models import Order
+from trading_bot.learn.tuner import default_params, maybe_tune_weekly
+from trading_bot.strategy.rsi_mean_reversion import RsiMeanReversionStrategy
+
+
+def _closes(n: int, m: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.maximum(50 + np.cumsum(rng.normal(0, 1.0, (n, m)), axis=0), 1.0)
+
+
+def _loop_equity(closes, sig, cfg: VectorSimConfig) -> np.ndarray:
+    """One parameter set, bar by bar."""
+    n, m = closes.shape
+    slip, comm = cfg.slippage_bps / 10_000.0, cfg.commission_bps / 10_000.0
+    cash = [cfg.start_cash / m] * m
+    shares = [0.0] * m
+    last_px = [np.nan] * m
+    out = np.empty(n)
+    for t in range(n):
+        for j in range(m):
+            px = closes[t, j]
+            if np.isnan(px):
+                continue
+            last_px[j] = px
+            if sig[t, j] and shares[j] == 0:
+                shares[j] = cash[j] / (px * (1 + slip) * (1 + comm))
+                cash[j] = 0.0
+            elif not sig[t, j] and shares[j] > 0:
+                cash[j] = shares[j] * px * (1 - slip) * (1 - comm)
+                shares[j] = 0.0
+        out[t] = sum(
+            cash[j] + (shares[j] * last_px[j] if shares[j] else 0.0) for j in range(m)
+        )
+    return out
+
+
+class TestSimulateSignalGrid:
+    """Batched simulation matches the per-bar model"""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_loop_for_every_param_set(self, seed):
+        rng = np.random.default_rng(seed)
+        closes = _closes(150, 4, seed)
+        closes[:30, 2] = np.nan  # listed late
+        closes[rng.choice(150, 20, replace=False), 3] = np.nan  # gaps
+        sig = (rng.random((7, 150, 4)) < 0.5).astype(np.int8)
+        cfg = VectorSimConfig(commission_bps=5.0, slippage_bps=3.0, chunk_size=3)
+
+        res = simulate_signal_grid(closes, sig, cfg)
+
+        assert res.equity.shape == (7, 150)
+        for p in range(7):
+            np.testing.assert_allclose(res.equity[p], _loop_equity(closes, sig[p], cfg), rtol=1e-10)
+
+    def test_matches_paper_broker_fills(self):
+        closes = _closes(80, 1, seed=5)
+        sig = np.zeros((80, 1), dtype=np.int8)
+        sig[10:30] = 1
+        sig[45:70] = 1
+        cfg = VectorSimConfig(start_cash=1e9, commission_bps=10.0, slippage_bps=5.0)
+        res = simulate_signal_grid(closes, sig, cfg)
+
+        broker = PaperBroker(
+            start_cash=cfg.start_cash,
+            config=PaperBrokerConfig(commission_bps=10.0, slippage_bps=5.0),
+        )
+        for t in range(80):
+            px = float(closes[t, 0])
+            broker.set_price("X", px)
+            pos = broker.portfolio().get_position("X")
+            if sig[t, 0] and pos.qty == 0:
+                qty = int(broker.portfolio().cash / (px * (1 + 5e-4) * (1 + 1e-3)))
+                broker.submit_order(Order(id=f"b{t}", ts=None, symbol="X", side="BUY", qty=qty))
+            elif not sig[t, 0] and pos.qty > 0:
+                sell = Order(id=f"s{t}", ts=None, symbol="X", side="SELL", qty=pos.qty)
+                broker.submit_order(sell)
+        final = broker.portfolio().equity(broker.prices())
+
+        assert res.num_trades[0] == 2
+        assert res.num_entries[0] == 2
+        assert res.equity[0, -1] == pytest.approx(final, rel=1e-6)
+
+    def test_metrics(self):
+        closes = np.array([[10.0], [11.0], [9.9], [12.0]])
+        res = simulate_signal_grid(closes, np.ones((2, 4, 1)) * [[[1]], [[0]]])
+        np.testing.assert_allclose(res.equity[0], [100_000, 110_000, 99_000, 120_000])
+        assert res.total_return[0] == pytest.approx(0.2)
+        assert res.max_drawdown[0] == pytest.approx(-0.1)
+        assert res.num_trades[0] == 0 and res.num_entries[0] == 1
+        np.testing.assert_allclose(res.equity[1], 100_000)
+        assert res.best("total_return") == 0
+
+    def test_rejects_mismatched_shapes(self):
+        with pytest.raises(ValueError):
+            simulate_signal_grid(np.ones((5, 2)), np.ones((3, 5, 3)))
+
+
+class TestBuildSignalTensor:
+    """Strategy grids stack into the simulator's layout"""
+
+    def test_rsi_grid(self):
+        idx = pd.date_range("2022-01-03", periods=200, freq="D")
+        frames = {}
+        for k, sym in enumerate(["A", "B"]):
+            close = _closes(200, 1, seed=10 + k)[:, 0]
+            frames[sym] = pd.DataFrame({"Close": close}, index=idx)
+        frames["B"] = frames["B"].iloc[50:]
+        grid = [{"entry_oversold": e} for e in (25.0, 30.0, 35.0, 40.0)]
+        strategies = [RsiMeanReversionStrategy(**g) for g in grid]
+
+        closes, sig, index, symbols = build_signal_tensor(frames, strategies)
+
+        assert closes.shape == (200, 2) and sig.shape == (4, 200, 2)
+        assert symbols == ["A", "B"] and index.equals(idx)
+        assert np.isnan(closes[:50, 1]).all()
+        np.testing.assert_array_equal(sig[1, 50:, 1], strategies[1].signals(frames["B"]).to_numpy())
+
+        table = results_frame(simulate_signal_grid(closes, sig), grid)
+        assert list(table["entry_oversold"]) == [25.0, 30.0, 35.0, 40.0]
+        assert {"total_return", "sharpe", "max_drawdown", "num_trades"} <= set(table.columns)
+
+
+class TestTunerSweep:
+    """The weekly tuner scores its grids with the sweep simulator"""
+
+    def test_picks_values_from_each_grid(self):
+        idx = pd.date_range("2022-01-03", periods=150, freq="D")
+        rng = np.random.default_rng(9)
+        frames = {}
+        for sym in ("A", "B", "C"):
+            close = _closes(150, 1, seed=int(rng.integers(1000)))[:, 0]
+            frames[sym] = pd.DataFrame(
+                {
+                    "High": close + 1.0,
+                    "Low": close - 1.0,
+                    "Close": close,
+                    "Volume": rng.integers(1_000, 5_000, 150).astype(float),
+                },
+                index=idx,
+            )
+
+        result = maybe_tune_weekly(
+            now=datetime(2022, 6, 1, tzinfo=timezone.utc),
+            last_tuned_bucket=None,
+            ohlcv_by_symbol=frames,
+            current_params=default_params(),
+        )
+
+        assert result.tuned
+        assert result.params["mean_reversion_rsi"]["entry_oversold"] in (25.0, 30.0, 35.0)
+        assert result.params["momentum_macd_volume"]["vol_mult"] in (1.0, 1.25, 1.5, 2.0)
+        assert result.params["breakout_atr"]["atr_mult"] in (0.75, 1.0, 1.25, 1.5)
@@ -0,0 +1,94 @@
+"""
+Tests for the parallel, signal-caching walk-forward executor.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot.backtest.walk_forward import (
+    WalkForwardBacktester,
+    WalkForwardExecutor,
+    WalkForwardOptimizer,
+)
+
+
+def ma_cross(data: pd.DataFrame, params: dict) -> pd.Series:
+    close = data["Close"]
+    fast = close.rolling(int(params["fast"]), min_periods=1).mean()
+    slow = close.rolling(int(params["slow"]), min_periods=1).mean()
+    return (fast > slow).astype(float)
+
+
+def _prices(n: int = 400, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, n)))
+    return pd.DataFrame({"Close": close}, index=pd.bdate_range("2020-01-01", periods=n))
+
+
+PARAMS = WalkForwardBacktester._generate_param_grid({"fast": (2, 10), "slow": (15, 40)}, samples=4)
+
+
+def _windows(data):
+    optimizer = WalkForwardOptimizer(step_days=20, min_window_days=30)
+    return optimizer.create_windows(data, lookback_days=len(data))
+
+
+class TestWalkForwardExecutor:
+    """Parallel and cached runs pick what a serial grid scan would pick"""
+
+    def test_matches_serial_scan(self):
+        data = _prices()
+        windows = _windows(data)
+        assert len(windows) > 3
+        bt = WalkForwardBacktester()
+
+        results = list(
+            WalkForwardExecutor(max_workers=2, causal_signals=False).iter_results(
+                data, windows, ma_cross, PARAMS
+            )
+        )
+        assert [r.window_num for r in results] == [w.window_num for w in windows]
+        for window, result in zip(windows, results):
+            train, test = WalkForwardOptimizer.split_data_by_window(data, window)
+            scores = [bt._evaluate_strategy(train, ma_cross, p)["sharpe_ratio"] for p in PARAMS]
+            assert result.parameter_set == PARAMS[int(np.argmax(scores))]
+            expected = bt._evaluate_strategy(test, ma_cross, result.parameter_set)
+            assert result.test_metrics == pytest.approx(expected)
+
+    def test_causal_signals_computed_once_per_param_set(self):
+        data = _prices()
+        windows = _windows(data)
+        calls = []
+
+        def counting(df, params):
+            calls.append(len(df))
+            return ma_cross(df, params)
+
+        serial = list(
+            WalkForwardExecutor(max_workers=1).iter_results(data, windows, counting, PARAMS)
+        )
+        assert calls == [len(data)] * len(PARAMS)
+
+        parallel = list(
+            WalkForwardExecutor(max_workers=3).iter_results(data, windows, ma_cross, PARAMS)
+        )
+        assert [r.parameter_set for r in parallel] == [r.parameter_set for r in serial]
+        stability = [r.parameter_stability for r in serial]
+        assert [r.parameter_stability for r in parallel] == pytest.approx(stability)
+
+    def test_streams_before_the_last_window(self):
+        data = _prices()
+        executor = WalkForwardExecutor(max_workers=2)
+        stream = executor.iter_results(data, _windows(data), ma_cross, PARAMS)
+        first = next(stream)
+        assert first.window_num == 0
+        stream.close()  # shuts the worker pools down
+
+    def test_backtester_delegates(self):
+        data = _prices()
+        analysis = WalkForwardBacktester().run_walk_forward_analysis(
+            data, ma_cross, {"fast": (2, 10), "slow": (15, 40)}, max_workers=2
+        )
+        assert analysis.windows
+        assert analysis.overall_metrics["num_windows"] == len(analysis.windows)
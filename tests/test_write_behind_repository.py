@@ -0,0 +1,150 @@
+"""
+Tests for the write-behind SQLite repository.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from trading_bot.core.models import Fill, Order, Portfolio, Position
+from trading_bot.db.repository import SqliteRepository
+from trading_bot.db.write_behind import BatchedSqliteRepository
+from trading_bot.strategy.base import StrategyDecision
+
+TABLES = ("orders", "fills", "portfolio_snapshots", "position_snapshots", "strategy_decisions")
+
+
+def _log_step(repo, step: int, symbols=("AAA", "BBB", "CCC")) -> None:
+    ts = datetime(2024, 1, 2) + timedelta(minutes=step)
+    prices = {}
+    for k, sym in enumerate(symbols):
+        oid = f"{step}-{sym}"
+        px = 100.0 + step + k
+        prices[sym] = px
+        repo.log_order_filled(Order(id=oid, ts=ts, symbol=sym, side="BUY", qty=10))
+        repo.log_fill(Fill(order_id=oid, ts=ts, symbol=sym, side="BUY", qty=10, price=px))
+        repo.log_strategy_decision(
+            ts=ts,
+            symbol=sym,
+            mode="ensemble",
+            decision=StrategyDecision(
+                signal=1, confidence=0.5, votes={"a": 1}, weights={"a": 1.0}, explanations={}
+            ),
+        )
+    portfolio = Portfolio(
+        cash=1_000.0 - step,
+        positions={s: Position(symbol=s, qty=10, avg_price=prices[s] - 1) for s in symbols},
+    )
+    repo.log_snapshot(ts=ts, portfolio=portfolio, prices=prices)
+
+
+def _dump(path) -> dict:
+    con = sqlite3.connect(path)
+    try:
+        return {t: con.execute(f"SELECT * FROM {t} ORDER BY 1, 2").fetchall() for t in TABLES}
+    finally:
+        con.close()
+
+
+@pytest.fixture
+def batched(tmp_path):
+    repo = BatchedSqliteRepository(db_path=tmp_path / "batched.sqlite")
+    repo.init_db()
+    yield repo
+    repo.close()
+
+
+class TestBatchedSqliteRepository:
+    """Queued writes land exactly as the direct path would write them"""
+
+    def test_rows_match_direct_repository(self, tmp_path, batched):
+        direct = SqliteRepository(db_path=tmp_path / "direct.sqlite")
+        direct.init_db()
+        for step in range(5):
+            _log_step(direct, step)
+            _log_step(batched, step)
+            batched.flush()
+
+        assert _dump(batched.db_path) == _dump(direct.db_path)
+        # events + snapshot rows + read model
+        assert batched.stats()["rows"] == 5 * (3 * 3 + 2 + 2 * 3)
+
+    def test_flush_is_a_barrier_and_uses_wal(self, batched):
+        _log_step(batched, 0)
+        batched.flush()
+        con = sqlite3.connect(batched.db_path)
+        try:
+            assert con.execute("SELECT COUNT(*) FROM fills").fetchone()[0] == 3
+            assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            con.close()
+
+    def test_reads_see_queued_events(self, batched):
+        _log_step(batched, 0)
+        _log_step(batched, 1)
+        assert batched.latest_portfolio_snapshot().cash == 999.0
+        assert len(batched.latest_position_snapshots()) == 3
+        assert len(batched.recent_fills(limit=100)) == 6
+
+    def test_close_drains_queue_then_writes_directly(self, tmp_path):
+        repo = BatchedSqliteRepository(db_path=tmp_path / "t.sqlite")
+        for step in range(20):
+            _log_step(repo, step)
+        repo.close()
+        assert len(_dump(repo.db_path)["fills"]) == 60
+
+        _log_step(repo, 20)
+        assert len(_dump(repo.db_path)["fills"]) == 63
+
+    def test_full_queue_blocks_the_caller(self, tmp_path):
+        repo = BatchedSqliteRepository(db_path=tmp_path / "t.sqlite", max_queue=2)
+        try:
+            with repo._db_lock:  # stall the writer
+                _log_step(repo, 0, symbols=("AAA",))
+                done = threading.Event()
+
+                def producer():
+                    for step in range(1, 6):
+                        _log_step(repo, step, symbols=("AAA",))
+                    done.set()
+
+                t = threading.Thread(target=producer, daemon=True)
+                t.start()
+                assert not done.wait(0.3)
+                assert repo.stats()["queued"] <= 2
+            t.join(10)
+            repo.flush()
+            assert len(_dump(repo.db_path)["fills"]) == 6
+        finally:
+            repo.close()
+
+    def test_failed_batch_is_reported_on_flush(self, batched):
+        order = Order(id="dup", ts=datetime(2024, 1, 2), symbol="AAA", side="BUY", qty=1)
+        batched.log_order_filled(order)
+        batched.log_order_filled(order)  # primary key clash
+        with pytest.raises(RuntimeError):
+            batched.flush()
+        batched.flush()  # the error is reported once
+
+    def test_bad_batch_is_dropped_and_writer_keeps_running(self, batched):
+        batched._write([None])  # not a (model, values) pair
+        with pytest.raises(RuntimeError):
+            batched.flush()
+        batched._queue.join()  # every taken item was marked done
+
+        _log_step(batched, 0)
+        batched.flush()
+        assert len(_dump(batched.db_path)["fills"]) == 3
+
+    def test_flush_times_out_when_writer_is_stalled(self, tmp_path):
+        repo = BatchedSqliteRepository(db_path=tmp_path / "t.sqlite", flush_timeout=0.1)
+        try:
+            with repo._db_lock:  # stall the writer
+                _log_step(repo, 0, symbols=("AAA",))
+                with pytest.raises(TimeoutError):
+                    repo.flush()
+            repo.flush(timeout=10)
+        finally:
+            repo.close()